@@ -5,9 +5,17 @@ Windows Folder Remark - 为 Windows 文件夹添加备注工具
 __author__ = "Piratf"
 
 from remark.core.base import CommentHandler
-from remark.core.folder_handler import FolderCommentHandler
+from remark.core.folder_handler import (
+    CommentResult,
+    ErrorKind,
+    FolderCommentHandler,
+    WriteStatus,
+)
 
 __all__ = [
     "CommentHandler",
+    "CommentResult",
+    "ErrorKind",
     "FolderCommentHandler",
+    "WriteStatus",
 ]
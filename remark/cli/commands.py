@@ -9,12 +9,29 @@ import tempfile
 import threading
 import urllib.error
 
+from remark.core.audit import AuditIssue, DesktopIniAuditor
+from remark.core.catalog import DEFAULT_CATALOG, DEFAULT_SEARCH_LIMIT, RemarkCatalog
 from remark.core.folder_handler import FolderCommentHandler
+from remark.core.manifest import (
+    ManifestError,
+    PlanAction,
+    apply_plan,
+    load_manifest,
+    plan_reconcile,
+)
+from remark.core.recursive import RecursiveRemarkApplier, RemarkTemplate
+from remark.core.watch import CacheSubscriber, CatalogSubscriber, ReporterSubscriber, Watcher
 from remark.gui import remark_dialog
-from remark.i18n import _ as _, set_language
+from remark.i18n import _ as _
+from remark.i18n import set_language
+from remark.storage.cache import RemarkCache
+from remark.storage.encoding_policy import EncodingPolicy
 from remark.utils import registry
+from remark.utils.cancellation import Deadline, DeadlineExceeded, OperationCancelled
+from remark.utils.concurrency import AdaptiveConcurrency
 from remark.utils.path_resolver import find_candidates
 from remark.utils.platform import check_platform
+from remark.utils.reporter import ConsoleReporter
 from remark.utils.updater import (
     check_updates_auto,
     check_updates_manual,
@@ -40,7 +57,13 @@ class CLI:
     """命令行接口"""
 
     def __init__(self):
-        self.handler = FolderCommentHandler()
+        # 交互模式、GUI 和 --view 会重复读取同一文件夹，启用读取缓存；
+        # 批量操作（审计、递归设置、清单）按存储的实际响应自动调整并发数
+        self.handler = FolderCommentHandler(
+            cache=RemarkCache(), reporter=ConsoleReporter(), concurrency=AdaptiveConcurrency()
+        )
+        # --find 使用的备注目录
+        self.catalog_path = DEFAULT_CATALOG
         self.pending_update = None
         self._update_check_done = threading.Event()
         # 初始化交互模式命令列表
@@ -148,15 +171,25 @@ class CLI:
             err_msg = str(e)
             if "closed connection" in err_msg.lower() or "connection reset" in err_msg.lower():
                 print(_("Download failed: Connection reset by server"))
-                print(_("Please try again later, or visit the following link to download manually:"))
+                print(
+                    _("Please try again later, or visit the following link to download manually:")
+                )
                 print(f"  {update['html_url']}")
             elif "timeout" in err_msg.lower():
                 print(_("Download failed: Request timeout"))
-                print(_("Please check your network connection, or visit the following link to download manually:"))
+                print(
+                    _(
+                        "Please check your network connection, or visit the following link to download manually:"
+                    )
+                )
                 print(f"  {update['html_url']}")
             elif "no route to host" in err_msg.lower() or "hostname" in err_msg.lower():
                 print(_("Download failed: Unable to connect to server"))
-                print(_("Please check your network connection, or visit the following link to download manually:"))
+                print(
+                    _(
+                        "Please check your network connection, or visit the following link to download manually:"
+                    )
+                )
                 print(f"  {update['html_url']}")
             else:
                 print(_("Download failed, please check your network or download manually"))
@@ -184,7 +217,11 @@ class CLI:
             print("")
             print(_("Usage Instructions:"))
             print(_("  Windows 10: Right-click folder to see 'Add Folder Remark'"))
-            print(_("  Windows 11: Right-click folder → Click 'Show more options' → Add Folder Remark"))
+            print(
+                _(
+                    "  Windows 11: Right-click folder → Click 'Show more options' → Add Folder Remark"
+                )
+            )
             return True
         else:
             print(_("Right-click menu installation failed"))
@@ -205,7 +242,7 @@ class CLI:
             return False
 
         # 显示对话框
-        comment = remark_dialog.show_remark_dialog(folder_path)
+        comment = remark_dialog.show_remark_dialog(folder_path, self.handler)
         if comment:
             result = self.add_comment(folder_path, comment)
             return result is not False
@@ -226,7 +263,11 @@ class CLI:
                             "Warning: desktop.ini file encoding is {encoding}, not standard UTF-16."
                         ).format(encoding=detected_encoding or _("unknown"))
                     )
-                    print(_("This may cause Chinese and other special characters to display abnormally."))
+                    print(
+                        _(
+                            "This may cause Chinese and other special characters to display abnormally."
+                        )
+                    )
 
                     # 询问是否修复
                     while True:
@@ -250,6 +291,296 @@ class CLI:
             else:
                 print(_("This folder has no remark"))
 
+    @staticmethod
+    def _audit_issue_label(issue: AuditIssue) -> str:
+        """审计问题的显示名称"""
+        labels = {
+            AuditIssue.NOT_UTF16: _("not UTF-16 encoded"),
+            AuditIssue.MISSING_SECTION: _("missing [.ShellClassInfo] section"),
+            AuditIssue.DUPLICATE_INFOTIP: _("duplicate InfoTip lines"),
+            AuditIssue.MIXED_LINE_ENDINGS: _("mixed line endings"),
+            AuditIssue.FILE_NOT_HIDDEN_SYSTEM: _("desktop.ini not hidden/system"),
+            AuditIssue.FOLDER_NOT_READONLY: _("folder not read-only"),
+            AuditIssue.UNREADABLE: _("unreadable"),
+        }
+        return labels[issue]
+
+    def _print_audit_result(self, result) -> None:
+        """输出单个有问题的审计结果"""
+        if result.clean:
+            return
+        issues = ", ".join(
+            self._audit_issue_label(issue) for issue in sorted(result.issues, key=lambda i: i.value)
+        )
+        print(_("{path}: {issues}").format(path=result.folder_path, issues=issues))
+        if result.fixed:
+            fixed = ", ".join(
+                self._audit_issue_label(issue)
+                for issue in sorted(result.fixed, key=lambda i: i.value)
+            )
+            print(_("  fixed: {issues}").format(issues=fixed))
+        if result.error:
+            print(_("  error: {error}").format(error=result.error))
+
+    @staticmethod
+    def _deadline(timeout: float | None) -> Deadline | None:
+        """--timeout 对应的截止时间"""
+        return Deadline(timeout) if timeout is not None else None
+
+    @staticmethod
+    def _print_stopped(error: BaseException) -> None:
+        """输出提前停止的原因，之后输出的是已完成部分的汇总"""
+        print()
+        if isinstance(error, DeadlineExceeded):
+            print(_("Time limit reached, stopped early. Results so far:"))
+        else:
+            print(_("Stopped early. Results so far:"))
+
+    def _print_concurrency(self) -> None:
+        """输出自适应并发最终选定的并发数"""
+        if self.handler.concurrency is None:
+            return
+        metrics = self.handler.concurrency.metrics()
+        print(
+            _("Concurrency: {limit} (raised {increases} times, lowered {decreases} times)").format(
+                limit=metrics.limit, increases=metrics.increases, decreases=metrics.decreases
+            )
+        )
+
+    def audit(self, path: str, fix: bool = False, timeout: float | None = None) -> bool:
+        """审计目录树中的 desktop.ini，可选就地修复；Ctrl+C 或超时时输出已完成部分的汇总"""
+        if not self._validate_folder(path):
+            return False
+
+        print(_("Auditing desktop.ini files under {path} ...").format(path=path))
+        auditor = DesktopIniAuditor(
+            fix=fix, attributes=self.handler.attributes, concurrency=self.handler.concurrency
+        )
+        try:
+            summary = auditor.run(
+                path, on_result=self._print_audit_result, token=self._deadline(timeout)
+            )
+        except (OperationCancelled, KeyboardInterrupt) as e:
+            self._print_stopped(e)
+            summary = auditor.summary
+
+        print()
+        print(
+            _(
+                "Audit finished: {directories} folders scanned, "
+                "{audited} desktop.ini files checked, {clean} without issues"
+            ).format(directories=summary.directories, audited=summary.audited, clean=summary.clean)
+        )
+        for issue, count, fixed in summary.histogram():
+            print(
+                _("  {issue}: {count} (fixed {fixed})").format(
+                    issue=self._audit_issue_label(issue), count=count, fixed=fixed
+                )
+            )
+        self._print_concurrency()
+        return True
+
+    def _batch_handler(self) -> FolderCommentHandler:
+        """
+        多文件夹操作使用的处理器
+
+        与 self.handler 共享缓存、属性后端、锁和并发控制，但不报告消息，并显式使用
+        FAIL 编码策略：工作线程不能在控制台询问，非 UTF-16 的 desktop.ini 计为失败，
+        可以之后用 --audit --fix 或单独设置该文件夹时再转换。
+        """
+        handler = self.handler
+        return FolderCommentHandler(
+            durability=handler.durability,
+            cache=handler.cache,
+            attributes=handler.attributes,
+            encoding_policy=EncodingPolicy.FAIL,
+            encoding_report=handler.encoding_report,
+            locks=handler.locks,
+            retry=handler.retry,
+            max_workers=handler.max_workers,
+            concurrency=handler.concurrency,
+            catalog=handler.catalog,
+        )
+
+    def _print_recursive_failure(self, result) -> None:
+        """输出递归设置中失败的文件夹"""
+        if not result.ok:
+            print(
+                _("{path}: failed ({error})").format(
+                    path=result.folder_path, error=result.detail or result.error.value
+                )
+            )
+
+    def apply_recursive(
+        self,
+        path: str,
+        template: str,
+        max_depth: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        timeout: float | None = None,
+    ) -> bool:
+        """为文件夹及其子孙文件夹设置备注模板；Ctrl+C 或超时时输出已完成部分的汇总"""
+        if not self._validate_folder(path):
+            return False
+        try:
+            remark_template = RemarkTemplate(template)
+        except ValueError as e:
+            print(_("Invalid remark template: {error}").format(error=e))
+            return False
+
+        applier = RecursiveRemarkApplier(
+            handler=self._batch_handler(), max_depth=max_depth, include=include, exclude=exclude
+        )
+        stopped = False
+        try:
+            summary = applier.run(
+                path,
+                remark_template,
+                on_result=self._print_recursive_failure,
+                token=self._deadline(timeout),
+            )
+        except (OperationCancelled, KeyboardInterrupt) as e:
+            self._print_stopped(e)
+            summary = applier.summary
+            stopped = True
+        print(
+            _(
+                "Done: {matched} folders processed, {updated} updated, "
+                "{unchanged} unchanged, {failed} failed"
+            ).format(
+                matched=summary.matched,
+                updated=summary.updated,
+                unchanged=summary.unchanged,
+                failed=summary.failed,
+            )
+        )
+        self._print_concurrency()
+        return summary.failed == 0 and not stopped
+
+    def find(
+        self,
+        query: str,
+        path: str | None = None,
+        limit: int | None = DEFAULT_SEARCH_LIMIT,
+        timeout: float | None = None,
+    ) -> bool:
+        """
+        按片段搜索备注目录
+
+        给出 path 时先增量刷新该目录树的记录（Ctrl+C 或超时时使用已刷新的部分），
+        只在其中搜索；否则搜索之前刷新过的所有目录树。
+        """
+        if path is not None and not self._validate_folder(path):
+            return False
+
+        with RemarkCatalog(
+            self.catalog_path,
+            attributes=self.handler.attributes,
+            concurrency=self.handler.concurrency,
+        ) as catalog:
+            if path is not None:
+                try:
+                    catalog.refresh(path, token=self._deadline(timeout))
+                except (OperationCancelled, KeyboardInterrupt) as e:
+                    self._print_stopped(e)
+            results = catalog.search(query, prefix=path, limit=limit)
+
+        for entry in results:
+            print(f"{entry.path}: {entry.remark}")
+        if not results:
+            print(_("No matching remarks"))
+        return bool(results)
+
+    def watch(self, paths: list[str], timeout: float | None = None) -> bool:
+        """
+        监视目录树，desktop.ini 或文件夹变化时更新备注目录和读取缓存并输出日志
+
+        监视开始后先增量刷新备注目录，之后只处理变化。Ctrl+C 或超时时停止。
+        """
+        for path in paths:
+            if not self._validate_folder(path):
+                return False
+
+        with (
+            RemarkCatalog(
+                self.catalog_path,
+                attributes=self.handler.attributes,
+                concurrency=self.handler.concurrency,
+            ) as catalog,
+            Watcher(paths, reporter=self.handler.reporter) as watcher,
+        ):
+            watcher.subscribe(CatalogSubscriber(catalog))
+            if self.handler.cache is not None:
+                watcher.subscribe(CacheSubscriber(self.handler.cache))
+            watcher.subscribe(ReporterSubscriber(ConsoleReporter()))
+            print(
+                _("Watching {count} folder tree(s) ({backend}), press Ctrl+C to stop").format(
+                    count=len(paths), backend=watcher.backend.name
+                )
+            )
+            try:
+                for path in paths:
+                    catalog.refresh(path)
+                watcher.run(self._deadline(timeout))
+            except KeyboardInterrupt:
+                pass
+        return True
+
+    @staticmethod
+    def _print_plan_item(item) -> None:
+        """输出计划中的一项"""
+        if item.action is PlanAction.CREATE:
+            print(f"  + {item.path}: {item.desired}")
+        elif item.action is PlanAction.UPDATE:
+            print(f"  ~ {item.path}: {item.current} -> {item.desired}")
+        elif item.action is PlanAction.DELETE:
+            print(f"  - {item.path}: {item.current}")
+        elif item.action is PlanAction.MISSING:
+            print(_("  ! {path}: folder not found").format(path=item.path))
+        elif item.action is PlanAction.ERROR:
+            print(_("  ! {path}: {error}").format(path=item.path, error=item.detail))
+
+    def reconcile(self, manifest_path: str, dry_run: bool = False) -> bool:
+        """按清单只设置或删除有差异的备注"""
+        try:
+            entries = load_manifest(manifest_path)
+        except (ManifestError, OSError) as e:
+            print(_("Invalid manifest: {error}").format(error=e))
+            return False
+
+        handler = self._batch_handler()
+        plan = plan_reconcile(entries, handler)
+        for item in plan.items:
+            self._print_plan_item(item)
+        counts = plan.counts()
+        print(
+            _(
+                "Plan: {create} to create, {update} to update, {delete} to delete, "
+                "{unchanged} unchanged, {missing} missing"
+            ).format(
+                create=counts[PlanAction.CREATE],
+                update=counts[PlanAction.UPDATE],
+                delete=counts[PlanAction.DELETE],
+                unchanged=counts[PlanAction.UNCHANGED],
+                missing=counts[PlanAction.MISSING] + counts[PlanAction.ERROR],
+            )
+        )
+        if dry_run:
+            print(_("Dry run, no changes made"))
+            return True
+
+        results = apply_plan(plan, handler)
+        for result in results:
+            self._print_recursive_failure(result)
+        failed = sum(1 for result in results if not result.ok)
+        print(
+            _("Applied: {succeeded} succeeded, {failed} failed").format(
+                succeeded=len(results) - failed, failed=failed
+            )
+        )
+        return failed == 0
+
     def interactive_mode(self) -> None:
         """交互模式"""
         version = get_version()
@@ -281,7 +612,9 @@ class CLI:
                     continue
 
                 if not os.path.isdir(user_input):
-                    print(_("This is a 'file', currently only supports adding remarks to 'folders'"))
+                    print(
+                        _("This is a 'file', currently only supports adding remarks to 'folders'")
+                    )
                     continue
 
                 comment = input(input_comment_msg)
@@ -325,6 +658,18 @@ class CLI:
         print(_("  --gui <path>        GUI mode (called from right-click menu)"))
         print(_("  --delete <path>     Delete remark"))
         print(_("  --view <path>       View remark"))
+        print(_("  --audit <path>      Audit desktop.ini files in a folder tree"))
+        print(_("  --fix              Repair issues found by --audit"))
+        print(_("  --recursive <path> <template>  Set remarks on a folder and its subfolders"))
+        print(_("  --max-depth <n>    Depth limit for --recursive"))
+        print(_("  --include <glob>   Only set remarks on matching folders (repeatable)"))
+        print(_("  --exclude <glob>   Skip matching folders and their subfolders (repeatable)"))
+        print(_("  --reconcile <manifest>  Apply remarks from a TOML/JSON/CSV manifest"))
+        print(_("  --dry-run          Show the --reconcile plan without applying it"))
+        print(_("  --find <text> [path]  Search remarks by fragment, refreshing path first"))
+        print(_("  --limit <n>        Maximum number of --find results (default 50)"))
+        print(_("  --watch <path>     Watch a folder tree for remark changes (repeatable)"))
+        print(_("  --timeout <seconds>  Time limit for --audit, --recursive, --find and --watch"))
         print(_("  --help, -h         Show help information"))
         print(_("Interactive Commands (available in interactive mode):"))
         print(_("  #help              Show interactive help"))
@@ -441,7 +786,7 @@ class CLI:
             return None
 
         if len(candidates) == 1:
-            path, remaining, path_type = candidates[0]
+            path, _remaining, path_type = candidates[0]
             if path_type == "folder":
                 return str(path)
             else:
@@ -466,6 +811,29 @@ class CLI:
         parser.add_argument("--gui", metavar="PATH", help="GUI 模式（右键菜单调用）")
         parser.add_argument("--delete", metavar="PATH", help="删除备注")
         parser.add_argument("--view", metavar="PATH", help="查看备注")
+        parser.add_argument("--audit", metavar="PATH", help="审计目录树中的 desktop.ini")
+        parser.add_argument("--fix", action="store_true", help="修复 --audit 发现的问题")
+        parser.add_argument(
+            "--recursive", nargs=2, metavar=("PATH", "TEMPLATE"), help="递归设置备注模板"
+        )
+        parser.add_argument("--max-depth", type=int, help="--recursive 的最大深度")
+        parser.add_argument("--include", action="append", metavar="GLOB", help="只处理匹配的文件夹")
+        parser.add_argument("--exclude", action="append", metavar="GLOB", help="跳过匹配的子树")
+        parser.add_argument("--reconcile", metavar="MANIFEST", help="按清单设置备注")
+        parser.add_argument("--dry-run", action="store_true", help="只显示 --reconcile 的计划")
+        parser.add_argument("--find", metavar="TEXT", help="按片段搜索备注")
+        parser.add_argument(
+            "--limit", type=int, default=DEFAULT_SEARCH_LIMIT, help="--find 的最大结果数"
+        )
+        parser.add_argument(
+            "--watch", action="append", metavar="PATH", help="监视目录树中的备注变化"
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            metavar="SECONDS",
+            help="--audit、--recursive、--find 和 --watch 的时间限制",
+        )
         parser.add_argument("--help", "-h", action="store_true", help="显示帮助信息")
         parser.add_argument("--lang", "-L", metavar="LANG", help="设置语言 (en, zh)", dest="lang")
 
@@ -502,6 +870,34 @@ class CLI:
                 self.view_comment(path)
             else:
                 print("错误: 路径不存在或未使用引号")
+        elif args.audit:
+            path = self._resolve_path_from_ambiguous_args([args.audit, *args.args])
+            if path:
+                self.audit(path, fix=args.fix, timeout=args.timeout)
+            else:
+                print("错误: 路径不存在或未使用引号")
+        elif args.recursive:
+            path, template = args.recursive
+            self.apply_recursive(
+                path,
+                template,
+                max_depth=args.max_depth,
+                include=args.include,
+                exclude=args.exclude,
+                timeout=args.timeout,
+            )
+        elif args.reconcile:
+            self.reconcile(args.reconcile, dry_run=args.dry_run)
+        elif args.find:
+            path = None
+            if args.args:
+                path = self._resolve_path_from_ambiguous_args(args.args)
+                if not path:
+                    print("错误: 路径不存在或未使用引号")
+                    return
+            self.find(args.find, path, limit=args.limit, timeout=args.timeout)
+        elif args.watch:
+            self.watch(args.watch, timeout=args.timeout)
         elif args.args:
             # 处理位置参数
             path, comment = self._handle_ambiguous_path(args.args)
@@ -2,10 +2,24 @@
 核心功能模块
 """
 
+from remark.core.async_handler import AsyncFolderCommentHandler
 from remark.core.base import CommentHandler
-from remark.core.folder_handler import FolderCommentHandler
+from remark.core.folder_handler import (
+    CommentResult,
+    ErrorKind,
+    FolderCommentHandler,
+    WriteStatus,
+)
+from remark.core.write_behind import WriteBehindQueue, WriteOperation, WriteResult
 
 __all__ = [
+    "AsyncFolderCommentHandler",
     "CommentHandler",
+    "CommentResult",
+    "ErrorKind",
     "FolderCommentHandler",
+    "WriteBehindQueue",
+    "WriteOperation",
+    "WriteResult",
+    "WriteStatus",
 ]
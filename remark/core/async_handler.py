@@ -0,0 +1,190 @@
+"""
+异步备注接口
+
+FolderCommentHandler 的操作都是阻塞的文件和属性 I/O，直接在事件循环中调用会阻塞循环。
+AsyncFolderCommentHandler 把这些操作放到有界线程池中执行，用信号量限制同时进行的操作数，
+返回与同步批量接口相同的 CommentResult。
+
+超时的操作返回 ErrorKind.TIMEOUT 的结果；取消会向调用方抛出 CancelledError。
+线程中的 I/O 无法被中断，超时或取消后操作仍可能在后台完成，
+信号量在线程真正结束时才释放，因此实际并发数始终不超过上限。
+一个实例只应在一个事件循环中使用。
+
+示例:
+    async with AsyncFolderCommentHandler(max_concurrency=16, timeout=5) as remarks:
+        results = await remarks.get_comments(paths)
+        async for result in remarks.iter_comments(paths):
+            ...
+"""
+
+import asyncio
+import time
+from asyncio import FIRST_COMPLETED
+from collections.abc import AsyncIterator, Mapping
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from remark.core.folder_handler import CommentResult, ErrorKind, FolderCommentHandler, WriteStatus
+from remark.utils.pool import DEFAULT_MAX_WORKERS
+
+
+class AsyncFolderCommentHandler:
+    """FolderCommentHandler 的 asyncio 接口"""
+
+    def __init__(
+        self,
+        handler: FolderCommentHandler | None = None,
+        max_concurrency: int | None = None,
+        executor: Executor | None = None,
+        timeout: float | None = None,
+        max_pending: int | None = None,
+    ):
+        """
+        Args:
+            handler: 执行实际操作的同步处理器，None 时创建默认处理器
+            max_concurrency: 同时进行的操作数上限，None 表示 DEFAULT_MAX_WORKERS
+            executor: 可选的线程池，由调用方负责关闭；None 时创建大小为
+                max_concurrency 的线程池，close() 时关闭
+            timeout: 单个操作的默认超时（秒），None 表示不限制
+            max_pending: 批量迭代时最多同时创建的任务数，None 表示 max_concurrency 的 4 倍
+        """
+        self.handler = handler or FolderCommentHandler()
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_WORKERS
+        self.max_pending = max_pending or self.max_concurrency * 4
+        if self.max_concurrency <= 0 or self.max_pending <= 0:
+            raise ValueError("max_concurrency and max_pending must be positive")
+        self.timeout = timeout
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="remark-async"
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _call(self, func, folder_path: str, *args, timeout=None) -> CommentResult:
+        """在线程池中执行 func(folder_path, *args)，超时返回 TIMEOUT 结果"""
+        if timeout is None:
+            timeout = self.timeout
+        start = time.perf_counter()
+        await self._semaphore.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor, func, folder_path, *args
+            )
+        except BaseException:
+            self._semaphore.release()
+            raise
+        # 线程结束时才释放信号量，超时和取消不会让实际并发数超过上限
+        future.add_done_callback(lambda _future: self._semaphore.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except TimeoutError:
+            return CommentResult(
+                folder_path,
+                WriteStatus.FAILED,
+                comment=args[0] if args else None,
+                error=ErrorKind.TIMEOUT,
+                elapsed=time.perf_counter() - start,
+            )
+
+    async def get_comment(self, folder_path: str, timeout: float | None = None) -> CommentResult:
+        """读取文件夹备注，见 FolderCommentHandler.get_comment_result"""
+        return await self._call(self.handler.get_comment_result, folder_path, timeout=timeout)
+
+    async def set_comment(
+        self, folder_path: str, comment: str, timeout: float | None = None
+    ) -> CommentResult:
+        """设置文件夹备注，见 FolderCommentHandler.set_comment_result"""
+        return await self._call(
+            self.handler.set_comment_result, folder_path, comment, timeout=timeout
+        )
+
+    async def delete_comment(self, folder_path: str, timeout: float | None = None) -> CommentResult:
+        """删除文件夹备注，见 FolderCommentHandler.delete_comment_result"""
+        return await self._call(self.handler.delete_comment_result, folder_path, timeout=timeout)
+
+    async def _iter(self, start_call, items) -> AsyncIterator[CommentResult]:
+        """
+        为 items 中的每一项创建任务，按完成顺序产出结果
+
+        同时存在的任务数不超过 max_pending；items 可以是同步或异步可迭代对象，惰性读取。
+        提前停止迭代时取消尚未完成的任务。
+        """
+        pending: set[asyncio.Task] = set()
+
+        async def source():
+            if hasattr(items, "__aiter__"):
+                async for item in items:
+                    yield item
+            else:
+                for item in items:
+                    yield item
+
+        try:
+            async for item in source():
+                pending.add(asyncio.ensure_future(start_call(item)))
+                if len(pending) >= self.max_pending:
+                    done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def iter_comments(self, paths, timeout: float | None = None) -> AsyncIterator[CommentResult]:
+        """并发读取多个文件夹的备注，按完成顺序产出结果"""
+        return self._iter(lambda path: self.get_comment(path, timeout), paths)
+
+    def iter_set_comments(self, comments, timeout: float | None = None):
+        """并发设置多个文件夹的备注，按完成顺序产出结果"""
+        items = comments.items() if isinstance(comments, Mapping) else comments
+        return self._iter(lambda item: self.set_comment(item[0], item[1], timeout), items)
+
+    def iter_delete_comments(self, paths, timeout: float | None = None):
+        """并发删除多个文件夹的备注，按完成顺序产出结果"""
+        return self._iter(lambda path: self.delete_comment(path, timeout), paths)
+
+    async def _gather(self, start_call, items) -> list[CommentResult]:
+        """按输入顺序收集结果"""
+        items = list(items)
+        results: list[CommentResult | None] = [None] * len(items)
+
+        async def indexed(pair):
+            index, item = pair
+            results[index] = await start_call(item)
+
+        async for _ in self._iter(indexed, enumerate(items)):
+            pass
+        return results  # type: ignore[return-value]
+
+    async def get_comments(self, paths, timeout: float | None = None) -> list[CommentResult]:
+        """并发读取多个文件夹的备注，结果按输入顺序排列"""
+        return await self._gather(lambda path: self.get_comment(path, timeout), paths)
+
+    async def set_comments(self, comments, timeout: float | None = None) -> list[CommentResult]:
+        """
+        并发设置多个文件夹的备注，结果按输入顺序排列
+
+        Args:
+            comments: 文件夹路径 -> 备注的映射，或 (路径, 备注) 的可迭代对象
+            timeout: 单个操作的超时，None 表示使用 self.timeout
+        """
+        items = comments.items() if isinstance(comments, Mapping) else comments
+        return await self._gather(lambda item: self.set_comment(item[0], item[1], timeout), items)
+
+    async def delete_comments(self, paths, timeout: float | None = None) -> list[CommentResult]:
+        """并发删除多个文件夹的备注，结果按输入顺序排列"""
+        return await self._gather(lambda path: self.delete_comment(path, timeout), paths)
+
+    def close(self) -> None:
+        """关闭自行创建的线程池（不等待后台仍在进行的操作）"""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,391 @@
+"""
+desktop.ini 批量审计与修复
+
+遍历目录树，检查每个 desktop.ini 的常见问题：
+
+- 不是 UTF-16 编码（资源管理器无法正确显示非 ASCII 备注）
+- 缺少 [.ShellClassInfo] 段落
+- 重复的 InfoTip 行
+- 混用多种行尾符
+- desktop.ini 缺少隐藏/系统属性
+- 所在文件夹缺少只读属性（资源管理器不会读取 desktop.ini）
+
+检查在有界线程池中并发执行，结果按完成顺序流式返回，最后给出按问题分类的汇总。
+开启修复时在文件夹锁内就地修复可修复的问题。
+
+遍历和检查可以通过取消令牌或截止时间中途停止，此时抛出 OperationCancelled，
+已经产出的结果和 summary 中的部分汇总仍然有效。
+"""
+
+import contextlib
+import dataclasses
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+
+from remark.storage.atomic import Durability
+from remark.storage.attributes import (
+    FILE_ATTRIBUTE_HIDDEN,
+    FILE_ATTRIBUTE_READONLY,
+    FILE_ATTRIBUTE_SYSTEM,
+    AttributeBackend,
+    get_default_backend,
+)
+from remark.storage.desktop_ini import LINE_ENDING, DesktopIniHandler, DesktopIniTooLarge
+from remark.storage.locking import FolderLocks
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.concurrency import AdaptiveConcurrency
+from remark.utils.pool import bounded_map
+from remark.utils.progress import ProgressCallback, ProgressTracker
+from remark.utils.walker import walk_directories
+
+
+class AuditIssue(Enum):
+    """desktop.ini 问题类型"""
+
+    NOT_UTF16 = "not_utf16"
+    MISSING_SECTION = "missing_section"
+    DUPLICATE_INFOTIP = "duplicate_infotip"
+    MIXED_LINE_ENDINGS = "mixed_line_endings"
+    FILE_NOT_HIDDEN_SYSTEM = "file_not_hidden_system"
+    FOLDER_NOT_READONLY = "folder_not_readonly"
+    UNREADABLE = "unreadable"  # 无法读取、超过大小上限或无法解码
+
+
+# 需要改写文件内容才能修复的问题
+CONTENT_ISSUES = frozenset(
+    {AuditIssue.NOT_UTF16, AuditIssue.DUPLICATE_INFOTIP, AuditIssue.MIXED_LINE_ENDINGS}
+)
+# 可以就地修复的问题（缺少段落和无法读取只报告，不猜测内容）
+FIXABLE_ISSUES = CONTENT_ISSUES | {
+    AuditIssue.FILE_NOT_HIDDEN_SYSTEM,
+    AuditIssue.FOLDER_NOT_READONLY,
+}
+
+
+@dataclass
+class AuditResult:
+    """
+    单个 desktop.ini 的审计结果
+
+    Attributes:
+        folder_path: 文件夹路径
+        issues: 发现的问题
+        encoding: 解码使用的编码
+        fixed: 已修复的问题
+        error: 读取或修复失败的原因
+    """
+
+    folder_path: str
+    issues: frozenset[AuditIssue]
+    encoding: str | None = None
+    fixed: frozenset[AuditIssue] = frozenset()
+    error: str | None = None
+
+    @property
+    def clean(self) -> bool:
+        """是否没有任何问题"""
+        return not self.issues
+
+    @property
+    def remaining(self) -> frozenset[AuditIssue]:
+        """尚未修复的问题"""
+        return self.issues - self.fixed
+
+
+@dataclass
+class AuditSummary:
+    """
+    审计汇总
+
+    Attributes:
+        directories: 遍历的目录数
+        audited: 检查的 desktop.ini 数
+        clean: 没有问题的 desktop.ini 数
+        issues: 问题类型 -> 出现次数
+        fixed: 问题类型 -> 修复次数
+    """
+
+    directories: int = 0
+    audited: int = 0
+    clean: int = 0
+    issues: Counter = field(default_factory=Counter)
+    fixed: Counter = field(default_factory=Counter)
+
+    def add(self, result: AuditResult) -> None:
+        """累加一个审计结果"""
+        self.audited += 1
+        if result.clean:
+            self.clean += 1
+        self.issues.update(result.issues)
+        self.fixed.update(result.fixed)
+
+    def histogram(self) -> list[tuple[AuditIssue, int, int]]:
+        """
+        按出现次数从多到少排列的问题分布
+
+        Returns:
+            list: (问题类型, 出现次数, 修复次数)
+        """
+        return [(issue, count, self.fixed[issue]) for issue, count in self.issues.most_common()]
+
+
+def audit_folder(folder_path: str, attributes: AttributeBackend | None = None) -> AuditResult:
+    """
+    检查一个文件夹的 desktop.ini
+
+    Args:
+        folder_path: 包含 desktop.ini 的文件夹
+        attributes: 文件属性后端，None 表示使用默认后端
+
+    Returns:
+        AuditResult: 审计结果
+    """
+    try:
+        encoding, is_utf16, document = DesktopIniHandler.load(folder_path)
+    except (OSError, DesktopIniTooLarge) as e:
+        return AuditResult(folder_path, frozenset({AuditIssue.UNREADABLE}), error=str(e))
+
+    issues = set()
+    if not is_utf16:
+        issues.add(AuditIssue.NOT_UTF16)
+    if document is None:
+        issues.add(AuditIssue.UNREADABLE)
+    else:
+        if not document.has_section(DesktopIniHandler.SHELL_CLASS_INFO):
+            issues.add(AuditIssue.MISSING_SECTION)
+        info_tips = document.get_all(
+            DesktopIniHandler.SHELL_CLASS_INFO, DesktopIniHandler.PROPERTY_INFOTIP
+        )
+        if len(info_tips) > 1:
+            issues.add(AuditIssue.DUPLICATE_INFOTIP)
+        if len(document.line_endings()) > 1:
+            issues.add(AuditIssue.MIXED_LINE_ENDINGS)
+
+    if not DesktopIniHandler.has_attributes(
+        DesktopIniHandler.get_path(folder_path),
+        FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM,
+        attributes,
+    ):
+        issues.add(AuditIssue.FILE_NOT_HIDDEN_SYSTEM)
+    if not DesktopIniHandler.has_attributes(folder_path, FILE_ATTRIBUTE_READONLY, attributes):
+        issues.add(AuditIssue.FOLDER_NOT_READONLY)
+
+    return AuditResult(folder_path, frozenset(issues), encoding)
+
+
+def repair_folder(
+    result: AuditResult,
+    attributes: AttributeBackend | None = None,
+    locks: FolderLocks | None = None,
+    durability: Durability | None = None,
+) -> AuditResult:
+    """
+    就地修复审计发现的问题
+
+    内容问题（编码、重复 InfoTip、混合行尾符）通过一次重写修复：
+    重复的 InfoTip 保留第一个值，行尾符统一为 CRLF，写入 UTF-16。
+    重写会先清除隐藏/系统属性，写入后恢复。整个过程持有文件夹锁。
+
+    Args:
+        result: audit_folder 的结果
+        attributes: 文件属性后端，None 表示使用默认后端
+        locks: 文件夹锁，None 表示使用默认的进程内+跨进程锁
+        durability: 持久化级别，None 表示使用存储层默认值
+
+    Returns:
+        AuditResult: 记录了已修复问题的新结果
+    """
+    fixable = result.issues & FIXABLE_ISSUES
+    if not fixable:
+        return result
+
+    folder_path = result.folder_path
+    desktop_ini_path = DesktopIniHandler.get_path(folder_path)
+    fixed: set[AuditIssue] = set()
+    error = None
+    try:
+        with (locks or FolderLocks()).hold(folder_path):
+            rewritten = False
+            if fixable & CONTENT_ISSUES:
+                # 在锁内重新读取，避免覆盖审计之后的修改
+                _encoding, _is_utf16, document = DesktopIniHandler.load(folder_path)
+                if document is not None:
+                    section = DesktopIniHandler.SHELL_CLASS_INFO
+                    key = DesktopIniHandler.PROPERTY_INFOTIP
+                    values = document.get_all(section, key)
+                    if len(values) > 1:
+                        document.set(section, key, values[0])
+                    if AuditIssue.MIXED_LINE_ENDINGS in fixable:
+                        document.line_ending = LINE_ENDING
+                        for line in document.iter_lines():
+                            if line.ending:
+                                line.ending = LINE_ENDING
+                    original = DesktopIniHandler.get_file_attributes(desktop_ini_path, attributes)
+                    if not DesktopIniHandler.clear_file_attributes(desktop_ini_path, attributes):
+                        raise OSError(f"无法清除 {desktop_ini_path} 的属性")
+                    try:
+                        DesktopIniHandler.write_document(folder_path, document, durability)
+                        rewritten = True
+                    finally:
+                        # 写入失败时恢复原有的隐藏/系统属性，不让 desktop.ini 保持可见
+                        hidden_system = (original or 0) & (
+                            FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+                        )
+                        if not rewritten and hidden_system:
+                            with contextlib.suppress(OSError):
+                                (attributes or get_default_backend()).update(
+                                    desktop_ini_path, add=hidden_system
+                                )
+                    fixed |= fixable & CONTENT_ISSUES
+
+            if (
+                (AuditIssue.FILE_NOT_HIDDEN_SYSTEM in fixable or rewritten)
+                and DesktopIniHandler.set_file_hidden_system_attributes(
+                    desktop_ini_path, attributes
+                )
+                and AuditIssue.FILE_NOT_HIDDEN_SYSTEM in fixable
+            ):
+                fixed.add(AuditIssue.FILE_NOT_HIDDEN_SYSTEM)
+
+            if AuditIssue.FOLDER_NOT_READONLY in fixable and (
+                DesktopIniHandler.set_folder_system_attributes(folder_path, attributes)
+            ):
+                fixed.add(AuditIssue.FOLDER_NOT_READONLY)
+    except (OSError, DesktopIniTooLarge) as e:
+        error = str(e)
+
+    return dataclasses.replace(result, fixed=frozenset(fixed), error=error or result.error)
+
+
+class DesktopIniAuditor:
+    """
+    目录树 desktop.ini 审计器
+
+    示例:
+        auditor = DesktopIniAuditor(fix=True)
+        for result in auditor.iter_audit(root):
+            ...
+        auditor.summary.histogram()
+    """
+
+    def __init__(
+        self,
+        fix: bool = False,
+        attributes: AttributeBackend | None = None,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        max_depth: int | None = None,
+        locks: FolderLocks | None = None,
+        durability: Durability | None = None,
+        executor: ThreadPoolExecutor | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+    ):
+        """
+        Args:
+            fix: 是否就地修复可修复的问题
+            attributes: 文件属性后端，None 表示使用默认后端
+            max_workers: 并发检查的线程数，None 表示默认值
+            max_pending: 最多同时在途的检查任务数，None 表示线程数的 4 倍
+            max_depth: 最大遍历深度，None 表示不限制
+            locks: 修复时使用的文件夹锁
+            durability: 修复写入的持久化级别
+            executor: 可选的线程池，由调用方负责关闭。审计器共享属性后端和文件夹锁
+                （含线程锁，不能 pickle），只支持线程池，不支持 ProcessPoolExecutor
+            concurrency: 可选的自适应并发控制器，给定时忽略 max_workers 和 max_pending
+
+        Raises:
+            TypeError: executor 不是线程池
+        """
+        if executor is not None and not isinstance(executor, ThreadPoolExecutor):
+            raise TypeError("executor must be a ThreadPoolExecutor")
+        self.fix = fix
+        self.attributes = attributes
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_depth = max_depth
+        self.locks = locks if locks is not None else FolderLocks()
+        self.durability = durability
+        self.executor = executor
+        self.concurrency = concurrency
+        self.summary = AuditSummary()
+
+    def iter_candidates(
+        self, root: str, token: CancellationToken | Deadline | None = None
+    ) -> Iterator[str]:
+        """遍历目录树，产出包含 desktop.ini 的文件夹"""
+        for entry in walk_directories(root, max_depth=self.max_depth, token=token):
+            self.summary.directories += 1
+            if entry.has_file(DesktopIniHandler.FILENAME):
+                yield entry.path
+
+    def audit(self, folder_path: str) -> AuditResult:
+        """检查（并按需修复）一个文件夹"""
+        result = audit_folder(folder_path, self.attributes)
+        if self.fix:
+            result = repair_folder(result, self.attributes, self.locks, self.durability)
+        return result
+
+    def iter_audit(
+        self,
+        root: str,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> Iterator[AuditResult]:
+        """
+        并发审计目录树，按完成顺序流式产出结果
+
+        每次调用重置 summary。
+
+        Args:
+            root: 根目录
+            token: 可选的取消令牌或截止时间
+            progress: 可选的进度回调，done 为已检查的 desktop.ini 数（总数未知）
+
+        Raises:
+            OperationCancelled: 被取消或超时，summary 保留已完成部分的汇总
+        """
+        self.summary = AuditSummary()
+        with ProgressTracker(progress) as tracker:
+            for result in bounded_map(
+                self.audit,
+                self.iter_candidates(root, token),
+                max_workers=self.max_workers,
+                max_pending=self.max_pending,
+                executor=self.executor,
+                token=token,
+                controller=self.concurrency,
+                is_error=lambda result: result.error is not None,
+            ):
+                self.summary.add(result)
+                tracker.advance()
+                yield result
+
+    def run(
+        self,
+        root: str,
+        on_result=None,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> AuditSummary:
+        """
+        审计整个目录树
+
+        Args:
+            root: 根目录
+            on_result: 可选回调，每个结果产出时调用
+            token: 可选的取消令牌或截止时间
+            progress: 可选的进度回调
+
+        Returns:
+            AuditSummary: 汇总
+
+        Raises:
+            OperationCancelled: 被取消或超时，self.summary 保留已完成部分的汇总
+        """
+        for result in self.iter_audit(root, token, progress):
+            if on_result is not None:
+                on_result(result)
+        return self.summary
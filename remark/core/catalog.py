@@ -0,0 +1,686 @@
+"""
+备注目录（SQLite 索引）
+
+把目录树中每个文件夹的备注和 desktop.ini 状态保存在本地 SQLite 数据库（WAL 模式）中，
+按备注查找文件夹、列出某个目录下所有备注都是索引查询，不需要遍历共享读取 desktop.ini。
+
+- 每个文件夹一行：路径、上级文件夹、备注、desktop.ini 的修改时间/大小/编码、
+  文件夹和 desktop.ini 的属性，以及文件夹自身的修改时间
+- refresh() 按层级并发扫描目录树（有界线程池）。文件夹的修改时间未变化时不重新列举，
+  子文件夹从目录中读取；desktop.ini 的修改时间和大小未变化时不重新读取
+- 子文件夹被删除或移动后，上级文件夹的修改时间变化，重新列举时删除对应的整棵子树
+- FolderCommentHandler(catalog=...) 在写入和删除的同一调用中（持有文件夹锁）更新目录
+- search() 按片段搜索备注（"contract"、"合同"、客户编号的一部分），
+  基于 FTS5 trigram 全文索引，支持子串和中日韩文本匹配、不区分大小写、按子树过滤
+
+desktop.ini 原地改写不会改变文件夹的修改时间，因此已有 desktop.ini 的文件夹
+每次刷新仍会 stat 一次 desktop.ini。目录是缓存而不是权威数据，读取备注仍以磁盘为准。
+
+示例:
+    with RemarkCatalog("remarks.sqlite3") as catalog:
+        catalog.refresh("D:/Projects")
+        catalog.find_remark("Q3 contracts")
+        catalog.search("contract", prefix="D:/Projects", limit=20)
+        for entry in catalog.iter_remarks("D:/Projects/Clients"):
+            ...
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from remark.storage.attributes import (
+    FILE_ATTRIBUTE_HIDDEN,
+    FILE_ATTRIBUTE_READONLY,
+    FILE_ATTRIBUTE_SYSTEM,
+    AttributeBackend,
+)
+from remark.storage.desktop_ini import DesktopIniHandler, DesktopIniTooLarge
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.concurrency import AdaptiveConcurrency
+from remark.utils.platform import user_cache_dir
+from remark.utils.pool import bounded_map
+from remark.utils.progress import ProgressCallback, ProgressTracker
+from remark.utils.walker import is_link
+
+# 默认的目录数据库（位于当前用户的缓存目录）
+DEFAULT_CATALOG = os.path.join(user_cache_dir(), "catalog.sqlite3")
+# 数据库结构版本，不匹配时重建
+CATALOG_SCHEMA_VERSION = 2
+# 按键批量查询时每条 SQL 的参数个数
+_QUERY_CHUNK = 500
+# 列出备注时每页的行数
+_PAGE_SIZE = 1000
+# search() 默认返回的结果数
+DEFAULT_SEARCH_LIMIT = 50
+# trigram 索引能匹配的最短词长，更短的词逐行比较
+_TRIGRAM = 3
+
+_COLUMNS = (
+    "path",
+    "remark",
+    "dir_mtime_ns",
+    "ini_mtime_ns",
+    "ini_size",
+    "encoding",
+    "folder_attributes",
+    "ini_attributes",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    parent TEXT,
+    path TEXT NOT NULL,
+    remark TEXT,
+    dir_mtime_ns INTEGER,
+    ini_mtime_ns INTEGER,
+    ini_size INTEGER,
+    encoding TEXT,
+    folder_attributes INTEGER,
+    ini_attributes INTEGER,
+    scanned_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS folders_parent ON folders(parent);
+CREATE INDEX IF NOT EXISTS folders_remark ON folders(remark) WHERE remark IS NOT NULL;
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# 备注全文索引：FTS5 trigram 分词（SQLite 3.34+）按三字符片段索引，
+# 子串和中日韩文本都能匹配，不区分大小写。外部内容表，由触发器与 folders 同步
+_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE remark_search USING fts5(
+    remark, content='folders', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER folders_search_insert AFTER INSERT ON folders BEGIN
+    INSERT INTO remark_search(rowid, remark) VALUES (new.id, new.remark);
+END;
+CREATE TRIGGER folders_search_delete AFTER DELETE ON folders BEGIN
+    INSERT INTO remark_search(remark_search, rowid, remark) VALUES ('delete', old.id, old.remark);
+END;
+CREATE TRIGGER folders_search_update AFTER UPDATE OF remark ON folders BEGIN
+    INSERT INTO remark_search(remark_search, rowid, remark) VALUES ('delete', old.id, old.remark);
+    INSERT INTO remark_search(rowid, remark) VALUES (new.id, new.remark);
+END;
+INSERT INTO remark_search(remark_search) VALUES ('rebuild');
+"""
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS remark_search;
+DROP TABLE IF EXISTS folders;
+DROP TABLE IF EXISTS meta;
+"""
+
+
+def catalog_key(path: str) -> str:
+    """目录中的键：规范化的绝对路径（Windows 上不区分大小写）"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _escape_like(text: str) -> str:
+    """转义 LIKE 模式中的通配符（配合 ESCAPE '\\'）"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def subtree_range(key: str) -> tuple[str, str]:
+    """键在 key 子树中（不含 key 本身）的范围 [low, high)"""
+    prefix = key.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogEntry:
+    """
+    目录中的一个文件夹
+
+    Attributes:
+        path: 文件夹路径
+        remark: 备注，没有时为 None
+        dir_mtime_ns: 文件夹的修改时间，尚未列举过时为 None
+        ini_mtime_ns: desktop.ini 的修改时间，没有 desktop.ini 时为 None
+        ini_size: desktop.ini 的大小
+        encoding: desktop.ini 解码使用的编码
+        folder_attributes: 文件夹属性，没有 desktop.ini 或无法读取时为 None
+        ini_attributes: desktop.ini 属性
+    """
+
+    path: str
+    remark: str | None = None
+    dir_mtime_ns: int | None = None
+    ini_mtime_ns: int | None = None
+    ini_size: int | None = None
+    encoding: str | None = None
+    folder_attributes: int | None = None
+    ini_attributes: int | None = None
+
+    @property
+    def has_desktop_ini(self) -> bool:
+        """是否有 desktop.ini"""
+        return self.ini_mtime_ns is not None
+
+    @property
+    def shell_ready(self) -> bool:
+        """desktop.ini 已隐藏+系统、文件夹已只读（资源管理器会显示备注）"""
+        ini_mask = FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+        return (
+            self.ini_attributes is not None
+            and self.ini_attributes & ini_mask == ini_mask
+            and self.folder_attributes is not None
+            and self.folder_attributes & FILE_ATTRIBUTE_READONLY != 0
+        )
+
+
+@dataclass
+class CatalogRefresh:
+    """
+    一次刷新的统计
+
+    Attributes:
+        directories: 遍历的文件夹数
+        listed: 重新列举的文件夹数
+        reused: 修改时间未变化、未重新列举的文件夹数
+        read: 重新读取的 desktop.ini 数
+        removed: 从目录中删除的文件夹数（已不存在）
+        errors: 无法访问的文件夹数
+    """
+
+    directories: int = 0
+    listed: int = 0
+    reused: int = 0
+    read: int = 0
+    removed: int = 0
+    errors: int = 0
+
+
+@dataclass(slots=True)
+class _Scan:
+    """单个文件夹的扫描结果（工作线程产出，主线程写入数据库）"""
+
+    path: str
+    entry: CatalogEntry | None = None
+    # None 表示未重新列举，子文件夹从目录中读取
+    children: list[str] | None = None
+    changed: bool = False
+    read: bool = False
+    missing: bool = False
+
+
+class RemarkCatalog:
+    """
+    备注目录（线程安全，同一进程内共享一个连接）
+
+    path 为 ":memory:" 时只保存在内存中。full_text 表示 SQLite 是否支持全文索引。
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CATALOG,
+        attributes: AttributeBackend | None = None,
+        max_workers: int | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+    ):
+        """
+        Args:
+            path: 数据库文件路径，所在目录不存在时自动创建
+            attributes: 文件属性后端，None 表示使用默认后端
+            max_workers: 刷新时并发扫描的线程数，None 表示默认值
+            concurrency: 可选的自适应并发控制器，给定时忽略 max_workers
+        """
+        self.path = path
+        self.attributes = attributes
+        self.max_workers = max_workers
+        self.concurrency = concurrency
+        self._lock = threading.RLock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        """创建表结构，版本不符时重建"""
+        with self._lock:
+            db = self._connection
+            db.executescript(_SCHEMA)
+            row = db.execute("SELECT value FROM meta WHERE name = 'schema'").fetchone()
+            if row is not None and row[0] != str(CATALOG_SCHEMA_VERSION):
+                db.executescript(_DROP_SCHEMA + _SCHEMA)
+                row = None
+            if row is None:
+                db.execute(
+                    "INSERT INTO meta(name, value) VALUES ('schema', ?)",
+                    (str(CATALOG_SCHEMA_VERSION),),
+                )
+            self.full_text = self._init_search(db)
+
+    @staticmethod
+    def _init_search(db) -> bool:
+        """
+        创建全文索引，已有的记录一并索引
+
+        Returns:
+            bool: 全文索引是否可用；SQLite 未编译 FTS5 或版本过旧时为 False，
+                search() 退回逐行比较
+        """
+        exists = db.execute("SELECT 1 FROM sqlite_master WHERE name = 'remark_search'").fetchone()
+        if exists is not None:
+            return True
+        try:
+            db.executescript("BEGIN IMMEDIATE;" + _SEARCH_SCHEMA + "COMMIT;")
+        except sqlite3.OperationalError:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            return False
+        return True
+
+    @contextmanager
+    def _transaction(self):
+        """持有锁的写事务"""
+        with self._lock:
+            db = self._connection
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _entry(row) -> CatalogEntry:
+        return CatalogEntry(*row)
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def get(self, path: str) -> CatalogEntry | None:
+        """读取一个文件夹的记录"""
+        rows = self._query(
+            f"SELECT {', '.join(_COLUMNS)} FROM folders WHERE key = ?", (catalog_key(path),)
+        )
+        return self._entry(rows[0]) if rows else None
+
+    def find_remark(self, remark: str, prefix: str | None = None) -> list[CatalogEntry]:
+        """
+        查找备注完全相同的文件夹（索引查询）
+
+        Args:
+            remark: 备注
+            prefix: 可选的根文件夹，只返回其子树中的文件夹（包括它本身）
+        """
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM folders WHERE remark = ?"
+        params: list = [remark]
+        if prefix is not None:
+            key = catalog_key(prefix)
+            low, high = subtree_range(key)
+            sql += " AND (key = ? OR (key >= ? AND key < ?))"
+            params += [key, low, high]
+        return [self._entry(row) for row in self._query(sql + " ORDER BY key", params)]
+
+    def iter_remarks(self, prefix: str | None = None) -> Iterator[CatalogEntry]:
+        """
+        按路径顺序列出有备注的文件夹
+
+        Args:
+            prefix: 可选的根文件夹，只列出其子树（包括它本身）
+        """
+        sql = f"SELECT key, {', '.join(_COLUMNS)} FROM folders WHERE remark IS NOT NULL"
+        params: list = []
+        if prefix is not None:
+            key = catalog_key(prefix)
+            low, high = subtree_range(key)
+            sql += " AND (key = ? OR (key >= ? AND key < ?))"
+            params = [key, low, high]
+        # 按键分页读取，不一次性载入全部结果，也不在迭代期间持有锁
+        last = None
+        while True:
+            page = sql + (" AND key > ?" if last is not None else "")
+            rows = self._query(
+                page + f" ORDER BY key LIMIT {_PAGE_SIZE}",
+                params + ([last] if last is not None else []),
+            )
+            for row in rows:
+                yield self._entry(row[1:])
+            if len(rows) < _PAGE_SIZE:
+                return
+            last = rows[-1][0]
+
+    def search(
+        self, query: str, prefix: str | None = None, limit: int | None = DEFAULT_SEARCH_LIMIT
+    ) -> list[CatalogEntry]:
+        """
+        按片段搜索备注（子串匹配，不区分大小写）
+
+        查询按空白拆分为多个词，备注须包含所有词。三个字符及以上的词通过 trigram 索引匹配；
+        更短的词（如 "合同"）在索引结果中逐行比较，查询只有短词时逐行比较所有备注。
+        逐行比较只对 ASCII 字母不区分大小写。
+
+        结果按相关度排序：备注与查询相同的在前，其次是以查询开头的，然后按 bm25 得分、
+        备注长度和路径。
+
+        Args:
+            query: 查询文本
+            prefix: 可选的根文件夹，只返回其子树中的文件夹（包括它本身）
+            limit: 最多返回的结果数，None 表示不限制
+
+        Returns:
+            list[CatalogEntry]: 按相关度排序的结果
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        indexed = [term for term in terms if len(term) >= _TRIGRAM] if self.full_text else []
+        phrase = _escape_like(" ".join(terms))
+        params: dict = {
+            "exact": phrase,
+            "starts": phrase + "%",
+            "limit": -1 if limit is None else limit,
+        }
+        if indexed:
+            source = "remark_search JOIN folders ON folders.id = remark_search.rowid"
+            conditions = ["remark_search MATCH :match"]
+            params["match"] = " AND ".join('"' + term.replace('"', '""') + '"' for term in indexed)
+            order = "bm25(remark_search), "
+        else:
+            source = "folders"
+            conditions = ["folders.remark IS NOT NULL"]
+            order = ""
+        for i, term in enumerate(term for term in terms if term not in indexed):
+            conditions.append(f"folders.remark LIKE :like{i} ESCAPE '\\'")
+            params[f"like{i}"] = "%" + _escape_like(term) + "%"
+        if prefix is not None:
+            key = catalog_key(prefix)
+            params["key"] = key
+            params["low"], params["high"] = subtree_range(key)
+            conditions.append(
+                "(folders.key = :key OR (folders.key >= :low AND folders.key < :high))"
+            )
+
+        columns = ", ".join(f"folders.{column}" for column in _COLUMNS)
+        rows = self._query(
+            f"SELECT {columns} FROM {source} WHERE {' AND '.join(conditions)} "
+            "ORDER BY folders.remark LIKE :exact ESCAPE '\\' DESC, "
+            "folders.remark LIKE :starts ESCAPE '\\' DESC, "
+            f"{order}length(folders.remark), folders.key LIMIT :limit",
+            params,
+        )
+        return [self._entry(row) for row in rows]
+
+    def count(self, with_remark: bool = False) -> int:
+        """文件夹数，with_remark 为 True 时只统计有备注的"""
+        sql = "SELECT COUNT(*) FROM folders"
+        if with_remark:
+            sql += " WHERE remark IS NOT NULL"
+        return int(self._query(sql)[0][0])
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def _get_many(self, keys: list[str]) -> dict[str, CatalogEntry]:
+        """按键批量读取记录"""
+        found = {}
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start : start + _QUERY_CHUNK]
+            rows = self._query(
+                f"SELECT key, {', '.join(_COLUMNS)} FROM folders "
+                f"WHERE key IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            for row in rows:
+                found[row[0]] = self._entry(row[1:])
+        return found
+
+    def _inspect(
+        self, folder_path: str, ini_stat: os.stat_result | None, known: CatalogEntry | None
+    ) -> tuple[dict, bool]:
+        """
+        desktop.ini 相关的字段，修改时间和大小未变化时沿用已有记录
+
+        Returns:
+            (字段, 是否重新读取了 desktop.ini)
+        """
+        if ini_stat is None:
+            return dict.fromkeys(_COLUMNS[3:]) | {"remark": None}, False
+        if (
+            known is not None
+            and known.ini_mtime_ns == ini_stat.st_mtime_ns
+            and known.ini_size == ini_stat.st_size
+        ):
+            return {
+                "remark": known.remark,
+                "ini_mtime_ns": known.ini_mtime_ns,
+                "ini_size": known.ini_size,
+                "encoding": known.encoding,
+                "folder_attributes": known.folder_attributes,
+                "ini_attributes": known.ini_attributes,
+            }, False
+
+        remark = encoding = None
+        try:
+            encoding, _is_utf16, document = DesktopIniHandler.load(folder_path)
+            if document is not None:
+                remark = document.get(
+                    DesktopIniHandler.SHELL_CLASS_INFO, DesktopIniHandler.PROPERTY_INFOTIP
+                )
+                remark = remark or None
+        except (OSError, DesktopIniTooLarge):
+            pass
+        return {
+            "remark": remark,
+            "ini_mtime_ns": ini_stat.st_mtime_ns,
+            "ini_size": ini_stat.st_size,
+            "encoding": encoding,
+            "folder_attributes": DesktopIniHandler.get_file_attributes(
+                folder_path, self.attributes
+            ),
+            "ini_attributes": DesktopIniHandler.get_file_attributes(
+                DesktopIniHandler.get_path(folder_path), self.attributes
+            ),
+        }, True
+
+    def _scan(self, path: str, known: CatalogEntry | None, full: bool) -> _Scan:
+        """扫描一个文件夹（工作线程中执行，不访问数据库）"""
+        scan = _Scan(path)
+        try:
+            dir_mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            scan.missing = True
+            return scan
+        except OSError:
+            return scan
+
+        ini_stat = None
+        if not full and known is not None and known.dir_mtime_ns == dir_mtime_ns:
+            # 未重新列举；desktop.ini 的增删会改变文件夹修改时间，原地改写不会
+            if known.has_desktop_ini:
+                try:
+                    ini_stat = os.stat(DesktopIniHandler.get_path(path))
+                except OSError:
+                    ini_stat = None
+        else:
+            children = []
+            try:
+                with os.scandir(path) as iterator:
+                    for entry in iterator:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not is_link(entry):
+                                    children.append(entry.path)
+                            elif entry.name.lower() == DesktopIniHandler.FILENAME:
+                                ini_stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+            except OSError:
+                return scan
+            scan.children = children
+
+        fields, scan.read = self._inspect(path, ini_stat, known)
+        scan.entry = CatalogEntry(path=path, dir_mtime_ns=dir_mtime_ns, **fields)
+        scan.changed = scan.entry != known
+        return scan
+
+    def _upsert(self, db, entry: CatalogEntry, now: float, keep_dir_mtime: bool = False) -> None:
+        """写入一条记录；keep_dir_mtime 为 True 时不覆盖已有的文件夹修改时间"""
+        key = catalog_key(entry.path)
+        parent = os.path.dirname(key)
+        updates = [c for c in _COLUMNS if not (keep_dir_mtime and c == "dir_mtime_ns")]
+        db.execute(
+            f"INSERT INTO folders(key, parent, {', '.join(_COLUMNS)}, scanned_at) "
+            f"VALUES (?, ?, {', '.join('?' * len(_COLUMNS))}, ?) "
+            f"ON CONFLICT(key) DO UPDATE SET "
+            + ", ".join(f"{column} = excluded.{column}" for column in updates)
+            + ", scanned_at = excluded.scanned_at",
+            (
+                key,
+                parent if parent != key else None,
+                *(getattr(entry, column) for column in _COLUMNS),
+                now,
+            ),
+        )
+
+    @staticmethod
+    def _remove_subtree(db, key: str) -> int:
+        """删除 key 及其所有子孙文件夹的记录"""
+        low, high = subtree_range(key)
+        return int(
+            db.execute(
+                "DELETE FROM folders WHERE key = ? OR (key >= ? AND key < ?)", (key, low, high)
+            ).rowcount
+        )
+
+    def refresh(
+        self,
+        root: str,
+        full: bool = False,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> CatalogRefresh:
+        """
+        扫描目录树并更新目录
+
+        第一次调用时完整扫描；之后只重新列举修改时间变化的文件夹。
+        每一层扫描完成后在一个事务中写入，取消时已写入的层保留。
+
+        Args:
+            root: 根文件夹
+            full: 为 True 时忽略文件夹修改时间，重新列举所有文件夹
+                （desktop.ini 仍按修改时间和大小判断是否重新读取）
+            token: 可选的取消令牌或截止时间
+            progress: 可选的进度回调，done 为已扫描的文件夹数（总数未知）
+
+        Returns:
+            CatalogRefresh: 统计
+
+        Raises:
+            OperationCancelled: 被取消或超时
+        """
+        summary = CatalogRefresh()
+        level = [os.path.abspath(root)]
+        with ProgressTracker(progress) as tracker:
+            while level:
+                known = self._get_many([catalog_key(path) for path in level])
+                scans = list(
+                    bounded_map(
+                        lambda path, known=known: self._scan(
+                            path, known.get(catalog_key(path)), full
+                        ),
+                        level,
+                        max_workers=self.max_workers,
+                        token=token,
+                        controller=self.concurrency,
+                        is_error=lambda scan: scan.entry is None and not scan.missing,
+                    )
+                )
+                level = self._store_level(scans, summary)
+                tracker.advance(len(scans))
+        return summary
+
+    def _store_level(self, scans: list[_Scan], summary: CatalogRefresh) -> list[str]:
+        """在一个事务中写入一层的扫描结果，返回下一层的文件夹"""
+        next_level = []
+        now = time.time()
+        with self._transaction() as db:
+            for scan in sorted(scans, key=lambda s: s.path):
+                key = catalog_key(scan.path)
+                if scan.missing:
+                    summary.removed += self._remove_subtree(db, key)
+                    continue
+                if scan.entry is None:
+                    # 暂时无法访问，保留已有记录
+                    summary.errors += 1
+                    continue
+
+                summary.directories += 1
+                summary.read += scan.read
+                if scan.changed:
+                    self._upsert(db, scan.entry, now)
+
+                if scan.children is None:
+                    summary.reused += 1
+                    children = [
+                        row[0]
+                        for row in db.execute("SELECT path FROM folders WHERE parent = ?", (key,))
+                    ]
+                else:
+                    summary.listed += 1
+                    children = scan.children
+                    current = {catalog_key(child) for child in children}
+                    for (child_key,) in db.execute(
+                        "SELECT key FROM folders WHERE parent = ?", (key,)
+                    ).fetchall():
+                        if child_key not in current:
+                            summary.removed += self._remove_subtree(db, child_key)
+                next_level.extend(children)
+        return next_level
+
+    def record_folder(self, folder_path: str) -> CatalogEntry | None:
+        """
+        重新读取一个文件夹的 desktop.ini 并更新记录（FolderCommentHandler 写入后调用）
+
+        不修改记录中文件夹的修改时间，下次刷新时仍会重新列举该文件夹。
+
+        Returns:
+            CatalogEntry: 新的记录，文件夹不存在时删除记录并返回 None
+        """
+        key = catalog_key(folder_path)
+        if not os.path.isdir(folder_path):
+            with self._transaction() as db:
+                self._remove_subtree(db, key)
+            return None
+        try:
+            ini_stat = os.stat(DesktopIniHandler.get_path(folder_path))
+        except OSError:
+            ini_stat = None
+        fields, _read = self._inspect(folder_path, ini_stat, None)
+        known = self.get(folder_path)
+        entry = CatalogEntry(
+            path=os.path.abspath(folder_path),
+            dir_mtime_ns=known.dir_mtime_ns if known is not None else None,
+            **fields,
+        )
+        with self._transaction() as db:
+            self._upsert(db, entry, time.time(), keep_dir_mtime=True)
+        return entry
+
+    def remove(self, paths: Iterable[str]) -> int:
+        """删除文件夹（及其子孙文件夹）的记录"""
+        with self._transaction() as db:
+            return sum(self._remove_subtree(db, catalog_key(path)) for path in paths)
@@ -7,103 +7,721 @@
 https://learn.microsoft.com/en-us/windows/win32/shell/how-to-customize-folders-with-desktop-ini
 """
 
+import contextlib
+import dataclasses
 import os
+import sqlite3
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from enum import Enum
 
 from remark.core.base import CommentHandler
-from remark.i18n import _ as _
-from remark.storage.desktop_ini import DesktopIniHandler
+from remark.core.catalog import RemarkCatalog
+from remark.i18n import N_
+from remark.storage.atomic import Durability
+from remark.storage.attributes import AttributeBackend, get_default_backend
+from remark.storage.cache import RemarkCache
+from remark.storage.desktop_ini import (
+    FILE_ATTRIBUTE_HIDDEN,
+    FILE_ATTRIBUTE_READONLY,
+    FILE_ATTRIBUTE_SYSTEM,
+    DesktopIniHandler,
+    NonUtf16DesktopIni,
+)
+from remark.storage.encoding_policy import EncodingPolicy, EncodingReport
+from remark.storage.locking import FolderLocks, LockStats, LockTimeout, RetryPolicy
+from remark.utils.cancellation import (
+    CancellationToken,
+    Deadline,
+    DeadlineExceeded,
+    OperationCancelled,
+)
+from remark.utils.concurrency import AdaptiveConcurrency
 from remark.utils.constants import MAX_COMMENT_LENGTH
+from remark.utils.pool import bounded_map
+from remark.utils.progress import ProgressCallback, ProgressTracker
+from remark.utils.reporter import NullReporter, Reporter
+
+
+class WriteStatus(Enum):
+    """备注写入结果"""
+
+    UPDATED = "updated"  # 已写入
+    UNCHANGED = "unchanged"  # 内容和属性均无变化，跳过写入
+    FAILED = "failed"  # 写入失败
+
+
+class ErrorKind(Enum):
+    """操作失败的原因"""
+
+    NOT_A_FOLDER = "not_a_folder"  # 路径不是文件夹
+    CLEAR_ATTRIBUTES = "clear_attributes"  # 无法清除 desktop.ini 属性
+    WRITE = "write"  # 无法写入 desktop.ini
+    SET_FILE_ATTRIBUTES = "set_file_attributes"  # 无法设置 desktop.ini 隐藏/系统属性
+    SET_FOLDER_ATTRIBUTES = "set_folder_attributes"  # 无法设置文件夹只读属性
+    REMOVE = "remove"  # 无法移除 InfoTip
+    RESTORE_ATTRIBUTES = "restore_attributes"  # 删除后无法恢复 desktop.ini 属性
+    LOCK_TIMEOUT = "lock_timeout"  # 等待文件夹锁超时
+    TIMEOUT = "timeout"  # 操作超时（异步接口）或批量操作超过截止时间
+    CANCELLED = "cancelled"  # 批量操作被取消，该项没有执行
+    ENCODING = "encoding"  # desktop.ini 不是 UTF-16，按编码策略未转换（批量操作和不能交互时不询问）
+    EXCEPTION = "exception"  # 其他异常，详情见 detail
+
+
+# 表示存储压力（超时、I/O 失败）的错误，自适应并发据此下调；
+# 路径不存在、编码策略等确定性的失败不影响并发数
+BACKPRESSURE_ERRORS = frozenset(
+    {
+        ErrorKind.WRITE,
+        ErrorKind.REMOVE,
+        ErrorKind.LOCK_TIMEOUT,
+        ErrorKind.TIMEOUT,
+        ErrorKind.EXCEPTION,
+    }
+)
+
+
+@dataclass
+class CommentResult:
+    """
+    单个文件夹的操作结果（批量接口使用，不输出任何内容）
+
+    Attributes:
+        folder_path: 文件夹路径
+        status: 写入状态；读取成功时为 UNCHANGED
+        comment: 写入或读取到的备注
+        error: 失败原因
+        detail: 异常信息
+        elapsed: 耗时（秒）
+        bytes_written: 写入 desktop.ini 的字节数
+    """
+
+    folder_path: str
+    status: WriteStatus
+    comment: str | None = None
+    error: ErrorKind | None = None
+    detail: str | None = None
+    elapsed: float = 0.0
+    bytes_written: int = 0
+
+    @property
+    def ok(self) -> bool:
+        """操作是否成功"""
+        return self.status is not WriteStatus.FAILED
 
 
 class FolderCommentHandler(CommentHandler):
     """文件夹备注处理器"""
 
-    def set_comment(self, folder_path: str, comment: str) -> bool:
-        """设置文件夹备注"""
-        if not os.path.isdir(folder_path):
-            print(_("Path is not a folder: {folder_path}").format(folder_path=folder_path))
+    def __init__(
+        self,
+        durability: Durability | None = None,
+        cache: RemarkCache | None = None,
+        attributes: AttributeBackend | None = None,
+        encoding_policy: EncodingPolicy | None = None,
+        encoding_report: EncodingReport | None = None,
+        locks: FolderLocks | None = None,
+        retry: RetryPolicy | None = None,
+        max_workers: int | None = None,
+        reporter: Reporter | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        catalog: RemarkCatalog | None = None,
+    ):
+        """
+        Args:
+            durability: desktop.ini 写入的持久化级别，None 表示使用存储层默认值。
+                批量任务可使用 Durability.NONE，依靠原子替换保证文件完整。
+            cache: 可选的备注读取缓存，长期运行的进程重复读取同一文件夹时使用
+            attributes: 文件属性后端，None 表示使用默认后端
+            encoding_policy: 遇到非 UTF-16 desktop.ini 时的处理策略，None 表示使用
+                存储层默认值（通过 reporter 询问，reporter 不能交互时按 FAIL 处理）。
+                无人值守的批量任务可使用 CONVERT/SKIP/FAIL；批量接口从不询问，
+                PROMPT 策略按 FAIL 处理。
+            encoding_report: 编码转换报告，None 时自动创建，可通过 self.encoding_report 读取
+            locks: 文件夹锁，None 时使用进程内+跨进程锁。同一文件夹的写入和删除
+                在锁内完成，多个线程或进程并行调用 set_comment 不会丢失更新。
+            retry: 遇到共享冲突（资源管理器正打开 desktop.ini）时的重试策略，
+                None 表示使用默认策略；重试次数计入 locks 的统计
+            max_workers: 批量接口（set_comments 等）的默认线程数，None 表示自动选择
+            reporter: 单个文件夹操作的消息报告器，None 表示不输出任何消息。
+                命令行使用 ConsoleReporter（PROMPT 策略由它询问用户）。批量接口始终不报告消息。
+            concurrency: 可选的自适应并发控制器，批量接口未指定 max_workers 时
+                由它按延迟和错误率调整并发数，可与审计、统计等共享
+            catalog: 可选的备注目录，写入和删除后在同一调用中（持有文件夹锁）更新
+        """
+        self.durability = durability
+        self.cache = cache
+        self.attributes = attributes
+        self.encoding_policy = encoding_policy
+        self.encoding_report = encoding_report if encoding_report is not None else EncodingReport()
+        self.locks = locks if locks is not None else FolderLocks()
+        if retry is None:
+            retry = RetryPolicy()
+        if retry.stats is None:
+            retry = dataclasses.replace(retry, stats=self.locks.stats)
+        self.retry = retry
+        self.max_workers = max_workers
+        self.reporter = reporter if reporter is not None else NullReporter()
+        self.concurrency = concurrency
+        self.catalog = catalog
+
+    @property
+    def lock_stats(self) -> LockStats:
+        """锁争用和重试统计的快照"""
+        return self.locks.stats.snapshot()
+
+    def invalidate(self, folder_path: str) -> None:
+        """使文件夹的读取缓存失效（写入路径调用）"""
+        if self.cache is not None:
+            self.cache.invalidate(folder_path)
+
+    def _record_catalog(self, folder_path: str) -> None:
+        """写入或删除后更新备注目录；目录更新失败不影响写入结果，下次刷新时修正"""
+        if self.catalog is None:
+            return
+        with contextlib.suppress(OSError, sqlite3.Error):
+            self.catalog.record_folder(folder_path)
+
+    def _encoding_options(self, interactive: bool) -> tuple[EncodingPolicy | None, Reporter]:
+        """
+        编码策略和报告器：单个文件夹操作使用配置值；批量操作在工作线程中执行，
+        不能询问用户也不报告消息，PROMPT 策略按 FAIL 处理
+        """
+        if interactive:
+            return self.encoding_policy, self.reporter
+        policy = self.encoding_policy or DesktopIniHandler.encoding_policy
+        if policy is EncodingPolicy.PROMPT:
+            policy = EncodingPolicy.FAIL
+        return policy, NullReporter()
+
+    def _fails_on_encoding(self) -> bool:
+        """调用方是否显式选择了 FAIL 编码策略（此时单个文件夹操作抛出 NonUtf16DesktopIni）"""
+        policy = self.encoding_policy or DesktopIniHandler.encoding_policy
+        return policy is EncodingPolicy.FAIL
+
+    def _restore_hidden_system(self, desktop_ini_path: str, original: int | None) -> None:
+        """改写失败或未改写时恢复清除前的隐藏和系统属性"""
+        hidden_system = (original or 0) & (FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM)
+        if hidden_system and os.path.exists(desktop_ini_path):
+            with contextlib.suppress(OSError):
+                (self.attributes or get_default_backend()).update(
+                    desktop_ini_path, add=hidden_system
+                )
+
+    @staticmethod
+    def _is_not_utf16(desktop_ini_path: str) -> bool:
+        """写入失败后区分编码问题（按 SKIP 策略未转换）和其他失败"""
+        if not os.path.exists(desktop_ini_path):
             return False
+        _encoding, is_utf16 = DesktopIniHandler.detect_encoding(desktop_ini_path)
+        return not is_utf16
+
+    def _prepare_comment(self, folder_path: str, comment: str) -> str | None:
+        """校验路径并截断过长的备注，路径不是文件夹时返回 None"""
+        if not os.path.isdir(folder_path):
+            self.reporter.error(N_("Path is not a folder: {folder_path}"), folder_path=folder_path)
+            return None
 
         if len(comment) > MAX_COMMENT_LENGTH:
-            print(
-                _("Remark length exceeds limit, maximum length is {length} characters").format(
-                    length=MAX_COMMENT_LENGTH
-                )
+            self.reporter.warning(
+                N_("Remark length exceeds limit, maximum length is {length} characters"),
+                length=MAX_COMMENT_LENGTH,
             )
             comment = comment[:MAX_COMMENT_LENGTH]
+        return comment
 
-        return self._set_comment_desktop_ini(folder_path, comment)
+    def set_comment(self, folder_path: str, comment: str) -> bool:
+        """设置文件夹备注"""
+        prepared = self._prepare_comment(folder_path, comment)
+        if prepared is None:
+            return False
+
+        try:
+            return self._set_comment_desktop_ini(folder_path, prepared)
+        finally:
+            self.invalidate(folder_path)
+
+    def apply_comment(self, folder_path: str, comment: str) -> WriteStatus:
+        """
+        设置文件夹备注并返回写入结果
+
+        与 set_comment 相同，但区分实际写入（UPDATED）和无需写入（UNCHANGED），
+        供批量重复应用备注的调用方统计。
+        """
+        prepared = self._prepare_comment(folder_path, comment)
+        if prepared is None:
+            return WriteStatus.FAILED
+
+        try:
+            return self._apply_comment_desktop_ini(folder_path, prepared)
+        finally:
+            self.invalidate(folder_path)
 
     @staticmethod
-    def _set_comment_desktop_ini(folder_path: str, comment: str) -> bool:
+    def is_comment_current(
+        folder_path: str, comment: str, attributes: AttributeBackend | None = None
+    ) -> bool:
+        """
+        检查文件夹是否已处于设置该备注后的状态
+
+        desktop.ini 的内容与将要写入的内容逐字节相同，且 desktop.ini
+        已是隐藏+系统属性、文件夹已是只读属性时返回 True。
+
+        Args:
+            folder_path: 文件夹路径
+            comment: 备注内容
+            attributes: 文件属性后端，None 表示使用默认后端
+
+        Returns:
+            bool: 无需任何写入或属性修改时返回 True
+        """
+        try:
+            current, rendered = DesktopIniHandler.render_info_tip(folder_path, comment)
+        except Exception:
+            return False
+        if current is None or rendered != current:
+            return False
+
+        return bool(
+            DesktopIniHandler.has_attributes(
+                DesktopIniHandler.get_path(folder_path),
+                FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM,
+                attributes,
+            )
+            and DesktopIniHandler.has_attributes(folder_path, FILE_ATTRIBUTE_READONLY, attributes)
+        )
+
+    def _set_comment_desktop_ini(self, folder_path: str, comment: str) -> bool:
         """使用 desktop.ini 设置备注"""
+        return self._apply_comment_desktop_ini(folder_path, comment) is not WriteStatus.FAILED
+
+    def _apply_comment_desktop_ini(self, folder_path: str, comment: str) -> WriteStatus:
+        """使用 desktop.ini 设置备注并报告结果"""
+        result = self._write_comment(folder_path, comment, interactive=True)
+        self._report_write_result(result)
+        return result.status
+
+    def _write_comment(
+        self, folder_path: str, comment: str, interactive: bool = False
+    ) -> CommentResult:
+        """
+        使用 desktop.ini 设置备注，不输出任何内容
+
+        整个读取-修改-写入过程持有文件夹锁；内容和属性均未变化时跳过所有 I/O。
+
+        Args:
+            folder_path: 文件夹路径
+            comment: 已校验长度的备注
+            interactive: 为 True 时（单个文件夹操作）按配置的编码策略处理，
+                只有 FAIL 策略直接抛出 NonUtf16DesktopIni；否则（批量操作，见
+                _encoding_options，或 PROMPT 策略下报告器不能交互）编码问题记录为
+                ErrorKind.ENCODING
+
+        Returns:
+            CommentResult: 写入结果
+        """
+        start = time.perf_counter()
+        result = CommentResult(folder_path, WriteStatus.FAILED, comment=comment)
+        try:
+            with self.locks.hold(folder_path):
+                try:
+                    self._write_comment_locked(result, interactive)
+                finally:
+                    self._record_catalog(folder_path)
+        except LockTimeout as e:
+            result.error, result.detail = ErrorKind.LOCK_TIMEOUT, str(e)
+        except NonUtf16DesktopIni as e:
+            if interactive and self._fails_on_encoding():
+                raise
+            result.error, result.detail = ErrorKind.ENCODING, str(e)
+        except Exception as e:
+            result.error, result.detail = ErrorKind.EXCEPTION, str(e)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _write_comment_locked(self, result: CommentResult, interactive: bool) -> None:
+        """在文件夹锁内写入备注，结果记录到 result 中"""
+        folder_path = result.folder_path
+        policy, reporter = self._encoding_options(interactive)
+        comment = result.comment or ""
         desktop_ini_path = DesktopIniHandler.get_path(folder_path)
 
+        # 重复应用相同备注时不改写文件，避免改变 mtime 使备份和资源管理器缓存失效
+        if self.is_comment_current(folder_path, comment, self.attributes):
+            result.status = WriteStatus.UNCHANGED
+            return
+
+        # 清除文件属性以便修改
+        original = None
+        if DesktopIniHandler.exists(folder_path):
+            original = DesktopIniHandler.get_file_attributes(desktop_ini_path, self.attributes)
+            if not DesktopIniHandler.clear_file_attributes(desktop_ini_path, self.attributes):
+                result.error = ErrorKind.CLEAR_ATTRIBUTES
+                return
+
+        # 使用 UTF-16 编码写入 desktop.ini
+        written = False
         try:
-            # 清除文件属性以便修改
-            if DesktopIniHandler.exists(
-                folder_path
-            ) and not DesktopIniHandler.clear_file_attributes(desktop_ini_path):
-                print(_("Failed to clear file attributes"))
-                return False
-
-            # 使用 UTF-16 编码写入 desktop.ini
-            if not DesktopIniHandler.write_info_tip(folder_path, comment):
-                print(_("Failed to write desktop.ini"))
-                return False
-
-            # 设置 desktop.ini 文件为隐藏和系统属性
-            if not DesktopIniHandler.set_file_hidden_system_attributes(desktop_ini_path):
-                print(_("Failed to set file attributes"))
-                return False
-
-            # 设置文件夹为只读属性（使 desktop.ini 生效）
-            if not DesktopIniHandler.set_folder_system_attributes(folder_path):
-                print(_("Failed to set folder attributes"))
-                return False
-
-            print(
-                _("Remark [{remark}] has been set for folder [{folder_path}]").format(
-                    remark=comment, folder_path=folder_path
-                )
+            written = DesktopIniHandler.write_info_tip(
+                folder_path,
+                comment,
+                self.durability,
+                policy,
+                self.encoding_report,
+                self.retry,
+                reporter,
             )
-            print(_("Remark added successfully, may take a few minutes to display"))
-            return True
-        except Exception as e:
-            print(_("Failed to set remark: {error}").format(error=str(e)))
-            return False
+        finally:
+            if not written:
+                self._restore_hidden_system(desktop_ini_path, original)
+        if not written:
+            result.error = ErrorKind.WRITE
+            if not interactive and self._is_not_utf16(desktop_ini_path):
+                result.error = ErrorKind.ENCODING
+            return
+        # 持有文件夹锁，文件大小就是本次写入的字节数
+        with contextlib.suppress(OSError):
+            result.bytes_written = os.path.getsize(desktop_ini_path)
+
+        # 设置 desktop.ini 文件为隐藏和系统属性
+        if not DesktopIniHandler.set_file_hidden_system_attributes(
+            desktop_ini_path, self.attributes
+        ):
+            result.error = ErrorKind.SET_FILE_ATTRIBUTES
+            return
+
+        # 设置文件夹为只读属性（使 desktop.ini 生效）
+        if not DesktopIniHandler.set_folder_system_attributes(folder_path, self.attributes):
+            result.error = ErrorKind.SET_FOLDER_ATTRIBUTES
+            return
+
+        result.status = WriteStatus.UPDATED
+
+    def _report_write_result(self, result: CommentResult) -> None:
+        """报告设置备注的结果"""
+        folder_path = result.folder_path
+        reporter = self.reporter
+        if result.status is WriteStatus.UNCHANGED:
+            reporter.info(
+                N_("Remark of folder [{folder_path}] is unchanged"), folder_path=folder_path
+            )
+        elif result.status is WriteStatus.UPDATED:
+            reporter.info(
+                N_("Remark [{remark}] has been set for folder [{folder_path}]"),
+                remark=result.comment,
+                folder_path=folder_path,
+            )
+            reporter.info(N_("Remark added successfully, may take a few minutes to display"))
+        elif result.error is ErrorKind.CLEAR_ATTRIBUTES:
+            reporter.error(N_("Failed to clear file attributes"))
+        elif result.error is ErrorKind.WRITE:
+            reporter.error(N_("Failed to write desktop.ini"))
+        elif result.error is ErrorKind.SET_FILE_ATTRIBUTES:
+            reporter.error(N_("Failed to set file attributes"))
+        elif result.error is ErrorKind.SET_FOLDER_ATTRIBUTES:
+            reporter.error(N_("Failed to set folder attributes"))
+        elif result.error is ErrorKind.LOCK_TIMEOUT:
+            reporter.error(
+                N_("Timed out waiting for folder lock: {folder_path}"), folder_path=folder_path
+            )
+        elif result.error is ErrorKind.ENCODING:
+            reporter.error(
+                N_("desktop.ini is not UTF-16 encoded, remark not changed: {folder_path}"),
+                folder_path=folder_path,
+            )
+        else:
+            reporter.error(N_("Failed to set remark: {error}"), error=result.detail)
 
     def get_comment(self, folder_path: str) -> str | None:
         """获取文件夹备注"""
-        return DesktopIniHandler.read_info_tip(folder_path)
+        if self.cache is not None:
+            return self.cache.get(folder_path, DesktopIniHandler.read_info_tip)
+        comment: str | None = DesktopIniHandler.read_info_tip(folder_path)
+        return comment
 
     def delete_comment(self, folder_path: str) -> bool:
-        """删除文件夹备注"""
+        """删除文件夹备注，持有文件夹锁"""
+        result = self._remove_comment(folder_path, interactive=True)
+        self._report_delete_result(result)
+        return result.ok
+
+    def _remove_comment(self, folder_path: str, interactive: bool = False) -> CommentResult:
+        """
+        删除文件夹备注，不输出任何内容
+
+        没有 desktop.ini 时状态为 UNCHANGED。
+
+        Args:
+            folder_path: 文件夹路径
+            interactive: 为 True 时（单个文件夹操作）按配置的编码策略处理，
+                只有 FAIL 策略直接抛出 NonUtf16DesktopIni；否则（批量操作，见
+                _encoding_options，或 PROMPT 策略下报告器不能交互）编码问题记录为
+                ErrorKind.ENCODING
+
+        Returns:
+            CommentResult: 删除结果
+        """
+        start = time.perf_counter()
+        result = CommentResult(folder_path, WriteStatus.FAILED)
+        try:
+            with self.locks.hold(folder_path):
+                try:
+                    self._remove_comment_locked(result, interactive)
+                finally:
+                    self._record_catalog(folder_path)
+        except LockTimeout as e:
+            result.error, result.detail = ErrorKind.LOCK_TIMEOUT, str(e)
+        except NonUtf16DesktopIni as e:
+            if interactive and self._fails_on_encoding():
+                raise
+            result.error, result.detail = ErrorKind.ENCODING, str(e)
+        except Exception as e:
+            result.error, result.detail = ErrorKind.EXCEPTION, str(e)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _remove_comment_locked(self, result: CommentResult, interactive: bool) -> None:
+        """在文件夹锁内删除备注，结果记录到 result 中"""
+        folder_path = result.folder_path
+        policy, reporter = self._encoding_options(interactive)
         desktop_ini_path = DesktopIniHandler.get_path(folder_path)
 
         if not DesktopIniHandler.exists(folder_path):
-            print(_("This folder has no remark"))
-            return True
+            result.status = WriteStatus.UNCHANGED
+            return
 
         # 清除文件属性以便修改
-        if not DesktopIniHandler.clear_file_attributes(desktop_ini_path):
-            print(_("Failed to clear file attributes"))
-            return False
+        original = DesktopIniHandler.get_file_attributes(desktop_ini_path, self.attributes)
+        if not DesktopIniHandler.clear_file_attributes(desktop_ini_path, self.attributes):
+            result.error = ErrorKind.CLEAR_ATTRIBUTES
+            return
 
         # 移除 InfoTip 行（保留其他设置如 IconResource）
-        if not DesktopIniHandler.remove_info_tip(folder_path):
-            print(_("Failed to remove remark"))
-            return False
+        removed = False
+        try:
+            removed = DesktopIniHandler.remove_info_tip(
+                folder_path,
+                self.durability,
+                policy,
+                self.encoding_report,
+                self.retry,
+                reporter,
+            )
+        finally:
+            if not removed:
+                self._restore_hidden_system(desktop_ini_path, original)
+            self.invalidate(folder_path)
+        if not removed:
+            result.error = ErrorKind.REMOVE
+            if not interactive and self._is_not_utf16(desktop_ini_path):
+                result.error = ErrorKind.ENCODING
+            return
 
         # 如果 desktop.ini 仍存在，恢复文件属性
-        if DesktopIniHandler.exists(
-            folder_path
-        ) and not DesktopIniHandler.set_file_hidden_system_attributes(desktop_ini_path):
-            print(_("Failed to restore file attributes"))
-            return False
+        if DesktopIniHandler.exists(folder_path):
+            with contextlib.suppress(OSError):
+                result.bytes_written = os.path.getsize(desktop_ini_path)
+            if not DesktopIniHandler.set_file_hidden_system_attributes(
+                desktop_ini_path, self.attributes
+            ):
+                result.error = ErrorKind.RESTORE_ATTRIBUTES
+                return
+
+        result.status = WriteStatus.UPDATED
+
+    def _report_delete_result(self, result: CommentResult) -> None:
+        """报告删除备注的结果"""
+        reporter = self.reporter
+        if result.status is WriteStatus.UNCHANGED:
+            reporter.info(N_("This folder has no remark"))
+        elif result.status is WriteStatus.UPDATED:
+            reporter.info(N_("Remark deleted successfully"))
+        elif result.error is ErrorKind.CLEAR_ATTRIBUTES:
+            reporter.error(N_("Failed to clear file attributes"))
+        elif result.error is ErrorKind.RESTORE_ATTRIBUTES:
+            reporter.error(N_("Failed to restore file attributes"))
+        elif result.error is ErrorKind.LOCK_TIMEOUT:
+            reporter.error(
+                N_("Timed out waiting for folder lock: {folder_path}"),
+                folder_path=result.folder_path,
+            )
+        elif result.error is ErrorKind.ENCODING:
+            reporter.error(
+                N_("desktop.ini is not UTF-16 encoded, remark not changed: {folder_path}"),
+                folder_path=result.folder_path,
+            )
+        else:
+            reporter.error(N_("Failed to remove remark"))
+
+    def _run_batch(
+        self,
+        func,
+        items,
+        max_workers: int | None,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> list[CommentResult]:
+        """
+        在线程池中执行批量操作，结果按输入顺序返回
+
+        取消或超过截止时间时不再开始新的项，已完成的结果保留，
+        未执行的项记录为 ErrorKind.CANCELLED（超时为 ErrorKind.TIMEOUT）。
+        """
+        items = list(items)
+        results: list[CommentResult | None] = [None] * len(items)
+        # 显式指定线程数时不使用自适应并发
+        controller = self.concurrency if max_workers is None else None
+
+        def run(indexed):
+            index, item = indexed
+            return index, func(item)
+
+        with ProgressTracker(progress, total=len(items)) as tracker:
+            try:
+                for index, result in bounded_map(
+                    run,
+                    enumerate(items),
+                    max_workers=max_workers or self.max_workers,
+                    token=token,
+                    controller=controller,
+                    is_error=lambda pair: pair[1].error in BACKPRESSURE_ERRORS,
+                ):
+                    results[index] = result
+                    tracker.advance()
+            except OperationCancelled as e:
+                error = ErrorKind.CANCELLED
+                if isinstance(e, DeadlineExceeded):
+                    error = ErrorKind.TIMEOUT
+                for index, item in enumerate(items):
+                    if results[index] is None:
+                        path, comment = item if isinstance(item, tuple) else (item, None)
+                        results[index] = CommentResult(
+                            path, WriteStatus.FAILED, comment=comment, error=error, detail=str(e)
+                        )
+        return results  # type: ignore[return-value]
+
+    def _set_one(self, item) -> CommentResult:
+        """批量设置中的单个文件夹"""
+        return self.set_comment_result(*item)
+
+    def set_comment_result(self, folder_path: str, comment: str) -> CommentResult:
+        """
+        设置单个文件夹备注并返回结构化结果，不报告任何消息
+
+        与 set_comments 的单项操作相同，供自行调度并发的调用方使用。
+        """
+        if not os.path.isdir(folder_path):
+            return CommentResult(
+                folder_path, WriteStatus.FAILED, comment=comment, error=ErrorKind.NOT_A_FOLDER
+            )
+        try:
+            return self._write_comment(folder_path, comment[:MAX_COMMENT_LENGTH])
+        finally:
+            self.invalidate(folder_path)
+
+    def get_comment_result(self, folder_path: str) -> CommentResult:
+        """
+        读取单个文件夹备注并返回结构化结果
+
+        成功时 status 为 UNCHANGED，备注（可能为 None）在 comment 中。
+        """
+        start = time.perf_counter()
+        if not os.path.isdir(folder_path):
+            return CommentResult(folder_path, WriteStatus.FAILED, error=ErrorKind.NOT_A_FOLDER)
+        try:
+            comment = self.get_comment(folder_path)
+        except Exception as e:
+            return CommentResult(
+                folder_path,
+                WriteStatus.FAILED,
+                error=ErrorKind.EXCEPTION,
+                detail=str(e),
+                elapsed=time.perf_counter() - start,
+            )
+        return CommentResult(
+            folder_path,
+            WriteStatus.UNCHANGED,
+            comment=comment,
+            elapsed=time.perf_counter() - start,
+        )
+
+    def delete_comment_result(self, folder_path: str) -> CommentResult:
+        """删除单个文件夹备注并返回结构化结果，不报告任何消息"""
+        if not os.path.isdir(folder_path):
+            return CommentResult(folder_path, WriteStatus.FAILED, error=ErrorKind.NOT_A_FOLDER)
+        return self._remove_comment(folder_path)
+
+    def set_comments(
+        self,
+        comments,
+        max_workers: int | None = None,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> list[CommentResult]:
+        """
+        并发设置多个文件夹的备注，不输出任何内容
+
+        超过长度上限的备注会被截断。遇到非 UTF-16 desktop.ini 时按 encoding_policy
+        处理但从不询问（PROMPT 按 FAIL 处理），未转换的记录为 ErrorKind.ENCODING，不会抛出。
+
+        Args:
+            comments: 文件夹路径 -> 备注的映射，或 (路径, 备注) 的可迭代对象
+            max_workers: 线程数，None 表示使用 self.max_workers
+            token: 可选的取消令牌或截止时间，未执行的项记录为 CANCELLED 或 TIMEOUT
+            progress: 可选的进度回调（限频调用）
+
+        Returns:
+            list[CommentResult]: 按输入顺序排列的结果
+        """
+        items = comments.items() if isinstance(comments, Mapping) else comments
+        return self._run_batch(self._set_one, items, max_workers, token, progress)
+
+    def get_comments(
+        self,
+        paths,
+        max_workers: int | None = None,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> list[CommentResult]:
+        """
+        并发读取多个文件夹的备注
+
+        成功时 status 为 UNCHANGED，备注（可能为 None）在 comment 中。
+
+        Args:
+            paths: 文件夹路径的可迭代对象
+            max_workers: 线程数，None 表示使用 self.max_workers
+            token: 可选的取消令牌或截止时间，未执行的项记录为 CANCELLED 或 TIMEOUT
+            progress: 可选的进度回调（限频调用）
+
+        Returns:
+            list[CommentResult]: 按输入顺序排列的结果
+        """
+        return self._run_batch(self.get_comment_result, paths, max_workers, token, progress)
+
+    def delete_comments(
+        self,
+        paths,
+        max_workers: int | None = None,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> list[CommentResult]:
+        """
+        并发删除多个文件夹的备注，不输出任何内容
+
+        没有备注的文件夹状态为 UNCHANGED。
+
+        Args:
+            paths: 文件夹路径的可迭代对象
+            max_workers: 线程数，None 表示使用 self.max_workers
+            token: 可选的取消令牌或截止时间，未执行的项记录为 CANCELLED 或 TIMEOUT
+            progress: 可选的进度回调（限频调用）
 
-        print(_("Remark deleted successfully"))
-        return True
+        Returns:
+            list[CommentResult]: 按输入顺序排列的结果
+        """
+        return self._run_batch(self.delete_comment_result, paths, max_workers, token, progress)
 
     def supports(self, path: str) -> bool:
         """检查是否支持该路径"""
@@ -0,0 +1,333 @@
+"""
+声明式备注清单
+
+清单描述期望的状态（路径 -> 备注，以及应当没有备注的路径），
+与磁盘上的当前状态比较得到计划，只对有差异的文件夹执行写入或删除。
+
+支持三种格式：
+
+TOML::
+
+    root = "D:/Projects"        # 可选，相对路径的基准目录，默认为清单所在目录
+    absent = ["archive/old"]    # 可选，应当没有备注的文件夹
+
+    [remarks]
+    "alpha" = "Alpha 项目"
+
+JSON::
+
+    {"root": "...", "remarks": {"alpha": "Alpha 项目"}, "absent": ["archive/old"]}
+
+    也可以直接是 路径 -> 备注 的对象，备注为 null 表示应当没有备注。
+
+CSV::
+
+    path,remark
+    alpha,Alpha 项目
+    archive/old,
+
+    备注为空表示应当没有备注；第一行是 path,remark 时视为表头。
+"""
+
+import csv
+import json
+import os
+import tomllib
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+
+from remark.core.folder_handler import CommentResult, ErrorKind, FolderCommentHandler
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.constants import MAX_COMMENT_LENGTH
+from remark.utils.progress import ProgressCallback
+
+# 支持的清单格式（按扩展名识别）
+MANIFEST_FORMATS = ("toml", "json", "csv")
+
+
+class ManifestError(ValueError):
+    """清单格式错误"""
+
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ManifestEntry:
+    """
+    清单中的一项
+
+    Attributes:
+        path: 文件夹绝对路径
+        remark: 期望的备注，None 表示应当没有备注
+    """
+
+    path: str
+    remark: str | None
+
+
+class PlanAction(Enum):
+    """计划中对单个文件夹的操作"""
+
+    CREATE = "create"  # 当前没有备注，需要设置
+    UPDATE = "update"  # 备注不同，需要更新
+    DELETE = "delete"  # 应当没有备注，需要删除
+    UNCHANGED = "unchanged"  # 已是期望状态
+    MISSING = "missing"  # 文件夹不存在，无法设置
+    ERROR = "error"  # 读取当前状态失败
+
+
+# 需要写入的操作
+CHANGE_ACTIONS = frozenset({PlanAction.CREATE, PlanAction.UPDATE, PlanAction.DELETE})
+
+
+@dataclass(frozen=True, slots=True)
+class PlanItem:
+    """
+    计划中的一项
+
+    Attributes:
+        path: 文件夹路径
+        action: 操作
+        current: 当前备注
+        desired: 期望的备注
+        detail: 读取失败的原因
+    """
+
+    path: str
+    action: PlanAction
+    current: str | None = None
+    desired: str | None = None
+    detail: str | None = None
+
+
+@dataclass
+class ReconcilePlan:
+    """
+    对比结果
+
+    Attributes:
+        items: 按清单顺序排列的计划项
+    """
+
+    items: list[PlanItem]
+
+    @property
+    def changes(self) -> list[PlanItem]:
+        """需要写入或删除的项"""
+        return [item for item in self.items if item.action in CHANGE_ACTIONS]
+
+    def counts(self) -> Counter:
+        """操作 -> 数量"""
+        return Counter(item.action for item in self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def _resolve(base: str, path) -> str:
+    """把清单中的路径解析为绝对路径"""
+    if not isinstance(path, str) or not path:
+        raise ManifestError(f"无效的路径: {path!r}")
+    return os.path.normpath(os.path.join(base, os.path.expanduser(path)))
+
+
+def _check_remark(path, remark):
+    """校验备注类型，空备注视为应当没有备注"""
+    if remark is None:
+        return None
+    if not isinstance(remark, str):
+        raise ManifestError(f"{path} 的备注必须是字符串: {remark!r}")
+    # 空备注无法写入，与 CSV 的空单元格一致
+    return remark or None
+
+
+def _from_mapping(data: dict, base: str) -> list[ManifestEntry]:
+    """解析 TOML/JSON 清单"""
+    if not isinstance(data, dict):
+        raise ManifestError("清单顶层必须是对象")
+    if not {"remarks", "absent", "root"} & data.keys():
+        # 简写形式：路径 -> 备注
+        data = {"remarks": data}
+
+    root = data.get("root")
+    if root is not None:
+        base = _resolve(base, root)
+    remarks = data.get("remarks", {})
+    absent = data.get("absent", [])
+    if not isinstance(remarks, dict):
+        raise ManifestError("remarks 必须是 路径 -> 备注 的对象")
+    if not isinstance(absent, list):
+        raise ManifestError("absent 必须是路径列表")
+
+    entries = [
+        ManifestEntry(_resolve(base, path), _check_remark(path, remark))
+        for path, remark in remarks.items()
+    ]
+    entries.extend(ManifestEntry(_resolve(base, path), None) for path in absent)
+    return entries
+
+
+def _from_csv(text: str, base: str) -> list[ManifestEntry]:
+    """解析 CSV 清单"""
+    entries = []
+    for number, row in enumerate(csv.reader(text.splitlines()), 1):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if number == 1 and [cell.strip().lower() for cell in row[:2]] == ["path", "remark"]:
+            continue
+        if len(row) > 2:
+            raise ManifestError(f"第 {number} 行有多余的列，备注中的逗号需要用引号包围")
+        path = row[0].strip()
+        remark = row[1] if len(row) > 1 else ""
+        entries.append(ManifestEntry(_resolve(base, path), _check_remark(path, remark)))
+    return entries
+
+
+def parse_manifest(text: str, fmt: str, base: str = ".") -> list[ManifestEntry]:
+    """
+    解析清单内容
+
+    Args:
+        text: 清单文本
+        fmt: 格式，toml、json 或 csv
+        base: 相对路径的基准目录
+
+    Returns:
+        list[ManifestEntry]: 清单项
+
+    Raises:
+        ManifestError: 格式错误或同一文件夹出现多次
+    """
+    base = os.path.abspath(base)
+    if fmt == "toml":
+        try:
+            entries = _from_mapping(tomllib.loads(text), base)
+        except tomllib.TOMLDecodeError as e:
+            raise ManifestError(str(e)) from e
+    elif fmt == "json":
+        try:
+            entries = _from_mapping(json.loads(text), base)
+        except json.JSONDecodeError as e:
+            raise ManifestError(str(e)) from e
+    elif fmt == "csv":
+        entries = _from_csv(text, base)
+    else:
+        raise ManifestError(f"不支持的清单格式: {fmt}")
+
+    seen = set()
+    for entry in entries:
+        key = os.path.normcase(entry.path)
+        if key in seen:
+            raise ManifestError(f"文件夹在清单中出现多次: {entry.path}")
+        seen.add(key)
+    return entries
+
+
+def load_manifest(path: str, fmt: str | None = None) -> list[ManifestEntry]:
+    """
+    读取清单文件
+
+    Args:
+        path: 清单文件路径
+        fmt: 格式，None 表示按扩展名识别
+
+    Returns:
+        list[ManifestEntry]: 清单项，相对路径以清单所在目录（或 root）为基准
+
+    Raises:
+        ManifestError: 格式错误
+        OSError: 文件无法读取
+    """
+    if fmt is None:
+        fmt = os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt not in MANIFEST_FORMATS:
+            raise ManifestError(f"无法根据扩展名识别清单格式: {path}")
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        text = f.read()
+    return parse_manifest(text, fmt, os.path.dirname(os.path.abspath(path)))
+
+
+def _normalize_remark(remark: str | None) -> str | None:
+    """按写入后读回的形式规范化期望的备注：截断到长度上限并去掉首尾空白"""
+    if remark is None:
+        return None
+    return remark[:MAX_COMMENT_LENGTH].strip()
+
+
+def plan_reconcile(
+    entries: Iterable[ManifestEntry],
+    handler: FolderCommentHandler | None = None,
+    max_workers: int | None = None,
+    token: CancellationToken | Deadline | None = None,
+    progress: ProgressCallback | None = None,
+) -> ReconcilePlan:
+    """
+    并发读取当前备注，与清单比较
+
+    Args:
+        entries: 清单项
+        handler: 读取使用的处理器，None 时创建默认处理器
+        max_workers: 并发读取的线程数，None 表示使用处理器的 max_workers
+        token: 可选的取消令牌或截止时间，未读取的项在计划中为 ERROR
+        progress: 可选的读取进度回调
+
+    Returns:
+        ReconcilePlan: 按清单顺序排列的计划
+    """
+    handler = handler or FolderCommentHandler()
+    entries = list(entries)
+    current = handler.get_comments(
+        [entry.path for entry in entries], max_workers, token=token, progress=progress
+    )
+
+    items = []
+    for entry, result in zip(entries, current, strict=True):
+        desired = _normalize_remark(entry.remark)
+        if result.error is ErrorKind.NOT_A_FOLDER:
+            action = PlanAction.UNCHANGED if desired is None else PlanAction.MISSING
+        elif not result.ok:
+            action = PlanAction.ERROR
+        elif result.comment == (desired or None):
+            # 只含空白的备注读回为 None
+            action = PlanAction.UNCHANGED
+        elif desired is None:
+            action = PlanAction.DELETE
+        elif result.comment is None:
+            action = PlanAction.CREATE
+        else:
+            action = PlanAction.UPDATE
+        items.append(PlanItem(entry.path, action, result.comment, desired, result.detail))
+    return ReconcilePlan(items)
+
+
+def apply_plan(
+    plan: ReconcilePlan,
+    handler: FolderCommentHandler | None = None,
+    max_workers: int | None = None,
+    token: CancellationToken | Deadline | None = None,
+) -> list[CommentResult]:
+    """
+    只对计划中有差异的文件夹执行写入和删除
+
+    Args:
+        plan: plan_reconcile 的结果
+        handler: 执行写入的处理器，None 时创建默认处理器
+        max_workers: 并发写入的线程数，None 表示使用处理器的 max_workers
+        token: 可选的取消令牌或截止时间，未执行的项记录为 CANCELLED 或 TIMEOUT
+
+    Returns:
+        list[CommentResult]: 写入结果在前、删除结果在后
+    """
+    handler = handler or FolderCommentHandler()
+    writes = [
+        (item.path, item.desired)
+        for item in plan.items
+        if item.action in (PlanAction.CREATE, PlanAction.UPDATE)
+    ]
+    deletes = [item.path for item in plan.items if item.action is PlanAction.DELETE]
+    results = handler.set_comments(writes, max_workers, token=token) if writes else []
+    if deletes:
+        results.extend(handler.delete_comments(deletes, max_workers, token=token))
+    return results
@@ -0,0 +1,342 @@
+"""
+递归应用备注模板
+
+为一个文件夹及其所有子孙文件夹设置备注，备注可以是包含占位符的模板：
+
+- {name}: 文件夹名
+- {parent}: 上级文件夹名
+- {depth}: 相对起始文件夹的深度（起始文件夹为 0）
+- {path}: 完整路径
+- {size}: 文件夹（含子孙文件夹）的总大小，如 12.4 GB
+- {files} / {folders}: 文件数和子孙文件夹数，可写作 {files:,} 加千位分隔符
+- {updated}: 最新的文件修改时间，默认显示日期，可写作 {updated:%Y-%m}
+
+统计字段由 FolderStatsEngine 对整棵树计算一次（见 remark.core.stats），
+未变化的目录从持久化缓存中读取。
+
+目录树用 os.scandir 遍历（见 remark.utils.walker），写入在有界线程池中并发执行。
+新建的 desktop.ini 内容按备注缓存（见 desktop_ini.new_file_payload），
+大量文件夹使用同一备注时只序列化和编码一次。
+遍历、统计和写入都可以通过取消令牌或截止时间中途停止（抛出 OperationCancelled），
+已完成的写入保留在 summary 中。
+"""
+
+import fnmatch
+import os
+import string
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from remark.core.folder_handler import (
+    BACKPRESSURE_ERRORS,
+    CommentResult,
+    ErrorKind,
+    FolderCommentHandler,
+    WriteStatus,
+)
+from remark.core.stats import DEFAULT_STATS_CACHE, FolderStats, FolderStatsEngine, StatsCache
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.concurrency import AdaptiveConcurrency
+from remark.utils.pool import bounded_map
+from remark.utils.progress import ProgressCallback, ProgressTracker
+from remark.utils.walker import walk_directories
+
+# 需要文件夹统计的占位符
+STATS_FIELDS = frozenset({"size", "files", "folders", "updated"})
+# 模板可用的占位符
+TEMPLATE_FIELDS = frozenset({"name", "parent", "depth", "path"}) | STATS_FIELDS
+# 检查模板时试渲染用的统计：有文件和空文件夹
+_SAMPLE_STATS = (
+    FolderStats(size=1024, files=1, folders=1, newest_mtime_ns=1_700_000_000 * 10**9),
+    FolderStats(),
+)
+
+
+class RemarkTemplate:
+    """
+    备注模板
+
+    占位符使用 str.format 语法，支持格式说明（如 {depth:02d}），
+    字面花括号写作 {{ 和 }}。
+
+    示例:
+        RemarkTemplate("{parent} / {name}").render("/data/photos/2024", 1)  # "photos / 2024"
+    """
+
+    def __init__(self, template: str):
+        """
+        Args:
+            template: 模板字符串
+
+        Raises:
+            ValueError: 模板语法错误、使用了未知占位符或格式说明无效
+        """
+        fields = set()
+        literal = []
+        for text, field_name, _spec, _conversion in string.Formatter().parse(template):
+            literal.append(text)
+            if field_name is None:
+                continue
+            if field_name not in TEMPLATE_FIELDS:
+                raise ValueError(f"未知的模板占位符: {{{field_name}}}")
+            fields.add(field_name)
+        self.template = template
+        self.fields = frozenset(fields)
+        # 不含占位符时所有文件夹使用同一备注
+        self.literal = None if fields else "".join(literal)
+        # 用样例值试渲染，格式说明无效（如 {name:d}）时在写入任何文件夹之前报错
+        for stats in _SAMPLE_STATS:
+            try:
+                self.render(os.path.join("parent", "name"), 1, stats)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise ValueError(f"模板格式错误: {e}") from e
+
+    @property
+    def needs_stats(self) -> bool:
+        """是否使用了文件夹统计字段"""
+        return bool(self.fields & STATS_FIELDS)
+
+    def render(self, folder_path: str, depth: int = 0, stats: FolderStats | None = None) -> str:
+        """
+        为文件夹生成备注
+
+        Args:
+            folder_path: 文件夹路径
+            depth: 相对起始文件夹的深度
+            stats: 文件夹统计，模板使用统计字段时必须提供
+
+        Returns:
+            str: 备注
+
+        Raises:
+            ValueError: 模板需要统计但未提供
+        """
+        if self.literal is not None:
+            return self.literal
+        if stats is None and self.needs_stats:
+            raise ValueError("模板使用了统计字段，需要提供 stats")
+        path = os.path.abspath(folder_path)
+        parent = os.path.dirname(path)
+        fields = stats.template_fields() if stats is not None else {}
+        return self.template.format(
+            name=os.path.basename(path) or path,
+            parent=os.path.basename(parent) or parent,
+            depth=depth,
+            path=path,
+            **fields,
+        )
+
+
+def _matches(name: str, relative_path: str, patterns: Iterable[str]) -> bool:
+    """文件夹名或相对路径（/ 分隔）匹配任一 glob"""
+    return any(
+        fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative_path, pattern)
+        for pattern in patterns
+    )
+
+
+@dataclass
+class RecursiveSummary:
+    """
+    递归应用汇总
+
+    Attributes:
+        directories: 遍历的目录数
+        matched: 需要设置备注的目录数
+        updated: 实际写入的目录数
+        unchanged: 备注已是目标值的目录数
+        failed: 失败的目录数
+        errors: 失败原因 -> 次数
+    """
+
+    directories: int = 0
+    matched: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    errors: Counter = field(default_factory=Counter)
+
+    def add(self, result: CommentResult) -> None:
+        """累加一个写入结果"""
+        if result.status is WriteStatus.UPDATED:
+            self.updated += 1
+        elif result.status is WriteStatus.UNCHANGED:
+            self.unchanged += 1
+        else:
+            self.failed += 1
+            self.errors[result.error or ErrorKind.EXCEPTION] += 1
+
+
+class RecursiveRemarkApplier:
+    """
+    为目录树递归设置备注
+
+    示例:
+        applier = RecursiveRemarkApplier(max_depth=2, exclude=[".git", "node_modules"])
+        summary = applier.run(root, "{parent} - {name}")
+    """
+
+    def __init__(
+        self,
+        handler: FolderCommentHandler | None = None,
+        max_depth: int | None = None,
+        include: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        executor=None,
+        stats_engine: FolderStatsEngine | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+    ):
+        """
+        Args:
+            handler: 执行写入的处理器，None 时创建默认处理器
+            max_depth: 最大深度，None 表示不限制（0 表示只处理起始文件夹）
+            include: glob 列表，给定时只为名称或相对路径匹配的文件夹设置备注，
+                不匹配的文件夹仍会继续向下遍历
+            exclude: glob 列表，匹配的文件夹及其整个子树被跳过
+            max_workers: 并发写入的线程数，None 表示使用处理器的 max_workers
+            max_pending: 最多同时在途的写入任务数，None 表示线程数的 4 倍
+            executor: 可选的执行器，由调用方负责关闭
+            stats_engine: 模板使用统计字段时的统计引擎，None 表示使用
+                DEFAULT_STATS_CACHE 持久化缓存的默认引擎
+            concurrency: 可选的自适应并发控制器，None 表示使用处理器的控制器；
+                指定 max_workers 时不使用自适应并发
+        """
+        self.handler = handler or FolderCommentHandler()
+        self.max_depth = max_depth
+        self.include = tuple(include or ())
+        self.exclude = tuple(exclude or ())
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = executor
+        self.stats_engine = stats_engine
+        self.concurrency = concurrency
+        self.summary = RecursiveSummary()
+
+    @property
+    def controller(self) -> AdaptiveConcurrency | None:
+        """实际使用的自适应并发控制器"""
+        if self.max_workers is not None:
+            return None
+        return self.concurrency or self.handler.concurrency
+
+    @staticmethod
+    def _relative(root: str, path: str) -> str:
+        """相对起始文件夹的路径，使用 / 分隔"""
+        return os.path.relpath(path, root).replace(os.sep, "/")
+
+    def iter_targets(
+        self,
+        root: str,
+        template: RemarkTemplate,
+        token: CancellationToken | Deadline | None = None,
+    ) -> Iterator[tuple[str, str]]:
+        """
+        遍历目录树，产出 (文件夹路径, 备注)
+
+        Args:
+            root: 起始文件夹
+            template: 备注模板
+            token: 可选的取消令牌或截止时间
+        """
+
+        def keep(entry: os.DirEntry) -> bool:
+            return not _matches(entry.name, self._relative(root, entry.path), self.exclude)
+
+        stats = {}
+        if template.needs_stats:
+            # 整棵树自底向上计算一次，排除的子树也计入上级文件夹的统计
+            engine = self.stats_engine or FolderStatsEngine(
+                StatsCache(DEFAULT_STATS_CACHE), concurrency=self.controller
+            )
+            try:
+                stats = engine.compute(root, token)
+            finally:
+                # 取消时已列举的目录也写入缓存，下次不必重新列举
+                engine.cache.save()
+
+        for entry in walk_directories(
+            root, max_depth=self.max_depth, include=keep if self.exclude else None, token=token
+        ):
+            self.summary.directories += 1
+            if self.include and not _matches(
+                os.path.basename(entry.path), self._relative(root, entry.path), self.include
+            ):
+                continue
+            self.summary.matched += 1
+            yield (
+                entry.path,
+                template.render(entry.path, entry.depth, stats.get(entry.path, FolderStats())),
+            )
+
+    def iter_apply(
+        self,
+        root: str,
+        template: str | RemarkTemplate,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> Iterator[CommentResult]:
+        """
+        并发设置备注，按完成顺序流式产出结果
+
+        每次调用重置 summary。
+
+        Args:
+            root: 起始文件夹
+            template: 备注模板
+            token: 可选的取消令牌或截止时间
+            progress: 可选的进度回调，done 为已处理的文件夹数（总数未知）
+
+        Raises:
+            ValueError: 模板无效
+            OperationCancelled: 被取消或超时，summary 保留已完成部分的汇总
+        """
+        if not isinstance(template, RemarkTemplate):
+            template = RemarkTemplate(template)
+        self.summary = RecursiveSummary()
+        handler = self.handler
+        with ProgressTracker(progress) as tracker:
+            for result in bounded_map(
+                lambda item: handler.set_comment_result(*item),
+                self.iter_targets(root, template, token),
+                max_workers=self.max_workers or handler.max_workers,
+                max_pending=self.max_pending,
+                executor=self.executor,
+                token=token,
+                controller=self.controller,
+                is_error=lambda result: result.error in BACKPRESSURE_ERRORS,
+            ):
+                self.summary.add(result)
+                tracker.advance()
+                yield result
+
+    def run(
+        self,
+        root: str,
+        template: str | RemarkTemplate,
+        on_result=None,
+        token: CancellationToken | Deadline | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> RecursiveSummary:
+        """
+        为整个目录树设置备注
+
+        Args:
+            root: 起始文件夹
+            template: 备注模板
+            on_result: 可选回调，每个结果产出时调用
+            token: 可选的取消令牌或截止时间
+            progress: 可选的进度回调
+
+        Returns:
+            RecursiveSummary: 汇总
+
+        Raises:
+            OperationCancelled: 被取消或超时，self.summary 保留已完成部分的汇总
+        """
+        for result in self.iter_apply(root, template, token, progress):
+            if on_result is not None:
+                on_result(result)
+        return self.summary
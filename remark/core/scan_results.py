@@ -0,0 +1,355 @@
+"""
+紧凑的目录树扫描结果
+
+(Path, str) 元组列表每个文件夹要占数百字节，100 万至 500 万个文件夹的扫描结果
+会耗尽小内存机器。ScanResults 把每个文件夹存为几个数组中的一项：
+
+- 路径按目录树存储：每个文件夹只记上级文件夹的编号和自己的名称，公共前缀只存一次；
+  子文件夹通过“第一个子文件夹 + 下一个兄弟”链表连接，查找时逐级比较名称
+- 编号和偏移放在 array 中，名称（UTF-8）连续存放在一个 bytearray 中
+- 备注去重后放入备注池，文件夹只记备注编号
+- 状态标志（FolderFlags）每个文件夹一个字节
+- 遍历和查找时才拼出路径，Path 对象不保留
+
+每个文件夹固定占 25 字节加上名称的长度，另加去重后备注的长度。
+
+示例:
+    results = collect_remarks("D:/Projects")
+    results.get("D:/Projects/Clients/Acme")
+    for path, remark in results.iter_remarks("D:/Projects/Clients"):
+        ...
+    for path, flags in results.iter_folders(FolderFlags.UNREADABLE):
+        ...
+"""
+
+import os
+from array import array
+from collections.abc import Iterator
+from enum import IntFlag
+from pathlib import Path
+
+from remark.storage.desktop_ini import DesktopIniHandler, DesktopIniTooLarge
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.concurrency import AdaptiveConcurrency
+from remark.utils.pool import bounded_map
+from remark.utils.progress import ProgressCallback, ProgressTracker
+from remark.utils.walker import walk_directories
+
+# 没有上级、子文件夹、兄弟或备注
+_NONE = -1
+
+
+class FolderFlags(IntFlag):
+    """文件夹的扫描状态"""
+
+    NONE = 0
+    # 有 desktop.ini
+    HAS_INI = 1
+    # 读到了备注
+    HAS_REMARK = 2
+    # 读取 desktop.ini 时出错（read_info_tip 抛出 OSError 或 DesktopIniTooLarge）
+    UNREADABLE = 4
+
+
+def _encode(name: str) -> bytes:
+    return name.encode("utf-8", "surrogateescape")
+
+
+def _decode(data: bytes | bytearray) -> str:
+    return data.decode("utf-8", "surrogateescape")
+
+
+class ScanResults:
+    """
+    一棵目录树的扫描结果（编号 0 为根目录）
+
+    不是线程安全的：由扫描线程填充，完成后可以在多个线程中只读访问。
+    路径比较规则与文件系统一致（Windows 上不区分大小写）。
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: 扫描的根目录
+        """
+        self.root = os.path.abspath(root)
+        self._parents = array("i")
+        self._first_child = array("i")
+        self._next_sibling = array("i")
+        self._name_ends = array("Q")
+        self._names = bytearray()
+        self._remarks = array("i")
+        self._flags = bytearray()
+        self._pool_ends = array("Q")
+        self._pool = bytearray()
+        # 备注 -> 编号，只在填充期间使用，compact() 后释放
+        self._interned: dict[str, int] | None = {}
+        self._append(_NONE, self.root)
+
+    def _append(self, parent: int, name: str) -> int:
+        """添加 parent 的子文件夹（不检查是否已存在），返回编号"""
+        index = len(self._parents)
+        self._parents.append(parent)
+        self._first_child.append(_NONE)
+        if parent == _NONE:
+            self._next_sibling.append(_NONE)
+        else:
+            self._next_sibling.append(self._first_child[parent])
+            self._first_child[parent] = index
+        self._names += _encode(name)
+        self._name_ends.append(len(self._names))
+        self._remarks.append(_NONE)
+        self._flags.append(FolderFlags.NONE)
+        return index
+
+    def _name(self, index: int) -> str:
+        start = self._name_ends[index - 1] if index else 0
+        return _decode(self._names[start : self._name_ends[index]])
+
+    def _path(self, index: int) -> str:
+        names = []
+        while index != _NONE:
+            names.append(self._name(index))
+            index = self._parents[index]
+        return os.path.join(*reversed(names))
+
+    def _remark(self, index: int) -> str | None:
+        remark_id = self._remarks[index]
+        if remark_id == _NONE:
+            return None
+        start = self._pool_ends[remark_id - 1] if remark_id else 0
+        return _decode(self._pool[start : self._pool_ends[remark_id]])
+
+    def _set_remark(self, index: int, remark: str) -> None:
+        if self._interned is None:
+            self._interned = {}
+            for pool_id, offset in enumerate(self._pool_ends):
+                start = self._pool_ends[pool_id - 1] if pool_id else 0
+                self._interned[_decode(self._pool[start:offset])] = pool_id
+        remark_id = self._interned.get(remark)
+        if remark_id is None:
+            remark_id = self._interned[remark] = len(self._pool_ends)
+            self._pool += _encode(remark)
+            self._pool_ends.append(len(self._pool))
+        self._remarks[index] = remark_id
+        self._flags[index] |= FolderFlags.HAS_REMARK
+
+    def _components(self, path: str) -> list[str] | None:
+        """path 相对根目录的各级名称，不在根目录之下时返回 None"""
+        try:
+            relative = os.path.relpath(os.path.abspath(path), self.root)
+        except ValueError:
+            # Windows 上位于不同驱动器
+            return None
+        if relative == os.curdir:
+            return []
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        return relative.split(os.sep)
+
+    def _child(self, parent: int, name: str) -> int:
+        target = os.path.normcase(name)
+        child = self._first_child[parent]
+        while child != _NONE and os.path.normcase(self._name(child)) != target:
+            child = self._next_sibling[child]
+        return child
+
+    def _index(self, path: str) -> int:
+        components = self._components(path)
+        if components is None:
+            return _NONE
+        index = 0
+        for name in components:
+            index = self._child(index, name)
+            if index == _NONE:
+                break
+        return index
+
+    def _walk(self, prefix: str | None) -> Iterator[tuple[int, str]]:
+        """先序遍历 prefix 子树（含 prefix 本身），产出 (编号, 路径)"""
+        start = 0 if prefix is None else self._index(prefix)
+        if start == _NONE:
+            return
+        stack = [(start, self._path(start))]
+        while stack:
+            index, path = stack.pop()
+            yield index, path
+            # 子文件夹链表按添加顺序的逆序排列，入栈后按添加顺序出栈
+            child = self._first_child[index]
+            while child != _NONE:
+                stack.append((child, os.path.join(path, self._name(child))))
+                child = self._next_sibling[child]
+
+    def add(self, path: str, remark: str | None = None, flags: int = FolderFlags.NONE) -> None:
+        """
+        记录一个文件夹，缺少的上级文件夹一并添加（状态为空）
+
+        Args:
+            path: 根目录或其下的文件夹
+            remark: 备注，None 或空字符串表示没有备注
+            flags: 附加的状态标志
+
+        Raises:
+            ValueError: path 不在根目录之下
+        """
+        components = self._components(path)
+        if components is None:
+            raise ValueError(f"{path} is not under {self.root}")
+        index = 0
+        for name in components:
+            child = self._child(index, name)
+            index = self._append(index, name) if child == _NONE else child
+        self._flags[index] |= flags
+        if remark:
+            self._set_remark(index, remark)
+
+    def get(self, path: str) -> str | None:
+        """文件夹的备注，没有备注或不在结果中时返回 None"""
+        index = self._index(path)
+        return None if index == _NONE else self._remark(index)
+
+    def flags(self, path: str) -> FolderFlags | None:
+        """文件夹的状态标志，不在结果中时返回 None"""
+        index = self._index(path)
+        return None if index == _NONE else FolderFlags(self._flags[index])
+
+    def __contains__(self, path: str) -> bool:
+        return self._index(path) != _NONE
+
+    def __len__(self) -> int:
+        """文件夹数（含根目录）"""
+        return len(self._parents)
+
+    @property
+    def remark_count(self) -> int:
+        """去重后的备注数"""
+        return len(self._pool_ends)
+
+    @property
+    def nbytes(self) -> int:
+        """数组和缓冲区占用的字节数（不含对象头和填充期间的去重表）"""
+        arrays = (
+            self._parents,
+            self._first_child,
+            self._next_sibling,
+            self._name_ends,
+            self._remarks,
+            self._pool_ends,
+        )
+        size = sum(values.itemsize * len(values) for values in arrays)
+        return size + len(self._names) + len(self._flags) + len(self._pool)
+
+    def iter_remarks(self, prefix: str | None = None) -> Iterator[tuple[Path, str]]:
+        """
+        先序遍历有备注的文件夹
+
+        Args:
+            prefix: 只遍历该文件夹及其子树，None 表示整棵树
+
+        Yields:
+            (文件夹路径, 备注)
+        """
+        for index, path in self._walk(prefix):
+            remark = self._remark(index)
+            if remark is not None:
+                yield Path(path), remark
+
+    def iter_folders(
+        self, flags: int = FolderFlags.NONE, prefix: str | None = None
+    ) -> Iterator[tuple[Path, FolderFlags]]:
+        """
+        先序遍历包含全部 flags 标志的文件夹
+
+        Args:
+            flags: 要求的标志，FolderFlags.NONE 表示所有文件夹
+            prefix: 只遍历该文件夹及其子树，None 表示整棵树
+
+        Yields:
+            (文件夹路径, 状态标志)
+        """
+        required = int(flags)
+        for index, path in self._walk(prefix):
+            if self._flags[index] & required == required:
+                yield Path(path), FolderFlags(self._flags[index])
+
+    def compact(self) -> None:
+        """释放去重表和数组的预留空间（之后仍可添加，去重表按需重建）"""
+        self._interned = None
+        for name in (
+            "_parents",
+            "_first_child",
+            "_next_sibling",
+            "_name_ends",
+            "_remarks",
+            "_pool_ends",
+        ):
+            values = getattr(self, name)
+            setattr(self, name, array(values.typecode, values))
+        self._names = bytearray(self._names)
+        self._flags = bytearray(self._flags)
+        self._pool = bytearray(self._pool)
+
+
+def _read_remark(item: tuple[int, str]) -> tuple[int, str | None, bool]:
+    index, folder_path = item
+    try:
+        return index, DesktopIniHandler.read_info_tip(folder_path), False
+    except (OSError, DesktopIniTooLarge):
+        return index, None, True
+
+
+def collect_remarks(
+    root: str,
+    max_depth: int | None = None,
+    max_workers: int | None = None,
+    concurrency: AdaptiveConcurrency | None = None,
+    token: CancellationToken | Deadline | None = None,
+    progress: ProgressCallback | None = None,
+) -> ScanResults:
+    """
+    遍历目录树，记录每个文件夹并发读取的备注和状态
+
+    Args:
+        root: 根目录
+        max_depth: 最大深度，None 表示不限制
+        max_workers: 并发读取的线程数，None 表示默认值
+        concurrency: 可选的自适应并发控制器，给定时忽略 max_workers
+        token: 可选的取消令牌或截止时间
+        progress: 可选的进度回调，done 为已读取的 desktop.ini 数（总数未知）
+
+    Returns:
+        ScanResults: 遍历到的所有文件夹
+
+    Raises:
+        OperationCancelled: 被取消或超时
+    """
+    results = ScanResults(root)
+
+    def candidates():
+        # 当前文件夹的各级上级编号（遍历是先序的，上级总是先产出）
+        ancestors: list[int] = []
+        for entry in walk_directories(root, max_depth=max_depth, token=token):
+            del ancestors[entry.depth :]
+            index = 0
+            if entry.depth:
+                index = results._append(ancestors[-1], os.path.basename(entry.path))
+            ancestors.append(index)
+            if entry.has_file(DesktopIniHandler.FILENAME):
+                results._flags[index] |= FolderFlags.HAS_INI
+                yield index, entry.path
+
+    with ProgressTracker(progress) as tracker:
+        for index, remark, failed in bounded_map(
+            _read_remark,
+            candidates(),
+            max_workers=max_workers,
+            token=token,
+            controller=concurrency,
+        ):
+            tracker.advance()
+            if failed:
+                results._flags[index] |= FolderFlags.UNREADABLE
+            elif remark:
+                results._set_remark(index, remark)
+    results.compact()
+    return results
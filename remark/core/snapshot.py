@@ -0,0 +1,449 @@
+"""
+备注快照（只读的二进制导出格式）
+
+供不能运行数据库的机器快速查找备注：把目录树中的所有备注导出为一个文件，
+读取时用 mmap 直接在文件上二分查找，打开时不解析也不载入内容。
+100 万条备注的快照几毫秒即可打开，常驻内存只包括实际访问过的页。
+
+文件结构（小端序）：
+
+    头部      magic、版本、条目数和各区的偏移，随后是扫描根目录（UTF-8）
+    路径表    按 UTF-8 字节序排列的键（规范化的绝对路径，见 catalog_key）。每
+              RESTART_INTERVAL 条设一个重启点存完整的键，其余条目只存与上一条的
+              公共前缀长度和剩余部分
+    重启索引  每个重启点在路径表中的偏移（u64 数组），用于二分查找
+    备注池    去重后的备注（UTF-8），相同的备注只存一次
+    备注索引  每个备注在备注池中的偏移（u64 数组，末尾多一项作为结束位置）
+
+路径表条目：varint 公共前缀长度、varint 剩余长度、剩余字节、varint 备注编号。
+
+查找时在重启索引上二分，找到最后一个不大于目标键的重启点，再顺序解码至多
+RESTART_INTERVAL 条。返回的路径是规范化的键（Windows 上为小写）。
+
+示例:
+    build_snapshot("D:/Projects", "projects.remarks")
+    with RemarkSnapshot("projects.remarks") as snapshot:
+        snapshot.get("D:/Projects/Clients/Acme")
+        for path, remark in snapshot.iter_remarks("D:/Projects/Clients"):
+            ...
+    handler = SnapshotCommentHandler("projects.remarks")
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+
+from remark.core.base import CommentHandler
+from remark.core.catalog import catalog_key, subtree_range
+from remark.storage.atomic import Durability, atomic_write
+from remark.storage.desktop_ini import DesktopIniHandler, DesktopIniTooLarge
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.concurrency import AdaptiveConcurrency
+from remark.utils.pool import bounded_map
+from remark.utils.progress import ProgressCallback, ProgressTracker
+from remark.utils.walker import walk_directories
+
+SNAPSHOT_MAGIC = b"WFRSNAP\0"
+SNAPSHOT_VERSION = 1
+# 每隔多少条设一个重启点：越大文件越小，单次查找解码的条目越多
+RESTART_INTERVAL = 16
+
+# magic, 版本, 重启间隔, 创建时间, 条目数, 备注数, 根目录长度,
+# 路径表、重启索引、重启点数、备注池、备注索引
+_HEADER = struct.Struct("<8sIIdQQQQQQQQ")
+_U64 = struct.Struct("<Q")
+
+
+class SnapshotError(ValueError):
+    """不是快照文件、版本不支持或文件已截断"""
+
+    pass
+
+
+def _encode(key: str) -> bytes:
+    return key.encode("utf-8", "surrogateescape")
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _varint(value: int) -> bytes:
+    """无符号 LEB128 编码"""
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _shared_prefix(a: bytes, b: bytes) -> int:
+    """a 和 b 的公共前缀字节数"""
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+def _u64_array(values: list[int]) -> bytes:
+    data = array("Q", values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _pad(buffer: bytearray) -> None:
+    """补齐到 8 字节边界"""
+    buffer += b"\0" * (-len(buffer) % 8)
+
+
+def write_snapshot(
+    path: str,
+    remarks: Iterable[tuple[str, str]],
+    root: str = "",
+    durability: Durability = Durability.FILE,
+) -> int:
+    """
+    把 (文件夹路径, 备注) 写成快照文件（原子替换）
+
+    Args:
+        path: 快照文件路径
+        remarks: (文件夹路径, 备注)，同一文件夹出现多次时以最后一次为准
+        root: 扫描的根目录，记录在快照中（见 RemarkSnapshot.root）
+        durability: 持久化级别
+
+    Returns:
+        int: 写入的条目数
+    """
+    entries = {_encode(catalog_key(folder)): remark for folder, remark in remarks}
+    pool_ids: dict[str, int] = {}
+    pool = bytearray()
+    pool_offsets: list[int] = []
+    table = bytearray()
+    restarts: list[int] = []
+    previous = b""
+    for index, key in enumerate(sorted(entries)):
+        remark = entries[key]
+        remark_id = pool_ids.get(remark)
+        if remark_id is None:
+            remark_id = pool_ids[remark] = len(pool_offsets)
+            pool_offsets.append(len(pool))
+            pool += _encode(remark)
+        if index % RESTART_INTERVAL == 0:
+            restarts.append(len(table))
+            shared = 0
+        else:
+            shared = _shared_prefix(previous, key)
+        table += _varint(shared) + _varint(len(key) - shared) + key[shared:] + _varint(remark_id)
+        previous = key
+    pool_offsets.append(len(pool))
+
+    root_bytes = _encode(os.path.abspath(root) if root else "")
+    body = bytearray(root_bytes)
+    _pad(body)
+    paths_offset = _HEADER.size + len(body)
+    body += table
+    _pad(body)
+    restarts_offset = _HEADER.size + len(body)
+    body += _u64_array(restarts)
+    pool_offset = _HEADER.size + len(body)
+    body += pool
+    _pad(body)
+    pool_index_offset = _HEADER.size + len(body)
+    body += _u64_array(pool_offsets)
+
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        RESTART_INTERVAL,
+        time.time(),
+        len(entries),
+        len(pool_ids),
+        len(root_bytes),
+        paths_offset,
+        restarts_offset,
+        len(restarts),
+        pool_offset,
+        pool_index_offset,
+    )
+    atomic_write(path, header + bytes(body), durability)
+    return len(entries)
+
+
+def _read_remark(folder_path: str) -> tuple[str, str | None]:
+    try:
+        return folder_path, DesktopIniHandler.read_info_tip(folder_path)
+    except (OSError, DesktopIniTooLarge):
+        return folder_path, None
+
+
+def scan_remarks(
+    root: str,
+    max_depth: int | None = None,
+    max_workers: int | None = None,
+    concurrency: AdaptiveConcurrency | None = None,
+    token: CancellationToken | Deadline | None = None,
+    progress: ProgressCallback | None = None,
+) -> Iterator[tuple[str, str]]:
+    """
+    遍历目录树，并发读取每个 desktop.ini 的备注（DesktopIniHandler.read_info_tip）
+
+    Args:
+        root: 根目录
+        max_depth: 最大深度，None 表示不限制
+        max_workers: 并发读取的线程数，None 表示默认值
+        concurrency: 可选的自适应并发控制器，给定时忽略 max_workers
+        token: 可选的取消令牌或截止时间
+        progress: 可选的进度回调，done 为已读取的 desktop.ini 数（总数未知）
+
+    Yields:
+        (文件夹路径, 备注)：按完成顺序，没有备注的文件夹不产出
+
+    Raises:
+        OperationCancelled: 被取消或超时
+    """
+    candidates = (
+        entry.path
+        for entry in walk_directories(root, max_depth=max_depth, token=token)
+        if entry.has_file(DesktopIniHandler.FILENAME)
+    )
+    with ProgressTracker(progress) as tracker:
+        for folder_path, remark in bounded_map(
+            _read_remark,
+            candidates,
+            max_workers=max_workers,
+            token=token,
+            controller=concurrency,
+        ):
+            tracker.advance()
+            if remark:
+                yield folder_path, remark
+
+
+def build_snapshot(
+    root: str,
+    path: str,
+    max_depth: int | None = None,
+    max_workers: int | None = None,
+    concurrency: AdaptiveConcurrency | None = None,
+    token: CancellationToken | Deadline | None = None,
+    progress: ProgressCallback | None = None,
+) -> int:
+    """
+    扫描目录树并写出快照，参数见 scan_remarks
+
+    取消时不写出快照（已有的快照文件保持不变）。
+
+    Returns:
+        int: 写入的备注数
+    """
+    remarks = list(scan_remarks(root, max_depth, max_workers, concurrency, token, progress))
+    return write_snapshot(path, remarks, root=root)
+
+
+class RemarkSnapshot:
+    """
+    通过 mmap 读取的备注快照（只读，线程安全）
+
+    可以用作上下文管理器，退出时关闭映射。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 快照文件路径
+
+        Raises:
+            OSError: 文件无法打开
+            SnapshotError: 不是快照文件、版本不支持或文件已截断
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise SnapshotError(f"not a remark snapshot: {path}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (
+                magic,
+                version,
+                self._interval,
+                self.created,
+                self._count,
+                self.remark_count,
+                root_length,
+                self._paths,
+                self._restarts,
+                self._restart_count,
+                self._pool,
+                self._pool_index,
+            ) = _HEADER.unpack_from(self._map, 0)
+            if magic != SNAPSHOT_MAGIC:
+                raise SnapshotError(f"not a remark snapshot: {path}")
+            if version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"unsupported snapshot version {version}: {path}")
+            if (
+                self._pool_index + 8 * (self.remark_count + 1) > size
+                or self._restarts + 8 * self._restart_count > size
+                or self._interval <= 0
+            ):
+                raise SnapshotError(f"truncated remark snapshot: {path}")
+        except BaseException:
+            self._map.close()
+            raise
+        self.root = _decode(self._map[_HEADER.size : _HEADER.size + root_length])
+
+    def close(self) -> None:
+        """关闭映射"""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return int(self._count)
+
+    def _varint(self, offset: int) -> tuple[int, int]:
+        """解码 offset 处的 varint，返回 (值, 下一个偏移)"""
+        data = self._map
+        value = shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value, offset
+            shift += 7
+
+    def _restart_offset(self, index: int) -> int:
+        return int(self._paths + _U64.unpack_from(self._map, self._restarts + 8 * index)[0])
+
+    def _restart_key(self, index: int) -> bytes:
+        """重启点上的完整键"""
+        _shared, offset = self._varint(self._restart_offset(index))
+        length, offset = self._varint(offset)
+        return self._map[offset : offset + length]
+
+    def _seek(self, key: bytes) -> int:
+        """最后一个不大于 key 的重启点（都大于 key 时为 0）"""
+        low, high = 0, self._restart_count
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._restart_key(middle) <= key:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def _entries(self, restart: int) -> Iterator[tuple[bytes, int]]:
+        """从重启点开始顺序解码 (键, 备注编号) 直到路径表结束"""
+        offset = self._restart_offset(restart)
+        key = b""
+        for _ in range(restart * self._interval, self._count):
+            shared, offset = self._varint(offset)
+            length, offset = self._varint(offset)
+            key = key[:shared] + self._map[offset : offset + length]
+            offset += length
+            remark_id, offset = self._varint(offset)
+            yield key, remark_id
+
+    def _remark(self, remark_id: int) -> str:
+        start, end = struct.unpack_from("<QQ", self._map, self._pool_index + 8 * remark_id)
+        return _decode(self._map[self._pool + start : self._pool + end])
+
+    def get(self, folder_path: str) -> str | None:
+        """
+        查找一个文件夹的备注
+
+        Returns:
+            str: 备注，快照中没有该文件夹时为 None
+        """
+        if not self._count:
+            return None
+        key = _encode(catalog_key(folder_path))
+        for entry_key, remark_id in self._entries(self._seek(key)):
+            if entry_key == key:
+                return self._remark(remark_id)
+            if entry_key > key:
+                break
+        return None
+
+    def __contains__(self, folder_path: str) -> bool:
+        return self.get(folder_path) is not None
+
+    def iter_remarks(self, prefix: str | None = None) -> Iterator[tuple[str, str]]:
+        """
+        按路径顺序列出 (文件夹路径, 备注)
+
+        Args:
+            prefix: 可选的根文件夹，只列出其子树（包括它本身）
+        """
+        if not self._count:
+            return
+        if prefix is None:
+            start, low, high = 0, b"", None
+        else:
+            key = catalog_key(prefix)
+            low, high = (_encode(bound) for bound in subtree_range(key))
+            low_key = _encode(key)
+            start = self._seek(low_key)
+        for entry_key, remark_id in self._entries(start):
+            if high is not None:
+                if entry_key >= high:
+                    return
+                if entry_key != low_key and entry_key < low:
+                    continue
+            yield _decode(entry_key), self._remark(remark_id)
+
+    def covers(self, folder_path: str) -> bool:
+        """文件夹是否在快照扫描的根目录之下（包括根目录本身）"""
+        if not self.root:
+            return False
+        key = catalog_key(folder_path)
+        root = catalog_key(self.root)
+        low, high = subtree_range(root)
+        return key == root or low <= key < high
+
+
+class SnapshotCommentHandler(CommentHandler):
+    """
+    基于快照的只读备注处理器
+
+    读取不访问文件夹本身；写入和删除抛出 PermissionError。
+    """
+
+    def __init__(self, snapshot: RemarkSnapshot | str):
+        """
+        Args:
+            snapshot: 已打开的快照或快照文件路径
+        """
+        if not isinstance(snapshot, RemarkSnapshot):
+            snapshot = RemarkSnapshot(snapshot)
+        self.snapshot = snapshot
+
+    def get_comment(self, path: str) -> str | None:
+        """读取快照中的备注"""
+        return self.snapshot.get(path)
+
+    def get_comments(self, paths: Iterable[str]) -> list[str | None]:
+        """批量读取，按输入顺序返回"""
+        return [self.snapshot.get(path) for path in paths]
+
+    def set_comment(self, path, comment):
+        raise PermissionError("remark snapshot is read-only")
+
+    def delete_comment(self, path):
+        raise PermissionError("remark snapshot is read-only")
+
+    def supports(self, path: str) -> bool:
+        """路径在快照扫描的根目录之下"""
+        return self.snapshot.covers(path)
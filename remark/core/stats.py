@@ -0,0 +1,352 @@
+"""
+文件夹统计
+
+计算每个文件夹（含所有子孙文件夹）的总大小、文件数、子文件夹数和最新修改时间，
+供备注模板使用（如 "{size}, {files:,} 个文件, 更新于 {updated:%Y-%m}"）。
+
+- 每个目录只列举一次：先并发列举（按层级用有界线程池），再自底向上汇总，
+  整棵树的计算量与目录数成正比，不会对每个文件夹重复遍历子树
+- 每个目录自身的统计（直接包含的文件和子目录名）按目录的 st_mtime_ns 缓存，
+  缓存可以保存到磁盘。重新计算时未变化的目录只需一次 stat，无需重新列举
+
+目录的修改时间只在其直接条目增删或重命名时变化，原地改写文件内容不会更新目录的
+修改时间，这种变化需要 refresh=True 才能反映。desktop.ini 不计入统计，
+设置备注不会改变文件夹的统计结果。
+"""
+
+import json
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+
+from remark.storage.atomic import Durability, atomic_write
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.concurrency import AdaptiveConcurrency
+from remark.utils.platform import user_cache_dir
+from remark.utils.pool import bounded_map
+from remark.utils.walker import is_link
+
+# 默认的持久化缓存文件（位于当前用户的缓存目录）
+DEFAULT_STATS_CACHE = os.path.join(user_cache_dir(), "stats.json")
+# 缓存文件格式版本，不匹配时丢弃
+STATS_CACHE_VERSION = 1
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+
+class Size(int):
+    """字节数，str() 显示为易读的大小（如 12.4 GB），格式说明按整数处理"""
+
+    def __str__(self) -> str:
+        value = float(self)
+        for unit in _SIZE_UNITS:
+            if value < 1024 or unit == _SIZE_UNITS[-1]:
+                break
+            value /= 1024
+        if unit == "B":
+            return f"{int(value)} B"
+        return f"{value:.1f} {unit}"
+
+
+class Timestamp(datetime):
+    """修改时间，str() 显示为日期，格式说明按 strftime 处理"""
+
+    def __str__(self) -> str:
+        return self.strftime("%Y-%m-%d")
+
+
+class _NoTimestamp(str):
+    """没有文件时的修改时间，显示为空，忽略格式说明（如 {updated:%Y-%m}）"""
+
+    def __format__(self, format_spec: str) -> str:
+        return ""
+
+
+@dataclass(slots=True)
+class FolderStats:
+    """
+    文件夹统计（包含所有子孙文件夹）
+
+    Attributes:
+        size: 文件总字节数
+        files: 文件数
+        folders: 子孙文件夹数
+        newest_mtime_ns: 最新的文件修改时间，没有文件时为 0
+    """
+
+    size: int = 0
+    files: int = 0
+    folders: int = 0
+    newest_mtime_ns: int = 0
+
+    def add(self, other: "FolderStats") -> None:
+        """累加一个子文件夹的统计"""
+        self.size += other.size
+        self.files += other.files
+        self.folders += other.folders + 1
+        self.newest_mtime_ns = max(self.newest_mtime_ns, other.newest_mtime_ns)
+
+    @property
+    def updated(self) -> Timestamp | None:
+        """最新修改时间（本地时间），没有文件时为 None"""
+        if not self.newest_mtime_ns:
+            return None
+        return Timestamp.fromtimestamp(self.newest_mtime_ns / 1e9)
+
+    def template_fields(self) -> dict:
+        """备注模板可用的字段"""
+        updated = self.updated
+        return {
+            "size": Size(self.size),
+            "files": self.files,
+            "folders": self.folders,
+            "updated": updated if updated is not None else _NoTimestamp(),
+        }
+
+
+@dataclass(slots=True)
+class _DirectoryEntry:
+    """单个目录自身的统计（不含子目录），缓存的单位"""
+
+    mtime_ns: int
+    size: int
+    files: int
+    newest_mtime_ns: int
+    subdirectories: list[str]
+
+
+class StatsCache:
+    """
+    目录统计缓存，键为规范化路径，按目录 st_mtime_ns 判断有效性（线程安全）
+
+    path 为 None 时只保存在内存中。
+    """
+
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path: 缓存文件路径，None 表示不持久化；文件损坏或版本不符时从空缓存开始
+        """
+        self.path = path
+        self._entries: dict[str, _DirectoryEntry] = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            self._load(path)
+
+    def _load(self, path: str) -> None:
+        """读取缓存文件"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != STATS_CACHE_VERSION:
+                return
+            self._entries = {
+                key: _DirectoryEntry(*value) for key, value in data["directories"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._entries = {}
+
+    def save(self) -> None:
+        """原子写入缓存文件，没有路径时什么都不做"""
+        if self.path is None:
+            return
+        with self._lock:
+            directories = {
+                key: [e.mtime_ns, e.size, e.files, e.newest_mtime_ns, e.subdirectories]
+                for key, e in self._entries.items()
+            }
+        data = json.dumps(
+            {"version": STATS_CACHE_VERSION, "directories": directories},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        # 缓存丢失只会导致重新列举，不需要 fsync
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        atomic_write(self.path, data.encode("utf-8"), Durability.NONE)
+
+    def get(self, key: str, mtime_ns: int) -> _DirectoryEntry | None:
+        """修改时间一致时返回缓存的条目"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.mtime_ns != mtime_ns:
+            return None
+        return entry
+
+    def put(self, key: str, entry: _DirectoryEntry) -> None:
+        """写入条目"""
+        with self._lock:
+            self._entries[key] = entry
+
+    def prune(self, root_key: str, seen: set[str]) -> int:
+        """
+        删除 root_key 之下本次没有遍历到的条目（目录已被删除或移动）
+
+        Returns:
+            int: 删除的条目数
+        """
+        prefix = root_key.rstrip(os.sep) + os.sep
+        with self._lock:
+            stale = [key for key in self._entries if key.startswith(prefix) and key not in seen]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class FolderStatsEngine:
+    """
+    目录树统计引擎
+
+    示例:
+        engine = FolderStatsEngine(StatsCache(DEFAULT_STATS_CACHE))
+        stats = engine.compute(root)     # 路径 -> FolderStats
+        engine.cache.save()
+    """
+
+    def __init__(
+        self,
+        cache: StatsCache | None = None,
+        max_workers: int | None = None,
+        refresh: bool = False,
+        concurrency: AdaptiveConcurrency | None = None,
+    ):
+        """
+        Args:
+            cache: 目录统计缓存，None 表示使用不持久化的内存缓存
+            max_workers: 并发列举目录的线程数，None 表示默认值
+            refresh: 为 True 时忽略缓存，重新列举所有目录（结果仍写入缓存）
+            concurrency: 可选的自适应并发控制器，给定时忽略 max_workers
+        """
+        self.cache = cache if cache is not None else StatsCache()
+        self.max_workers = max_workers
+        self.refresh = refresh
+        self.concurrency = concurrency
+        # 最近一次 compute 的计数
+        self.listed = 0
+        self.reused = 0
+        self.errors = 0
+
+    def _scan(self, path: str) -> tuple[str, _DirectoryEntry | None, bool]:
+        """
+        获取一个目录自身的统计
+
+        Returns:
+            (path, 条目, 是否新列举)；目录无法访问时条目为 None
+        """
+        key = os.path.normcase(os.path.abspath(path))
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            if not self.refresh:
+                cached = self.cache.get(key, mtime_ns)
+                if cached is not None:
+                    return path, cached, False
+
+            size = files = newest = 0
+            subdirectories = []
+            with os.scandir(path) as iterator:
+                for child in iterator:
+                    try:
+                        if is_link(child):
+                            continue
+                        if child.is_dir(follow_symlinks=False):
+                            subdirectories.append(child.name)
+                        elif child.is_file(follow_symlinks=False):
+                            if child.name.lower() == DesktopIniHandler.FILENAME:
+                                continue
+                            st = child.stat(follow_symlinks=False)
+                            size += st.st_size
+                            files += 1
+                            newest = max(newest, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            return path, None, False
+
+        entry = _DirectoryEntry(mtime_ns, size, files, newest, subdirectories)
+        self.cache.put(key, entry)
+        return path, entry, True
+
+    def _walk(
+        self, root: str, token: CancellationToken | Deadline | None = None
+    ) -> Iterator[tuple[str, list[str], _DirectoryEntry | None]]:
+        """按层级并发获取目录统计，父目录先于子目录产出"""
+        level = [root]
+        while level:
+            next_level = []
+            results = sorted(
+                bounded_map(
+                    self._scan,
+                    level,
+                    max_workers=self.max_workers,
+                    token=token,
+                    controller=self.concurrency,
+                    is_error=lambda result: result[1] is None,
+                ),
+                key=lambda result: result[0],
+            )
+            for path, entry, listed in results:
+                if entry is None:
+                    self.errors += 1
+                    yield path, [], None
+                    continue
+                if listed:
+                    self.listed += 1
+                else:
+                    self.reused += 1
+                children = [os.path.join(path, name) for name in entry.subdirectories]
+                next_level.extend(children)
+                yield path, children, entry
+            level = next_level
+
+    def compute(
+        self, root: str, token: CancellationToken | Deadline | None = None
+    ) -> dict[str, FolderStats]:
+        """
+        计算 root 及其所有子孙文件夹的统计
+
+        Args:
+            root: 根目录
+            token: 可选的取消令牌或截止时间
+
+        Returns:
+            dict: 文件夹路径 -> FolderStats（路径由 root 拼接而成）
+
+        Raises:
+            OperationCancelled: 被取消或超时；已列举的目录保留在缓存中，
+                保存缓存后再次计算时不必重新列举
+        """
+        self.listed = self.reused = self.errors = 0
+        order = []
+        children_of = {}
+        totals = {}
+        for path, children, entry in self._walk(os.fspath(root), token):
+            order.append(path)
+            children_of[path] = children
+            if entry is None:
+                totals[path] = FolderStats()
+            else:
+                totals[path] = FolderStats(entry.size, entry.files, 0, entry.newest_mtime_ns)
+
+        # 子目录总是在父目录之后出现，逆序汇总即为自底向上
+        for path in reversed(order):
+            stats = totals[path]
+            for child in children_of[path]:
+                child_stats = totals.get(child)
+                if child_stats is not None:
+                    stats.add(child_stats)
+
+        self.cache.prune(
+            os.path.normcase(os.path.abspath(root)),
+            {os.path.normcase(os.path.abspath(path)) for path in order},
+        )
+        return totals
+
+    def stats(self, root: str, token: CancellationToken | Deadline | None = None) -> FolderStats:
+        """计算单个文件夹（含子孙文件夹）的统计"""
+        return self.compute(root, token)[os.fspath(root)]
@@ -0,0 +1,785 @@
+"""
+监视模式
+
+长时间运行，监视一个或多个目录树中 desktop.ini 的新建、修改、删除以及文件夹的重命名和删除，
+把去抖后的变化事件批量交给订阅者（备注目录、读取缓存、日志等）。变化很少时，
+不需要按计划反复遍历整棵树。
+
+两种后端：
+
+- InotifyBackend: Linux 上使用 inotify（见 remark.utils.inotify），每个文件夹一个监视，
+  新建和移入的文件夹自动加入监视。内核事件队列溢出，或运行中监视数达到上限时发出 RESCAN，
+  订阅者应重新扫描该目录树
+- PollingBackend: 其他平台，或 inotify 不可用（如监视数达到 max_user_watches 上限）时使用。
+  保存每个文件夹的修改时间、inode、子文件夹和 desktop.ini 的修改时间/大小；每次轮询只 stat
+  每个文件夹和已有的 desktop.ini，修改时间变化的文件夹才用 os.scandir 重新列举。
+  消失和新出现的文件夹按 inode 匹配，识别为重命名或移动
+
+Debouncer 合并短时间内的连续事件（先新建后修改只报告新建，新建后又删除则不报告），
+没有新事件 delay 秒后（或第一个事件之后最多 max_delay 秒）整批交给订阅者。
+文件夹事件是合并的边界，之前和之后的 desktop.ini 事件不会合并，订阅者按顺序处理即可。
+
+示例:
+    with Watcher(["D:/Projects"]) as watcher:
+        watcher.subscribe(CatalogSubscriber(catalog))
+        watcher.subscribe(ReporterSubscriber(ConsoleReporter()))
+        watcher.run(token)       # 直到 token 被取消
+"""
+
+import errno
+import os
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from enum import Enum
+
+from remark.core.catalog import RemarkCatalog
+from remark.i18n import N_
+from remark.storage.cache import RemarkCache
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.inotify import (
+    IN_CLOSE_WRITE,
+    IN_CREATE,
+    IN_DELETE,
+    IN_DELETE_SELF,
+    IN_DONT_FOLLOW,
+    IN_IGNORED,
+    IN_ISDIR,
+    IN_MOVE_SELF,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    IN_ONLYDIR,
+    IN_Q_OVERFLOW,
+    Inotify,
+    inotify_available,
+)
+from remark.utils.pool import CANCEL_POLL_INTERVAL
+from remark.utils.reporter import NullReporter, Reporter
+from remark.utils.walker import is_link
+
+# 默认的去抖时间（秒）：没有新事件这么久之后交给订阅者
+DEFAULT_DEBOUNCE = 0.5
+# 默认的轮询间隔（秒）
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+class ChangeKind(Enum):
+    """变化类型"""
+
+    CREATED = "created"  # 新建 desktop.ini
+    MODIFIED = "modified"  # 修改或替换 desktop.ini
+    DELETED = "deleted"  # 删除 desktop.ini
+    RENAMED = "renamed"  # 文件夹重命名或移动（old_path -> folder_path）
+    REMOVED = "removed"  # 文件夹被删除或移出监视范围（包括整棵子树）
+    RESCAN = "rescan"  # 可能漏掉了事件，需要重新扫描 folder_path 整棵树
+
+
+# 与 desktop.ini 相关、按文件夹合并的变化
+INI_CHANGES = frozenset({ChangeKind.CREATED, ChangeKind.MODIFIED, ChangeKind.DELETED})
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeEvent:
+    """
+    变化事件
+
+    Attributes:
+        kind: 变化类型
+        folder_path: 文件夹路径（desktop.ini 事件为其所在文件夹，重命名为新路径）
+        old_path: 重命名前的路径，其他事件为 None
+    """
+
+    kind: ChangeKind
+    folder_path: str
+    old_path: str | None = None
+
+
+# 订阅者：以一批去抖后的事件调用
+Subscriber = Callable[[list[ChangeEvent]], None]
+
+# 同一文件夹连续两个 desktop.ini 事件合并后的类型，None 表示相互抵消
+_MERGE = {
+    (ChangeKind.CREATED, ChangeKind.CREATED): ChangeKind.CREATED,
+    (ChangeKind.CREATED, ChangeKind.MODIFIED): ChangeKind.CREATED,
+    (ChangeKind.CREATED, ChangeKind.DELETED): None,
+    (ChangeKind.MODIFIED, ChangeKind.CREATED): ChangeKind.MODIFIED,
+    (ChangeKind.MODIFIED, ChangeKind.MODIFIED): ChangeKind.MODIFIED,
+    (ChangeKind.MODIFIED, ChangeKind.DELETED): ChangeKind.DELETED,
+    (ChangeKind.DELETED, ChangeKind.CREATED): ChangeKind.MODIFIED,
+    (ChangeKind.DELETED, ChangeKind.MODIFIED): ChangeKind.MODIFIED,
+    (ChangeKind.DELETED, ChangeKind.DELETED): ChangeKind.DELETED,
+}
+
+
+def _is_ini(name: str) -> bool:
+    return name.lower() == DesktopIniHandler.FILENAME
+
+
+def _ini_change(old: tuple[int, int] | None, new: tuple[int, int] | None) -> ChangeKind | None:
+    """desktop.ini 的 (修改时间, 大小) 前后对比"""
+    if old == new:
+        return None
+    if old is None:
+        return ChangeKind.CREATED
+    if new is None:
+        return ChangeKind.DELETED
+    return ChangeKind.MODIFIED
+
+
+class Debouncer:
+    """
+    合并短时间内的连续事件
+
+    示例:
+        debouncer.add(events)
+        batch = debouncer.flush()        # 还没到时间时为空列表
+    """
+
+    def __init__(
+        self,
+        delay: float = DEFAULT_DEBOUNCE,
+        max_delay: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            delay: 没有新事件多少秒后交出
+            max_delay: 第一个事件之后最多等待的秒数（事件持续不断时），None 表示 delay 的 10 倍
+            clock: 时钟函数，测试时可替换
+        """
+        self.delay = delay
+        self.max_delay = max_delay if max_delay is not None else delay * 10
+        self._clock = clock
+        self._pending: dict[tuple, ChangeEvent] = {}
+        # 每个文件夹事件开始新的一段，desktop.ini 事件只在段内合并
+        self._generation = 0
+        self._first: float | None = None
+        self._last: float | None = None
+
+    def add(self, events: Iterable[ChangeEvent]) -> None:
+        """加入事件"""
+        for event in events:
+            if event.kind in INI_CHANGES:
+                key = (self._generation, event.folder_path)
+                previous = self._pending.pop(key, None)
+                kind = event.kind if previous is None else _MERGE[previous.kind, event.kind]
+                if kind is not None:
+                    self._pending[key] = ChangeEvent(kind, event.folder_path)
+            else:
+                self._generation += 1
+                self._pending[(self._generation, None)] = event
+                self._generation += 1
+            now = self._clock()
+            if self._first is None:
+                self._first = now
+            self._last = now
+
+    def time_until_due(self) -> float | None:
+        """距离可以交出的秒数，没有待处理的事件时为 None"""
+        if self._first is None or self._last is None:
+            return None
+        due = min(self._last + self.delay, self._first + self.max_delay)
+        return max(0.0, due - self._clock())
+
+    def flush(self, force: bool = False) -> list[ChangeEvent]:
+        """
+        到时间（或 force 为 True）时取出合并后的事件
+
+        Returns:
+            list[ChangeEvent]: 按发生顺序排列的事件，没有到时间时为空列表
+        """
+        remaining = self.time_until_due()
+        if remaining is None or (remaining > 0 and not force):
+            return []
+        events = list(self._pending.values())
+        self._pending.clear()
+        self._first = self._last = None
+        return events
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class WatchBackend(ABC):
+    """监视后端基类"""
+
+    # 后端名称（用于显示）
+    name = ""
+
+    @abstractmethod
+    def add_root(self, root: str) -> None:
+        """开始监视一个目录树"""
+        pass
+
+    @abstractmethod
+    def read(self, timeout: float) -> list[ChangeEvent]:
+        """读取未经合并的事件，没有事件时最多等待 timeout 秒"""
+        pass
+
+    def close(self) -> None:  # noqa: B027
+        """释放资源（默认没有需要释放的资源）"""
+        pass
+
+
+@dataclass(slots=True)
+class _FolderState:
+    """轮询快照中的一个文件夹"""
+
+    mtime_ns: int
+    ino: int
+    # desktop.ini 的 (修改时间, 大小)，没有时为 None
+    ini: tuple[int, int] | None
+    # 子文件夹名
+    children: list[str]
+
+
+class PollingBackend(WatchBackend):
+    """按间隔比较快照的轮询后端"""
+
+    name = "polling"
+
+    def __init__(
+        self, interval: float = DEFAULT_POLL_INTERVAL, clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            interval: 轮询间隔（秒）
+            clock: 时钟函数，测试时可替换
+        """
+        self.interval = interval
+        self._clock = clock
+        self._roots: list[str] = []
+        self._states: dict[str, _FolderState] = {}
+        # 已被删除、等待重新出现的根
+        self._missing: set[str] = set()
+        self._next_poll = clock() + interval
+
+    @staticmethod
+    def _stat_ini(folder_path: str) -> tuple[int, int] | None:
+        try:
+            st = os.stat(DesktopIniHandler.get_path(folder_path))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    @staticmethod
+    def _scan_folder(path: str) -> _FolderState | None:
+        """列举一个文件夹，无法访问时返回 None"""
+        ini = None
+        children = []
+        try:
+            # 先 stat 后列举：两者之间的变化会让下次轮询再列举一次，不会漏掉
+            st = os.stat(path)
+            with os.scandir(path) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not is_link(entry):
+                                children.append(entry.name)
+                        elif _is_ini(entry.name):
+                            ini_stat = entry.stat(follow_symlinks=False)
+                            ini = (ini_stat.st_mtime_ns, ini_stat.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return _FolderState(st.st_mtime_ns, st.st_ino, ini, children)
+
+    def _scan_tree(self, root: str) -> dict[str, _FolderState]:
+        """列举整棵目录树"""
+        states = {}
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            state = self._scan_folder(path)
+            if state is None:
+                continue
+            states[path] = state
+            stack.extend(os.path.join(path, name) for name in state.children)
+        return states
+
+    def _drop(self, path: str) -> dict[str, _FolderState]:
+        """从快照中移除一棵子树，返回移除的部分"""
+        dropped = {}
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            state = self._states.pop(current, None)
+            if state is None:
+                continue
+            dropped[current] = state
+            stack.extend(os.path.join(current, name) for name in state.children)
+        return dropped
+
+    def add_root(self, root: str) -> None:
+        root = os.path.abspath(root)
+        self._roots.append(root)
+        self._states.update(self._scan_tree(root))
+
+    def read(self, timeout: float) -> list[ChangeEvent]:
+        wait = self._next_poll - self._clock()
+        if wait > 0:
+            time.sleep(min(timeout, wait))
+            if self._clock() < self._next_poll:
+                return []
+        self._next_poll = self._clock() + self.interval
+        return self.poll()
+
+    def poll(self) -> list[ChangeEvent]:
+        """立即与快照比较一次，更新快照并返回变化"""
+        events: list[ChangeEvent] = []
+        # 消失的文件夹 -> 其子树的旧快照；新出现的文件夹
+        removed: dict[str, dict[str, _FolderState]] = {}
+        added: list[str] = []
+
+        for root in self._roots:
+            if root in self._missing:
+                if os.path.isdir(root):
+                    self._missing.discard(root)
+                    self._states.update(self._scan_tree(root))
+                    events.append(ChangeEvent(ChangeKind.RESCAN, root))
+                continue
+            stack = [root]
+            while stack:
+                path = stack.pop()
+                old = self._states.get(path)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    if path == root:
+                        self._drop(root)
+                        self._missing.add(root)
+                        events.append(ChangeEvent(ChangeKind.REMOVED, root))
+                    # 其他文件夹的消失由上级文件夹的列举发现
+                    continue
+                except OSError:
+                    continue
+                if old is None:
+                    continue
+
+                if st.st_mtime_ns == old.mtime_ns:
+                    # 文件夹未变化；desktop.ini 原地改写不会改变文件夹的修改时间
+                    if old.ini is not None:
+                        ini = self._stat_ini(path)
+                        kind = _ini_change(old.ini, ini)
+                        if kind is not None:
+                            events.append(ChangeEvent(kind, path))
+                            old.ini = ini
+                    stack.extend(os.path.join(path, name) for name in old.children)
+                    continue
+
+                new = self._scan_folder(path)
+                if new is None:
+                    continue
+                kind = _ini_change(old.ini, new.ini)
+                if kind is not None:
+                    events.append(ChangeEvent(kind, path))
+                old_children = set(old.children)
+                new_children = set(new.children)
+                for name in old_children - new_children:
+                    child = os.path.join(path, name)
+                    removed[child] = self._drop(child)
+                added.extend(
+                    os.path.join(path, name) for name in sorted(new_children - old_children)
+                )
+                self._states[path] = new
+                stack.extend(
+                    os.path.join(path, name) for name in new.children if name in old_children
+                )
+
+        events.extend(self._match_moves(removed, added))
+        return events
+
+    def _match_moves(
+        self, removed: dict[str, dict[str, _FolderState]], added: list[str]
+    ) -> list[ChangeEvent]:
+        """按 inode 把消失和新出现的文件夹配对为重命名，其余为删除和新建"""
+        events: list[ChangeEvent] = []
+        by_inode: dict[int, str] = {}
+        for removed_path, subtree in removed.items():
+            state = subtree.get(removed_path)
+            if state is not None and state.ino:
+                by_inode[state.ino] = removed_path
+
+        for new_path in added:
+            subtree = self._scan_tree(new_path)
+            if not subtree:
+                continue
+            self._states.update(subtree)
+            old_path = by_inode.pop(subtree[new_path].ino, None)
+            if old_path is None:
+                events.extend(
+                    ChangeEvent(ChangeKind.CREATED, path)
+                    for path, state in sorted(subtree.items())
+                    if state.ini is not None
+                )
+                continue
+
+            events.append(ChangeEvent(ChangeKind.RENAMED, new_path, old_path))
+            old_subtree = removed.pop(old_path)
+            for path, state in sorted(subtree.items()):
+                old_state = old_subtree.get(old_path + path[len(new_path) :])
+                kind = _ini_change(old_state.ini if old_state is not None else None, state.ini)
+                if kind is not None:
+                    events.append(ChangeEvent(kind, path))
+
+        events.extend(ChangeEvent(ChangeKind.REMOVED, path) for path in removed)
+        return events
+
+
+# 每个文件夹的 inotify 监视
+_WATCH_MASK = (
+    IN_CREATE
+    | IN_DELETE
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+
+
+class InotifyBackend(WatchBackend):
+    """Linux inotify 后端"""
+
+    name = "inotify"
+
+    def __init__(self):
+        """
+        Raises:
+            OSError: inotify 不可用
+        """
+        self._inotify = Inotify()
+        self._roots: set[str] = set()
+        self._paths: dict[int, str] = {}
+        self._wds: dict[str, int] = {}
+        # 有 desktop.ini 的文件夹，用于区分新建和替换
+        self._has_ini: set[str] = set()
+
+    @staticmethod
+    def available() -> bool:
+        """当前平台是否支持 inotify"""
+        return inotify_available()
+
+    def add_root(self, root: str) -> None:
+        """
+        Raises:
+            OSError: 监视数达到上限（ENOSPC）或内存不足
+        """
+        root = os.path.abspath(root)
+        self._roots.add(root)
+        self._watch_tree(root)
+
+    def _watch_tree(self, root: str) -> list[str]:
+        """监视 root 及其子孙文件夹，返回其中有 desktop.ini 的文件夹"""
+        found = []
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            try:
+                # 先添加监视后列举，列举期间新建的条目也会产生事件
+                wd = self._inotify.add_watch(path, _WATCH_MASK)
+            except OSError as e:
+                if e.errno in (errno.ENOSPC, errno.ENOMEM):
+                    raise
+                continue
+            previous = self._paths.get(wd)
+            if previous is not None:
+                self._wds.pop(previous, None)
+            self._paths[wd] = path
+            self._wds[path] = wd
+            try:
+                with os.scandir(path) as iterator:
+                    for entry in iterator:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not is_link(entry):
+                                    stack.append(entry.path)
+                            elif _is_ini(entry.name):
+                                found.append(path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        self._has_ini.update(found)
+        return found
+
+    def _subtree(self, path: str) -> list[str]:
+        """已监视的 path 及其子孙文件夹"""
+        prefix = path.rstrip(os.sep) + os.sep
+        return [p for p in self._wds if p == path or p.startswith(prefix)]
+
+    def _unwatch(self, path: str) -> None:
+        """停止监视一棵子树（已删除或移出监视范围）"""
+        for current in self._subtree(path):
+            wd = self._wds.pop(current)
+            self._paths.pop(wd, None)
+            self._has_ini.discard(current)
+            self._inotify.rm_watch(wd)
+
+    def _rename(self, old_path: str, new_path: str) -> None:
+        """监视跟随 inode 移动，只需更新路径"""
+        for current in self._subtree(old_path):
+            moved = new_path + current[len(old_path) :]
+            wd = self._wds.pop(current)
+            self._wds[moved] = wd
+            self._paths[wd] = moved
+            if current in self._has_ini:
+                self._has_ini.discard(current)
+                self._has_ini.add(moved)
+
+    def _root_of(self, path: str) -> str:
+        """path 所在的监视根"""
+        return max(
+            (root for root in self._roots if path == root or path.startswith(root + os.sep)),
+            key=len,
+            default=path,
+        )
+
+    def _created(self, path: str) -> list[ChangeEvent]:
+        """新建或移入的文件夹：加入监视，其中已有的 desktop.ini 报告为新建"""
+        try:
+            found = self._watch_tree(path)
+        except OSError as e:
+            if e.errno not in (errno.ENOSPC, errno.ENOMEM):
+                raise
+            # 监视数达到上限（例如移入了很大的目录树）：已加入的监视保留，
+            # 不再中断监视，而是请订阅者重新扫描所在的根；未能加入监视的文件夹此后的变化会漏报
+            return [ChangeEvent(ChangeKind.RESCAN, self._root_of(path))]
+        return [ChangeEvent(ChangeKind.CREATED, folder) for folder in found]
+
+    def read(self, timeout: float) -> list[ChangeEvent]:
+        events: list[ChangeEvent] = []
+        # cookie -> 移出的文件夹，同一批中没有对应的移入时视为移出监视范围
+        moved_from: dict[int, str] = {}
+
+        for raw in self._inotify.read(timeout):
+            if raw.mask & IN_Q_OVERFLOW:
+                events.extend(ChangeEvent(ChangeKind.RESCAN, root) for root in sorted(self._roots))
+                continue
+            parent = self._paths.get(raw.wd)
+            if parent is None:
+                continue
+            if raw.mask & IN_IGNORED:
+                del self._paths[raw.wd]
+                if self._wds.get(parent) == raw.wd:
+                    del self._wds[parent]
+                continue
+            if raw.mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                # 其他文件夹的删除和移动由上级文件夹的事件报告
+                if parent in self._roots:
+                    self._unwatch(parent)
+                    events.append(ChangeEvent(ChangeKind.REMOVED, parent))
+                continue
+
+            path = os.path.join(parent, raw.name)
+            if raw.mask & IN_ISDIR:
+                if raw.mask & IN_MOVED_FROM:
+                    moved_from[raw.cookie] = path
+                elif raw.mask & IN_MOVED_TO:
+                    old_path = moved_from.pop(raw.cookie, None)
+                    if old_path is None:
+                        events.extend(self._created(path))
+                    else:
+                        self._rename(old_path, path)
+                        events.append(ChangeEvent(ChangeKind.RENAMED, path, old_path))
+                elif raw.mask & IN_CREATE:
+                    events.extend(self._created(path))
+                elif raw.mask & IN_DELETE:
+                    self._unwatch(path)
+                    events.append(ChangeEvent(ChangeKind.REMOVED, path))
+            elif _is_ini(raw.name):
+                if raw.mask & (IN_CREATE | IN_MOVED_TO):
+                    # 原子写入以重命名替换 desktop.ini
+                    existed = parent in self._has_ini
+                    self._has_ini.add(parent)
+                    kind = ChangeKind.MODIFIED if existed else ChangeKind.CREATED
+                elif raw.mask & IN_CLOSE_WRITE:
+                    kind = ChangeKind.MODIFIED
+                else:
+                    self._has_ini.discard(parent)
+                    kind = ChangeKind.DELETED
+                events.append(ChangeEvent(kind, parent))
+
+        for old_path in moved_from.values():
+            self._unwatch(old_path)
+            events.append(ChangeEvent(ChangeKind.REMOVED, old_path))
+        return events
+
+    def close(self) -> None:
+        self._inotify.close()
+
+
+class Watcher:
+    """
+    监视一个或多个目录树，把去抖后的事件交给订阅者
+
+    可以用作上下文管理器，退出时释放后端。
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[str],
+        backend: WatchBackend | str = "auto",
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        reporter: Reporter | None = None,
+    ):
+        """
+        Args:
+            roots: 要监视的目录树
+            backend: "auto"（inotify 可用时使用，否则或监视数达到上限时轮询）、
+                "inotify"、"polling"，或已创建的后端
+            debounce: 去抖时间（秒）
+            poll_interval: 轮询后端的间隔（秒）
+            reporter: 订阅者出错时报告，None 表示不报告
+
+        Raises:
+            OSError: 指定 "inotify" 但不可用
+            ValueError: 未知的后端名称
+        """
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.reporter = reporter if reporter is not None else NullReporter()
+        self.debouncer = Debouncer(debounce)
+        self._subscribers: list[Subscriber] = []
+        self.backend = self._create_backend(backend, poll_interval)
+
+    def _create_backend(self, backend: WatchBackend | str, poll_interval: float) -> WatchBackend:
+        if isinstance(backend, WatchBackend):
+            return self._start(backend)
+        if backend == "auto":
+            if InotifyBackend.available():
+                try:
+                    return self._start(InotifyBackend())
+                except OSError:
+                    pass
+            return self._start(PollingBackend(poll_interval))
+        if backend == "inotify":
+            return self._start(InotifyBackend())
+        if backend == "polling":
+            return self._start(PollingBackend(poll_interval))
+        raise ValueError(f"unknown watch backend: {backend}")
+
+    def _start(self, backend: WatchBackend) -> WatchBackend:
+        """把所有根加入后端，失败时释放后端"""
+        try:
+            for root in self.roots:
+                backend.add_root(root)
+        except BaseException:
+            backend.close()
+            raise
+        return backend
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """添加订阅者，按添加顺序调用"""
+        self._subscribers.append(subscriber)
+
+    def _dispatch(self, events: list[ChangeEvent]) -> None:
+        if not events:
+            return
+        for subscriber in self._subscribers:
+            # 一个订阅者出错不影响其他订阅者和后续事件
+            try:
+                subscriber(events)
+            except Exception as e:
+                self.reporter.error(N_("Watch subscriber failed: {error}"), error=e)
+
+    def poll(self, timeout: float = 0.0) -> list[ChangeEvent]:
+        """
+        读取一次后端，把到时间的事件交给订阅者
+
+        Args:
+            timeout: 最多等待的秒数
+
+        Returns:
+            list[ChangeEvent]: 交给订阅者的事件
+        """
+        due = self.debouncer.time_until_due()
+        self.debouncer.add(self.backend.read(timeout if due is None else min(timeout, due)))
+        events = self.debouncer.flush()
+        self._dispatch(events)
+        return events
+
+    def run(self, token: CancellationToken | Deadline | None = None) -> None:
+        """
+        持续监视，直到 token 被取消或超时（或 KeyboardInterrupt）
+
+        停止时把尚未交出的事件立即交给订阅者。
+        """
+        try:
+            while token is None or not token.cancelled:
+                self.poll(CANCEL_POLL_INTERVAL)
+        finally:
+            self._dispatch(self.debouncer.flush(force=True))
+
+    def close(self) -> None:
+        """释放后端"""
+        self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CatalogSubscriber:
+    """把变化写入备注目录"""
+
+    def __init__(self, catalog: RemarkCatalog):
+        self.catalog = catalog
+
+    def __call__(self, events: list[ChangeEvent]) -> None:
+        for event in events:
+            if event.kind in INI_CHANGES:
+                self.catalog.record_folder(event.folder_path)
+            elif event.kind is ChangeKind.REMOVED:
+                self.catalog.remove([event.folder_path])
+            elif event.kind is ChangeKind.RENAMED and event.old_path is not None:
+                self.catalog.remove([event.old_path])
+                self.catalog.refresh(event.folder_path)
+            else:
+                self.catalog.refresh(event.folder_path)
+
+
+class CacheSubscriber:
+    """使读取缓存中变化的文件夹失效"""
+
+    def __init__(self, cache: RemarkCache):
+        self.cache = cache
+
+    def __call__(self, events: list[ChangeEvent]) -> None:
+        for event in events:
+            if event.kind in INI_CHANGES:
+                self.cache.invalidate(event.folder_path)
+            else:
+                # 整棵子树都可能受影响，缓存没有按子树失效的接口
+                self.cache.clear()
+                return
+
+
+_EVENT_MESSAGES = {
+    ChangeKind.CREATED: N_("desktop.ini created: {path}"),
+    ChangeKind.MODIFIED: N_("desktop.ini modified: {path}"),
+    ChangeKind.DELETED: N_("desktop.ini deleted: {path}"),
+    ChangeKind.RENAMED: N_("Folder renamed: {old_path} -> {path}"),
+    ChangeKind.REMOVED: N_("Folder removed: {path}"),
+    ChangeKind.RESCAN: N_("Changes may have been missed, rescanning: {path}"),
+}
+
+
+class ReporterSubscriber:
+    """把每个事件作为消息交给 Reporter（如用 ConsoleReporter 输出日志）"""
+
+    def __init__(self, reporter: Reporter):
+        self.reporter = reporter
+
+    def __call__(self, events: list[ChangeEvent]) -> None:
+        for event in events:
+            self.reporter.info(
+                _EVENT_MESSAGES[event.kind], path=event.folder_path, old_path=event.old_path
+            )
@@ -0,0 +1,257 @@
+"""
+写后合并队列
+
+长期运行的调用方（同步代理、目录监视等）经常在短时间内对同一文件夹连续更新备注。
+WriteBehindQueue 放在 FolderCommentHandler 前面，按文件夹合并尚未写入的更新：
+
+- 同一文件夹多次设置备注，只写入最后一次（last writer wins）
+- 删除会取消尚未写入的设置，反之亦然
+
+待写入的文件夹数量达到上限、最早的更新等待超过时限，或调用 flush() 时统一写入。
+每次提交返回一个 Future，写入完成后得到该文件夹的 WriteResult。
+写入在后台线程中执行，使用处理器的结构化接口，从不询问用户也不输出消息。
+"""
+
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import Enum
+
+from remark.core.folder_handler import ErrorKind, FolderCommentHandler, WriteStatus
+
+# 默认最多积压的文件夹数量
+DEFAULT_MAX_PENDING = 256
+# 默认最长积压时间（秒）
+DEFAULT_MAX_DELAY = 1.0
+
+
+class WriteOperation(Enum):
+    """待写入的操作"""
+
+    SET = "set"
+    DELETE = "delete"
+
+
+@dataclass
+class WriteResult:
+    """
+    单个文件夹的写入结果
+
+    Attributes:
+        folder_path: 文件夹路径
+        operation: 实际执行的操作
+        success: 是否成功
+        status: 写入状态，处理器抛出异常时为 None
+        merged: 合并进这次写入的提交次数
+        error: 处理器抛出的异常
+        reason: 失败原因
+        detail: 失败原因的详细信息
+    """
+
+    folder_path: str
+    operation: WriteOperation
+    success: bool
+    status: WriteStatus | None = None
+    merged: int = 1
+    error: BaseException | None = None
+    reason: ErrorKind | None = None
+    detail: str | None = None
+
+
+@dataclass
+class WriteBehindStats:
+    """写后队列统计"""
+
+    submitted: int = 0  # 提交次数
+    coalesced: int = 0  # 被合并、无需单独写入的提交次数
+    written: int = 0  # 实际执行的写入次数
+    failed: int = 0  # 失败的写入次数
+    flushes: int = 0  # 写入批次数
+
+
+@dataclass
+class _Pending:
+    """某个文件夹尚未写入的更新"""
+
+    folder_path: str
+    operation: WriteOperation
+    comment: str | None
+    created: float
+    futures: list[Future] = field(default_factory=list)
+
+
+class WriteBehindQueue:
+    """
+    写后合并队列（线程安全）
+
+    示例:
+        with WriteBehindQueue(handler) as queue:
+            queue.set_comment(path, "草稿")
+            future = queue.set_comment(path, "定稿")  # 与上一次合并
+        future.result().success
+    """
+
+    def __init__(
+        self,
+        handler: FolderCommentHandler | None = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        on_result=None,
+    ):
+        """
+        Args:
+            handler: 执行写入的处理器，None 时创建默认处理器
+            max_pending: 积压的文件夹数量达到该值时立即写入
+            max_delay: 最早的更新等待超过该时间（秒）时写入
+            on_result: 可选回调，每个文件夹写入后以 WriteResult 调用（在写入线程中执行）
+        """
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        if max_delay < 0:
+            raise ValueError("max_delay must not be negative")
+        self.handler = handler or FolderCommentHandler()
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self.on_result = on_result
+        self._pending: OrderedDict[str, _Pending] = OrderedDict()
+        self._cond = threading.Condition()
+        # 保证批次按取出顺序执行，同一文件夹的新更新不会被旧批次覆盖
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._stats = WriteBehindStats()
+        self._thread = threading.Thread(target=self._run, name="remark-write-behind", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _key(folder_path: str) -> str:
+        """规范化的文件夹键"""
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    def set_comment(self, folder_path: str, comment: str) -> Future:
+        """提交设置备注，返回写入完成后得到 WriteResult 的 Future"""
+        return self._submit(folder_path, WriteOperation.SET, comment)
+
+    def delete_comment(self, folder_path: str) -> Future:
+        """提交删除备注，返回写入完成后得到 WriteResult 的 Future"""
+        return self._submit(folder_path, WriteOperation.DELETE, None)
+
+    def _submit(self, folder_path, operation, comment) -> Future:
+        future: Future = Future()
+        key = self._key(folder_path)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = _Pending(folder_path, operation, comment, time.monotonic())
+                self._pending[key] = entry
+            else:
+                # 后提交的操作覆盖尚未写入的操作，等待时间仍从第一次提交算起
+                entry.folder_path = folder_path
+                entry.operation = operation
+                entry.comment = comment
+                self._stats.coalesced += 1
+            entry.futures.append(future)
+            self._stats.submitted += 1
+            self._cond.notify()
+        return future
+
+    def _drain(self) -> list[_Pending]:
+        """取出全部待写入的更新（调用方持有 self._cond）"""
+        batch = list(self._pending.values())
+        self._pending.clear()
+        return batch
+
+    def _run(self) -> None:
+        """后台写入线程：等待数量或时间阈值"""
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._pending:
+                        self._cond.wait()
+                        continue
+                    if len(self._pending) >= self.max_pending:
+                        break
+                    oldest = next(iter(self._pending.values())).created
+                    remaining = oldest + self.max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self._flush_pending()
+
+    def _flush_pending(self) -> list[WriteResult]:
+        """取出并写入当前积压的全部更新"""
+        with self._flush_lock:
+            with self._cond:
+                batch = self._drain()
+                if batch:
+                    self._stats.flushes += 1
+            return [self._execute(entry) for entry in batch]
+
+    def _execute(self, entry: _Pending) -> WriteResult:
+        """执行一个文件夹的写入并通知所有等待者"""
+        result = WriteResult(entry.folder_path, entry.operation, False, merged=len(entry.futures))
+        try:
+            # 结构化接口不询问、不输出，非 UTF-16 的 desktop.ini 记为 ErrorKind.ENCODING
+            if entry.operation is WriteOperation.SET:
+                outcome = self.handler.set_comment_result(entry.folder_path, entry.comment or "")
+            else:
+                outcome = self.handler.delete_comment_result(entry.folder_path)
+            result.success = outcome.ok
+            result.status = outcome.status
+            result.reason = outcome.error
+            result.detail = outcome.detail
+        except Exception as e:
+            result.error = e
+
+        with self._cond:
+            self._stats.written += 1
+            if not result.success:
+                self._stats.failed += 1
+
+        for future in entry.futures:
+            future.set_result(result)
+        if self.on_result is not None:
+            # 回调异常不能中断写入线程
+            with contextlib.suppress(Exception):
+                self.on_result(result)
+        return result
+
+    def flush(self) -> list[WriteResult]:
+        """
+        立即写入所有积压的更新
+
+        Returns:
+            list[WriteResult]: 本次写入的结果（每个文件夹一个）
+        """
+        return self._flush_pending()
+
+    def close(self) -> list[WriteResult]:
+        """停止后台线程并写入剩余的更新，之后不能再提交"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        return self._flush_pending()
+
+    @property
+    def stats(self) -> WriteBehindStats:
+        """统计信息的快照"""
+        with self._cond:
+            return WriteBehindStats(**vars(self._stats))
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -10,7 +10,7 @@ from tkinter import messagebox, ttk
 from remark.core.folder_handler import FolderCommentHandler
 
 
-def show_remark_dialog(folder_path: str) -> str | None:
+def show_remark_dialog(folder_path: str, handler: FolderCommentHandler | None = None) -> str | None:
     """
     显示备注输入对话框
 
@@ -23,6 +23,7 @@ def show_remark_dialog(folder_path: str) -> str | None:
 
     Args:
         folder_path: 文件夹完整路径
+        handler: 读取当前备注使用的处理器，None 时新建（调用方传入可共享读取缓存）
 
     Returns:
         用户输入的备注内容（非空字符串），用户点击取消返回 None
@@ -67,7 +68,8 @@ def show_remark_dialog(folder_path: str) -> str | None:
     path_entry.grid(row=1, column=0, columnspan=2, sticky=tk.EW, pady=(0, 15))
 
     # 当前备注显示（如果存在）
-    handler = FolderCommentHandler()
+    if handler is None:
+        handler = FolderCommentHandler()
     current_comment = handler.get_comment(folder_path)
 
     if current_comment:
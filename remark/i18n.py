@@ -3,6 +3,7 @@ Internationalization (i18n) module for Windows Folder Remark tool.
 
 This module provides translation support using gettext.
 """
+
 from __future__ import annotations
 
 import ctypes
@@ -221,5 +222,18 @@ def ngettext_function(singular: str, plural: str, n: int) -> str:
     return get_translator().ngettext(singular, plural, n)
 
 
+def N_(message: str) -> str:  # noqa: N802
+    """
+    标记可翻译字符串但不立即翻译（用于延迟渲染的消息模板）.
+
+    Args:
+        message: 要标记的字符串
+
+    Returns:
+        原字符串
+    """
+    return message
+
+
 # 默认导出的翻译函数
 _ = gettext_function
@@ -2,6 +2,35 @@
 存储层模块 - 提供统一的存储接口
 """
 
-from .desktop_ini import DesktopIniHandler, EncodingConversionCanceled
+from .atomic import Durability
+from .attributes import (
+    AttributeBackend,
+    MemoryAttributeBackend,
+    NativeAttributeBackend,
+    SkipUnchangedAttributeBackend,
+)
+from .cache import CacheStats, RemarkCache
+from .desktop_ini import DesktopIniHandler, EncodingConversionCanceled, NonUtf16DesktopIni
+from .encoding_policy import EncodingPolicy, EncodingReport
+from .ini_document import DesktopIniDocument
+from .locking import FolderLocks, LockStats, LockTimeout, RetryPolicy
 
-__all__ = ["DesktopIniHandler", "EncodingConversionCanceled"]
+__all__ = [
+    "AttributeBackend",
+    "CacheStats",
+    "DesktopIniDocument",
+    "DesktopIniHandler",
+    "Durability",
+    "EncodingConversionCanceled",
+    "EncodingPolicy",
+    "EncodingReport",
+    "FolderLocks",
+    "LockStats",
+    "LockTimeout",
+    "MemoryAttributeBackend",
+    "NativeAttributeBackend",
+    "NonUtf16DesktopIni",
+    "RemarkCache",
+    "RetryPolicy",
+    "SkipUnchangedAttributeBackend",
+]
@@ -0,0 +1,81 @@
+"""
+原子文件写入
+
+先把内容写入同一目录下的临时文件，再用 os.replace 替换目标文件。
+替换在同一文件系统内是原子的：进程崩溃或网络共享断开时，
+目标文件要么是旧内容，要么是完整的新内容，不会出现空文件或半截文件。
+"""
+
+import contextlib
+import os
+import tempfile
+from enum import Enum
+
+from remark.storage.locking import RetryPolicy
+
+
+class Durability(Enum):
+    """写入持久化级别"""
+
+    NONE = "none"  # 不调用 fsync，只保证原子替换（批量任务的快速模式）
+    FILE = "file"  # fsync 临时文件后再替换
+    DIRECTORY = "directory"  # 额外 fsync 所在目录，确保替换本身落盘
+
+
+def _fsync_directory(directory: str) -> None:
+    """fsync 目录，使 rename 操作落盘"""
+    # Windows 无法以只读方式打开目录调用 fsync，NTFS 日志负责元数据一致性
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(
+    path: str,
+    data: bytes,
+    durability: Durability = Durability.FILE,
+    retry: RetryPolicy | None = None,
+) -> int:
+    """
+    原子地写入文件
+
+    Args:
+        path: 目标文件路径
+        data: 要写入的内容
+        durability: 持久化级别
+        retry: 替换时遇到共享冲突（如资源管理器正打开目标文件）的重试策略，
+            None 表示不重试
+
+    Returns:
+        int: 写入的字节数
+
+    Raises:
+        OSError: 写入或替换失败，此时目标文件保持原样，临时文件已清理
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if durability is not Durability.NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        if retry is None:
+            os.replace(temp_path, path)
+        else:
+            retry.run(lambda: os.replace(temp_path, path))
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+    if durability is Durability.DIRECTORY:
+        _fsync_directory(directory)
+
+    return len(data)
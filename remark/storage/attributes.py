@@ -0,0 +1,176 @@
+"""
+文件属性后端
+
+desktop.ini 需要隐藏+系统属性，所在文件夹需要只读属性，资源管理器才会读取它。
+这里把属性读写抽象为 AttributeBackend，避免每次操作都启动 attrib 进程：
+
+- NativeAttributeBackend: 通过 ctypes 调用 GetFileAttributesW/SetFileAttributesW
+- MemoryAttributeBackend: 内存中的属性表，用于测试和非 Windows 平台
+- SkipUnchangedAttributeBackend: 先读后写，属性已满足时跳过底层写入
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+
+# Windows 文件属性
+FILE_ATTRIBUTE_READONLY = 0x01
+FILE_ATTRIBUTE_HIDDEN = 0x02
+FILE_ATTRIBUTE_SYSTEM = 0x04
+FILE_ATTRIBUTE_ARCHIVE = 0x20
+FILE_ATTRIBUTE_NORMAL = 0x80
+FILE_ATTRIBUTE_TEMPORARY = 0x100
+FILE_ATTRIBUTE_OFFLINE = 0x1000
+FILE_ATTRIBUTE_NOT_CONTENT_INDEXED = 0x2000
+INVALID_FILE_ATTRIBUTES = 0xFFFFFFFF
+
+# SetFileAttributesW 接受的属性位，其余位（如目录位）由系统维护
+SETTABLE_ATTRIBUTES = (
+    FILE_ATTRIBUTE_READONLY
+    | FILE_ATTRIBUTE_HIDDEN
+    | FILE_ATTRIBUTE_SYSTEM
+    | FILE_ATTRIBUTE_ARCHIVE
+    | FILE_ATTRIBUTE_NORMAL
+    | FILE_ATTRIBUTE_TEMPORARY
+    | FILE_ATTRIBUTE_OFFLINE
+    | FILE_ATTRIBUTE_NOT_CONTENT_INDEXED
+)
+
+
+class AttributeBackend(ABC):
+    """文件属性后端基类"""
+
+    @abstractmethod
+    def get(self, path: str) -> int | None:
+        """
+        读取属性
+
+        Returns:
+            属性位掩码，路径不存在或读取失败返回 None
+        """
+        pass
+
+    @abstractmethod
+    def set(self, path: str, attributes: int) -> bool:
+        """写入完整的属性位掩码"""
+        pass
+
+    def update(self, path: str, add: int = 0, remove: int = 0) -> bool:
+        """
+        添加和移除属性位
+
+        Args:
+            path: 文件或文件夹路径
+            add: 要添加的属性位
+            remove: 要移除的属性位
+
+        Returns:
+            bool: 操作是否成功
+        """
+        attributes = self.get(path)
+        if attributes is None:
+            return False
+        return self.set(path, (attributes | add) & ~remove)
+
+
+class NativeAttributeBackend(AttributeBackend):
+    """通过 ctypes 直接调用 Windows API，不启动子进程"""
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)  # type: ignore[attr-defined]
+        self._get_attributes = kernel32.GetFileAttributesW
+        self._get_attributes.argtypes = [wintypes.LPCWSTR]
+        self._get_attributes.restype = wintypes.DWORD
+        self._set_attributes = kernel32.SetFileAttributesW
+        self._set_attributes.argtypes = [wintypes.LPCWSTR, wintypes.DWORD]
+        self._set_attributes.restype = wintypes.BOOL
+
+    def get(self, path: str) -> int | None:
+        attributes = self._get_attributes(path)
+        if attributes == INVALID_FILE_ATTRIBUTES:
+            return None
+        return int(attributes)
+
+    def set(self, path: str, attributes: int) -> bool:
+        attributes &= SETTABLE_ATTRIBUTES
+        # 没有任何属性时必须使用 FILE_ATTRIBUTE_NORMAL
+        return bool(self._set_attributes(path, attributes or FILE_ATTRIBUTE_NORMAL))
+
+
+class MemoryAttributeBackend(AttributeBackend):
+    """
+    内存中的属性表
+
+    不访问文件系统，未记录过的路径属性为 0。用于测试和非 Windows 平台，
+    使整个写入流程可以在 Linux 上运行和验证。
+    """
+
+    def __init__(self, attributes: dict[str, int] | None = None):
+        self._attributes: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.set_calls = 0
+        for path, value in (attributes or {}).items():
+            self._attributes[self._key(path)] = value
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def get(self, path: str) -> int | None:
+        with self._lock:
+            return self._attributes.get(self._key(path), 0)
+
+    def set(self, path: str, attributes: int) -> bool:
+        with self._lock:
+            self._attributes[self._key(path)] = attributes & SETTABLE_ATTRIBUTES
+            self.set_calls += 1
+        return True
+
+
+class SkipUnchangedAttributeBackend(AttributeBackend):
+    """先读后写：计算出的属性与当前相同时不调用底层写入"""
+
+    def __init__(self, inner: AttributeBackend):
+        self.inner = inner
+        self.skipped = 0
+
+    def get(self, path: str) -> int | None:
+        return self.inner.get(path)
+
+    def set(self, path: str, attributes: int) -> bool:
+        return self.inner.set(path, attributes)
+
+    def update(self, path: str, add: int = 0, remove: int = 0) -> bool:
+        attributes = self.get(path)
+        if attributes is None:
+            return False
+        updated = (attributes | add) & ~remove
+        if updated == attributes:
+            self.skipped += 1
+            return True
+        return self.set(path, updated)
+
+
+_default_backend: AttributeBackend | None = None
+
+
+def get_default_backend() -> AttributeBackend:
+    """
+    获取默认属性后端
+
+    Windows 上使用原生 API，其他平台使用内存属性表；两者都先读后写。
+    """
+    global _default_backend
+    if _default_backend is None:
+        inner = NativeAttributeBackend() if os.name == "nt" else MemoryAttributeBackend()
+        _default_backend = SkipUnchangedAttributeBackend(inner)
+    return _default_backend
+
+
+def set_default_backend(backend: AttributeBackend | None) -> None:
+    """设置默认属性后端，None 表示恢复为按平台自动选择"""
+    global _default_backend
+    _default_backend = backend
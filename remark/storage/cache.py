@@ -0,0 +1,132 @@
+"""
+备注读取缓存
+
+按文件夹缓存 desktop.ini 中读取到的备注，使用 desktop.ini 的
+(st_mtime_ns, st_size, st_ino) 作为有效性签名。命中时只需一次 stat，
+无需再打开、解码和解析文件。没有 desktop.ini 的文件夹也会缓存（负缓存）。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from remark.storage.desktop_ini import DesktopIniHandler
+
+# 默认最多缓存的文件夹数量
+DEFAULT_CACHE_SIZE = 4096
+
+
+@dataclass
+class CacheStats:
+    """缓存统计"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class RemarkCache:
+    """
+    有界 LRU 备注缓存（线程安全）
+
+    写入路径在修改 desktop.ini 后应调用 invalidate；即使遗漏，
+    stat 签名变化也会让旧条目在下次读取时失效。
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            maxsize: 最多缓存的文件夹数量
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[tuple[int, int, int] | None, str | None]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    @staticmethod
+    def _key(folder_path: str) -> str:
+        """规范化的缓存键"""
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    @staticmethod
+    def _signature(folder_path: str) -> tuple[int, int, int] | None:
+        """
+        获取 desktop.ini 的有效性签名
+
+        Returns:
+            (st_mtime_ns, st_size, st_ino)，文件不存在时返回 None
+
+        Raises:
+            OSError: 除文件不存在以外的错误（如权限不足）
+        """
+        try:
+            st = os.stat(DesktopIniHandler.get_path(folder_path))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def get(self, folder_path: str, loader: Callable[[str], str | None]) -> str | None:
+        """
+        读取备注，签名未变化时直接返回缓存
+
+        Args:
+            folder_path: 文件夹路径
+            loader: 缓存未命中时调用的读取函数，参数为 folder_path
+
+        Returns:
+            备注内容，没有备注返回 None
+        """
+        key = self._key(folder_path)
+        try:
+            signature = self._signature(folder_path)
+        except OSError:
+            # 无法校验时不使用缓存
+            with self._lock:
+                self._stats.misses += 1
+            return loader(folder_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return entry[1]
+            self._stats.misses += 1
+
+        # 没有 desktop.ini 时无需读取，直接记录负缓存
+        value = None if signature is None else loader(folder_path)
+
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+        return value
+
+    def invalidate(self, folder_path: str) -> None:
+        """使指定文件夹的缓存失效（写入路径调用）"""
+        with self._lock:
+            if self._entries.pop(self._key(folder_path), None) is not None:
+                self._stats.invalidations += 1
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        """统计信息的快照"""
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -12,9 +12,30 @@ This is necessary to store the localized strings that can be displayed to users.
 """
 
 import codecs
+import functools
 import os
+import re
 
+from remark.i18n import N_
 from remark.i18n import _ as _
+from remark.storage.atomic import Durability, atomic_write
+from remark.storage.attributes import (
+    FILE_ATTRIBUTE_HIDDEN,
+    FILE_ATTRIBUTE_READONLY,
+    FILE_ATTRIBUTE_SYSTEM,
+    INVALID_FILE_ATTRIBUTES,  # noqa: F401 - 兼容旧的导入路径
+    get_default_backend,
+)
+from remark.storage.encoding_policy import EncodingPolicy, EncodingReport
+from remark.storage.ini_document import DesktopIniDocument, IniLine, LineKind
+from remark.storage.locking import RetryPolicy
+from remark.utils.encoding import (
+    candidate_encodings,
+    decode_bytes,
+    iter_decodings,
+    sniff_encoding,
+)
+from remark.utils.reporter import NullReporter, Reporter
 
 
 class EncodingConversionCanceled(Exception):  # noqa: N818
@@ -23,11 +44,84 @@ class EncodingConversionCanceled(Exception):  # noqa: N818
     pass
 
 
+class DesktopIniTooLarge(Exception):  # noqa: N818
+    """desktop.ini 超过读取大小上限"""
+
+    pass
+
+
+class NonUtf16DesktopIni(Exception):  # noqa: N818
+    """desktop.ini 不是 UTF-16 编码，且编码策略为 EncodingPolicy.FAIL"""
+
+    def __init__(self, path, encoding):
+        super().__init__(f"{path} 的编码为 {encoding or '未知'}，不是 UTF-16")
+        self.path = path
+        self.encoding = encoding
+
+
 # Windows desktop.ini 标准编码格式
 # 使用 'utf-16' 编码，codecs 会自动添加 UTF-16 LE BOM (0xFF 0xFE)
 DESKTOP_INI_ENCODING = "utf-16"
 # Windows 行尾符
 LINE_ENDING = "\r\n"
+# 增量读取时每次读取的字节数
+READ_CHUNK_SIZE = 4096
+# 编码转换提示中最多显示的字符数
+PREVIEW_LENGTH = 1000
+# 缓存的新建 desktop.ini 内容数量（按备注区分）
+NEW_FILE_CACHE_SIZE = 256
+
+# 增量读取时的行分割（不保留行尾符）
+_LINE_SPLIT_RE = re.compile(r"\r\n|\r|\n")
+
+# UTF-16 LE 快速路径使用的字节模式
+_UTF16LE_SECTION = "[.ShellClassInfo]".encode("utf-16-le")
+_UTF16LE_NEXT_SECTION = "\n[".encode("utf-16-le")
+_UTF16LE_CR = "\r".encode("utf-16-le")
+_UTF16LE_LF = "\n".encode("utf-16-le")
+
+
+def _find_aligned(data, needle, start, end=None):
+    """在 UTF-16 字节中查找 needle，只接受落在码元边界（偶数偏移）上的匹配"""
+    if end is None:
+        end = len(data)
+    pos = data.find(needle, start, end)
+    while pos != -1 and pos % 2:
+        pos = data.find(needle, pos + 1, end)
+    return pos
+
+
+def encode_desktop_ini(content):
+    """
+    将文本编码为 desktop.ini 标准格式
+
+    显式写入 UTF-16 LE BOM 和小端序内容，不依赖运行平台的字节序。
+
+    Args:
+        content: 文本内容
+
+    Returns:
+        bytes: 编码后的内容
+    """
+    return codecs.BOM_UTF16_LE + content.encode("utf-16-le")
+
+
+@functools.lru_cache(maxsize=NEW_FILE_CACHE_SIZE)
+def new_file_payload(info_tip):
+    """
+    只包含 InfoTip 的新 desktop.ini 的编码后内容
+
+    内容只取决于备注本身，批量为大量文件夹设置同一备注时只序列化和编码一次。
+
+    Args:
+        info_tip: InfoTip 值
+
+    Returns:
+        bytes: UTF-16 编码的文件内容
+    """
+    document = DesktopIniDocument(LINE_ENDING)
+    document.set(DesktopIniHandler.SHELL_CLASS_INFO, DesktopIniHandler.PROPERTY_INFOTIP, info_tip)
+    return encode_desktop_ini(document.serialize())
 
 
 class DesktopIniHandler:
@@ -42,8 +136,22 @@ class DesktopIniHandler:
     FILENAME = "desktop.ini"
     # ShellClassInfo 段落
     SECTION_SHELL_CLASS_INFO = "[.ShellClassInfo]"
+    # ShellClassInfo 段落名（不含方括号，用于文档查找）
+    SHELL_CLASS_INFO = ".ShellClassInfo"
     # InfoTip 属性
     PROPERTY_INFOTIP = "InfoTip"
+    # 图标属性
+    PROPERTY_ICON_RESOURCE = "IconResource"
+    # 本地化显示名称属性
+    PROPERTY_LOCALIZED_RESOURCE_NAME = "LocalizedResourceName"
+    # 默认写入持久化级别，批量任务可改为 Durability.NONE
+    durability = Durability.FILE
+    # 读取 desktop.ini 的大小上限（字节），防止超大或损坏的文件拖慢扫描、占用内存
+    max_size = 64 * 1024
+    # 默认编码转换策略，无人值守的批量任务应改为 CONVERT/SKIP/FAIL
+    encoding_policy = EncodingPolicy.PROMPT
+    # 替换或删除 desktop.ini 遇到共享冲突（资源管理器正打开文件）时的默认重试策略
+    retry_policy = RetryPolicy()
 
     @staticmethod
     def get_path(folder_path):
@@ -72,162 +180,463 @@ class DesktopIniHandler:
         return os.path.exists(DesktopIniHandler.get_path(folder_path))
 
     @staticmethod
-    def read_info_tip(folder_path):
+    def _read_limited(file_path, max_size=None):
         """
-        读取 desktop.ini 中的 InfoTip 值
+        读取整个文件，超过大小上限时拒绝读取
+
+        Raises:
+            DesktopIniTooLarge: 文件超过大小上限
+            OSError: 文件不存在或无法读取
+        """
+        limit = DesktopIniHandler.max_size if max_size is None else max_size
+        with open(file_path, "rb") as f:
+            data = f.read(limit + 1)
+        if len(data) > limit:
+            raise DesktopIniTooLarge(f"{file_path} 超过 {limit} 字节")
+        return data
+
+    @staticmethod
+    def read_document(folder_path, max_size=None):
+        """
+        读取并解析 desktop.ini
 
-        使用 UTF-16 编码读取（与写入逻辑一致），支持中文等非 ASCII 字符。
-        如果 UTF-16 读取失败，会尝试其他编码以处理外部程序创建的文件。
+        文件只读取一次，根据 BOM 和字节统计判定编码后在内存中解码。
+        如果判定的编码解析不出 [.ShellClassInfo] 段落，会在同一块缓冲区上
+        尝试其他编码以处理外部程序创建的文件。
 
         Args:
             folder_path: 文件夹路径
+            max_size: 大小上限（字节），None 表示使用 DesktopIniHandler.max_size
 
         Returns:
-            str: InfoTip 值，如果不存在或读取失败返回 None
+            DesktopIniDocument: 包含 [.ShellClassInfo] 段落的文档，
+            如果文件不存在、读取失败、超过大小上限或结构不合法返回 None
         """
         desktop_ini_path = DesktopIniHandler.get_path(folder_path)
 
-        if not os.path.exists(desktop_ini_path):
+        # 只打开并读取一次，所有候选编码都在同一块缓冲区上解码
+        try:
+            data = DesktopIniHandler._read_limited(desktop_ini_path, max_size)
+        except (OSError, DesktopIniTooLarge):
             return None
 
-        # 优先使用标准编码 UTF-16（与写入逻辑一致）
-        # 降级编码用于处理外部程序创建的文件
-        encodings = [DESKTOP_INI_ENCODING, "utf-16-le", "utf-8-sig", "utf-8", "gbk", "mbcs"]
+        for _encoding, content in iter_decodings(data):
+            document = DesktopIniDocument.parse(content)
+            # 不包含 [.ShellClassInfo] 说明编码不对，继续尝试下一个
+            if document.has_section(DesktopIniHandler.SHELL_CLASS_INFO):
+                return document
 
-        for encoding in encodings:
-            try:
-                with codecs.open(desktop_ini_path, "r", encoding=encoding) as f:
-                    content = f.read()
-
-                # 验证是否是合法的 desktop.ini 结构（必须包含 [.ShellClassInfo]）
-                # 如果不包含，说明编码不对，继续尝试下一个
-                if DesktopIniHandler.SECTION_SHELL_CLASS_INFO not in content:
-                    continue
-
-                # 解析 InfoTip
-                if DesktopIniHandler.PROPERTY_INFOTIP in content:
-                    # 找到 InfoTip= 的位置
-                    start = content.index(DesktopIniHandler.PROPERTY_INFOTIP + "=")
-                    start += len(DesktopIniHandler.PROPERTY_INFOTIP + "=")
-
-                    # 找到行尾
-                    end = len(content)
-                    for line_ending in ["\r\n", "\n", "\r"]:
-                        pos = content.find(line_ending, start)
-                        if pos != -1 and pos < end:
-                            end = pos
-                            break
-
-                    value = content[start:end].strip()
-                    if value:
-                        return value
-                # 成功读取且结构正确，但没有 InfoTip
+        return None
+
+    @staticmethod
+    def load(folder_path, max_size=None):
+        """
+        读取并解析 desktop.ini，同时返回编码信息（供审计和修复使用）
+
+        与 read_document 不同，不要求文件包含 [.ShellClassInfo] 段落：
+        优先返回能解析出该段落的编码，否则返回第一个能解码的编码。
+
+        Args:
+            folder_path: 文件夹路径
+            max_size: 大小上限（字节），None 表示使用 DesktopIniHandler.max_size
+
+        Returns:
+            tuple: (encoding, is_utf16, document)
+                - encoding: 解码使用的编码
+                - is_utf16: 文件是否为 UTF-16 编码（判定逻辑与 detect_encoding 相同）
+                - document: 解析出的文档，所有候选编码都无法解码时为 None
+
+        Raises:
+            DesktopIniTooLarge: 文件超过大小上限
+            OSError: 文件不存在或无法读取
+        """
+        data = DesktopIniHandler._read_limited(DesktopIniHandler.get_path(folder_path), max_size)
+        sniffed, is_utf16 = sniff_encoding(data)
+
+        fallback = None
+        for encoding, content in iter_decodings(data):
+            document = DesktopIniDocument.parse(content)
+            if document.has_section(DesktopIniHandler.SHELL_CLASS_INFO):
+                return encoding, is_utf16, document
+            if fallback is None:
+                fallback = (encoding, document)
+
+        if fallback is None:
+            return sniffed, is_utf16, None
+        return fallback[0], is_utf16, fallback[1]
+
+    @staticmethod
+    def write_document(folder_path, document, durability=None, retry=None):
+        """
+        以 UTF-16 编码原子写入文档
+
+        Args:
+            folder_path: 文件夹路径
+            document: DesktopIniDocument
+            durability: 持久化级别，None 表示使用 DesktopIniHandler.durability
+            retry: 共享冲突重试策略，None 表示使用 DesktopIniHandler.retry_policy
+
+        Returns:
+            int: 写入的字节数
+        """
+        return DesktopIniHandler._write_text(
+            DesktopIniHandler.get_path(folder_path), document.serialize(), durability, retry
+        )
+
+    @staticmethod
+    def _scan_properties(f, encoding, keys, limit):
+        """
+        增量解码文件并查找 [.ShellClassInfo] 中的属性
+
+        每次只解码一个数据块，找齐所有属性或 [.ShellClassInfo] 之后的
+        下一个段落开始时立即停止，内存占用与文件大小无关。
+
+        Args:
+            f: 已定位到文件开头的二进制文件对象
+            encoding: 解码使用的编码
+            keys: 要查找的属性名
+            limit: 最多读取的字节数
+
+        Returns:
+            tuple: (section_found, values)
+                - section_found: 是否找到 [.ShellClassInfo] 段落
+                - values: 属性名 -> 属性值（只包含找到的属性）
+
+        Raises:
+            UnicodeError: 内容与编码不匹配
+        """
+        wanted = {key.lower(): key for key in keys}
+        section_name = DesktopIniHandler.SHELL_CLASS_INFO.lower()
+        values: dict[str, str | None] = {}
+        decoder = codecs.getincrementaldecoder(encoding)()
+        pending = ""
+        remaining = limit
+        at_start = True
+        in_section = False
+        section_found = False
+
+        while True:
+            chunk = f.read(min(READ_CHUNK_SIZE, remaining)) if remaining > 0 else b""
+            remaining -= len(chunk)
+            # 达到上限时文件可能还有内容，丢弃不完整的最后一行
+            eof = not chunk and (remaining > 0 or not f.read(1))
+
+            text = decoder.decode(chunk, final=eof)
+            if at_start and text:
+                text = text.removeprefix("\ufeff")
+                at_start = False
+            lines = _LINE_SPLIT_RE.split(pending + text)
+            pending = "" if not chunk else lines.pop()
+            if not chunk and not eof:
+                lines.pop()
+
+            for raw in lines:
+                line = IniLine.parse(raw, "")
+                if line.kind is LineKind.SECTION:
+                    if in_section:
+                        # [.ShellClassInfo] 之后的下一个段落开始
+                        return True, values
+                    in_section = (line.name or "").lower() == section_name
+                    section_found = section_found or in_section
+                elif in_section and line.kind is LineKind.PROPERTY:
+                    key = wanted.get((line.name or "").lower())
+                    if key is not None and key not in values:
+                        values[key] = line.value
+                        if len(values) == len(wanted):
+                            return True, values
+
+            if not chunk:
+                return section_found, values
+
+    @staticmethod
+    def _fast_utf16le_properties(data, keys, complete):
+        """
+        UTF-16 LE 快速路径：不解码整个文件，直接在原始字节中查找属性
+
+        write_info_tip 写出的文件都是带 BOM 的 UTF-16 LE，且使用规范的
+        "键=值" 写法。这里直接用 bytes.find 查找 [.ShellClassInfo] 和
+        "键=" 的 UTF-16 LE 编码，只解码值所在的那一段。
+        任何不符合规范写法的情况都返回 None，由通用路径处理。
+
+        Args:
+            data: 文件开头的字节
+            keys: 要查找的属性名
+            complete: data 是否为完整的文件内容
+
+        Returns:
+            dict: 属性名 -> 属性值；无法在快速路径中确定时返回 None
+        """
+        if not data.startswith(codecs.BOM_UTF16_LE):
+            return None
+
+        # 段落头必须位于行首
+        header = _find_aligned(data, _UTF16LE_SECTION, 2)
+        if header == -1 or (header != 2 and data[header - 2 : header] != _UTF16LE_LF):
+            return None
+
+        body = header + len(_UTF16LE_SECTION)
+        section_end = _find_aligned(data, _UTF16LE_NEXT_SECTION, body)
+        if section_end == -1:
+            if not complete:
+                return None
+            section_end = len(data)
+
+        view = memoryview(data)
+        values = {}
+        for key in keys:
+            marker = ("\n" + key + "=").encode("utf-16-le")
+            pos = _find_aligned(data, marker, body, section_end)
+            if pos == -1:
                 return None
-            except (UnicodeDecodeError, UnicodeError):
-                # 当前编码失败，尝试下一个
-                continue
-            except Exception:
-                # 其他错误（文件不存在、权限问题等），直接返回
-                break
 
-        return None
+            start = pos + len(marker)
+            ends = [_find_aligned(data, eol, start) for eol in (_UTF16LE_CR, _UTF16LE_LF)]
+            ends = [end for end in ends if end != -1]
+            if ends:
+                stop = min(ends)
+            elif complete:
+                stop = len(data)
+            else:
+                # 值可能被截断在读取块之外
+                return None
+
+            values[key] = str(view[start:stop], "utf-16-le").strip() or None
+        return values
+
+    @staticmethod
+    def read_properties(folder_path, *keys, max_size=None):
+        """
+        一次读取 [.ShellClassInfo] 中的多个属性
+
+        文件只打开一次并增量解码，找齐属性或 [.ShellClassInfo] 段落结束时
+        立即停止读取；最多读取 max_size 字节，超大或损坏的文件不会拖慢扫描。
+        带 BOM 的 UTF-16 LE 文件先尝试不解码整个文件的快速路径。
+
+        Args:
+            folder_path: 文件夹路径
+            *keys: 属性名，如 InfoTip, IconResource, LocalizedResourceName
+            max_size: 最多读取的字节数，None 表示使用 DesktopIniHandler.max_size
+
+        Returns:
+            dict: 属性名 -> 属性值（不存在或为空时为 None）
+        """
+        desktop_ini_path = DesktopIniHandler.get_path(folder_path)
+        limit = DesktopIniHandler.max_size if max_size is None else max_size
+
+        try:
+            with open(desktop_ini_path, "rb") as f:
+                head = f.read(min(READ_CHUNK_SIZE, limit))
+                final = len(head) < min(READ_CHUNK_SIZE, limit)
+
+                fast = DesktopIniHandler._fast_utf16le_properties(head, keys, final)
+                if fast is not None:
+                    return fast
+
+                for encoding in candidate_encodings(head, final):
+                    f.seek(0)
+                    try:
+                        found, values = DesktopIniHandler._scan_properties(f, encoding, keys, limit)
+                    except (UnicodeError, LookupError):
+                        continue
+                    # 不包含 [.ShellClassInfo] 说明编码不对，继续尝试下一个
+                    if found:
+                        return {key: values.get(key) or None for key in keys}
+        except OSError:
+            pass
+
+        return dict.fromkeys(keys)
+
+    @staticmethod
+    def read_info_tip(folder_path):
+        """
+        读取 desktop.ini 中的 InfoTip 值
+
+        Args:
+            folder_path: 文件夹路径
+
+        Returns:
+            str: InfoTip 值，如果不存在或读取失败返回 None
+        """
+        return DesktopIniHandler.read_properties(folder_path, DesktopIniHandler.PROPERTY_INFOTIP)[
+            DesktopIniHandler.PROPERTY_INFOTIP
+        ]
+
+    @staticmethod
+    def _load_utf16_document(desktop_ini_path):
+        """读取已确认为 UTF-16 编码的 desktop.ini 并解析"""
+        data = DesktopIniHandler._read_limited(desktop_ini_path)
+        # 按探测到的字节序解码：无 BOM 的 UTF-16-BE 不能按本机小端序解码
+        encoding, _is_utf16 = sniff_encoding(data)
+        return DesktopIniDocument.parse(decode_bytes(data, encoding or DESKTOP_INI_ENCODING))
+
+    @staticmethod
+    def _write_text(file_path, content, durability=None, retry=None):
+        """以 UTF-16 编码原子写入文本"""
+        if durability is None:
+            durability = DesktopIniHandler.durability
+        return atomic_write(
+            file_path,
+            encode_desktop_ini(content),
+            durability,
+            retry or DesktopIniHandler.retry_policy,
+        )
+
+    @staticmethod
+    def render_info_tip(folder_path, info_tip):
+        """
+        计算写入 InfoTip 后 desktop.ini 的完整内容，不修改文件
+
+        Args:
+            folder_path: 文件夹路径
+            info_tip: 要写入的 InfoTip 值
+
+        Returns:
+            tuple: (current, rendered)
+                - current: 当前文件内容，文件不存在时为 None
+                - rendered: write_info_tip 将写入的内容；
+                  当前文件不是 UTF-16 编码（写入前需要转换）时为 None
+
+        Raises:
+            DesktopIniTooLarge: 文件超过大小上限
+            OSError: 文件无法读取
+        """
+        desktop_ini_path = DesktopIniHandler.get_path(folder_path)
+
+        try:
+            current = DesktopIniHandler._read_limited(desktop_ini_path)
+        except FileNotFoundError:
+            # 新建文件，内容按备注缓存
+            return None, new_file_payload(info_tip)
+
+        encoding, is_utf16 = sniff_encoding(current)
+        if not is_utf16:
+            return current, None
+        # 按探测到的字节序解码，渲染结果统一为带 BOM 的 UTF-16 LE
+        document = DesktopIniDocument.parse(decode_bytes(current, encoding or DESKTOP_INI_ENCODING))
+
+        document.set(
+            DesktopIniHandler.SHELL_CLASS_INFO, DesktopIniHandler.PROPERTY_INFOTIP, info_tip
+        )
+        return current, encode_desktop_ini(document.serialize())
 
     @staticmethod
-    def write_info_tip(folder_path, info_tip):
+    def write_info_tip(
+        folder_path,
+        info_tip,
+        durability=None,
+        encoding_policy=None,
+        encoding_report=None,
+        retry=None,
+        reporter=None,
+    ):
         """
         写入 InfoTip 到 desktop.ini
 
         使用 UTF-16 编码写入（自动添加 BOM），符合 Microsoft 官方文档要求。
         这确保中文等非 ASCII 字符在资源管理器中正确显示。
 
-        如果 desktop.ini 已存在且包含其他设置（如 IconResource），会保留这些设置。
+        如果 desktop.ini 已存在且包含其他设置（如 IconResource），会保留这些设置，
+        未修改的行（包括注释和行尾符）原样写回。
+
+        新内容先写入临时文件再原子替换，写入中途失败不会损坏原文件。
 
         Args:
             folder_path: 文件夹路径
             info_tip: 要写入的 InfoTip 值
+            durability: 持久化级别，None 表示使用 DesktopIniHandler.durability
+            encoding_policy: 非 UTF-16 文件的处理策略，None 表示使用
+                DesktopIniHandler.encoding_policy
+            encoding_report: 可选的编码转换报告
+            retry: 共享冲突重试策略，None 表示使用 DesktopIniHandler.retry_policy
+            reporter: PROMPT 策略显示提示并询问的报告器，见 ensure_utf16_encoding
 
         Returns:
-            bool: 写入是否成功
+            bool: 写入是否成功（拒绝或跳过编码转换时返回 False）
 
         Raises:
-            EncodingConversionCanceled: 用户拒绝编码转换
+            NonUtf16DesktopIni: 文件不是 UTF-16 编码且策略为 FAIL
         """
         if not info_tip:
             return False
 
         desktop_ini_path = DesktopIniHandler.get_path(folder_path)
+        if durability is None:
+            durability = DesktopIniHandler.durability
+        if retry is None:
+            retry = DesktopIniHandler.retry_policy
 
         try:
-            # 如果文件已存在，读取并更新
-            if os.path.exists(desktop_ini_path):
-                # 确保是 UTF-16 编码（用户拒绝会抛出异常）
-                DesktopIniHandler.ensure_utf16_encoding(desktop_ini_path)
-
-                with codecs.open(desktop_ini_path, "r", encoding=DESKTOP_INI_ENCODING) as f:
-                    content = f.read()
-
-                # 检查是否已有 InfoTip
-                lines = content.splitlines()
-                new_lines = []
-                info_tip_updated = False
-
-                for line in lines:
-                    stripped = line.strip()
-                    # 更新现有 InfoTip 行
-                    if stripped.startswith(
-                        DesktopIniHandler.PROPERTY_INFOTIP + "="
-                    ) or stripped.startswith(DesktopIniHandler.PROPERTY_INFOTIP + " "):
-                        new_lines.append(DesktopIniHandler.PROPERTY_INFOTIP + "=" + info_tip)
-                        info_tip_updated = True
-                    else:
-                        new_lines.append(line)
-
-                # 如果没有 InfoTip，添加它
-                if not info_tip_updated:
-                    # 找到 [.ShellClassInfo] 后插入
-                    inserted = False
-                    for i, line in enumerate(new_lines):
-                        if line.strip().startswith("[.ShellClassInfo]"):
-                            new_lines.insert(
-                                i + 1, DesktopIniHandler.PROPERTY_INFOTIP + "=" + info_tip
-                            )
-                            inserted = True
-                            break
-                    if not inserted:
-                        # 没找到 section，添加整个 section
-                        new_lines = [
-                            DesktopIniHandler.SECTION_SHELL_CLASS_INFO,
-                            DesktopIniHandler.PROPERTY_INFOTIP + "=" + info_tip,
-                        ]
-
-                new_content = LINE_ENDING.join(new_lines)
-            else:
-                # 新建文件
-                new_content = (
-                    DesktopIniHandler.SECTION_SHELL_CLASS_INFO
-                    + LINE_ENDING
-                    + DesktopIniHandler.PROPERTY_INFOTIP
-                    + "="
-                    + info_tip
-                    + LINE_ENDING
-                )
+            # 如果文件已存在，确保是 UTF-16 编码（用户拒绝会抛出异常）
+            if os.path.exists(desktop_ini_path) and not DesktopIniHandler.ensure_utf16_encoding(
+                desktop_ini_path, encoding_policy, encoding_report, durability, reporter
+            ):
+                return False
+
+            _current, rendered = DesktopIniHandler.render_info_tip(folder_path, info_tip)
+            if rendered is None:
+                return False
 
             # 使用 UTF-16 编码写入
-            with codecs.open(desktop_ini_path, "w", encoding=DESKTOP_INI_ENCODING) as f:
-                f.write(new_content)
+            atomic_write(desktop_ini_path, rendered, durability, retry)
 
             return True
 
+        except NonUtf16DesktopIni:
+            raise
         except EncodingConversionCanceled:
             return False
         except Exception:
             return False
 
+    @staticmethod
+    def get_file_attributes(path, backend=None):
+        """
+        读取文件或文件夹的 Windows 属性
+
+        Args:
+            path: 文件或文件夹路径
+            backend: 属性后端，None 使用默认后端
+
+        Returns:
+            int: 属性位掩码，读取失败返回 None
+        """
+        try:
+            return (backend or get_default_backend()).get(path)
+        except Exception:
+            return None
+
+    @staticmethod
+    def has_attributes(path, mask, backend=None):
+        """
+        检查文件或文件夹是否已具有全部指定属性
+
+        Args:
+            path: 文件或文件夹路径
+            mask: 属性位掩码，如 FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+            backend: 属性后端，None 使用默认后端
+
+        Returns:
+            bool: 属性已全部设置时返回 True，无法读取属性时返回 False
+        """
+        attrs = DesktopIniHandler.get_file_attributes(path, backend)
+        return attrs is not None and attrs & mask == mask
+
+    @staticmethod
+    def _update_attributes(path, add=0, remove=0, backend=None):
+        """通过属性后端添加/移除属性位，出错时返回 False"""
+        try:
+            return (backend or get_default_backend()).update(path, add=add, remove=remove)
+        except Exception:
+            return False
+
     @staticmethod
     def detect_encoding(file_path):
         """
         检测文件编码
 
+        与 read_info_tip 共用同一套判定逻辑：读取一次后根据 BOM、
+        NUL 字节比例和 UTF-8 合法性判定。最多读取 DesktopIniHandler.max_size 字节。
+
         Args:
             file_path: 文件路径
 
@@ -236,119 +645,171 @@ class DesktopIniHandler:
                 - encoding_name: 检测到的编码名称
                 - is_utf16: 是否为 UTF-16 编码
         """
-        # 检查 BOM
+        limit = DesktopIniHandler.max_size
         try:
             with open(file_path, "rb") as f:
-                bom = f.read(4)
-
-            if bom[:2] == b"\xff\xfe":  # UTF-16 LE BOM
-                return "utf-16-le", True
-            elif bom[:2] == b"\xfe\xff":  # UTF-16 BE BOM
-                return "utf-16-be", True
-            elif bom[:3] == b"\xef\xbb\xbf":  # UTF-8 BOM
-                return "utf-8-sig", False
-        except Exception:
-            pass
+                data = f.read(limit + 1)
+        except OSError:
+            return None, False
 
-        # 尝试检测其他编码
-        for encoding in ["utf-8", "gbk", "mbcs"]:
-            try:
-                with codecs.open(file_path, "r", encoding=encoding) as f:
-                    f.read()
-                return encoding, False
-            except (UnicodeDecodeError, UnicodeError):
-                continue
-
-        return None, False
+        # 超过上限时只根据开头部分判定
+        return sniff_encoding(data[:limit], final=len(data) <= limit)
 
     @staticmethod
-    def fix_encoding(file_path, current_encoding):
+    def fix_encoding(file_path, current_encoding, durability=None):
         """
         修复文件编码为 UTF-16
 
         Args:
             file_path: 文件路径
             current_encoding: 当前编码名称
+            durability: 持久化级别，None 表示使用 DesktopIniHandler.durability
 
         Returns:
             bool: 修复是否成功
         """
         try:
             # 读取当前内容
-            with codecs.open(file_path, "r", encoding=current_encoding or "utf-8") as f:
-                content = f.read()
+            data = DesktopIniHandler._read_limited(file_path)
+            content = decode_bytes(data, current_encoding or "utf-8")
 
             # 写入 UTF-16 编码
-            with codecs.open(file_path, "w", encoding=DESKTOP_INI_ENCODING) as f:
-                f.write(content)
+            DesktopIniHandler._write_text(file_path, content, durability)
 
             return True
         except Exception:
             return False
 
     @staticmethod
-    def ensure_utf16_encoding(file_path):
+    def _preview(content):
+        """截断过长的文件内容，用于转换提示"""
+        if len(content) <= PREVIEW_LENGTH:
+            return content
+        return (
+            content[:PREVIEW_LENGTH]
+            + "\n"
+            + _("... ({count} more characters not shown)").format(
+                count=len(content) - PREVIEW_LENGTH
+            )
+        )
+
+    @staticmethod
+    def ensure_utf16_encoding(
+        file_path, policy=None, report=None, durability=None, reporter: Reporter | None = None
+    ):
         """
-        确保文件是 UTF-16 编码，如果不是则提示用户确认转换
+        确保文件是 UTF-16 编码，不是时按编码策略处理
+
+        - PROMPT: 显示截断的预览并通过 reporter.confirm 询问，用户拒绝时抛出
+          EncodingConversionCanceled；报告器不能交互（confirm 返回 None）时按 FAIL 处理
+        - CONVERT: 不询问、不输出，直接转换
+        - SKIP: 不转换，返回 False
+        - FAIL: 不转换，抛出 NonUtf16DesktopIni
 
-        如果用户拒绝转换，抛出 EncodingConversionCanceled 异常。
+        文件只读取一次（受 DesktopIniHandler.max_size 限制）。
 
         Args:
             file_path: 文件路径
+            policy: 编码策略，None 表示使用 DesktopIniHandler.encoding_policy
+            report: 可选的编码转换报告，记录转换、跳过和失败的文件
+            durability: 转换写入的持久化级别，None 表示使用 DesktopIniHandler.durability
+            reporter: PROMPT 策略显示警告、预览并询问的报告器，None 时使用 NullReporter
+                （不能交互，因此按 FAIL 处理）
+
+        Returns:
+            bool: 文件已是（或已转换为）UTF-16 时返回 True，按策略跳过时返回 False
 
         Raises:
-            EncodingConversionCanceled: 用户拒绝转换
+            EncodingConversionCanceled: 用户拒绝转换，或转换失败
+            NonUtf16DesktopIni: 策略为 FAIL，或 PROMPT 策略下报告器不能交互
+            DesktopIniTooLarge: 文件超过大小上限
         """
-        encoding, is_utf16 = DesktopIniHandler.detect_encoding(file_path)
+        data = DesktopIniHandler._read_limited(file_path)
+        encoding, is_utf16 = sniff_encoding(data)
 
         if is_utf16:
-            return  # 已经是 UTF-16
+            return True  # 已经是 UTF-16
+
+        if policy is None:
+            policy = DesktopIniHandler.encoding_policy
+        if report is None:
+            report = EncodingReport()
+
+        if policy is EncodingPolicy.SKIP:
+            report.record_skipped(file_path, encoding)
+            return False
+        if policy is EncodingPolicy.FAIL:
+            report.record_failed(file_path, encoding, "not utf-16")
+            raise NonUtf16DesktopIni(file_path, encoding)
+        if policy is EncodingPolicy.CONVERT:
+            try:
+                content = decode_bytes(data, encoding or "utf-8")
+                DesktopIniHandler._write_text(file_path, content, durability)
+            except Exception as e:
+                report.record_failed(file_path, encoding, str(e))
+                raise EncodingConversionCanceled(f"编码转换失败: {e}") from e
+            report.record_converted(file_path, encoding)
+            return True
 
         # 文件不是 UTF-16，需要用户确认
-        print(
-            _("Warning: desktop.ini file encoding is {encoding}, not standard UTF-16.").format(
-                encoding=encoding or _("unknown")
-            )
+        if reporter is None:
+            reporter = NullReporter()
+        reporter.warning(
+            N_("Warning: desktop.ini file encoding is {encoding}, not standard UTF-16."),
+            encoding=encoding or _("unknown"),
+        )
+        reporter.warning(
+            N_("This file needs to be converted to UTF-16 encoding before modification.")
+        )
+        reporter.warning(
+            N_("The original content will be preserved, only the encoding format will change.")
         )
-        print(_("This file needs to be converted to UTF-16 encoding before modification."))
-        print(_("The original content will be preserved, only the encoding format will change."))
 
         try:
-            # 显示文件预览
-            with codecs.open(file_path, "r", encoding=encoding or "utf-8") as f:
-                content = f.read()
-
-            print(_("\nCurrent file content:"))
-            print("-" * 40)
-            print(content)
-            print("-" * 40)
-
-            # 用户确认
-            while True:
-                response = input(_("\nConvert to UTF-16 encoding and continue? [Y/n]: ")).strip().lower()
-                if response in ("", "y", "yes"):
-                    break
-                elif response in ("n", "no"):
-                    print(_("Operation cancelled."))
-                    raise EncodingConversionCanceled("用户拒绝编码转换")
-                else:
-                    print(_("Please enter Y or n"))
+            # 显示文件预览（转换使用同一块缓冲区，无需再次读取）
+            content = decode_bytes(data, encoding or "utf-8")
+
+            reporter.info(N_("\nCurrent file content:"))
+            reporter.info(
+                "{separator}\n{preview}\n{separator}",
+                separator="-" * 40,
+                preview=DesktopIniHandler._preview(content),
+            )
+
+            # 用户确认；报告器不能交互时按 FAIL 处理
+            answer = reporter.confirm(N_("\nConvert to UTF-16 encoding and continue? [Y/n]: "))
+            if answer is None:
+                report.record_failed(file_path, encoding, "not utf-16")
+                raise NonUtf16DesktopIni(file_path, encoding)
+            if not answer:
+                reporter.info(N_("Operation cancelled."))
+                report.record_skipped(file_path, encoding)
+                raise EncodingConversionCanceled("用户拒绝编码转换")
 
             # 执行转换
-            with codecs.open(file_path, "w", encoding=DESKTOP_INI_ENCODING) as f:
-                f.write(content)
+            DesktopIniHandler._write_text(file_path, content, durability)
 
-            print(_("Converted to UTF-16 encoding."))
+            reporter.info(N_("Converted to UTF-16 encoding."))
+            report.record_converted(file_path, encoding)
+            return True
 
-        except EncodingConversionCanceled:
+        except (EncodingConversionCanceled, NonUtf16DesktopIni):
             raise
         except Exception as e:
-            print(_("Conversion failed: {error}").format(error=e))
-            print(_("Operation cancelled."))
+            reporter.error(N_("Conversion failed: {error}"), error=e)
+            reporter.info(N_("Operation cancelled."))
+            report.record_failed(file_path, encoding, str(e))
             raise EncodingConversionCanceled(f"编码转换失败: {e}") from e
 
     @staticmethod
-    def remove_info_tip(folder_path):
+    def remove_info_tip(
+        folder_path,
+        durability=None,
+        encoding_policy=None,
+        encoding_report=None,
+        retry=None,
+        reporter=None,
+    ):
         """
         移除 desktop.ini 中的 InfoTip
 
@@ -356,12 +817,18 @@ class DesktopIniHandler:
 
         Args:
             folder_path: 文件夹路径
+            durability: 持久化级别，None 表示使用 DesktopIniHandler.durability
+            encoding_policy: 非 UTF-16 文件的处理策略，None 表示使用
+                DesktopIniHandler.encoding_policy
+            encoding_report: 可选的编码转换报告
+            retry: 共享冲突重试策略，None 表示使用 DesktopIniHandler.retry_policy
+            reporter: PROMPT 策略显示提示并询问的报告器，见 ensure_utf16_encoding
 
         Returns:
-            bool: 操作是否成功
+            bool: 操作是否成功（拒绝或跳过编码转换时返回 False）
 
         Raises:
-            EncodingConversionCanceled: 用户拒绝编码转换
+            NonUtf16DesktopIni: 文件不是 UTF-16 编码且策略为 FAIL
         """
         desktop_ini_path = DesktopIniHandler.get_path(folder_path)
 
@@ -370,44 +837,26 @@ class DesktopIniHandler:
 
         try:
             # 确保文件是 UTF-16 编码
-            DesktopIniHandler.ensure_utf16_encoding(desktop_ini_path)
-
-            # 读取内容（UTF-16）
-            with codecs.open(desktop_ini_path, "r", encoding=DESKTOP_INI_ENCODING) as f:
-                content = f.read()
-
-            # 移除 InfoTip 行
-            lines = content.splitlines()
-            new_lines = []
-            for line in lines:
-                # 跳过 InfoTip 行（支持 = 前后有/无空格）
-                stripped = line.strip()
-                if stripped.startswith(
-                    DesktopIniHandler.PROPERTY_INFOTIP + "="
-                ) or stripped.startswith(DesktopIniHandler.PROPERTY_INFOTIP + " "):
-                    continue
-                new_lines.append(line)
-
-            # 检查是否还有有效内容
-            has_content = False
-            for line in new_lines:
-                stripped = line.strip()
-                if stripped and not stripped.startswith("[.ShellClassInfo]"):
-                    has_content = True
-                    break
+            if not DesktopIniHandler.ensure_utf16_encoding(
+                desktop_ini_path, encoding_policy, encoding_report, durability, reporter
+            ):
+                return False
+
+            document = DesktopIniHandler._load_utf16_document(desktop_ini_path)
+            document.remove(DesktopIniHandler.SHELL_CLASS_INFO, DesktopIniHandler.PROPERTY_INFOTIP)
 
             # 如果没有其他内容，删除文件
-            if not has_content:
-                os.remove(desktop_ini_path)
+            if document.is_empty(ignored_sections=[DesktopIniHandler.SHELL_CLASS_INFO]):
+                (retry or DesktopIniHandler.retry_policy).run(lambda: os.remove(desktop_ini_path))
                 return True
 
             # 用 UTF-16 写回
-            new_content = LINE_ENDING.join(new_lines)
-            with codecs.open(desktop_ini_path, "w", encoding=DESKTOP_INI_ENCODING) as f:
-                f.write(new_content)
+            DesktopIniHandler._write_text(desktop_ini_path, document.serialize(), durability, retry)
 
             return True
 
+        except NonUtf16DesktopIni:
+            raise
         except EncodingConversionCanceled:
             return False
         except Exception:
@@ -436,7 +885,7 @@ class DesktopIniHandler:
             return False
 
     @staticmethod
-    def set_folder_system_attributes(folder_path):
+    def set_folder_system_attributes(folder_path, backend=None):
         """
         设置文件夹为只读属性
 
@@ -449,39 +898,17 @@ class DesktopIniHandler:
 
         Args:
             folder_path: 文件夹路径
+            backend: 属性后端，None 使用默认后端
 
         Returns:
-            bool: 设置是否成功
+            bool: 设置是否成功（已有只读属性时不会重复写入）
         """
-        try:
-            import ctypes
-            import subprocess
-
-            # 使用 Windows API 检查文件夹是否已有只读属性
-            FILE_ATTRIBUTE_READONLY = 0x01  # noqa: N806 - Windows API 常量
-            GetFileAttributesW = ctypes.windll.kernel32.GetFileAttributesW  # noqa: N806 - Windows API
-
-            attrs = GetFileAttributesW(folder_path)
-            if attrs == 0xFFFFFFFF:  # INVALID_FILE_ATTRIBUTES
-                return False
-
-            # 如果已有只读属性，无需再次设置
-            if attrs & FILE_ATTRIBUTE_READONLY:
-                return True
-
-            # 设置文件夹为只读属性
-            result = subprocess.call(
-                'attrib +r "' + folder_path + '"',
-                shell=True,
-                stdout=subprocess.DEVNULL,  # 抑制输出
-                stderr=subprocess.DEVNULL,
-            )
-            return result == 0
-        except Exception:
-            return False
+        return DesktopIniHandler._update_attributes(
+            folder_path, add=FILE_ATTRIBUTE_READONLY, backend=backend
+        )
 
     @staticmethod
-    def set_file_hidden_system_attributes(file_path):
+    def set_file_hidden_system_attributes(file_path, backend=None):
         """
         设置 desktop.ini 文件为隐藏和系统属性
 
@@ -490,20 +917,17 @@ class DesktopIniHandler:
 
         Args:
             file_path: desktop.ini 文件路径
+            backend: 属性后端，None 使用默认后端
 
         Returns:
             bool: 设置是否成功
         """
-        try:
-            import subprocess
-
-            result = subprocess.call('attrib +h +s "' + file_path + '"', shell=True)
-            return result == 0
-        except Exception:
-            return False
+        return DesktopIniHandler._update_attributes(
+            file_path, add=FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM, backend=backend
+        )
 
     @staticmethod
-    def clear_file_attributes(file_path):
+    def clear_file_attributes(file_path, backend=None):
         """
         清除文件的隐藏和系统属性
 
@@ -511,14 +935,11 @@ class DesktopIniHandler:
 
         Args:
             file_path: 文件路径
+            backend: 属性后端，None 使用默认后端
 
         Returns:
             bool: 清除是否成功
         """
-        try:
-            import subprocess
-
-            result = subprocess.call('attrib -s -h "' + file_path + '"', shell=True)
-            return result == 0
-        except Exception:
-            return False
+        return DesktopIniHandler._update_attributes(
+            file_path, remove=FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM, backend=backend
+        )
@@ -0,0 +1,74 @@
+"""
+desktop.ini 编码转换策略
+
+遇到非 UTF-16 编码的 desktop.ini 时，写入前必须先转换编码。交互式使用时
+询问用户；无人值守的批量任务不能阻塞在 input() 上，需要自动转换、跳过或报错。
+EncodingReport 记录每个文件的处理结果，供批量任务汇总。
+"""
+
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+
+
+class EncodingPolicy(Enum):
+    """非 UTF-16 desktop.ini 的处理策略"""
+
+    PROMPT = "prompt"  # 显示预览并通过报告器询问用户，报告器不能交互时按 FAIL 处理
+    CONVERT = "convert"  # 不询问，直接转换为 UTF-16
+    SKIP = "skip"  # 不转换，跳过该文件夹
+    FAIL = "fail"  # 不转换，抛出 NonUtf16DesktopIni 异常
+
+
+@dataclass
+class EncodingIssue:
+    """
+    单个文件的处理记录
+
+    Attributes:
+        path: desktop.ini 路径
+        encoding: 检测到的原编码，无法判定时为 None
+        error: 失败原因（仅 failed 列表中有值）
+    """
+
+    path: str
+    encoding: str | None
+    error: str | None = None
+
+
+@dataclass
+class EncodingReport:
+    """
+    编码转换报告（线程安全，可在多个并发写入之间共享）
+
+    Attributes:
+        converted: 已转换为 UTF-16 的文件
+        skipped: 按策略或用户选择未转换的文件
+        failed: 转换失败或按 FAIL 策略拒绝的文件
+    """
+
+    converted: list[EncodingIssue] = field(default_factory=list)
+    skipped: list[EncodingIssue] = field(default_factory=list)
+    failed: list[EncodingIssue] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_converted(self, path: str, encoding: str | None) -> None:
+        """记录已转换的文件"""
+        with self._lock:
+            self.converted.append(EncodingIssue(path, encoding))
+
+    def record_skipped(self, path: str, encoding: str | None) -> None:
+        """记录跳过的文件"""
+        with self._lock:
+            self.skipped.append(EncodingIssue(path, encoding))
+
+    def record_failed(self, path: str, encoding: str | None, error: str) -> None:
+        """记录失败的文件"""
+        with self._lock:
+            self.failed.append(EncodingIssue(path, encoding, error))
+
+    @property
+    def total(self) -> int:
+        """遇到的非 UTF-16 文件总数"""
+        with self._lock:
+            return len(self.converted) + len(self.skipped) + len(self.failed)
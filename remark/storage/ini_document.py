@@ -0,0 +1,266 @@
+"""
+desktop.ini 文档模型
+
+把 desktop.ini 解析成可往返（round-trip）的文档对象：保留段落、键、注释、
+空行以及每一行原始的行尾符。调用方解析一次、修改、再序列化一次，
+未被修改的行会原样写回。
+
+段落名和键名按 Windows 的习惯不区分大小写，查找通过字典完成。
+"""
+
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+
+# 行尾符（保留在分割结果中）
+_LINE_BREAK_RE = re.compile(r"(\r\n|\r|\n)")
+
+# 新增行使用的默认行尾符
+DEFAULT_LINE_ENDING = "\r\n"
+
+
+class LineKind(Enum):
+    """文档行类型"""
+
+    BLANK = "blank"  # 空行
+    COMMENT = "comment"  # ; 或 # 开头的注释
+    SECTION = "section"  # [段落]
+    PROPERTY = "property"  # 键=值
+    OTHER = "other"  # 无法识别的内容，原样保留
+
+
+@dataclass
+class IniLine:
+    """
+    文档中的一行
+
+    Attributes:
+        text: 行内容（不含行尾符）
+        ending: 原始行尾符，文件最后一行可能为空字符串
+        kind: 行类型
+        name: 段落名或键名（其他类型为 None）
+        value: 属性值（仅 PROPERTY 有效）
+    """
+
+    text: str
+    ending: str
+    kind: LineKind
+    name: str | None = None
+    value: str | None = None
+
+    @classmethod
+    def parse(cls, text: str, ending: str) -> "IniLine":
+        """解析单行内容"""
+        stripped = text.strip()
+        if not stripped:
+            return cls(text, ending, LineKind.BLANK)
+        if stripped[0] in ";#":
+            return cls(text, ending, LineKind.COMMENT)
+        if stripped[0] == "[" and "]" in stripped:
+            return cls(text, ending, LineKind.SECTION, name=stripped[1 : stripped.index("]")])
+        if "=" in stripped:
+            key, _sep, value = stripped.partition("=")
+            return cls(text, ending, LineKind.PROPERTY, name=key.strip(), value=value.strip())
+        return cls(text, ending, LineKind.OTHER)
+
+
+@dataclass
+class IniSection:
+    """
+    文档中的一个段落
+
+    Attributes:
+        name: 段落名，第一个段落之前的内容使用 None
+        header: 段落头所在行
+        lines: 段落头之后、下一个段落之前的所有行
+        keys: 小写键名 -> 该键所有的属性行（按出现顺序）
+    """
+
+    name: str | None
+    header: IniLine | None = None
+    lines: list[IniLine] = field(default_factory=list)
+    keys: dict[str, list[IniLine]] = field(default_factory=dict)
+
+    def append(self, line: IniLine) -> None:
+        """在段落末尾追加一行并更新索引"""
+        self.lines.append(line)
+        if line.kind is LineKind.PROPERTY and line.name is not None:
+            self.keys.setdefault(line.name.lower(), []).append(line)
+
+
+class DesktopIniDocument:
+    """
+    可往返的 desktop.ini 文档
+
+    示例:
+        doc = DesktopIniDocument.parse(content)
+        doc.set(".ShellClassInfo", "InfoTip", "备注")
+        new_content = doc.serialize()
+    """
+
+    def __init__(self, line_ending: str = DEFAULT_LINE_ENDING):
+        self.line_ending = line_ending
+        self.sections: list[IniSection] = [IniSection(None)]
+        self._index: dict[str, IniSection] = {}
+
+    @classmethod
+    def parse(cls, content: str) -> "DesktopIniDocument":
+        """
+        解析文本内容
+
+        Args:
+            content: 已解码的 desktop.ini 内容
+
+        Returns:
+            DesktopIniDocument: 文档对象，新增行沿用文件中第一个行尾符
+        """
+        parts = _LINE_BREAK_RE.split(content)
+        endings = parts[1::2]
+        doc = cls(endings[0] if endings else DEFAULT_LINE_ENDING)
+
+        # parts 为 [行, 行尾, 行, 行尾, ..., 最后一行]
+        pairs = zip(parts[0::2], [*endings, ""], strict=True)
+        for text, ending in pairs:
+            if not text and not ending:
+                continue
+            doc._append_line(IniLine.parse(text, ending))
+        return doc
+
+    def _append_line(self, line: IniLine) -> None:
+        """解析时追加一行，遇到段落头则开启新段落"""
+        if line.kind is LineKind.SECTION and line.name is not None:
+            section = IniSection(line.name, header=line)
+            self.sections.append(section)
+            self._index.setdefault(line.name.lower(), section)
+        else:
+            self.sections[-1].append(line)
+
+    def iter_lines(self):
+        """按原始顺序遍历所有行"""
+        for section in self.sections:
+            if section.header is not None:
+                yield section.header
+            yield from section.lines
+
+    def line_endings(self) -> set[str]:
+        """返回文件中出现过的所有行尾符（不含空字符串）"""
+        return {line.ending for line in self.iter_lines() if line.ending}
+
+    def get_section(self, section: str) -> IniSection | None:
+        """按名称查找段落（不区分大小写）"""
+        return self._index.get(section.lower())
+
+    def has_section(self, section: str) -> bool:
+        """检查段落是否存在"""
+        return section.lower() in self._index
+
+    def get(self, section: str, key: str, default: str | None = None) -> str | None:
+        """
+        读取属性值
+
+        Args:
+            section: 段落名（不含方括号）
+            key: 键名
+            default: 不存在时的返回值
+
+        Returns:
+            第一次出现的属性值
+        """
+        found = self.get_section(section)
+        if found is None:
+            return default
+        lines = found.keys.get(key.lower())
+        if not lines:
+            return default
+        return lines[0].value
+
+    def get_all(self, section: str, key: str) -> list[str]:
+        """读取同一个键的所有值（用于检查重复键）"""
+        found = self.get_section(section)
+        if found is None:
+            return []
+        return [line.value or "" for line in found.keys.get(key.lower(), [])]
+
+    def set(self, section: str, key: str, value: str) -> None:
+        """
+        设置属性值
+
+        已存在时更新第一次出现的行（保留原有键名写法）并删除重复行；
+        不存在时插入到段落头之后；段落不存在时在文件末尾新建段落。
+
+        Args:
+            section: 段落名（不含方括号）
+            key: 键名
+            value: 属性值
+        """
+        target = self.get_section(section) or self._add_section(section)
+        existing = target.keys.get(key.lower())
+
+        if existing:
+            first = existing[0]
+            first.text = f"{first.name}={value}"
+            first.value = value
+            for duplicate in existing[1:]:
+                target.lines.remove(duplicate)
+            del existing[1:]
+            return
+
+        if target.header is not None and not target.header.ending:
+            target.header.ending = self.line_ending
+        line = IniLine(f"{key}={value}", self.line_ending, LineKind.PROPERTY, key, value)
+        target.lines.insert(0, line)
+        target.keys[key.lower()] = [line]
+
+    def remove(self, section: str, key: str) -> bool:
+        """
+        删除属性（包括所有重复行）
+
+        Returns:
+            bool: 是否删除了内容
+        """
+        found = self.get_section(section)
+        if found is None:
+            return False
+        lines = found.keys.pop(key.lower(), None)
+        if not lines:
+            return False
+        for line in lines:
+            found.lines.remove(line)
+        return True
+
+    def _add_section(self, section: str) -> IniSection:
+        """在文件末尾新建段落"""
+        last = None
+        for line in self.iter_lines():
+            last = line
+        if last is not None and not last.ending:
+            last.ending = self.line_ending
+
+        header = IniLine(f"[{section}]", self.line_ending, LineKind.SECTION, name=section)
+        created = IniSection(section, header=header)
+        self.sections.append(created)
+        self._index[section.lower()] = created
+        return created
+
+    def is_empty(self, ignored_sections=()) -> bool:
+        """
+        检查文档是否没有有效内容
+
+        Args:
+            ignored_sections: 段落头不计为内容的段落名
+
+        Returns:
+            bool: 除空行和被忽略的段落头之外没有任何内容
+        """
+        ignored = {name.lower() for name in ignored_sections}
+        for line in self.iter_lines():
+            if line.kind is LineKind.BLANK:
+                continue
+            if line.kind is LineKind.SECTION and (line.name or "").lower() in ignored:
+                continue
+            return False
+        return True
+
+    def serialize(self) -> str:
+        """序列化为文本，未修改的行保持原样"""
+        return "".join(line.text + line.ending for line in self.iter_lines())
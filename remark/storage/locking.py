@@ -0,0 +1,403 @@
+"""
+文件夹锁与争用重试
+
+多个线程或进程同时修改同一文件夹的 desktop.ini 时，读取-修改-写入会互相覆盖。
+FolderLocks 提供按文件夹的咨询锁：
+
+- 进程内: 按规范化路径共享的 threading.Lock，所有 FolderLocks 实例共用
+- 跨进程: 锁文件目录（见 default_lock_dir）中的锁文件，Windows 使用 msvcrt.locking，
+  其他平台使用 fcntl.flock。文件夹按路径哈希分到固定数量的锁文件（条带）上，目录中
+  最多有 stripes 个锁文件；同一进程内共用每个条带的文件锁，不同进程修改同一条带的
+  不同文件夹时会互相等待
+
+只有使用同一锁文件目录的进程之间才会互斥。Windows 上默认目录位于 %ProgramData%，
+以不同账户运行的进程（如计划任务和交互用户）共用；没有 ProgramData 时退回
+按用户区分的 %TEMP%，此时不同账户之间不互斥，需要用 REMARK_LOCK_DIR 环境变量或
+lock_dir 参数指定共用目录。
+
+资源管理器短暂打开 desktop.ini 时，替换或删除文件会遇到共享冲突
+（ERROR_SHARING_VIOLATION / ERROR_LOCK_VIOLATION）。RetryPolicy 对这类错误
+按指数退避有限次重试，其他错误直接抛出。
+"""
+
+import contextlib
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field, fields
+
+# Windows 共享冲突错误码
+ERROR_SHARING_VIOLATION = 32
+ERROR_LOCK_VIOLATION = 33
+SHARING_VIOLATION_ERRORS = frozenset({ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION})
+
+# 指定锁文件目录的环境变量，优先于默认目录
+LOCK_DIR_ENV = "REMARK_LOCK_DIR"
+# 锁文件目录名（锁文件不会删除，删除会与其他进程的加锁产生竞争）
+_LOCK_DIR_NAME = "windows-folder-remark-locks"
+# 默认的锁文件（条带）数
+DEFAULT_LOCK_STRIPES = 64
+
+# 等待跨进程锁时的轮询间隔（秒）
+_POLL_INITIAL = 0.005
+_POLL_MAX = 0.1
+
+
+class LockTimeout(TimeoutError):  # noqa: N818
+    """等待文件夹锁超时"""
+
+    pass
+
+
+def default_lock_dir() -> str:
+    """
+    默认的锁文件目录
+
+    REMARK_LOCK_DIR 环境变量优先；Windows 上为所有账户共用的 %ProgramData%，
+    其他平台（或没有 ProgramData 时）为系统临时目录。
+    """
+    configured = os.environ.get(LOCK_DIR_ENV)
+    if configured:
+        return configured
+    base = os.environ.get("PROGRAMDATA") if sys.platform == "win32" else None
+    return os.path.join(base or tempfile.gettempdir(), _LOCK_DIR_NAME)
+
+
+def is_sharing_violation(error):
+    """检查异常是否为 Windows 共享冲突（其他进程正占用文件）"""
+    return (
+        isinstance(error, OSError) and getattr(error, "winerror", None) in SHARING_VIOLATION_ERRORS
+    )
+
+
+@dataclass
+class LockStats:
+    """
+    锁争用统计（线程安全）
+
+    Attributes:
+        acquisitions: 成功加锁次数
+        contentions: 加锁时需要等待的次数
+        timeouts: 等待超时次数
+        wait_seconds: 累计等待时间
+        retries: 遇到共享冲突后的重试次数
+        retry_failures: 重试次数耗尽仍失败的次数
+    """
+
+    acquisitions: int = 0
+    contentions: int = 0
+    timeouts: int = 0
+    wait_seconds: float = 0.0
+    retries: int = 0
+    retry_failures: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, **increments) -> None:
+        """累加计数"""
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> "LockStats":
+        """统计信息的快照"""
+        with self._lock:
+            return LockStats(
+                **{f.name: getattr(self, f.name) for f in fields(self) if f.name != "_lock"}
+            )
+
+
+@dataclass
+class RetryPolicy:
+    """
+    共享冲突重试策略
+
+    Attributes:
+        attempts: 最多尝试次数（含第一次）
+        initial_delay: 第一次重试前的等待时间（秒）
+        max_delay: 单次等待时间上限（秒）
+        backoff: 每次重试后等待时间的倍数
+        stats: 可选的统计对象，记录重试次数
+    """
+
+    attempts: int = 5
+    initial_delay: float = 0.05
+    max_delay: float = 1.0
+    backoff: float = 2.0
+    stats: LockStats | None = field(default=None, repr=False, compare=False)
+
+    def run(self, func):
+        """
+        调用 func，遇到共享冲突时退避重试
+
+        Args:
+            func: 无参数的可调用对象
+
+        Returns:
+            func 的返回值
+
+        Raises:
+            OSError: 非共享冲突错误，或重试次数耗尽
+        """
+        delay = self.initial_delay
+        for attempt in range(1, max(self.attempts, 1) + 1):
+            try:
+                return func()
+            except OSError as e:
+                if not is_sharing_violation(e):
+                    raise
+                if attempt >= self.attempts:
+                    if self.stats is not None:
+                        self.stats.record(retry_failures=1)
+                    raise
+            if self.stats is not None:
+                self.stats.record(retries=1)
+            time.sleep(delay)
+            delay = min(delay * self.backoff, self.max_delay)
+
+
+# 不重试
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+def _try_lock_file(fd):
+    """非阻塞地锁定文件，已被其他进程锁定时返回 False"""
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock_file(fd):
+    """释放文件锁"""
+    if sys.platform == "win32":
+        import msvcrt
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class _LockEntry:
+    """进程内锁及其引用计数"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class _StripeEntry:
+    """进程持有的条带文件锁及其引用计数"""
+
+    __slots__ = ("fd", "lock", "users")
+
+    def __init__(self):
+        self.fd: int | None = None
+        # 同一进程内串行化文件锁的获取
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+# 进程内所有 FolderLocks 共享的锁表：规范化路径 -> _LockEntry
+_registry: dict[str, _LockEntry] = {}
+# 进程持有的条带：锁文件路径 -> _StripeEntry
+_stripes: dict[str, _StripeEntry] = {}
+_registry_lock = threading.Lock()
+
+
+class FolderLocks:
+    """
+    按文件夹的咨询锁
+
+    锁不可重入：同一线程在持有某文件夹的锁时不能再次加锁。
+
+    示例:
+        locks = FolderLocks()
+        with locks.hold(folder_path):
+            ...  # 读取-修改-写入 desktop.ini
+    """
+
+    def __init__(
+        self,
+        lock_dir: str | None = None,
+        cross_process: bool = True,
+        timeout: float | None = None,
+        stats: LockStats | None = None,
+        stripes: int = DEFAULT_LOCK_STRIPES,
+    ):
+        """
+        Args:
+            lock_dir: 锁文件目录，None 表示使用 default_lock_dir()。
+                需要互斥的进程（包括以其他账户运行的进程）必须使用同一目录
+            cross_process: 是否同时使用锁文件在进程之间互斥
+            timeout: 等待锁的最长时间（秒），None 表示一直等待
+            stats: 统计对象，None 时自动创建
+            stripes: 锁文件数，共用同一目录的进程必须使用相同的值
+        """
+        if stripes <= 0:
+            raise ValueError("stripes must be positive")
+        self.lock_dir = lock_dir or default_lock_dir()
+        self.stripes = stripes
+        self.cross_process = cross_process
+        self.timeout = timeout
+        self.stats = stats if stats is not None else LockStats()
+
+    @staticmethod
+    def _key(folder_path: str) -> str:
+        """规范化的锁键"""
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    def lock_path(self, folder_path: str) -> str:
+        """文件夹对应的锁文件（条带）路径"""
+        digest = hashlib.sha1(self._key(folder_path).encode("utf-8")).digest()
+        stripe = int.from_bytes(digest[:8], "big") % self.stripes
+        return os.path.join(self.lock_dir, f"stripe-{stripe:03d}.lock")
+
+    @staticmethod
+    def _remaining(deadline):
+        """距离截止时间的剩余秒数，没有截止时间返回 None"""
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    def _lock_file(self, path, folder_path, deadline):
+        """
+        打开并锁定锁文件，等待其他进程释放
+
+        Returns:
+            tuple: (fd, waited)
+
+        Raises:
+            LockTimeout: 超过截止时间
+        """
+        os.makedirs(self.lock_dir, exist_ok=True)
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        except PermissionError:
+            # 其他账户创建的锁文件可能只允许读取，加锁不需要写权限
+            fd = os.open(path, os.O_RDONLY)
+        waited = False
+        delay = _POLL_INITIAL
+        try:
+            while not _try_lock_file(fd):
+                waited = True
+                remaining = self._remaining(deadline)
+                if remaining == 0.0:
+                    raise LockTimeout(folder_path)
+                time.sleep(delay if remaining is None else min(delay, remaining))
+                delay = min(delay * 2, _POLL_MAX)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd, waited
+
+    def _acquire_file(self, folder_path, deadline):
+        """
+        获取跨进程锁（文件夹所在条带），进程内已持有该条带时直接共用
+
+        Returns:
+            tuple: (条带锁文件路径, waited)
+
+        Raises:
+            LockTimeout: 超过截止时间
+        """
+        path = self.lock_path(folder_path)
+        with _registry_lock:
+            stripe = _stripes.setdefault(path, _StripeEntry())
+            stripe.users += 1
+        try:
+            remaining = self._remaining(deadline)
+            if not stripe.lock.acquire(timeout=-1 if remaining is None else remaining):
+                raise LockTimeout(folder_path)
+            try:
+                if stripe.fd is not None:
+                    return path, False
+                stripe.fd, waited = self._lock_file(path, folder_path, deadline)
+                return path, waited
+            finally:
+                stripe.lock.release()
+        except BaseException:
+            self._release_file(path)
+            raise
+
+    @staticmethod
+    def _release_file(path):
+        """释放一次条带引用，最后一个使用者解锁并关闭锁文件"""
+        with _registry_lock:
+            stripe = _stripes[path]
+            stripe.users -= 1
+            if stripe.users:
+                return
+            del _stripes[path]
+            if stripe.fd is not None:
+                try:
+                    _unlock_file(stripe.fd)
+                finally:
+                    os.close(stripe.fd)
+
+    @contextlib.contextmanager
+    def hold(self, folder_path: str):
+        """
+        持有文件夹锁的上下文
+
+        Raises:
+            LockTimeout: 在 timeout 内未能获得锁
+        """
+        key = self._key(folder_path)
+        start = time.monotonic()
+        deadline = None if self.timeout is None else start + self.timeout
+
+        with _registry_lock:
+            entry = _registry.setdefault(key, _LockEntry())
+            entry.users += 1
+
+        try:
+            contended = not entry.lock.acquire(blocking=False)
+            if contended:
+                remaining = self._remaining(deadline)
+                if not entry.lock.acquire(timeout=-1 if remaining is None else remaining):
+                    self.stats.record(timeouts=1, contentions=1)
+                    raise LockTimeout(folder_path)
+
+            try:
+                stripe = None
+                if self.cross_process:
+                    try:
+                        stripe, waited = self._acquire_file(folder_path, deadline)
+                    except LockTimeout:
+                        self.stats.record(timeouts=1, contentions=1)
+                        raise
+                    contended = contended or waited
+
+                self.stats.record(
+                    acquisitions=1,
+                    contentions=int(contended),
+                    wait_seconds=time.monotonic() - start if contended else 0.0,
+                )
+                try:
+                    yield
+                finally:
+                    if stripe is not None:
+                        self._release_file(stripe)
+            finally:
+                entry.lock.release()
+        finally:
+            with _registry_lock:
+                entry.users -= 1
+                if entry.users == 0:
+                    _registry.pop(key, None)
@@ -0,0 +1,192 @@
+"""
+取消令牌与截止时间
+
+长时间运行的操作（批量读写、目录遍历、路径候选搜索、下载更新）接受一个可选的
+token 参数，可以是 CancellationToken 或 Deadline，两者提供相同的检查接口：
+
+- cancelled: 是否应当停止
+- raise_if_cancelled(): 应当停止时抛出 OperationCancelled（超时为 DeadlineExceeded）
+- remaining(): 距截止时间的秒数，没有截止时间时为 None
+
+取消是协作式的：操作在检查点（每个目录、每个任务、每个数据块）检查令牌，
+正在进行的单个文件 I/O 不会被中断。已经产出的结果和汇总在取消后仍然有效。
+
+示例:
+    token = CancellationToken(deadline=Deadline(600))
+    threading.Timer(5, token.cancel).start()     # 任意线程都可以取消
+    results = handler.get_comments(paths, token=token)
+"""
+
+import threading
+import time
+from collections.abc import Callable
+
+
+class OperationCancelled(Exception):  # noqa: N818
+    """操作被取消"""
+
+    pass
+
+
+class DeadlineExceeded(OperationCancelled, TimeoutError):  # noqa: N818
+    """操作超过截止时间"""
+
+    pass
+
+
+class Deadline:
+    """
+    截止时间（基于单调时钟，不受系统时间调整影响）
+
+    示例:
+        deadline = Deadline(30)
+        deadline.remaining()      # 剩余秒数
+        deadline.raise_if_cancelled()
+    """
+
+    def __init__(self, timeout: float | None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            timeout: 从现在起的秒数，None 表示没有截止时间
+            clock: 时钟函数，测试时可替换
+        """
+        self._clock = clock
+        self.expires_at = None if timeout is None else clock() + timeout
+
+    def remaining(self) -> float | None:
+        """剩余秒数（不小于 0），没有截止时间时为 None"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        """是否已经超过截止时间"""
+        return self.expires_at is not None and self._clock() >= self.expires_at
+
+    @property
+    def cancelled(self) -> bool:
+        """与 CancellationToken 相同的检查接口，等同于 expired"""
+        return self.expired
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises:
+            DeadlineExceeded: 已经超过截止时间
+        """
+        if self.expired:
+            raise DeadlineExceeded("deadline exceeded")
+
+    def timeout(self, default: float | None = None) -> float | None:
+        """
+        阻塞调用（如 socket 超时）应使用的超时时间
+
+        Args:
+            default: 调用本身的超时，None 表示不限制
+
+        Returns:
+            default 与剩余时间中较小的一个，两者都没有时为 None
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if default is None:
+            return remaining
+        return min(default, remaining)
+
+
+class CancellationToken:
+    """
+    线程安全的取消令牌，可附带截止时间，可从父令牌派生
+
+    父令牌取消时所有子令牌随之取消；子令牌取消不影响父令牌。
+    """
+
+    def __init__(
+        self,
+        deadline: Deadline | float | None = None,
+        parent: "CancellationToken | Deadline | None" = None,
+    ):
+        """
+        Args:
+            deadline: 截止时间，数字表示从现在起的秒数，None 表示没有截止时间
+            parent: 可选的父令牌或截止时间
+        """
+        if deadline is not None and not isinstance(deadline, Deadline):
+            deadline = Deadline(deadline)
+        self.deadline = deadline
+        self.parent = parent
+        self._event = threading.Event()
+        self._reason: str | None = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """请求取消，可以从任意线程多次调用，只记录第一次的原因"""
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已取消、超过截止时间或父令牌已取消"""
+        return (
+            self._event.is_set()
+            or (self.deadline is not None and self.deadline.expired)
+            or (self.parent is not None and self.parent.cancelled)
+        )
+
+    @property
+    def reason(self) -> str | None:
+        """cancel() 记录的原因"""
+        return self._reason
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises:
+            OperationCancelled: 已调用 cancel()
+            DeadlineExceeded: 超过截止时间
+        """
+        if self._event.is_set():
+            raise OperationCancelled(self._reason)
+        if self.deadline is not None:
+            self.deadline.raise_if_cancelled()
+        if self.parent is not None:
+            self.parent.raise_if_cancelled()
+
+    def remaining(self) -> float | None:
+        """到最近的截止时间（包括父令牌的）的秒数，没有截止时间时为 None"""
+        candidates = [
+            value
+            for value in (
+                self.deadline.remaining() if self.deadline is not None else None,
+                self.parent.remaining() if self.parent is not None else None,
+            )
+            if value is not None
+        ]
+        return min(candidates) if candidates else None
+
+    def timeout(self, default: float | None = None) -> float | None:
+        """阻塞调用应使用的超时时间，见 Deadline.timeout"""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        等待 cancel() 被调用，最多等待 timeout 秒（不超过截止时间）
+
+        Returns:
+            bool: 是否已取消
+        """
+        self._event.wait(self.timeout(timeout))
+        return self.cancelled
+
+    def child(self, deadline: Deadline | float | None = None) -> "CancellationToken":
+        """派生一个子令牌，通常用于给一部分工作设置更短的截止时间"""
+        return CancellationToken(deadline, parent=self)
+
+
+def check_cancelled(token: CancellationToken | Deadline | None) -> None:
+    """token 不为 None 时检查取消，供各检查点使用"""
+    if token is not None:
+        token.raise_if_cancelled()
@@ -0,0 +1,191 @@
+"""
+自适应并发控制
+
+固定的线程数无法同时适应本地 SSD 和跨广域网挂载的共享：线程太少浪费吞吐，
+太多则导致超时和 SMB 限流。AdaptiveConcurrency 按 AIMD（加性增、乘性减）
+调整同时进行的操作数：
+
+- 每完成一个窗口（不少于当前上限个操作）评估一次
+- 窗口内错误率超过 error_threshold，或平均延迟超过基线的 latency_tolerance 倍时，
+  上限乘以 decrease_factor
+- 否则如果窗口内并发确实达到了上限（生产者跟得上），上限加 increase_step
+- 基线延迟取观察到的最低窗口平均延迟，并缓慢向当前值漂移，
+  存储整体变慢后不会一直下调
+
+同一个控制器可以在批量读写、审计和统计之间共享（见 bounded_map 的 controller 参数），
+选定的并发数可以通过 metrics() 读取。
+
+示例:
+    concurrency = AdaptiveConcurrency(min_limit=2, max_limit=64)
+    handler = FolderCommentHandler(concurrency=concurrency)
+    handler.get_comments(paths)
+    concurrency.metrics().limit
+"""
+
+import threading
+from dataclasses import dataclass
+
+# 自适应并发的默认上下限
+ADAPTIVE_MIN_WORKERS = 1
+ADAPTIVE_MAX_WORKERS = 64
+# 每个评估窗口的最少样本数
+MIN_WINDOW = 8
+# 每个窗口基线向当前平均延迟漂移的比例
+BASELINE_DRIFT = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class ConcurrencyMetrics:
+    """
+    自适应并发的统计快照
+
+    Attributes:
+        limit: 当前的并发上限
+        min_limit: 下限
+        max_limit: 上限
+        in_flight: 正在进行的操作数
+        completed: 完成的操作总数
+        errors: 出错的操作总数
+        latency: 最近一个窗口的平均延迟（秒），还没有完整窗口时为 None
+        baseline: 基线延迟（秒）
+        increases: 上调次数
+        decreases: 下调次数
+    """
+
+    limit: int
+    min_limit: int
+    max_limit: int
+    in_flight: int
+    completed: int
+    errors: int
+    latency: float | None
+    baseline: float | None
+    increases: int
+    decreases: int
+
+
+class AdaptiveConcurrency:
+    """按延迟和错误率调整并发上限的 AIMD 控制器（线程安全）"""
+
+    def __init__(
+        self,
+        min_limit: int = ADAPTIVE_MIN_WORKERS,
+        max_limit: int = ADAPTIVE_MAX_WORKERS,
+        initial: int | None = None,
+        latency_tolerance: float = 2.0,
+        error_threshold: float = 0.05,
+        decrease_factor: float = 0.75,
+        increase_step: int = 1,
+    ):
+        """
+        Args:
+            min_limit: 并发下限
+            max_limit: 并发上限
+            initial: 初始并发数，None 表示 min(8, max_limit) 且不小于 min_limit
+            latency_tolerance: 平均延迟超过基线的倍数时下调
+            error_threshold: 窗口内错误率超过该值时下调
+            decrease_factor: 下调时乘以的系数（0~1）
+            increase_step: 上调时增加的数量
+
+        Raises:
+            ValueError: 参数超出范围
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("require 1 <= min_limit <= max_limit")
+        if not 0 < decrease_factor < 1 or increase_step < 1 or latency_tolerance <= 1:
+            raise ValueError("invalid adjustment parameters")
+        if initial is None:
+            initial = min(8, max_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.error_threshold = error_threshold
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self._limit = max(min_limit, min(initial, max_limit))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._errors = 0
+        self._increases = 0
+        self._decreases = 0
+        self._latency: float | None = None
+        self._baseline: float | None = None
+        # 当前窗口
+        self._window_count = 0
+        self._window_errors = 0
+        self._window_latency = 0.0
+        self._window_peak = 0
+
+    @property
+    def limit(self) -> int:
+        """当前的并发上限"""
+        return self._limit
+
+    def started(self) -> None:
+        """记录一个操作开始"""
+        with self._lock:
+            self._in_flight += 1
+            self._window_peak = max(self._window_peak, self._in_flight)
+
+    def record(self, latency: float, error: bool = False) -> None:
+        """
+        记录一个操作完成，窗口满时调整上限
+
+        Args:
+            latency: 操作耗时（秒）
+            error: 是否失败（超时、I/O 错误等表示存储压力的失败）
+        """
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._completed += 1
+            self._window_count += 1
+            self._window_latency += latency
+            if error:
+                self._errors += 1
+                self._window_errors += 1
+            if self._window_count >= max(self._limit, MIN_WINDOW):
+                self._adjust()
+
+    def _adjust(self) -> None:
+        """评估一个窗口（调用方持有锁）"""
+        average = self._window_latency / self._window_count
+        error_rate = self._window_errors / self._window_count
+        saturated = self._window_peak >= self._limit
+        self._latency = average
+        if self._baseline is None:
+            self._baseline = average
+
+        if error_rate > self.error_threshold or average > self._baseline * self.latency_tolerance:
+            limit = max(self.min_limit, int(self._limit * self.decrease_factor))
+            if limit < self._limit:
+                self._limit = limit
+                self._decreases += 1
+        elif saturated and self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + self.increase_step)
+            self._increases += 1
+
+        if average < self._baseline:
+            self._baseline = average
+        else:
+            self._baseline += (average - self._baseline) * BASELINE_DRIFT
+
+        self._window_count = self._window_errors = 0
+        self._window_latency = 0.0
+        self._window_peak = self._in_flight
+
+    def metrics(self) -> ConcurrencyMetrics:
+        """统计快照"""
+        with self._lock:
+            return ConcurrencyMetrics(
+                limit=self._limit,
+                min_limit=self.min_limit,
+                max_limit=self.max_limit,
+                in_flight=self._in_flight,
+                completed=self._completed,
+                errors=self._errors,
+                latency=self._latency,
+                baseline=self._baseline,
+                increases=self._increases,
+                decreases=self._decreases,
+            )
@@ -1,3 +1,142 @@
 """
 编码处理工具
+
+对已经读入内存的字节进行编码判定与解码。
+判定只依赖 BOM 和廉价的字节统计（NUL 字节比例、UTF-8 合法性），
+调用方只需打开并读取文件一次，所有候选编码都在同一块缓冲区上尝试。
 """
+
+import codecs
+
+# BOM 与对应编码
+BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+# 没有 BOM 且不像 UTF-16 时依次尝试的编码（mbcs 仅 Windows 可用）
+FALLBACK_ENCODINGS = ("utf-8", "gbk", "mbcs")
+
+# 读取 desktop.ini 时的完整候选列表，与历史行为保持一致
+DESKTOP_INI_CANDIDATES = ("utf-16", "utf-16-le", "utf-8-sig", "utf-8", "gbk", "mbcs")
+
+# 统计 NUL 字节时的采样长度
+SAMPLE_SIZE = 4096
+
+# NUL 字节占比超过该阈值时判定为无 BOM 的 UTF-16
+# （以 ASCII 为主的 UTF-16 文本约有一半字节为 NUL）
+UTF16_NUL_RATIO = 0.3
+
+
+def _sniff_utf16(sample: bytes) -> str | None:
+    """根据 NUL 字节的比例和奇偶位置判断无 BOM 的 UTF-16"""
+    nul_count = sample.count(0)
+    if not sample or nul_count / len(sample) < UTF16_NUL_RATIO:
+        return None
+    # 小端序 ASCII 字符的高位字节（NUL）落在奇数位置
+    odd_nul = sample[1::2].count(0)
+    even_nul = nul_count - odd_nul
+    return "utf-16-le" if odd_nul >= even_nul else "utf-16-be"
+
+
+def _can_decode(data: bytes, encoding: str, final: bool = True) -> bool:
+    """检查字节能否用指定编码解码，final 为 False 时允许末尾的字符不完整"""
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(data, final)
+        return True
+    except (UnicodeError, LookupError):
+        return False
+
+
+def sniff_encoding(data: bytes, final: bool = True) -> tuple[str | None, bool]:
+    """
+    判定字节缓冲区的编码
+
+    Args:
+        data: 文件内容（或文件开头的一段）
+        final: data 是否为完整内容；为 False 时末尾被截断的多字节字符不视为错误
+
+    Returns:
+        tuple: (encoding_name, is_utf16)
+            - encoding_name: 检测到的编码名称，无法判定时为 None
+            - is_utf16: 是否为 UTF-16 编码
+    """
+    for bom, encoding in BOM_ENCODINGS:
+        if data.startswith(bom):
+            return encoding, encoding.startswith("utf-16")
+
+    utf16 = _sniff_utf16(data[:SAMPLE_SIZE])
+    if utf16:
+        return utf16, True
+
+    # 纯 ASCII 一定是合法的 UTF-8，无需真正解码
+    if data.isascii():
+        return "utf-8", False
+
+    for encoding in FALLBACK_ENCODINGS:
+        if _can_decode(data, encoding, final):
+            return encoding, False
+
+    return None, False
+
+
+def decode_bytes(data: bytes, encoding: str) -> str:
+    """
+    用指定编码解码，并去除开头的 BOM
+
+    Args:
+        data: 文件内容
+        encoding: 编码名称
+
+    Returns:
+        str: 解码后的文本
+
+    Raises:
+        UnicodeError: 内容与编码不匹配
+        LookupError: 当前平台不支持该编码
+    """
+    text = data.decode(encoding)
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    return text
+
+
+def candidate_encodings(
+    data: bytes, final: bool = True, candidates=DESKTOP_INI_CANDIDATES
+) -> list[str]:
+    """
+    按可能性从高到低排列候选编码
+
+    先使用 sniff_encoding 判定的编码，再按 candidates 顺序排列其余编码。
+
+    Args:
+        data: 文件内容（或文件开头的一段）
+        final: data 是否为完整内容
+        candidates: 候选编码列表
+
+    Returns:
+        list: 编码名称列表
+    """
+    sniffed, _is_utf16 = sniff_encoding(data, final)
+    ordered = [sniffed] if sniffed else []
+    ordered.extend(encoding for encoding in candidates if encoding != sniffed)
+    return ordered
+
+
+def iter_decodings(data: bytes, candidates=DESKTOP_INI_CANDIDATES):
+    """
+    按可能性从高到低依次解码同一块缓冲区，跳过无法解码的编码
+
+    Args:
+        data: 文件内容
+        candidates: 候选编码列表
+
+    Yields:
+        tuple: (encoding_name, text)
+    """
+    for encoding in candidate_encodings(data, candidates=candidates):
+        try:
+            yield encoding, decode_bytes(data, encoding)
+        except (UnicodeError, LookupError):
+            continue
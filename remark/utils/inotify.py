@@ -0,0 +1,173 @@
+"""
+Linux inotify 绑定（ctypes）
+
+只封装监视目录变化所需的最小接口，不依赖第三方包。
+其他平台或 libc 不提供 inotify 时 inotify_available() 返回 False。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from dataclasses import dataclass
+
+# 事件掩码（<sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+_IN_NONBLOCK = os.O_NONBLOCK if hasattr(os, "O_NONBLOCK") else 0
+_IN_CLOEXEC = 0o2000000
+
+# struct inotify_event 的定长部分：wd, mask, cookie, len
+_EVENT = struct.Struct("iIII")
+# 每次 read 的缓冲区大小
+_READ_SIZE = 64 * 1024
+
+_libc: ctypes.CDLL | None = None
+# 是否已经尝试过加载 libc（不支持时 _libc 保持 None）
+_checked = False
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    """加载 libc 并声明函数签名，不支持时返回 None"""
+    global _libc, _checked
+    if not _checked:
+        _checked = True
+        if sys.platform.startswith("linux"):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_init1.restype = ctypes.c_int
+                libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                libc.inotify_add_watch.restype = ctypes.c_int
+                libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+                libc.inotify_rm_watch.restype = ctypes.c_int
+                _libc = libc
+            except (OSError, AttributeError):
+                pass
+    return _libc
+
+
+def inotify_available() -> bool:
+    """当前平台是否支持 inotify"""
+    return _load_libc() is not None
+
+
+def _raise_errno(path: str | None = None) -> None:
+    errno = ctypes.get_errno()
+    raise OSError(errno, os.strerror(errno), path)
+
+
+@dataclass(frozen=True, slots=True)
+class InotifyEvent:
+    """
+    一个 inotify 事件
+
+    Attributes:
+        wd: 监视描述符
+        mask: 事件掩码
+        cookie: 关联 IN_MOVED_FROM 和 IN_MOVED_TO 的标识
+        name: 目录中条目的名称，事件针对目录本身时为空字符串
+    """
+
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+class Inotify:
+    """
+    一个 inotify 实例（非阻塞文件描述符）
+
+    示例:
+        with Inotify() as inotify:
+            wd = inotify.add_watch("/data", IN_CREATE | IN_DELETE)
+            for event in inotify.read(timeout=1.0):
+                ...
+    """
+
+    def __init__(self):
+        """
+        Raises:
+            OSError: 平台不支持 inotify 或创建失败
+        """
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self.fd: int = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            _raise_errno()
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """
+        添加或更新监视
+
+        Returns:
+            int: 监视描述符
+
+        Raises:
+            OSError: 路径无法监视，ENOSPC 表示达到 max_user_watches 上限
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            _raise_errno(path)
+        return int(wd)
+
+    def rm_watch(self, wd: int) -> None:
+        """移除监视，监视已失效时忽略"""
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout: float | None = None) -> list[InotifyEvent]:
+        """
+        读取所有已到达的事件，没有事件时最多等待 timeout 秒
+
+        Returns:
+            list[InotifyEvent]: 事件，超时时为空列表
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset : offset + length].split(b"\0", 1)[0]
+                offset += length
+                events.append(InotifyEvent(wd, mask, cookie, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        """关闭文件描述符，重复调用无效"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
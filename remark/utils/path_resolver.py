@@ -12,6 +12,8 @@ from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path, PureWindowsPath
 
+from remark.utils.cancellation import CancellationToken, Deadline, check_cancelled
+
 
 class NextResult(Enum):
     """Cursor.next() 的返回类型枚举"""
@@ -200,6 +202,7 @@ def get_inner_items_list(current_working_path: Path) -> list[Path]:
 
 def find_candidates(
     args_list: list[str],
+    token: CancellationToken | Deadline | None = None,
 ) -> list[tuple[Path, list[str], str]]:
     """
     递归查找所有可能的路径重建候选
@@ -209,6 +212,7 @@ def find_candidates(
     Args:
         args_list: argparse 解析后的位置参数列表
                    例如: ["C:\\Program", "Files", "App"] 或 ["My", "Folder/App", "备注"]
+        token: 可选的取消令牌或截止时间，每处理一个工作目录检查一次
 
     Returns:
         List[Tuple[full_path, remaining_args, type]]: 所有候选
@@ -216,6 +220,9 @@ def find_candidates(
         - remaining_args: 剩余参数（作为备注内容）
         - type: "folder" 或 "file"
 
+    Raises:
+        OperationCancelled: 被取消或超时（如在很慢的网络共享上搜索）
+
     """
     if not args_list:
         return []
@@ -265,6 +272,7 @@ def find_candidates(
     queue.append((Path(current_working_path), deepcopy(cursor), deepcopy(cursor)))
 
     while queue:
+        check_cancelled(token)
         work_path, start_cursor, cur = queue.popleft()
         if not work_path.is_dir():
             continue
@@ -2,15 +2,40 @@
 平台检查工具
 """
 
+import os
 import platform
 
 from remark.i18n import _ as _
 
+# 用户缓存目录下的应用子目录名
+APP_DIR_NAME = "windows-folder-remark"
+
 
 def check_platform() -> bool:
     """检查是否为 Windows 系统"""
     if platform.system() != "Windows":
-        print(_("Error: This tool adds remarks to files/folders on Windows, other systems are not supported."))
+        print(
+            _(
+                "Error: This tool adds remarks to files/folders on Windows, other systems are not supported."
+            )
+        )
         print(_("Current system: {system}").format(system=platform.system()))
         return False
     return True
+
+
+def user_cache_dir() -> str:
+    """
+    当前用户的缓存目录（不会自动创建）
+
+    Windows 上为 %LOCALAPPDATA%\\windows-folder-remark，其他系统为
+    $XDG_CACHE_HOME/windows-folder-remark（未设置时为 ~/.cache）。
+    与系统临时目录不同，其他用户无法预先创建或替换其中的文件。
+    """
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(
+            os.path.expanduser("~"), "AppData", "Local"
+        )
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, APP_DIR_NAME)
@@ -0,0 +1,107 @@
+"""
+有界并发执行
+
+bounded_map 把任务提交到线程池（或调用方提供的进程池），同时在途的任务数有上限：
+生产者（如目录遍历）不会一次性把百万个任务塞进队列，结果按完成顺序流式返回。
+给定 AdaptiveConcurrency 控制器时，在途任务数由控制器按延迟和错误率动态调整。
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+
+from remark.utils.cancellation import CancellationToken, Deadline, check_cancelled
+from remark.utils.concurrency import AdaptiveConcurrency
+
+# 默认线程数：任务以文件 I/O 为主，与 ThreadPoolExecutor 的默认值一致
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+# 给定取消令牌时等待任务完成的轮询间隔（秒），决定取消的响应速度
+CANCEL_POLL_INTERVAL = 0.1
+
+
+def bounded_map(
+    func,
+    items,
+    max_workers: int | None = None,
+    max_pending: int | None = None,
+    executor: Executor | None = None,
+    token: CancellationToken | Deadline | None = None,
+    controller: AdaptiveConcurrency | None = None,
+    is_error=None,
+):
+    """
+    并发执行 func(item)，按完成顺序产出结果
+
+    Args:
+        func: 任务函数；使用进程池时必须可以被 pickle
+        items: 任务参数的可迭代对象（惰性读取）
+        max_workers: 工作线程数，None 表示 DEFAULT_MAX_WORKERS
+        max_pending: 最多同时在途的任务数，None 表示 max_workers 的 4 倍
+        executor: 可选的执行器（如 ProcessPoolExecutor），由调用方负责关闭
+        token: 可选的取消令牌或截止时间，在提交任务前和等待期间检查
+        controller: 可选的自适应并发控制器。给定时在途任务数不超过 controller.limit，
+            忽略 max_workers 和 max_pending；线程池大小为 controller.max_limit。
+            只能用于线程池，调用方提供的执行器应至少有 max_limit 个线程
+        is_error: 可选的判断函数，以任务结果调用，返回 True 时向控制器记录一次失败
+            （用于把错误记录在返回值中的任务）；任务抛出异常总是记为失败
+
+    Yields:
+        func 的返回值；任务抛出的异常在产出该结果时重新抛出
+
+    Raises:
+        OperationCancelled: token 已取消或超时；已完成的结果会先全部产出
+
+    提前停止迭代或取消时，尚未开始的任务会被取消，正在执行的任务运行到结束。
+    """
+    workers = max_workers or DEFAULT_MAX_WORKERS
+    limit = max_pending or workers * 4
+    if workers <= 0 or limit <= 0:
+        raise ValueError("max_workers and max_pending must be positive")
+    if controller is not None:
+        workers = controller.max_limit
+        func = _measured(func, controller, is_error)
+
+    owned = executor is None
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="remark-pool")
+
+    # 有令牌时轮询等待，慢任务阻塞期间也能及时响应取消
+    poll = CANCEL_POLL_INTERVAL if token is not None else None
+    pending = set()
+    try:
+        for item in items:
+            check_cancelled(token)
+            pending.add(executor.submit(func, item))
+            while len(pending) >= (controller.limit if controller is not None else limit):
+                done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                check_cancelled(token)
+        while pending:
+            done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+            check_cancelled(token)
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _measured(func, controller: AdaptiveConcurrency, is_error):
+    """包装任务函数，向控制器报告每个任务的耗时和是否失败"""
+
+    def run(item):
+        controller.started()
+        start = time.perf_counter()
+        try:
+            result = func(item)
+        except BaseException:
+            controller.record(time.perf_counter() - start, error=True)
+            raise
+        failed = is_error is not None and bool(is_error(result))
+        controller.record(time.perf_counter() - start, error=failed)
+        return result
+
+    return run
@@ -0,0 +1,165 @@
+"""
+进度报告
+
+长时间运行的操作接受一个可选的 progress 回调，以 Progress 快照调用。
+ProgressTracker 负责计数和限频：两次回调之间至少间隔 interval 秒，
+第一次更新和结束时总会回调，每秒处理上万项时回调本身不会成为瓶颈。
+回调在持有锁时调用，多个工作线程更新时回调不会并发执行。
+
+示例:
+    def show(progress: Progress) -> None:
+        print(f"\\r{progress.done}/{progress.total} ETA {progress.eta:.0f}s", end="")
+
+    results = handler.get_comments(paths, progress=show)
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+# 默认的最小回调间隔（秒）
+DEFAULT_PROGRESS_INTERVAL = 0.2
+
+
+@dataclass(frozen=True, slots=True)
+class Progress:
+    """
+    进度快照
+
+    Attributes:
+        done: 已完成的项数
+        total: 总项数，未知时为 None
+        bytes_done: 已处理的字节数
+        bytes_total: 总字节数，未知时为 None
+        elapsed: 已用时间（秒）
+        finished: 是否为结束时的最后一次回调（包括取消和出错）
+    """
+
+    done: int = 0
+    total: int | None = None
+    bytes_done: int = 0
+    bytes_total: int | None = None
+    elapsed: float = 0.0
+    finished: bool = False
+
+    @property
+    def fraction(self) -> float | None:
+        """完成比例（0~1），字节总数已知时按字节计算，总量未知时为 None"""
+        if self.bytes_total:
+            return min(self.bytes_done / self.bytes_total, 1.0)
+        if self.total:
+            return min(self.done / self.total, 1.0)
+        if self.total == 0 or self.bytes_total == 0:
+            return 1.0
+        return None
+
+    @property
+    def rate(self) -> float:
+        """每秒完成的项数"""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """按当前平均速度估计的剩余秒数，无法估计时为 None"""
+        fraction = self.fraction
+        if fraction is None or fraction <= 0:
+            return None
+        return self.elapsed * (1 - fraction) / fraction
+
+
+# 进度回调协议
+ProgressCallback = Callable[[Progress], None]
+
+
+class ProgressTracker:
+    """
+    线程安全的进度计数器，按间隔限频调用回调
+
+    可以用作上下文管理器，退出时调用 finish()。
+    """
+
+    def __init__(
+        self,
+        callback: ProgressCallback | None,
+        total: int | None = None,
+        bytes_total: int | None = None,
+        interval: float = DEFAULT_PROGRESS_INTERVAL,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            callback: 进度回调，None 表示只计数
+            total: 总项数，None 表示未知
+            bytes_total: 总字节数，None 表示未知
+            interval: 最小回调间隔（秒），0 表示每次更新都回调
+            clock: 时钟函数，测试时可替换
+        """
+        self.callback = callback
+        self.total = total
+        self.bytes_total = bytes_total
+        self.interval = interval
+        self._clock = clock
+        self._start = clock()
+        self._last_emit: float | None = None
+        self._done = 0
+        self._bytes_done = 0
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def _snapshot(self, now: float, finished: bool = False) -> Progress:
+        return Progress(
+            self._done,
+            self.total,
+            self._bytes_done,
+            self.bytes_total,
+            now - self._start,
+            finished,
+        )
+
+    def snapshot(self) -> Progress:
+        """当前进度"""
+        with self._lock:
+            return self._snapshot(self._clock(), self._finished)
+
+    def advance(self, items: int = 1, nbytes: int = 0) -> None:
+        """
+        记录完成的项数和字节数，距上次回调超过 interval 时回调
+
+        Args:
+            items: 新完成的项数
+            nbytes: 新处理的字节数
+        """
+        with self._lock:
+            self._done += items
+            self._bytes_done += nbytes
+            if self.callback is None or self._finished:
+                return
+            now = self._clock()
+            if self._last_emit is not None and now - self._last_emit < self.interval:
+                return
+            self._last_emit = now
+            self.callback(self._snapshot(now))
+
+    def set_total(self, total: int | None = None, bytes_total: int | None = None) -> None:
+        """更新总量（如遍历结束后总数才确定）"""
+        with self._lock:
+            if total is not None:
+                self.total = total
+            if bytes_total is not None:
+                self.bytes_total = bytes_total
+
+    def finish(self) -> None:
+        """结束，不论间隔回调一次 finished=True 的快照；重复调用无效"""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            if self.callback is not None:
+                self.callback(self._snapshot(self._clock(), finished=True))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.finish()
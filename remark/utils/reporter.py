@@ -0,0 +1,171 @@
+"""
+消息报告接口
+
+核心库不直接 print，而是把消息交给 Reporter：
+
+- NullReporter: 库的默认值，丢弃所有消息，不做翻译和格式化
+- ConsoleReporter: 命令行使用，翻译并输出到控制台，可以询问用户
+- BufferedReporter: 收集消息，稍后统一渲染或转交给其他 Reporter
+
+调用方传入未翻译的消息模板（用 N_ 标记以便提取）和格式化参数，
+翻译和格式化推迟到 Reporter 真正渲染时才进行。
+
+需要用户确认时调用 confirm()。只有 ConsoleReporter 会询问（input），
+其他报告器返回 None，库代码据此按非交互方式处理，不会阻塞在标准输入上。
+"""
+
+import sys
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, TextIO
+
+from remark.i18n import N_
+from remark.i18n import _ as _
+
+
+class Level(Enum):
+    """消息级别"""
+
+    INFO = "info"
+    WARNING = "warning"
+    ERROR = "error"
+
+
+@dataclass(frozen=True)
+class Message:
+    """
+    未渲染的消息
+
+    Attributes:
+        level: 消息级别
+        template: 未翻译的消息模板（gettext msgid）
+        params: str.format 参数
+    """
+
+    level: Level
+    template: str
+    params: dict[str, Any] = field(default_factory=dict)
+
+    def render(self) -> str:
+        """翻译并格式化消息"""
+        text = _(self.template)
+        if self.params:
+            text = text.format(**self.params)
+        return text
+
+
+class Reporter(ABC):
+    """消息报告器基类"""
+
+    @abstractmethod
+    def report(self, message: Message) -> None:
+        """处理一条消息"""
+        pass
+
+    def confirm(self, template: str, **params) -> bool | None:
+        """
+        询问用户是否继续
+
+        Args:
+            template: 未翻译的问题模板
+            **params: str.format 参数
+
+        Returns:
+            bool | None: 用户的回答；报告器不能交互时返回 None
+        """
+        return None
+
+    def info(self, template: str, **params) -> None:
+        """报告普通消息"""
+        self.report(Message(Level.INFO, template, params))
+
+    def warning(self, template: str, **params) -> None:
+        """报告警告"""
+        self.report(Message(Level.WARNING, template, params))
+
+    def error(self, template: str, **params) -> None:
+        """报告错误"""
+        self.report(Message(Level.ERROR, template, params))
+
+
+class NullReporter(Reporter):
+    """丢弃所有消息"""
+
+    def report(self, message: Message) -> None:
+        pass
+
+    # 直接覆盖快捷方法，连 Message 对象都不创建
+    def info(self, template: str, **params) -> None:
+        pass
+
+    def warning(self, template: str, **params) -> None:
+        pass
+
+    def error(self, template: str, **params) -> None:
+        pass
+
+
+class ConsoleReporter(Reporter):
+    """翻译消息并输出到控制台"""
+
+    def __init__(self, stream: TextIO | None = None):
+        """
+        Args:
+            stream: 输出流，None 表示每次输出时使用当前的 sys.stdout
+        """
+        self.stream = stream
+        # 多个线程同时询问时逐个进行，问题和回答不会交错
+        self._confirm_lock = threading.Lock()
+
+    def report(self, message: Message) -> None:
+        print(message.render(), file=self.stream or sys.stdout)
+
+    def confirm(self, template: str, **params) -> bool | None:
+        """在控制台询问 [Y/n]，直接回车表示同意"""
+        prompt = Message(Level.INFO, template, params).render()
+        with self._confirm_lock:
+            while True:
+                response = input(prompt).strip().lower()
+                if response in ("", "y", "yes"):
+                    return True
+                if response in ("n", "no"):
+                    return False
+                self.warning(N_("Please enter Y or n"))
+
+
+class BufferedReporter(Reporter):
+    """收集消息，线程安全"""
+
+    def __init__(self):
+        self._messages: list[Message] = []
+        self._lock = threading.Lock()
+
+    def report(self, message: Message) -> None:
+        with self._lock:
+            self._messages.append(message)
+
+    @property
+    def messages(self) -> list[Message]:
+        """已收集消息的副本"""
+        with self._lock:
+            return list(self._messages)
+
+    def render(self) -> list[str]:
+        """翻译并格式化所有已收集的消息"""
+        return [message.render() for message in self.messages]
+
+    def replay(self, reporter: Reporter) -> None:
+        """把已收集的消息按顺序转交给另一个 Reporter"""
+        for message in self.messages:
+            reporter.report(message)
+
+    def clear(self) -> None:
+        """清空已收集的消息"""
+        with self._lock:
+            self._messages.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._messages)
@@ -4,6 +4,7 @@
 提供版本检测、下载更新、创建更新脚本等功能。
 """
 
+import contextlib
 import json
 import os
 import sys
@@ -14,11 +15,22 @@ from typing import Any
 
 from packaging import version
 
+from remark.utils.cancellation import (
+    CancellationToken,
+    Deadline,
+    OperationCancelled,
+    check_cancelled,
+)
 from remark.utils.constants import (
     GITHUB_API_RELEASES,
     UPDATE_CACHE_FILE,
     UPDATE_CHECK_INTERVAL,
 )
+from remark.utils.progress import Progress, ProgressCallback, ProgressTracker
+
+# 下载更新时单次网络读取的超时（秒）
+DOWNLOAD_TIMEOUT = 30
+DOWNLOAD_CHUNK_SIZE = 8192
 
 
 def _get_proxies() -> dict[str, str] | None:
@@ -198,46 +210,69 @@ def check_updates_manual(current_version: str) -> dict[str, Any] | None:
     return None
 
 
-def download_update(url: str, dest: str) -> str:
+def print_download_progress(progress: Progress) -> None:
+    """在控制台显示下载进度（download_update 的默认进度回调）"""
+    fraction = progress.fraction
+    if progress.bytes_total and fraction is not None:
+        percent = fraction * 100
+        downloaded_mb = progress.bytes_done / 1024 / 1024
+        total_mb = progress.bytes_total / 1024 / 1024
+        print(
+            f"\r下载进度: {percent:.1f}% ({downloaded_mb:.1f}MB / {total_mb:.1f}MB)",
+            end="",
+        )
+    if progress.finished:
+        print()  # 换行
+
+
+def download_update(
+    url: str,
+    dest: str,
+    token: CancellationToken | Deadline | None = None,
+    progress: ProgressCallback | None = None,
+) -> str:
     """
     下载新版本 exe
 
     Args:
         url: 下载 URL
         dest: 目标路径（文件名）
+        token: 可选的取消令牌或截止时间，每个数据块检查一次；
+            截止时间同时限制网络读取的超时
+        progress: 进度回调（bytes_done / bytes_total），None 表示在控制台显示进度
 
     Returns:
         下载的文件路径
+
+    Raises:
+        OperationCancelled: 被取消或超过截止时间，不完整的文件会被删除
     """
+    check_cancelled(token)
+    timeout = token.timeout(DOWNLOAD_TIMEOUT) if token is not None else DOWNLOAD_TIMEOUT
     request = urllib.request.Request(
         url,
         headers={"User-Agent": "windows-folder-remark"},
     )
     opener = _create_opener()
 
-    with opener.open(request, timeout=30) as response:
-        total_size = int(response.headers.get("content-length", 0))
-        downloaded = 0
-        chunk_size = 8192
-
-        with open(dest, "wb") as f:
-            while True:
-                chunk = response.read(chunk_size)
-                if not chunk:
-                    break
-                f.write(chunk)
-                downloaded += len(chunk)
-
-                # 显示进度
-                if total_size > 0:
-                    percent = min(downloaded * 100 / total_size, 100)
-                    downloaded_mb = downloaded / 1024 / 1024
-                    total_mb = total_size / 1024 / 1024
-                    print(
-                        f"\r下载进度: {percent:.1f}% ({downloaded_mb:.1f}MB / {total_mb:.1f}MB)",
-                        end="",
-                    )
-        print()  # 换行
+    with opener.open(request, timeout=timeout) as response:
+        total_size = int(response.headers.get("content-length", 0)) or None
+
+        callback = progress or print_download_progress
+        with ProgressTracker(callback, bytes_total=total_size) as tracker:
+            try:
+                with open(dest, "wb") as f:
+                    while True:
+                        check_cancelled(token)
+                        chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        tracker.advance(items=0, nbytes=len(chunk))
+            except OperationCancelled:
+                with contextlib.suppress(OSError):
+                    os.remove(dest)
+                raise
 
     return dest
 
@@ -0,0 +1,115 @@
+"""
+目录树遍历
+
+基于 os.scandir 的迭代式遍历：每个目录只列举一次，子目录判断使用 DirEntry
+缓存的类型信息（Windows 上不需要额外的 stat），深层目录树不会触发递归深度限制。
+审计、批量备注和统计等功能共用这一遍历器。
+"""
+
+import os
+from dataclasses import dataclass
+
+from remark.utils.cancellation import CancellationToken, Deadline, check_cancelled
+
+
+@dataclass(slots=True)
+class WalkEntry:
+    """
+    遍历到的目录
+
+    Attributes:
+        path: 目录路径
+        depth: 相对根目录的深度（根目录为 0）
+        entries: 该目录下的所有条目
+    """
+
+    path: str
+    depth: int
+    entries: list[os.DirEntry]
+
+    def has_file(self, name: str) -> bool:
+        """检查目录下是否有指定文件（不区分大小写）"""
+        lowered = name.lower()
+        for entry in self.entries:
+            if entry.name.lower() == lowered:
+                try:
+                    return entry.is_file()
+                except OSError:
+                    return False
+        return False
+
+    def subdirectories(self, follow_symlinks: bool = False) -> list[os.DirEntry]:
+        """该目录下的子目录条目"""
+        result = []
+        for entry in self.entries:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    result.append(entry)
+            except OSError:
+                continue
+        return result
+
+
+def is_link(entry: os.DirEntry) -> bool:
+    """符号链接或目录联接（junction）不跟随，避免循环"""
+    try:
+        if entry.is_symlink():
+            return True
+        is_junction = getattr(entry, "is_junction", None)
+        return bool(is_junction and is_junction())
+    except OSError:
+        return True
+
+
+def walk_directories(
+    root: str,
+    max_depth: int | None = None,
+    follow_symlinks: bool = False,
+    on_error=None,
+    include=None,
+    token: CancellationToken | Deadline | None = None,
+):
+    """
+    深度优先遍历目录树（先序）
+
+    Args:
+        root: 根目录
+        max_depth: 最大深度，None 表示不限制（0 表示只遍历根目录）
+        follow_symlinks: 是否进入符号链接和目录联接
+        on_error: 列举目录失败时以 (path, OSError) 调用，None 表示忽略
+        include: 可选的过滤函数，以子目录 DirEntry 调用，返回 False 时跳过该子树
+        token: 可选的取消令牌或截止时间，列举每个目录前检查
+
+    Yields:
+        WalkEntry: 每个可列举的目录
+
+    Raises:
+        OperationCancelled: token 已取消或超时，之前产出的目录不受影响
+    """
+    stack = [(os.fspath(root), 0)]
+    while stack:
+        check_cancelled(token)
+        path, depth = stack.pop()
+        try:
+            with os.scandir(path) as iterator:
+                entries = list(iterator)
+        except OSError as e:
+            if on_error is not None:
+                on_error(path, e)
+            continue
+
+        walk_entry = WalkEntry(path, depth, entries)
+        yield walk_entry
+
+        if max_depth is not None and depth >= max_depth:
+            continue
+
+        children = []
+        for entry in walk_entry.subdirectories(follow_symlinks=follow_symlinks):
+            if not follow_symlinks and is_link(entry):
+                continue
+            if include is not None and not include(entry):
+                continue
+            children.append((entry.path, depth + 1))
+        # 逆序入栈，使子目录按列举顺序出栈
+        stack.extend(reversed(children))
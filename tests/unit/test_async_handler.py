@@ -0,0 +1,124 @@
+"""异步备注接口单元测试"""
+
+import asyncio
+import threading
+
+import pytest
+
+from remark.core.async_handler import AsyncFolderCommentHandler
+from remark.core.folder_handler import ErrorKind, FolderCommentHandler, WriteStatus
+from remark.storage.attributes import MemoryAttributeBackend
+from remark.storage.locking import FolderLocks
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return FolderCommentHandler(
+        attributes=MemoryAttributeBackend(),
+        locks=FolderLocks(lock_dir=str(tmp_path / "locks")),
+    )
+
+
+@pytest.fixture
+def folders(tmp_path):
+    result = []
+    for i in range(20):
+        (tmp_path / f"f{i}").mkdir()
+        result.append(str(tmp_path / f"f{i}"))
+    return result
+
+
+@pytest.mark.unit
+class TestAsyncFolderCommentHandler:
+    """异步接口测试"""
+
+    def test_single_operations(self, handler, tmp_path):
+        """测试单个文件夹的设置、读取、删除"""
+
+        async def main():
+            async with AsyncFolderCommentHandler(handler, max_concurrency=2) as remarks:
+                folder = str(tmp_path)
+                assert (await remarks.set_comment(folder, "备注")).status is WriteStatus.UPDATED
+                assert (await remarks.get_comment(folder)).comment == "备注"
+                assert (await remarks.delete_comment(folder)).ok
+                assert (await remarks.get_comment(folder)).comment is None
+
+        asyncio.run(main())
+
+    def test_bulk_in_input_order(self, handler, folders):
+        """测试批量接口结果按输入顺序排列"""
+
+        async def main():
+            async with AsyncFolderCommentHandler(handler, max_concurrency=4) as remarks:
+                await remarks.set_comments({f: f"备注{i}" for i, f in enumerate(folders)})
+                results = await remarks.get_comments(folders)
+                streamed = [r.folder_path async for r in remarks.iter_comments(folders)]
+            return results, streamed
+
+        results, streamed = asyncio.run(main())
+        assert [r.comment for r in results] == [f"备注{i}" for i in range(20)]
+        assert sorted(streamed) == sorted(folders)
+
+    def test_concurrency_bounded(self, handler, folders, monkeypatch):
+        """测试同时进行的操作数不超过上限"""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+        original = handler.get_comment_result
+
+        def tracked(path):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            try:
+                threading.Event().wait(0.005)
+                return original(path)
+            finally:
+                with lock:
+                    active -= 1
+
+        monkeypatch.setattr(handler, "get_comment_result", tracked)
+
+        async def main():
+            async with AsyncFolderCommentHandler(handler, max_concurrency=3, max_pending=5) as r:
+                return await r.get_comments(folders)
+
+        assert len(asyncio.run(main())) == 20
+        assert peak <= 3
+
+    def test_timeout_result(self, handler, tmp_path, monkeypatch):
+        """测试超时返回 TIMEOUT 结果而不是抛出"""
+        release = threading.Event()
+        monkeypatch.setattr(handler, "get_comment_result", lambda path: release.wait(5))
+
+        async def main():
+            remarks = AsyncFolderCommentHandler(handler, max_concurrency=1, timeout=0.01)
+            try:
+                return await remarks.get_comment(str(tmp_path))
+            finally:
+                release.set()
+                remarks.close()
+
+        result = asyncio.run(main())
+        assert result.status is WriteStatus.FAILED
+        assert result.error is ErrorKind.TIMEOUT
+
+    def test_cancellation(self, handler, tmp_path, monkeypatch):
+        """测试取消向调用方抛出 CancelledError"""
+        release = threading.Event()
+        monkeypatch.setattr(handler, "get_comment_result", lambda path: release.wait(5))
+
+        async def main():
+            remarks = AsyncFolderCommentHandler(handler, max_concurrency=1)
+            task = asyncio.ensure_future(remarks.get_comment(str(tmp_path)))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            try:
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+            finally:
+                release.set()
+                remarks.close()
+
+        asyncio.run(main())
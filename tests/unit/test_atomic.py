@@ -0,0 +1,53 @@
+"""原子写入单元测试"""
+
+from unittest.mock import patch
+
+import pytest
+
+from remark.storage.atomic import Durability, atomic_write
+
+
+@pytest.mark.unit
+class TestAtomicWrite:
+    """原子写入测试"""
+
+    @pytest.mark.parametrize("durability", list(Durability))
+    def test_write_new_file(self, tmp_path, durability):
+        """测试各持久化级别写入新文件"""
+        target = tmp_path / "desktop.ini"
+
+        written = atomic_write(str(target), b"content", durability)
+
+        assert written == len(b"content")
+        assert target.read_bytes() == b"content"
+        assert [p.name for p in tmp_path.iterdir()] == ["desktop.ini"]
+
+    def test_replace_existing(self, tmp_path):
+        """测试替换已有文件"""
+        target = tmp_path / "desktop.ini"
+        target.write_bytes(b"old")
+
+        atomic_write(str(target), b"new")
+
+        assert target.read_bytes() == b"new"
+
+    @pytest.mark.parametrize(
+        "durability,expected_calls",
+        [(Durability.NONE, 0), (Durability.FILE, 1)],
+    )
+    def test_fsync_by_durability(self, tmp_path, durability, expected_calls):
+        """测试按持久化级别调用 fsync"""
+        with patch("os.fsync") as mock_fsync:
+            atomic_write(str(tmp_path / "desktop.ini"), b"data", durability)
+        assert mock_fsync.call_count == expected_calls
+
+    def test_failure_cleans_temp_file(self, tmp_path):
+        """测试替换失败时清理临时文件并保留原文件"""
+        target = tmp_path / "desktop.ini"
+        target.write_bytes(b"old")
+
+        with patch("os.replace", side_effect=OSError("share disconnected")), pytest.raises(OSError):
+            atomic_write(str(target), b"new")
+
+        assert target.read_bytes() == b"old"
+        assert [p.name for p in tmp_path.iterdir()] == ["desktop.ini"]
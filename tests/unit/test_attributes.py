@@ -0,0 +1,131 @@
+"""文件属性后端单元测试"""
+
+import os
+
+import pytest
+
+from remark.core.folder_handler import FolderCommentHandler, WriteStatus
+from remark.storage import attributes
+from remark.storage.attributes import (
+    FILE_ATTRIBUTE_ARCHIVE,
+    FILE_ATTRIBUTE_HIDDEN,
+    FILE_ATTRIBUTE_READONLY,
+    FILE_ATTRIBUTE_SYSTEM,
+    MemoryAttributeBackend,
+    SkipUnchangedAttributeBackend,
+    get_default_backend,
+    set_default_backend,
+)
+from remark.storage.desktop_ini import DesktopIniHandler
+
+
+@pytest.mark.unit
+class TestMemoryAttributeBackend:
+    """内存属性后端测试"""
+
+    def test_unknown_path_has_no_attributes(self):
+        """测试未记录的路径属性为 0"""
+        assert MemoryAttributeBackend().get("/folder") == 0
+
+    def test_update(self):
+        """测试添加和移除属性位"""
+        backend = MemoryAttributeBackend({"/file": FILE_ATTRIBUTE_ARCHIVE})
+        assert backend.update("/file", add=FILE_ATTRIBUTE_HIDDEN) is True
+        assert backend.get("/file") == FILE_ATTRIBUTE_ARCHIVE | FILE_ATTRIBUTE_HIDDEN
+        assert backend.update("/file", remove=FILE_ATTRIBUTE_ARCHIVE) is True
+        assert backend.get("/file") == FILE_ATTRIBUTE_HIDDEN
+
+    def test_path_normalized(self):
+        """测试路径规范化后作为键"""
+        backend = MemoryAttributeBackend()
+        backend.set(os.path.join("a", "b"), FILE_ATTRIBUTE_READONLY)
+        assert backend.get(os.path.join("a", ".", "b")) == FILE_ATTRIBUTE_READONLY
+
+
+@pytest.mark.unit
+class TestSkipUnchangedAttributeBackend:
+    """先读后写包装测试"""
+
+    def test_skip_when_already_set(self):
+        """测试属性已满足时不写入"""
+        inner = MemoryAttributeBackend({"/folder": FILE_ATTRIBUTE_READONLY})
+        backend = SkipUnchangedAttributeBackend(inner)
+        assert backend.update("/folder", add=FILE_ATTRIBUTE_READONLY) is True
+        assert inner.set_calls == 0
+        assert backend.skipped == 1
+
+    def test_write_when_changed(self):
+        """测试属性变化时写入"""
+        inner = MemoryAttributeBackend()
+        backend = SkipUnchangedAttributeBackend(inner)
+        assert backend.update("/folder", add=FILE_ATTRIBUTE_READONLY) is True
+        assert inner.set_calls == 1
+        assert backend.skipped == 0
+
+    def test_unreadable_path_fails(self):
+        """测试无法读取属性时失败"""
+
+        class Unreadable(MemoryAttributeBackend):
+            def get(self, path):
+                return None
+
+        backend = SkipUnchangedAttributeBackend(Unreadable())
+        assert backend.update("/folder", add=FILE_ATTRIBUTE_READONLY) is False
+
+
+@pytest.mark.unit
+class TestDefaultBackend:
+    """默认后端选择测试"""
+
+    def test_default_backend(self, monkeypatch):
+        """测试默认后端按平台选择并包装为先读后写"""
+        monkeypatch.setattr(attributes, "_default_backend", None)
+        backend = get_default_backend()
+        assert isinstance(backend, SkipUnchangedAttributeBackend)
+        assert get_default_backend() is backend
+
+    def test_set_default_backend(self, monkeypatch):
+        """测试替换默认后端"""
+        monkeypatch.setattr(attributes, "_default_backend", None)
+        memory = MemoryAttributeBackend()
+        set_default_backend(memory)
+        assert get_default_backend() is memory
+        assert DesktopIniHandler.set_folder_system_attributes("/folder") is True
+        assert memory.get("/folder") == FILE_ATTRIBUTE_READONLY
+
+
+@pytest.mark.unit
+class TestHandlerWithMemoryBackend:
+    """使用内存属性后端的完整写入流程"""
+
+    def test_set_comment_sets_attributes(self, tmp_path):
+        """测试设置备注后 desktop.ini 和文件夹属性正确"""
+        backend = MemoryAttributeBackend()
+        handler = FolderCommentHandler(attributes=backend)
+        assert handler.set_comment(str(tmp_path), "备注") is True
+
+        ini_path = DesktopIniHandler.get_path(str(tmp_path))
+        assert backend.get(ini_path) == FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+        assert backend.get(str(tmp_path)) == FILE_ATTRIBUTE_READONLY
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "备注"
+
+    def test_reapply_is_unchanged(self, tmp_path):
+        """测试重复设置相同备注时不修改属性"""
+        backend = MemoryAttributeBackend()
+        handler = FolderCommentHandler(attributes=backend)
+        assert handler.apply_comment(str(tmp_path), "备注") is WriteStatus.UPDATED
+        calls = backend.set_calls
+        assert handler.apply_comment(str(tmp_path), "备注") is WriteStatus.UNCHANGED
+        assert backend.set_calls == calls
+
+    def test_delete_comment_restores_attributes(self, tmp_path):
+        """测试删除备注后保留的 desktop.ini 恢复隐藏系统属性"""
+        ini_path = DesktopIniHandler.get_path(str(tmp_path))
+        with open(ini_path, "wb") as f:
+            f.write(
+                "[.ShellClassInfo]\r\nInfoTip=备注\r\nIconResource=a.ico,0\r\n".encode("utf-16")
+            )
+        backend = MemoryAttributeBackend()
+        handler = FolderCommentHandler(attributes=backend)
+        assert handler.delete_comment(str(tmp_path)) is True
+        assert backend.get(ini_path) == FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
@@ -0,0 +1,185 @@
+"""desktop.ini 审计与修复单元测试"""
+
+import codecs
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from remark.core.audit import (
+    AuditIssue,
+    DesktopIniAuditor,
+    audit_folder,
+    repair_folder,
+)
+from remark.storage.attributes import (
+    FILE_ATTRIBUTE_HIDDEN,
+    FILE_ATTRIBUTE_READONLY,
+    FILE_ATTRIBUTE_SYSTEM,
+    MemoryAttributeBackend,
+)
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.storage.locking import FolderLocks
+
+HIDDEN_SYSTEM = FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+
+
+def write_ini(folder, content, encoding="utf-16"):
+    folder.mkdir(parents=True, exist_ok=True)
+    if encoding == "utf-16":
+        data = codecs.BOM_UTF16_LE + content.encode("utf-16-le")
+    else:
+        data = content.encode(encoding)
+    (folder / "desktop.ini").write_bytes(data)
+    return str(folder)
+
+
+def healthy_backend(*folders):
+    """所有文件夹和 desktop.ini 的属性都已正确设置"""
+    attributes = {}
+    for folder in folders:
+        attributes[folder] = FILE_ATTRIBUTE_READONLY
+        attributes[DesktopIniHandler.get_path(folder)] = HIDDEN_SYSTEM
+    return MemoryAttributeBackend(attributes)
+
+
+@pytest.mark.unit
+class TestAuditFolder:
+    """单个文件夹审计测试"""
+
+    def test_clean(self, tmp_path):
+        """测试没有问题的 desktop.ini"""
+        folder = write_ini(tmp_path / "ok", "[.ShellClassInfo]\r\nInfoTip=备注\r\n")
+        result = audit_folder(folder, healthy_backend(folder))
+        assert result.clean
+        assert result.issues == frozenset()
+
+    @pytest.mark.parametrize(
+        "content,encoding,expected",
+        [
+            ("[.ShellClassInfo]\r\nInfoTip=备注\r\n", "gbk", AuditIssue.NOT_UTF16),
+            ("[ViewState]\r\nMode=\r\n", "utf-16", AuditIssue.MISSING_SECTION),
+            (
+                "[.ShellClassInfo]\r\nInfoTip=一\r\ninfotip=二\r\n",
+                "utf-16",
+                AuditIssue.DUPLICATE_INFOTIP,
+            ),
+            ("[.ShellClassInfo]\nInfoTip=备注\r\n", "utf-16", AuditIssue.MIXED_LINE_ENDINGS),
+        ],
+    )
+    def test_content_issues(self, tmp_path, content, encoding, expected):
+        """测试内容问题"""
+        folder = write_ini(tmp_path / "f", content, encoding)
+        result = audit_folder(folder, healthy_backend(folder))
+        assert result.issues == {expected}
+
+    def test_attribute_issues(self, tmp_path):
+        """测试缺少属性"""
+        folder = write_ini(tmp_path / "f", "[.ShellClassInfo]\r\nInfoTip=备注\r\n")
+        result = audit_folder(folder, MemoryAttributeBackend())
+        assert result.issues == {
+            AuditIssue.FILE_NOT_HIDDEN_SYSTEM,
+            AuditIssue.FOLDER_NOT_READONLY,
+        }
+
+    def test_unreadable(self, tmp_path, monkeypatch):
+        """测试超过大小上限的文件"""
+        folder = write_ini(tmp_path / "f", "[.ShellClassInfo]\r\n" + ";" * 200 + "\r\n")
+        monkeypatch.setattr(DesktopIniHandler, "max_size", 100)
+        result = audit_folder(folder, healthy_backend(folder))
+        assert result.issues == {AuditIssue.UNREADABLE}
+        assert result.error
+
+
+@pytest.mark.unit
+class TestRepairFolder:
+    """修复测试"""
+
+    def test_repair_content_and_attributes(self, tmp_path):
+        """测试一次重写修复编码、重复 InfoTip 和行尾符，并设置属性"""
+        folder = write_ini(
+            tmp_path / "f",
+            "[.ShellClassInfo]\nInfoTip=一\r\nInfoTip=二\r\nIconResource=a.ico,0\n",
+            "gbk",
+        )
+        backend = MemoryAttributeBackend()
+        locks = FolderLocks(lock_dir=str(tmp_path / "locks"))
+
+        result = repair_folder(audit_folder(folder, backend), backend, locks)
+
+        assert result.remaining == frozenset()
+        assert result.error is None
+        content = (tmp_path / "f" / "desktop.ini").read_bytes()
+        assert content == codecs.BOM_UTF16_LE + (
+            "[.ShellClassInfo]\r\nInfoTip=一\r\nIconResource=a.ico,0\r\n"
+        ).encode("utf-16-le")
+        assert audit_folder(folder, backend).clean
+
+    def test_missing_section_not_fixed(self, tmp_path):
+        """测试缺少段落只报告不修复"""
+        folder = write_ini(tmp_path / "f", "[ViewState]\r\nMode=\r\n")
+        backend = healthy_backend(folder)
+        result = repair_folder(
+            audit_folder(folder, backend), backend, FolderLocks(lock_dir=str(tmp_path / "locks"))
+        )
+        assert result.remaining == {AuditIssue.MISSING_SECTION}
+
+    def test_failed_rewrite_restores_attributes(self, tmp_path, monkeypatch):
+        """测试重写失败时恢复 desktop.ini 的隐藏/系统属性"""
+        folder = write_ini(tmp_path / "f", "[.ShellClassInfo]\r\nInfoTip=备注\r\n", "gbk")
+        backend = healthy_backend(folder)
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(DesktopIniHandler, "write_document", fail)
+        result = repair_folder(
+            audit_folder(folder, backend), backend, FolderLocks(lock_dir=str(tmp_path / "locks"))
+        )
+        assert result.error == "disk full"
+        assert result.remaining == {AuditIssue.NOT_UTF16}
+        assert backend.get(DesktopIniHandler.get_path(folder)) == HIDDEN_SYSTEM
+
+
+@pytest.mark.unit
+class TestDesktopIniAuditor:
+    """目录树审计测试"""
+
+    def test_tree_summary(self, tmp_path):
+        """测试遍历目录树并汇总问题"""
+        ok = write_ini(tmp_path / "ok", "[.ShellClassInfo]\r\nInfoTip=备注\r\n")
+        gbk = write_ini(tmp_path / "sub" / "gbk", "[.ShellClassInfo]\r\nInfoTip=备注\r\n", "gbk")
+        (tmp_path / "empty").mkdir()
+
+        auditor = DesktopIniAuditor(attributes=healthy_backend(ok, gbk), max_workers=2)
+        results = list(auditor.iter_audit(str(tmp_path)))
+
+        assert {r.folder_path for r in results} == {ok, gbk}
+        summary = auditor.summary
+        assert summary.directories == 5
+        assert summary.audited == 2
+        assert summary.clean == 1
+        assert summary.histogram() == [(AuditIssue.NOT_UTF16, 1, 0)]
+
+    def test_fix_mode(self, tmp_path):
+        """测试修复模式"""
+        folder = write_ini(tmp_path / "f", "[.ShellClassInfo]\r\nInfoTip=备注\r\n", "utf-8")
+        backend = MemoryAttributeBackend()
+        auditor = DesktopIniAuditor(
+            fix=True, attributes=backend, locks=FolderLocks(lock_dir=str(tmp_path / "locks"))
+        )
+
+        summary = auditor.run(str(tmp_path))
+
+        assert summary.fixed[AuditIssue.NOT_UTF16] == 1
+        assert summary.fixed[AuditIssue.FOLDER_NOT_READONLY] == 1
+        assert DesktopIniHandler.detect_encoding(DesktopIniHandler.get_path(folder))[1] is True
+
+    def test_thread_executor_only(self, tmp_path):
+        """测试只接受线程池：审计器的锁不能 pickle，进程池在构造时即被拒绝"""
+        folder = write_ini(tmp_path / "ok", "[.ShellClassInfo]\r\nInfoTip=备注\r\n")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            auditor = DesktopIniAuditor(attributes=healthy_backend(folder), executor=executor)
+            assert auditor.run(str(tmp_path)).clean == 1
+
+        with ProcessPoolExecutor(max_workers=1) as executor, pytest.raises(TypeError):
+            DesktopIniAuditor(executor=executor)
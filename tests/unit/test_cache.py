@@ -0,0 +1,86 @@
+"""备注读取缓存单元测试"""
+
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from remark.storage.cache import RemarkCache
+from remark.storage.desktop_ini import DesktopIniHandler
+
+
+def _write_remark(folder, remark):
+    """写入备注并把 mtime 推进一秒，避免文件系统时间精度导致签名相同"""
+    DesktopIniHandler.write_info_tip(str(folder), remark)
+    path = DesktopIniHandler.get_path(str(folder))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.mark.unit
+class TestRemarkCache:
+    """LRU 缓存测试"""
+
+    def test_hit_after_miss(self, tmp_path):
+        """测试第二次读取命中缓存"""
+        _write_remark(tmp_path, "备注")
+        loader = MagicMock(side_effect=DesktopIniHandler.read_info_tip)
+        cache = RemarkCache()
+
+        assert cache.get(str(tmp_path), loader) == "备注"
+        assert cache.get(str(tmp_path), loader) == "备注"
+
+        loader.assert_called_once()
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_change_invalidates_entry(self, tmp_path):
+        """测试 desktop.ini 变化后重新读取"""
+        _write_remark(tmp_path, "旧备注")
+        cache = RemarkCache()
+        assert cache.get(str(tmp_path), DesktopIniHandler.read_info_tip) == "旧备注"
+
+        _write_remark(tmp_path, "新备注!")
+
+        assert cache.get(str(tmp_path), DesktopIniHandler.read_info_tip) == "新备注!"
+        assert cache.stats.misses == 2
+
+    def test_negative_entry(self, tmp_path):
+        """测试没有 desktop.ini 时不调用读取函数"""
+        loader = MagicMock()
+        cache = RemarkCache()
+
+        assert cache.get(str(tmp_path), loader) is None
+        assert cache.get(str(tmp_path), loader) is None
+
+        loader.assert_not_called()
+        assert cache.stats.hits == 1
+
+    def test_eviction(self, tmp_path):
+        """测试超过容量时淘汰最久未使用的条目"""
+        cache = RemarkCache(maxsize=2)
+        folders = []
+        for name in ("a", "b", "c"):
+            folder = tmp_path / name
+            folder.mkdir()
+            folders.append(str(folder))
+            cache.get(str(folder), MagicMock())
+
+        assert len(cache) == 2
+        assert cache.stats.evictions == 1
+
+    def test_invalidate(self, tmp_path):
+        """测试显式失效"""
+        cache = RemarkCache()
+        cache.get(str(tmp_path), MagicMock())
+
+        cache.invalidate(str(tmp_path))
+        cache.invalidate(str(tmp_path))
+
+        assert len(cache) == 0
+        assert cache.stats.invalidations == 1
+
+    def test_invalid_size(self):
+        """测试非法容量"""
+        with pytest.raises(ValueError):
+            RemarkCache(maxsize=0)
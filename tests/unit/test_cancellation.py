@@ -0,0 +1,115 @@
+"""取消令牌与截止时间单元测试"""
+
+import threading
+
+import pytest
+
+from remark.utils.cancellation import (
+    CancellationToken,
+    Deadline,
+    DeadlineExceeded,
+    OperationCancelled,
+    check_cancelled,
+)
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestDeadline:
+    """截止时间测试"""
+
+    def test_expiry(self):
+        """测试剩余时间和过期"""
+        clock = FakeClock()
+        deadline = Deadline(5, clock=clock)
+        assert deadline.remaining() == 5
+        assert not deadline.cancelled
+        deadline.raise_if_cancelled()
+
+        clock.now += 6
+        assert deadline.remaining() == 0
+        assert deadline.expired
+        with pytest.raises(DeadlineExceeded):
+            deadline.raise_if_cancelled()
+
+    def test_timeout(self):
+        """测试阻塞调用的超时取较小值"""
+        clock = FakeClock()
+        assert Deadline(None).timeout(30) == 30
+        assert Deadline(None).remaining() is None
+        assert Deadline(5, clock=clock).timeout(30) == 5
+        assert Deadline(50, clock=clock).timeout(30) == 30
+        assert Deadline(5, clock=clock).timeout() == 5
+
+    def test_deadline_exceeded_is_timeout(self):
+        """测试超时异常同时是 OperationCancelled 和 TimeoutError"""
+        assert issubclass(DeadlineExceeded, OperationCancelled)
+        assert issubclass(DeadlineExceeded, TimeoutError)
+
+
+@pytest.mark.unit
+class TestCancellationToken:
+    """取消令牌测试"""
+
+    def test_cancel(self):
+        """测试取消并记录第一次的原因"""
+        token = CancellationToken()
+        assert not token.cancelled
+        token.raise_if_cancelled()
+
+        token.cancel("operator")
+        token.cancel("again")
+        assert token.cancelled
+        assert token.reason == "operator"
+        with pytest.raises(OperationCancelled, match="operator") as info:
+            token.raise_if_cancelled()
+        assert not isinstance(info.value, DeadlineExceeded)
+
+    def test_deadline(self):
+        """测试附带的截止时间"""
+        clock = FakeClock()
+        token = CancellationToken(Deadline(1, clock=clock))
+        assert token.remaining() == 1
+        clock.now += 2
+        assert token.cancelled
+        with pytest.raises(DeadlineExceeded):
+            token.raise_if_cancelled()
+
+    def test_child(self):
+        """测试父令牌取消传递给子令牌，反之不传递"""
+        clock = FakeClock()
+        parent = CancellationToken(Deadline(10, clock=clock))
+        child = parent.child(Deadline(3, clock=clock))
+        assert child.remaining() == 3
+
+        sibling = parent.child()
+        sibling.cancel()
+        assert not parent.cancelled
+
+        parent.cancel()
+        assert child.cancelled
+        with pytest.raises(OperationCancelled):
+            child.raise_if_cancelled()
+
+    def test_cancel_from_other_thread(self):
+        """测试其他线程取消时 wait 立即返回"""
+        token = CancellationToken()
+        threading.Timer(0.01, token.cancel).start()
+        assert token.wait(5)
+
+    def test_check_cancelled_none(self):
+        """测试没有令牌时不检查"""
+        check_cancelled(None)
+        with pytest.raises(OperationCancelled):
+            token = CancellationToken()
+            token.cancel()
+            check_cancelled(token)
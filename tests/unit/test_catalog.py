@@ -0,0 +1,220 @@
+"""备注目录单元测试"""
+
+import os
+import shutil
+
+import pytest
+
+from remark.core.catalog import RemarkCatalog
+from remark.core.folder_handler import FolderCommentHandler
+from remark.storage.attributes import MemoryAttributeBackend
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.storage.locking import FolderLocks
+from remark.utils.cancellation import CancellationToken, OperationCancelled
+
+
+@pytest.fixture
+def attributes():
+    return MemoryAttributeBackend()
+
+
+@pytest.fixture
+def handler(tmp_path, attributes):
+    return FolderCommentHandler(
+        attributes=attributes, locks=FolderLocks(lock_dir=str(tmp_path / "locks"))
+    )
+
+
+@pytest.fixture
+def tree(tmp_path, handler):
+    """
+    tmp_path/root                 备注 "根"
+    ├── clients
+    │   ├── acme                  备注 "Q3 contracts"
+    │   └── globex                备注 "Q3 contracts"
+    └── archive
+        └── 2020
+    """
+    root = tmp_path / "root"
+    for name in ("clients/acme", "clients/globex", "archive/2020"):
+        (root / name).mkdir(parents=True)
+    handler.set_comments(
+        {
+            str(root): "根",
+            str(root / "clients" / "acme"): "Q3 contracts",
+            str(root / "clients" / "globex"): "Q3 contracts",
+        }
+    )
+    return root
+
+
+@pytest.fixture
+def catalog(tmp_path, attributes):
+    with RemarkCatalog(str(tmp_path / "catalog.sqlite3"), attributes=attributes) as catalog:
+        yield catalog
+
+
+@pytest.mark.unit
+class TestRemarkCatalog:
+    """备注目录测试"""
+
+    def test_full_scan(self, tree, catalog):
+        """测试首次完整扫描和索引查询"""
+        summary = catalog.refresh(str(tree))
+
+        assert (summary.directories, summary.listed, summary.read) == (6, 6, 3)
+        assert len(catalog) == 6
+        assert catalog.count(with_remark=True) == 3
+        found = catalog.find_remark("Q3 contracts")
+        assert [os.path.basename(e.path) for e in found] == ["acme", "globex"]
+        assert found[0].encoding == "utf-16-le"
+        assert found[0].shell_ready
+        assert catalog.get(str(tree / "archive")).remark is None
+        assert not catalog.get(str(tree / "archive")).has_desktop_ini
+
+    def test_prefix_listing(self, tree, catalog, monkeypatch):
+        """测试按子树分页列出备注，不会匹配名称相同前缀的兄弟文件夹"""
+        monkeypatch.setattr("remark.core.catalog._PAGE_SIZE", 1)
+        (tree / "clients-old").mkdir()
+        DesktopIniHandler.write_info_tip(str(tree / "clients-old"), "旧")
+        catalog.refresh(str(tree))
+
+        listed = [e.path for e in catalog.iter_remarks(str(tree / "clients"))]
+        assert listed == [str(tree / "clients" / "acme"), str(tree / "clients" / "globex")]
+        assert len(catalog.find_remark("Q3 contracts", prefix=str(tree / "archive"))) == 0
+        assert len(list(catalog.iter_remarks())) == 4
+
+    def test_incremental_refresh(self, tree, catalog):
+        """测试未变化的文件夹不重新列举，desktop.ini 原地改写仍会被发现"""
+        catalog.refresh(str(tree))
+        summary = catalog.refresh(str(tree))
+        assert (summary.listed, summary.reused, summary.read) == (0, 6, 0)
+
+        ini = tree / "clients" / "acme" / "desktop.ini"
+        old, new = "Q3".encode("utf-16-le"), "Q4".encode("utf-16-le")
+        ini.write_bytes(ini.read_bytes().replace(old, new))
+        summary = catalog.refresh(str(tree))
+        assert (summary.listed, summary.read) == (0, 1)
+        assert catalog.get(str(tree / "clients" / "acme")).remark == "Q4 contracts"
+
+    def test_new_and_removed_folders(self, tree, catalog):
+        """测试新增文件夹被发现，删除的子树从目录中移除"""
+        catalog.refresh(str(tree))
+        shutil.rmtree(tree / "clients")
+        (tree / "archive" / "2021").mkdir()
+
+        summary = catalog.refresh(str(tree))
+        assert summary.removed == 3
+        assert catalog.find_remark("Q3 contracts") == []
+        assert catalog.get(str(tree / "archive" / "2021")) is not None
+        assert len(catalog) == 4
+
+    def test_persistent(self, tree, tmp_path, attributes):
+        """测试数据库使用 WAL 模式并在重新打开后保留，所在目录不存在时自动创建"""
+        path = str(tmp_path / "cache" / "persist.sqlite3")
+        with RemarkCatalog(path, attributes=attributes) as catalog:
+            catalog.refresh(str(tree))
+            mode = catalog._query("PRAGMA journal_mode")[0][0]
+        assert mode == "wal"
+        with RemarkCatalog(path, attributes=attributes) as catalog:
+            assert catalog.count(with_remark=True) == 3
+            assert catalog.refresh(str(tree)).listed == 0
+
+    def test_cancel(self, tree, catalog):
+        """测试取消时已写入的层保留"""
+        token = CancellationToken()
+
+        def cancel_after_first(progress):
+            token.cancel()
+
+        with pytest.raises(OperationCancelled):
+            catalog.refresh(str(tree), token=token, progress=cancel_after_first)
+        assert len(catalog) == 1
+
+
+@pytest.mark.unit
+class TestSearch:
+    """备注搜索测试"""
+
+    @pytest.fixture
+    def indexed(self, tree, catalog, handler):
+        """在 tree 之外再加几个用于排序和过滤的备注"""
+        for name, remark in (
+            ("archive/contract", "Contract"),
+            ("archive/2020/a", "合同 2020"),
+            ("archive/2020/b", "框架合同 ACME-7731"),
+        ):
+            (tree / name).mkdir(exist_ok=True)
+            handler.set_comment_result(str(tree / name), remark)
+        catalog.refresh(str(tree))
+        return tree
+
+    @staticmethod
+    def names(entries):
+        return [os.path.basename(e.path) for e in entries]
+
+    def test_substring_and_case(self, indexed, catalog):
+        """测试子串匹配不区分大小写，完全相同的备注排在最前"""
+        assert catalog.full_text
+        assert self.names(catalog.search("CONTRACT")) == ["contract", "acme", "globex"]
+        assert self.names(catalog.search("acme-77")) == ["b"]
+        assert self.names(catalog.search("q3 tract")) == ["acme", "globex"]
+
+    def test_short_cjk_terms(self, indexed, catalog):
+        """测试两个字的中文词（短于 trigram）也能匹配，以查询开头的排在前面"""
+        assert self.names(catalog.search("合同")) == ["a", "b"]
+        assert self.names(catalog.search("合同 7731")) == ["b"]
+        assert catalog.search("根")[0].path == str(indexed)
+
+    def test_prefix_limit_and_wildcards(self, indexed, catalog):
+        """测试子树过滤、结果数限制，LIKE 通配符按字面匹配"""
+        assert self.names(catalog.search("contract", prefix=str(indexed / "clients"))) == [
+            "acme",
+            "globex",
+        ]
+        assert len(catalog.search("contract", limit=1)) == 1
+        assert len(catalog.search("contract", limit=None)) == 3
+        assert catalog.search("%") == []
+        assert catalog.search("   ") == []
+
+    def test_index_follows_changes(self, indexed, catalog, handler):
+        """测试写入、删除和刷新后索引同步更新"""
+        handler.catalog = catalog
+        folder = str(indexed / "archive" / "2020" / "a")
+        handler.set_comment_result(folder, "发票")
+        assert self.names(catalog.search("合同")) == ["b"]
+        assert self.names(catalog.search("发票")) == ["a"]
+
+        shutil.rmtree(indexed / "clients")
+        catalog.refresh(str(indexed))
+        assert self.names(catalog.search("contract")) == ["contract"]
+
+    def test_without_full_text(self, indexed, catalog):
+        """测试没有全文索引时逐行比较"""
+        catalog.full_text = False
+        assert self.names(catalog.search("contract")) == ["contract", "acme", "globex"]
+        assert self.names(catalog.search("合同", prefix=str(indexed / "archive"))) == ["a", "b"]
+
+
+@pytest.mark.unit
+class TestHandlerWriteThrough:
+    """处理器写入时更新目录测试"""
+
+    def test_set_and_delete(self, tree, catalog, handler):
+        """测试写入和删除在同一调用中更新目录"""
+        catalog.refresh(str(tree))
+        handler.catalog = catalog
+        folder = str(tree / "archive" / "2020")
+
+        assert handler.set_comment_result(folder, "归档").ok
+        entry = catalog.get(folder)
+        assert entry.remark == "归档"
+        assert entry.has_desktop_ini
+
+        assert handler.delete_comment_result(folder).ok
+        assert catalog.get(folder).remark is None
+
+        # 写入改变了文件夹的修改时间，下次刷新时重新列举
+        summary = catalog.refresh(str(tree))
+        assert summary.listed >= 1
+        assert catalog.get(folder).remark is None
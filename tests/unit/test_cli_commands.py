@@ -5,6 +5,7 @@ import os
 import pytest
 
 from remark.cli.commands import CLI, get_version
+from remark.storage.attributes import MemoryAttributeBackend
 
 
 @pytest.mark.unit
@@ -300,6 +301,98 @@ class TestCLI:
         cli = CLI()
         cli.run(["--view", "/test/folder"])
 
+    def test_audit(self, tmp_path, capsys):
+        """测试审计目录树并输出汇总"""
+        folder = tmp_path / "folder"
+        folder.mkdir()
+        (folder / "desktop.ini").write_bytes(b"[.ShellClassInfo]\r\nInfoTip=remark\r\n")
+        cli = CLI()
+        assert cli.audit(str(tmp_path)) is True
+        captured = capsys.readouterr()
+        assert "不是 UTF-16 编码" in captured.out
+        assert "审计完成" in captured.out
+
+    def test_apply_recursive(self, tmp_path, capsys):
+        """测试递归设置备注并输出汇总"""
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        cli = CLI()
+        cli.handler.attributes = MemoryAttributeBackend()
+        assert cli.apply_recursive(str(tmp_path), "{name}", exclude=["b"]) is True
+        assert "更新 2 个" in capsys.readouterr().out
+
+    def test_apply_recursive_never_prompts(self, tmp_path, capsys, monkeypatch):
+        """测试递归设置遇到非 UTF-16 desktop.ini 时不询问，计为失败"""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "desktop.ini").write_bytes(b"[.ShellClassInfo]\r\nInfoTip=old\r\n")
+        monkeypatch.setattr("builtins.input", lambda *args: pytest.fail("input() called"))
+        cli = CLI()
+        cli.handler.attributes = MemoryAttributeBackend()
+        assert cli.apply_recursive(str(tmp_path), "{name}") is False
+        assert "失败 1 个" in capsys.readouterr().out
+        assert cli.handler.get_comment(str(tmp_path / "a")) == "old"
+
+    def test_apply_recursive_timeout(self, tmp_path, capsys):
+        """测试超过时间限制时提前停止并输出已完成部分的汇总"""
+        (tmp_path / "a").mkdir()
+        cli = CLI()
+        cli.handler.attributes = MemoryAttributeBackend()
+        assert cli.apply_recursive(str(tmp_path), "{name}", timeout=0) is False
+        captured = capsys.readouterr()
+        assert "已达到时间限制" in captured.out
+        assert "更新 0 个" in captured.out
+
+    def test_find(self, tmp_path, capsys):
+        """测试刷新目录树的备注目录后按片段搜索"""
+        root = tmp_path / "root"
+        (root / "acme").mkdir(parents=True)
+        (root / "other").mkdir()
+        cli = CLI()
+        cli.handler.attributes = MemoryAttributeBackend()
+        cli.catalog_path = str(tmp_path / "catalog.sqlite3")
+        cli.handler.set_comment_result(str(root / "acme"), "框架合同 ACME")
+        assert cli.find("合同", str(root)) is True
+        assert "框架合同 ACME" in capsys.readouterr().out
+        # 不给路径时搜索已刷新过的记录
+        assert cli.find("acme") is True
+        assert cli.find("发票") is False
+        assert "没有匹配的备注" in capsys.readouterr().out
+
+    def test_watch(self, tmp_path, capsys):
+        """测试监视开始时刷新备注目录，超过时间限制后停止"""
+        (tmp_path / "root" / "a").mkdir(parents=True)
+        cli = CLI()
+        cli.handler.attributes = MemoryAttributeBackend()
+        cli.catalog_path = str(tmp_path / "catalog.sqlite3")
+        cli.handler.set_comment_result(str(tmp_path / "root" / "a"), "甲")
+        assert cli.watch([str(tmp_path / "root")], timeout=0.2) is True
+        assert "正在监视 1 个目录树" in capsys.readouterr().out
+        assert cli.find("甲") is True
+
+    def test_reconcile_dry_run(self, tmp_path, capsys):
+        """测试按清单试运行只输出计划"""
+        (tmp_path / "a").mkdir()
+        manifest = tmp_path / "remarks.csv"
+        manifest.write_text("a,备注\n", encoding="utf-8")
+        cli = CLI()
+        cli.handler.attributes = MemoryAttributeBackend()
+        assert cli.reconcile(str(manifest), dry_run=True) is True
+        captured = capsys.readouterr()
+        assert "新建 1 个" in captured.out
+        assert cli.handler.get_comment(str(tmp_path / "a")) is None
+
+    def test_reconcile_never_prompts(self, tmp_path, capsys, monkeypatch):
+        """测试按清单设置遇到非 UTF-16 desktop.ini 时不询问，计为失败"""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "desktop.ini").write_bytes(b"[.ShellClassInfo]\r\nInfoTip=old\r\n")
+        manifest = tmp_path / "remarks.csv"
+        manifest.write_text("a,备注\n", encoding="utf-8")
+        monkeypatch.setattr("builtins.input", lambda *args: pytest.fail("input() called"))
+        cli = CLI()
+        cli.handler.attributes = MemoryAttributeBackend()
+        assert cli.reconcile(str(manifest)) is False
+        assert "失败 1 个" in capsys.readouterr().out
+        assert cli.handler.get_comment(str(tmp_path / "a")) == "old"
+
     @pytest.mark.skipif(os.name != "nt", reason="Windows only")
     def test_run_with_path_and_comment(self, fs, monkeypatch):
         """测试运行带路径和备注参数"""
@@ -0,0 +1,128 @@
+"""自适应并发控制单元测试"""
+
+import threading
+import time
+
+import pytest
+
+from remark.utils.concurrency import MIN_WINDOW, AdaptiveConcurrency
+from remark.utils.pool import bounded_map
+
+
+def run_window(controller, latency, error=False, concurrent=None):
+    """模拟一个窗口：concurrent 个操作同时开始，然后依次完成"""
+    count = max(controller.limit, MIN_WINDOW)
+    concurrent = controller.limit if concurrent is None else concurrent
+    done = 0
+    while done < count:
+        batch = min(concurrent, count - done)
+        for _ in range(batch):
+            controller.started()
+        for _ in range(batch):
+            controller.record(latency, error)
+        done += batch
+
+
+@pytest.mark.unit
+class TestAdaptiveConcurrency:
+    """AIMD 控制器测试"""
+
+    def test_additive_increase(self):
+        """测试延迟稳定且并发跑满时逐步上调，不超过上限"""
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=10, initial=4)
+        for _ in range(20):
+            run_window(controller, 0.01)
+        metrics = controller.metrics()
+        assert metrics.limit == 10
+        assert metrics.increases == 6
+        assert metrics.decreases == 0
+
+    def test_no_increase_when_not_saturated(self):
+        """测试生产者跟不上（并发没有跑满）时不上调"""
+        controller = AdaptiveConcurrency(initial=4)
+        for _ in range(5):
+            run_window(controller, 0.01, concurrent=1)
+        assert controller.limit == 4
+
+    def test_multiplicative_decrease_on_latency(self):
+        """测试延迟超过基线的容忍倍数时按比例下调，不低于下限"""
+        controller = AdaptiveConcurrency(min_limit=2, max_limit=64, initial=32)
+        run_window(controller, 0.01)
+        limit = controller.limit
+        run_window(controller, 0.1)
+        assert controller.limit == int(limit * 0.75)
+        for _ in range(8):
+            run_window(controller, 10.0)
+        assert controller.limit == 2
+
+    def test_decrease_on_errors(self):
+        """测试错误率超过阈值时下调"""
+        controller = AdaptiveConcurrency(initial=16)
+        run_window(controller, 0.01, error=True)
+        metrics = controller.metrics()
+        assert metrics.limit == 12
+        assert metrics.errors == 16
+        assert metrics.decreases == 1
+
+    def test_baseline_drifts(self):
+        """测试存储整体变慢后基线逐渐跟上，不会一直下调"""
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=64, initial=8)
+        run_window(controller, 0.01)
+        for _ in range(100):
+            run_window(controller, 0.05)
+        metrics = controller.metrics()
+        assert metrics.baseline > 0.025
+        assert metrics.decreases < 10
+        assert metrics.limit == 64
+
+    def test_invalid_arguments(self):
+        """测试非法参数"""
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(min_limit=0)
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(min_limit=8, max_limit=4)
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(decrease_factor=1.5)
+
+
+@pytest.mark.unit
+class TestBoundedMapController:
+    """bounded_map 使用自适应并发测试"""
+
+    def test_in_flight_bounded_by_limit(self):
+        """测试在途任务数不超过控制器的当前上限，并记录每个任务"""
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=3, initial=2)
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work(x):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.001)
+            with lock:
+                active -= 1
+            return x
+
+        results = sorted(bounded_map(work, range(60), controller=controller))
+        assert results == list(range(60))
+        assert peak <= 3
+        metrics = controller.metrics()
+        assert metrics.completed == 60
+        assert metrics.in_flight == 0
+
+    def test_errors_recorded(self):
+        """测试异常和 is_error 判定的结果都记为失败"""
+        controller = AdaptiveConcurrency(initial=2)
+
+        def work(x):
+            if x == 0:
+                raise OSError("boom")
+            return x
+
+        with pytest.raises(OSError):
+            list(bounded_map(work, [0], controller=controller))
+        list(bounded_map(work, [1, 2, 3], controller=controller, is_error=lambda r: r == 2))
+        assert controller.metrics().errors == 2
@@ -1,16 +1,28 @@
 """desktop.ini 读写单元测试"""
 
+import codecs
 import os
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from remark.storage.attributes import (
+    FILE_ATTRIBUTE_ARCHIVE,
+    FILE_ATTRIBUTE_HIDDEN,
+    FILE_ATTRIBUTE_READONLY,
+    FILE_ATTRIBUTE_SYSTEM,
+    MemoryAttributeBackend,
+)
 from remark.storage.desktop_ini import (
     DESKTOP_INI_ENCODING,
     LINE_ENDING,
     DesktopIniHandler,
     EncodingConversionCanceled,
+    NonUtf16DesktopIni,
+    new_file_payload,
 )
+from remark.storage.encoding_policy import EncodingPolicy, EncodingReport
+from remark.utils.reporter import ConsoleReporter
 
 
 @pytest.mark.unit
@@ -51,46 +63,122 @@ class TestDesktopIniHandler:
             ("No InfoTip here", None),
         ],
     )
-    def test_read_info_tip_with_content(self, content, expected):
+    def test_read_info_tip_with_content(self, tmp_path, content, expected):
         """测试读取各种内容格式"""
-        with patch("os.path.exists", return_value=True), patch("codecs.open") as mock_open_func:
-            mock_file = MagicMock()
-            mock_file.read.return_value = content
-            mock_open_func.return_value.__enter__.return_value = mock_file
+        (tmp_path / "desktop.ini").write_bytes(content.encode(DESKTOP_INI_ENCODING))
 
-            result = DesktopIniHandler.read_info_tip("/folder")
-            assert result == expected
+        result = DesktopIniHandler.read_info_tip(str(tmp_path))
+        assert result == expected
+
+    def test_read_info_tip_opens_file_once(self, tmp_path):
+        """测试读取时只打开一次文件"""
+        content = "[.ShellClassInfo]\r\nInfoTip=GBK 备注\r\n"
+        (tmp_path / "desktop.ini").write_bytes(content.encode("gbk"))
+
+        with patch("builtins.open", wraps=open) as mock_open_func:
+            result = DesktopIniHandler.read_info_tip(str(tmp_path))
+
+        assert result == "GBK 备注"
+        mock_open_func.assert_called_once()
 
     def test_write_info_tip_empty(self):
         """测试写入空备注"""
         result = DesktopIniHandler.write_info_tip("/folder", "")
         assert result is False
 
-    def test_write_info_tip_new_file(self):
+    def test_write_info_tip_new_file(self, tmp_path):
         """测试写入新文件"""
-        with patch("os.path.exists", return_value=False), patch("codecs.open") as mock_open_func:
-            mock_file = MagicMock()
-            mock_open_func.return_value.__enter__.return_value = mock_file
+        result = DesktopIniHandler.write_info_tip(str(tmp_path), "新备注")
+        assert result is True
 
-            result = DesktopIniHandler.write_info_tip("/folder", "新备注")
-            assert result is True
-            mock_file.write.assert_called_once()
+        content = (tmp_path / "desktop.ini").read_bytes()
+        assert content == codecs.BOM_UTF16_LE + "[.ShellClassInfo]\r\nInfoTip=新备注\r\n".encode(
+            "utf-16-le"
+        )
+        # 临时文件已被替换，不留残留
+        assert [p.name for p in tmp_path.iterdir()] == ["desktop.ini"]
+
+    def test_new_file_payload_reused(self, tmp_path):
+        """测试新建文件的内容按备注缓存，多个文件夹共用同一份编码结果"""
+        new_file_payload.cache_clear()
+        for name in ("a", "b", "c"):
+            (tmp_path / name).mkdir()
+            DesktopIniHandler.write_info_tip(str(tmp_path / name), "同一备注")
+
+        info = new_file_payload.cache_info()
+        assert info.misses == 1
+        assert info.hits >= 2
+        assert (tmp_path / "c" / "desktop.ini").read_bytes() == new_file_payload("同一备注")
+
+    def test_write_info_tip_failure_keeps_original(self, tmp_path):
+        """测试写入失败时原文件保持不变"""
+        original = "[.ShellClassInfo]\r\nInfoTip=旧备注\r\n".encode(DESKTOP_INI_ENCODING)
+        (tmp_path / "desktop.ini").write_bytes(original)
 
-    def test_write_info_tip_update_existing(self):
+        with patch("os.replace", side_effect=OSError("disconnected")):
+            result = DesktopIniHandler.write_info_tip(str(tmp_path), "新备注")
+
+        assert result is False
+        assert (tmp_path / "desktop.ini").read_bytes() == original
+        assert [p.name for p in tmp_path.iterdir()] == ["desktop.ini"]
+
+    def test_write_info_tip_update_existing(self, tmp_path):
         """测试更新已有文件"""
         existing_content = "[.ShellClassInfo]\r\nInfoTip=旧备注\r\n"
-        with (
-            patch("os.path.exists", return_value=True),
-            patch("remark.storage.desktop_ini.DesktopIniHandler.ensure_utf16_encoding"),
-            patch("codecs.open") as mock_open_func,
-        ):
-            mock_file_read = MagicMock()
-            mock_file_read.read.return_value = existing_content
-            mock_file_write = MagicMock()
-            mock_open_func.side_effect = [mock_file_read, mock_file_write]
+        (tmp_path / "desktop.ini").write_bytes(existing_content.encode(DESKTOP_INI_ENCODING))
 
-            result = DesktopIniHandler.write_info_tip("/folder", "新备注")
-            assert result is True
+        result = DesktopIniHandler.write_info_tip(str(tmp_path), "新备注")
+        assert result is True
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "新备注"
+
+    def test_write_info_tip_preserves_other_content(self, tmp_path):
+        """测试更新时保留其他段落、注释和行尾符"""
+        existing_content = (
+            "; 注释\n[.ShellClassInfo]\nIconResource=icon.dll,0\ninfotip = 旧备注\n"
+            "[ViewState]\nMode=\n"
+        )
+        (tmp_path / "desktop.ini").write_bytes(existing_content.encode(DESKTOP_INI_ENCODING))
+
+        result = DesktopIniHandler.write_info_tip(str(tmp_path), "新备注")
+        assert result is True
+
+        content = (tmp_path / "desktop.ini").read_bytes().decode(DESKTOP_INI_ENCODING)
+        assert content == existing_content.replace("infotip = 旧备注", "infotip=新备注")
+
+    def test_read_properties(self, tmp_path):
+        """测试一次读取多个属性"""
+        content = "[.ShellClassInfo]\r\nInfoTip=备注\r\nIconResource=icon.dll,0\r\n"
+        (tmp_path / "desktop.ini").write_bytes(content.encode(DESKTOP_INI_ENCODING))
+
+        result = DesktopIniHandler.read_properties(
+            str(tmp_path),
+            DesktopIniHandler.PROPERTY_INFOTIP,
+            DesktopIniHandler.PROPERTY_ICON_RESOURCE,
+            DesktopIniHandler.PROPERTY_LOCALIZED_RESOURCE_NAME,
+        )
+        assert result == {
+            "InfoTip": "备注",
+            "IconResource": "icon.dll,0",
+            "LocalizedResourceName": None,
+        }
+
+    def test_remove_info_tip_keeps_other_settings(self, tmp_path):
+        """测试删除备注时保留其他设置"""
+        content = "[.ShellClassInfo]\r\nInfoTip=备注\r\nIconResource=icon.dll,0\r\n"
+        (tmp_path / "desktop.ini").write_bytes(content.encode(DESKTOP_INI_ENCODING))
+
+        assert DesktopIniHandler.remove_info_tip(str(tmp_path)) is True
+
+        remaining = (tmp_path / "desktop.ini").read_bytes().decode(DESKTOP_INI_ENCODING)
+        assert remaining == "[.ShellClassInfo]\r\nIconResource=icon.dll,0\r\n"
+
+    def test_remove_info_tip_deletes_empty_file(self, tmp_path):
+        """测试删除备注后没有其他内容时删除文件"""
+        content = "[.ShellClassInfo]\r\nInfoTip=备注\r\n"
+        (tmp_path / "desktop.ini").write_bytes(content.encode(DESKTOP_INI_ENCODING))
+
+        assert DesktopIniHandler.remove_info_tip(str(tmp_path)) is True
+        assert not (tmp_path / "desktop.ini").exists()
 
     def test_detect_encoding_utf16_le(self):
         """测试检测 UTF-16 LE 编码"""
@@ -126,23 +214,38 @@ class TestDesktopIniHandler:
             assert is_utf16 is False
 
     def test_set_file_hidden_system_attributes(self):
-        """测试设置文件隐藏系统属性"""
-        with patch("subprocess.call", return_value=0) as mock_call:
-            result = DesktopIniHandler.set_file_hidden_system_attributes("/file")
+        """测试设置文件隐藏系统属性（不启动 attrib 进程）"""
+        backend = MemoryAttributeBackend({"/file": FILE_ATTRIBUTE_ARCHIVE})
+        with patch("subprocess.call") as mock_call:
+            result = DesktopIniHandler.set_file_hidden_system_attributes("/file", backend)
             assert result is True
-            mock_call.assert_called_once()
-            args = mock_call.call_args[0][0]
-            assert "attrib +h +s" in args
-            assert "/file" in args or '"file"' in args or "file" in args
+            mock_call.assert_not_called()
+        assert backend.get("/file") == (
+            FILE_ATTRIBUTE_ARCHIVE | FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+        )
 
     def test_clear_file_attributes(self):
-        """测试清除文件属性"""
-        with patch("subprocess.call", return_value=0) as mock_call:
-            result = DesktopIniHandler.clear_file_attributes("/file")
-            assert result is True
-            mock_call.assert_called_once()
-            args = mock_call.call_args[0][0]
-            assert "attrib -s -h" in args
+        """测试清除文件属性（保留其他属性位）"""
+        backend = MemoryAttributeBackend(
+            {"/file": FILE_ATTRIBUTE_ARCHIVE | FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM}
+        )
+        result = DesktopIniHandler.clear_file_attributes("/file", backend)
+        assert result is True
+        assert backend.get("/file") == FILE_ATTRIBUTE_ARCHIVE
+
+    def test_set_folder_system_attributes(self):
+        """测试设置文件夹只读属性"""
+        backend = MemoryAttributeBackend()
+        assert DesktopIniHandler.set_folder_system_attributes("/folder", backend) is True
+        assert backend.get("/folder") == FILE_ATTRIBUTE_READONLY
+
+    def test_attributes_unreadable(self):
+        """测试无法读取属性时设置失败"""
+        backend = MagicMock()
+        backend.get.side_effect = OSError("denied")
+        backend.update.side_effect = OSError("denied")
+        assert DesktopIniHandler.get_file_attributes("/folder", backend) is None
+        assert DesktopIniHandler.set_folder_system_attributes("/folder", backend) is False
 
     def test_delete_file_exists(self):
         """测试删除存在的文件"""
@@ -171,3 +274,256 @@ class TestEncodingConversionCanceled:
         exc = EncodingConversionCanceled("用户取消")
         assert str(exc) == "用户取消"
         assert isinstance(exc, Exception)
+
+
+@pytest.mark.unit
+class TestBoundedRead:
+    """超大或异常 desktop.ini 的有界读取测试"""
+
+    def _write(self, folder, content, encoding=DESKTOP_INI_ENCODING):
+        (folder / "desktop.ini").write_bytes(content.encode(encoding))
+
+    def test_stops_after_info_tip(self, tmp_path):
+        """测试找到 InfoTip 后不再读取文件剩余部分"""
+        self._write(tmp_path, "[.ShellClassInfo]\r\nInfoTip=备注\r\n" + "x=y\r\n" * 200_000)
+
+        with patch.object(DesktopIniHandler, "max_size", 10 * 1024 * 1024):
+            assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "备注"
+
+    def test_stops_at_next_section(self, tmp_path):
+        """测试 [.ShellClassInfo] 结束后不再查找"""
+        self._write(tmp_path, "[.ShellClassInfo]\r\nIconResource=a\r\n[Other]\r\nInfoTip=x\r\n")
+
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) is None
+
+    def test_info_tip_beyond_limit(self, tmp_path):
+        """测试超过大小上限的内容不会被读取"""
+        self._write(tmp_path, "[.ShellClassInfo]\r\n" + ";" * 200 + "\r\nInfoTip=备注\r\n")
+
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "备注"
+        with patch.object(DesktopIniHandler, "max_size", 100):
+            assert DesktopIniHandler.read_info_tip(str(tmp_path)) is None
+
+    @pytest.mark.parametrize("encoding", ["utf-16", "utf-8", "gbk"])
+    def test_value_across_chunks(self, tmp_path, encoding):
+        """测试跨越读取块边界的行"""
+        padding = "; " + "填充" * 1500 + "\r\n"
+        self._write(tmp_path, "[.ShellClassInfo]\r\n" + padding + "InfoTip=跨块备注\r\n", encoding)
+
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "跨块备注"
+
+    def test_write_refuses_oversized_file(self, tmp_path):
+        """测试超过上限的文件不会被读入并改写"""
+        original = "[.ShellClassInfo]\r\n" + ";" * 200 + "\r\n"
+        self._write(tmp_path, original)
+
+        with patch.object(DesktopIniHandler, "max_size", 100):
+            assert DesktopIniHandler.write_info_tip(str(tmp_path), "备注") is False
+
+        assert (tmp_path / "desktop.ini").read_bytes() == original.encode(DESKTOP_INI_ENCODING)
+
+    def test_conversion_preview_truncated(self, tmp_path, capsys):
+        """测试编码转换提示只显示截断的预览"""
+        self._write(tmp_path, "[.ShellClassInfo]\r\n" + "a" * 5000 + "\r\n", "utf-8")
+
+        with patch("builtins.input", return_value="y"):
+            DesktopIniHandler.ensure_utf16_encoding(
+                str(tmp_path / "desktop.ini"), reporter=ConsoleReporter()
+            )
+
+        output = capsys.readouterr().out
+        assert "a" * 5000 not in output
+        assert "未显示" in output
+        _encoding, is_utf16 = DesktopIniHandler.detect_encoding(str(tmp_path / "desktop.ini"))
+        assert is_utf16 is True
+
+
+@pytest.mark.unit
+class TestEncodingPolicy:
+    """编码转换策略测试"""
+
+    GBK_CONTENT = "[.ShellClassInfo]\r\nInfoTip=旧备注\r\n"
+
+    def _write_gbk(self, folder):
+        (folder / "desktop.ini").write_bytes(self.GBK_CONTENT.encode("gbk"))
+
+    def test_convert_without_prompt(self, tmp_path, capsys):
+        """测试 CONVERT 策略不询问、不输出，直接转换"""
+        self._write_gbk(tmp_path)
+        report = EncodingReport()
+
+        with patch("builtins.input") as mock_input:
+            result = DesktopIniHandler.write_info_tip(
+                str(tmp_path),
+                "新备注",
+                encoding_policy=EncodingPolicy.CONVERT,
+                encoding_report=report,
+            )
+            mock_input.assert_not_called()
+
+        assert result is True
+        assert capsys.readouterr().out == ""
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "新备注"
+        assert [issue.path for issue in report.converted] == [str(tmp_path / "desktop.ini")]
+        assert report.converted[0].encoding == "gbk"
+
+    def test_skip_leaves_file(self, tmp_path):
+        """测试 SKIP 策略不修改文件并记录跳过"""
+        self._write_gbk(tmp_path)
+        report = EncodingReport()
+
+        result = DesktopIniHandler.write_info_tip(
+            str(tmp_path), "新备注", encoding_policy=EncodingPolicy.SKIP, encoding_report=report
+        )
+
+        assert result is False
+        assert (tmp_path / "desktop.ini").read_bytes() == self.GBK_CONTENT.encode("gbk")
+        assert len(report.skipped) == 1
+        assert report.total == 1
+
+    def test_fail_raises(self, tmp_path):
+        """测试 FAIL 策略抛出异常"""
+        self._write_gbk(tmp_path)
+        report = EncodingReport()
+
+        with pytest.raises(NonUtf16DesktopIni) as exc_info:
+            DesktopIniHandler.remove_info_tip(
+                str(tmp_path), encoding_policy=EncodingPolicy.FAIL, encoding_report=report
+            )
+
+        assert exc_info.value.encoding == "gbk"
+        assert len(report.failed) == 1
+        assert (tmp_path / "desktop.ini").read_bytes() == self.GBK_CONTENT.encode("gbk")
+
+    def test_class_default_policy(self, tmp_path):
+        """测试未指定策略时使用类属性默认值"""
+        self._write_gbk(tmp_path)
+
+        with patch.object(DesktopIniHandler, "encoding_policy", EncodingPolicy.SKIP):
+            assert DesktopIniHandler.remove_info_tip(str(tmp_path)) is False
+
+    def test_prompt_declined_recorded(self, tmp_path):
+        """测试 PROMPT 策略下用户拒绝时记录为跳过"""
+        self._write_gbk(tmp_path)
+        report = EncodingReport()
+
+        with patch("builtins.input", return_value="n"):
+            result = DesktopIniHandler.write_info_tip(
+                str(tmp_path),
+                "新备注",
+                encoding_policy=EncodingPolicy.PROMPT,
+                encoding_report=report,
+                reporter=ConsoleReporter(),
+            )
+
+        assert result is False
+        assert len(report.skipped) == 1
+
+    def test_prompt_without_console_fails(self, tmp_path):
+        """测试 PROMPT 策略下报告器不能交互时不读取标准输入，按 FAIL 处理"""
+        self._write_gbk(tmp_path)
+        report = EncodingReport()
+
+        with (
+            patch("builtins.input", side_effect=AssertionError("input() called")),
+            pytest.raises(NonUtf16DesktopIni),
+        ):
+            DesktopIniHandler.ensure_utf16_encoding(
+                str(tmp_path / "desktop.ini"), policy=EncodingPolicy.PROMPT, report=report
+            )
+
+        assert len(report.failed) == 1
+        assert (tmp_path / "desktop.ini").read_bytes() == self.GBK_CONTENT.encode("gbk")
+
+    def test_utf16_file_not_reported(self, tmp_path):
+        """测试已是 UTF-16 的文件不计入报告"""
+        report = EncodingReport()
+        DesktopIniHandler.write_info_tip(str(tmp_path), "备注")
+        DesktopIniHandler.write_info_tip(
+            str(tmp_path), "新备注", encoding_policy=EncodingPolicy.FAIL, encoding_report=report
+        )
+        assert report.total == 0
+
+
+@pytest.mark.unit
+class TestUtf16LeFastPath:
+    """UTF-16 LE 快速路径测试"""
+
+    def _encode(self, content):
+        return codecs.BOM_UTF16_LE + content.encode("utf-16-le")
+
+    @pytest.mark.parametrize(
+        "content,expected",
+        [
+            ("[.ShellClassInfo]\r\nInfoTip=备注\r\n", {"InfoTip": "备注"}),
+            ("[.ShellClassInfo]\r\nIconResource=a\r\nInfoTip=备注", {"InfoTip": "备注"}),
+            ("[.ShellClassInfo]\r\nInfoTip=\r\n", {"InfoTip": None}),
+            # 非规范写法交给通用路径
+            ("[.ShellClassInfo]\r\nInfoTip = 备注\r\n", None),
+            ("[.ShellClassInfo]\r\nIconResource=a\r\n[x]\r\nInfoTip=备注\r\n", None),
+            ("; [.ShellClassInfo]\r\nInfoTip=备注\r\n", None),
+        ],
+    )
+    def test_fast_path(self, content, expected):
+        """测试快速路径的结果与回退"""
+        result = DesktopIniHandler._fast_utf16le_properties(
+            self._encode(content), ["InfoTip"], complete=True
+        )
+        assert result == expected
+
+    def test_not_utf16le(self):
+        """测试非 UTF-16 LE 内容不走快速路径"""
+        data = "[.ShellClassInfo]\r\nInfoTip=备注\r\n".encode()
+        assert DesktopIniHandler._fast_utf16le_properties(data, ["InfoTip"], True) is None
+
+    def test_truncated_value_falls_back(self):
+        """测试值可能被读取块截断时回退"""
+        data = self._encode("[.ShellClassInfo]\r\nInfoTip=备注")
+        assert DesktopIniHandler._fast_utf16le_properties(data, ["InfoTip"], False) is None
+
+    def test_ignores_unaligned_match(self):
+        """测试忽略跨码元边界的伪匹配"""
+        # U+0D41 U+0A00 的字节为 41 0D 00 0A，其中奇数偏移处的 "0D 00" 不是 CR
+        content = "[.ShellClassInfo]\r\nInfoTip=\u0d41\u0a00备注\r\n"
+        result = DesktopIniHandler._fast_utf16le_properties(
+            self._encode(content), ["InfoTip"], complete=True
+        )
+        assert result == {"InfoTip": "\u0d41\u0a00备注"}
+
+    def test_read_info_tip_uses_fast_path(self, tmp_path):
+        """测试读取标准文件时不进入增量解码路径"""
+        DesktopIniHandler.write_info_tip(str(tmp_path), "快速备注")
+
+        with patch.object(DesktopIniHandler, "_scan_properties") as mock_scan:
+            assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "快速备注"
+        mock_scan.assert_not_called()
+
+
+@pytest.mark.unit
+class TestUtf16BeWithoutBom:
+    """无 BOM 的 UTF-16 BE 文件测试"""
+
+    CONTENT = "[.ShellClassInfo]\r\nIconResource=图标.ico,0\r\nInfoTip=旧备注\r\n"
+
+    def test_round_trip(self, tmp_path):
+        """测试按探测到的字节序读取，并改写为带 BOM 的 UTF-16 LE"""
+        desktop_ini = tmp_path / "desktop.ini"
+        desktop_ini.write_bytes(self.CONTENT.encode("utf-16-be"))
+
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "旧备注"
+        assert DesktopIniHandler.write_info_tip(str(tmp_path), "新备注")
+
+        data = desktop_ini.read_bytes()
+        assert data.startswith(codecs.BOM_UTF16_LE)
+        text = data[len(codecs.BOM_UTF16_LE) :].decode("utf-16-le")
+        assert "IconResource=图标.ico,0" in text
+        assert "InfoTip=新备注" in text
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "新备注"
+
+    def test_render_info_tip(self, tmp_path):
+        """测试渲染结果不会按错误字节序解码"""
+        (tmp_path / "desktop.ini").write_bytes(self.CONTENT.encode("utf-16-be"))
+
+        _current, rendered = DesktopIniHandler.render_info_tip(str(tmp_path), "新备注")
+        assert rendered.startswith(codecs.BOM_UTF16_LE)
+        assert "IconResource=图标.ico,0" in rendered[2:].decode("utf-16-le")
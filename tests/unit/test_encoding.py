@@ -0,0 +1,46 @@
+"""编码判定单元测试"""
+
+import codecs
+
+import pytest
+
+from remark.utils.encoding import decode_bytes, iter_decodings, sniff_encoding
+
+
+@pytest.mark.unit
+class TestSniffEncoding:
+    """编码判定测试"""
+
+    @pytest.mark.parametrize(
+        "data,expected",
+        [
+            (codecs.BOM_UTF16_LE + "备注".encode("utf-16-le"), ("utf-16-le", True)),
+            (codecs.BOM_UTF16_BE + "备注".encode("utf-16-be"), ("utf-16-be", True)),
+            (codecs.BOM_UTF8 + "备注".encode(), ("utf-8-sig", False)),
+            ("[.ShellClassInfo]".encode("utf-16-le"), ("utf-16-le", True)),
+            ("[.ShellClassInfo]".encode("utf-16-be"), ("utf-16-be", True)),
+            (b"[.ShellClassInfo]", ("utf-8", False)),
+            ("中文备注".encode(), ("utf-8", False)),
+            ("中文备注".encode("gbk"), ("gbk", False)),
+        ],
+    )
+    def test_sniff_encoding(self, data, expected):
+        """测试根据 BOM 和字节统计判定编码"""
+        assert sniff_encoding(data) == expected
+
+    def test_sniff_empty(self):
+        """测试空内容"""
+        assert sniff_encoding(b"") == ("utf-8", False)
+
+    def test_decode_strips_bom(self):
+        """测试解码时去除 BOM"""
+        data = codecs.BOM_UTF16_LE + "InfoTip=备注".encode("utf-16-le")
+        assert decode_bytes(data, "utf-16-le") == "InfoTip=备注"
+
+    def test_iter_decodings_sniffed_first(self):
+        """测试优先使用判定出的编码，并跳过无法解码的候选"""
+        data = "[.ShellClassInfo]\r\nInfoTip=备注\r\n".encode("gbk")
+        decodings = list(iter_decodings(data))
+
+        assert decodings[0] == ("gbk", "[.ShellClassInfo]\r\nInfoTip=备注\r\n")
+        assert "utf-8" not in [encoding for encoding, _text in decodings]
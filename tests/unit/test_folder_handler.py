@@ -1,10 +1,30 @@
 """核心业务逻辑单元测试"""
 
-from unittest.mock import patch
+import contextlib
+import os
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from remark.core.folder_handler import MAX_COMMENT_LENGTH, FolderCommentHandler
+from remark.core.folder_handler import (
+    MAX_COMMENT_LENGTH,
+    ErrorKind,
+    FolderCommentHandler,
+    WriteStatus,
+)
+from remark.storage.attributes import MemoryAttributeBackend
+from remark.storage.desktop_ini import (
+    FILE_ATTRIBUTE_HIDDEN,
+    FILE_ATTRIBUTE_READONLY,
+    FILE_ATTRIBUTE_SYSTEM,
+    DesktopIniHandler,
+    NonUtf16DesktopIni,
+)
+from remark.storage.encoding_policy import EncodingPolicy
+from remark.storage.locking import FolderLocks
+from remark.utils.cancellation import CancellationToken, Deadline
+from remark.utils.concurrency import AdaptiveConcurrency
+from remark.utils.reporter import BufferedReporter, ConsoleReporter, Level
 
 
 @pytest.mark.unit
@@ -30,7 +50,7 @@ class TestFolderCommentHandler:
     def test_set_comment_not_folder(self, capsys):
         """测试对非文件夹路径设置备注"""
         with patch("os.path.isdir", return_value=False):
-            handler = FolderCommentHandler()
+            handler = FolderCommentHandler(reporter=ConsoleReporter())
             result = handler.set_comment("/file.txt", "备注")
             assert result is False
             captured = capsys.readouterr()
@@ -86,7 +106,7 @@ class TestFolderCommentHandler:
     def test_delete_comment_no_ini(self, capsys):
         """测试删除不存在的备注"""
         with patch("remark.storage.desktop_ini.DesktopIniHandler.exists", return_value=False):
-            handler = FolderCommentHandler()
+            handler = FolderCommentHandler(reporter=ConsoleReporter())
             result = handler.delete_comment("/folder")
             assert result is True
             captured = capsys.readouterr()
@@ -146,6 +166,310 @@ class TestFolderCommentHandler:
             result = handler._set_comment_desktop_ini("/folder", "备注")
             assert result is True
 
+    def test_get_comment_with_cache(self):
+        """测试启用缓存时通过缓存读取"""
+        cache = MagicMock()
+        cache.get.return_value = "缓存备注"
+        handler = FolderCommentHandler(cache=cache)
+
+        assert handler.get_comment("/folder") == "缓存备注"
+        cache.get.assert_called_once()
+
+    def test_set_comment_invalidates_cache(self):
+        """测试设置备注后使缓存失效"""
+        cache = MagicMock()
+        with (
+            patch("os.path.isdir", return_value=True),
+            patch.object(FolderCommentHandler, "_set_comment_desktop_ini", return_value=True),
+        ):
+            handler = FolderCommentHandler(cache=cache)
+            handler.set_comment("/folder", "备注")
+
+        cache.invalidate.assert_called_once_with("/folder")
+
     def test_max_comment_length_constant(self):
         """测试最大备注长度常量"""
         assert MAX_COMMENT_LENGTH == 260
+
+
+@pytest.mark.unit
+class TestNoOpWrite:
+    """重复应用相同备注时跳过写入的测试"""
+
+    ALL_ATTRIBUTES = FILE_ATTRIBUTE_READONLY | FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+
+    def test_unchanged_skips_all_io(self, tmp_path, capsys):
+        """测试内容和属性均未变化时不写文件、不改属性"""
+        DesktopIniHandler.write_info_tip(str(tmp_path), "备注")
+        with (
+            patch.object(
+                DesktopIniHandler, "get_file_attributes", return_value=self.ALL_ATTRIBUTES
+            ),
+            patch.object(DesktopIniHandler, "write_info_tip") as mock_write,
+            patch.object(DesktopIniHandler, "clear_file_attributes") as mock_clear,
+            patch.object(DesktopIniHandler, "set_folder_system_attributes") as mock_folder,
+        ):
+            status = FolderCommentHandler(reporter=ConsoleReporter()).apply_comment(
+                str(tmp_path), "备注"
+            )
+
+        assert status is WriteStatus.UNCHANGED
+        mock_write.assert_not_called()
+        mock_clear.assert_not_called()
+        mock_folder.assert_not_called()
+        assert "未变化" in capsys.readouterr().out
+
+    def test_different_remark_is_written(self, tmp_path):
+        """测试备注不同时正常写入"""
+        DesktopIniHandler.write_info_tip(str(tmp_path), "旧备注")
+        with (
+            patch.object(
+                DesktopIniHandler, "get_file_attributes", return_value=self.ALL_ATTRIBUTES
+            ),
+            patch.object(DesktopIniHandler, "clear_file_attributes", return_value=True),
+            patch.object(DesktopIniHandler, "set_file_hidden_system_attributes", return_value=True),
+            patch.object(DesktopIniHandler, "set_folder_system_attributes", return_value=True),
+        ):
+            status = FolderCommentHandler().apply_comment(str(tmp_path), "新备注")
+
+        assert status is WriteStatus.UPDATED
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "新备注"
+
+    @pytest.mark.parametrize(
+        "attributes",
+        [None, FILE_ATTRIBUTE_READONLY, FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM],
+    )
+    def test_missing_attributes_not_current(self, tmp_path, attributes):
+        """测试属性缺失或无法读取时仍需写入"""
+        DesktopIniHandler.write_info_tip(str(tmp_path), "备注")
+        with patch.object(DesktopIniHandler, "get_file_attributes", return_value=attributes):
+            assert FolderCommentHandler.is_comment_current(str(tmp_path), "备注") is False
+
+    def test_non_utf16_file_not_current(self, tmp_path):
+        """测试非 UTF-16 文件需要转换，不视为未变化"""
+        (tmp_path / "desktop.ini").write_bytes(b"[.ShellClassInfo]\r\nInfoTip=remark\r\n")
+        with patch.object(
+            DesktopIniHandler, "get_file_attributes", return_value=self.ALL_ATTRIBUTES
+        ):
+            assert FolderCommentHandler.is_comment_current(str(tmp_path), "remark") is False
+
+
+@pytest.mark.unit
+class TestEncodingPolicy:
+    """处理器编码策略测试"""
+
+    def test_convert_records_report(self, tmp_path):
+        """测试处理器把策略传递到存储层并汇总报告"""
+        (tmp_path / "desktop.ini").write_bytes("[.ShellClassInfo]\r\nInfoTip=旧\r\n".encode("gbk"))
+        handler = FolderCommentHandler(
+            attributes=MemoryAttributeBackend(), encoding_policy=EncodingPolicy.CONVERT
+        )
+
+        with patch("builtins.input") as mock_input:
+            assert handler.set_comment(str(tmp_path), "新备注") is True
+            mock_input.assert_not_called()
+
+        assert len(handler.encoding_report.converted) == 1
+        assert DesktopIniHandler.read_info_tip(str(tmp_path)) == "新备注"
+
+    def test_fail_propagates(self, tmp_path):
+        """测试 FAIL 策略的异常从处理器抛出"""
+        (tmp_path / "desktop.ini").write_bytes(b"[.ShellClassInfo]\r\nInfoTip=old\r\n")
+        handler = FolderCommentHandler(
+            attributes=MemoryAttributeBackend(), encoding_policy=EncodingPolicy.FAIL
+        )
+
+        with pytest.raises(NonUtf16DesktopIni):
+            handler.set_comment(str(tmp_path), "新备注")
+        with pytest.raises(NonUtf16DesktopIni):
+            handler.delete_comment(str(tmp_path))
+
+    def test_unanswered_prompt_reported(self, tmp_path):
+        """测试默认 PROMPT 策略下报告器不能交互时返回失败并报告，不抛出异常"""
+        original = "[.ShellClassInfo]\r\nInfoTip=旧\r\n".encode("gbk")
+        (tmp_path / "desktop.ini").write_bytes(original)
+        reporter = BufferedReporter()
+        handler = FolderCommentHandler(attributes=MemoryAttributeBackend(), reporter=reporter)
+
+        with patch("builtins.input", side_effect=AssertionError("input() called")):
+            assert handler.set_comment(str(tmp_path), "新备注") is False
+            assert handler.apply_comment(str(tmp_path), "新备注") is WriteStatus.FAILED
+            assert handler.delete_comment(str(tmp_path)) is False
+
+        assert (tmp_path / "desktop.ini").read_bytes() == original
+        assert len(handler.encoding_report.failed) == 3
+        errors = [m.render() for m in reporter.messages if m.level is Level.ERROR]
+        assert len(errors) == 3
+        assert all("不是 UTF-16 编码，未修改备注" in text for text in errors)
+
+    @pytest.mark.parametrize("policy", [EncodingPolicy.PROMPT, EncodingPolicy.FAIL])
+    def test_failed_rewrite_restores_attributes(self, tmp_path, policy):
+        """测试改写失败（包括抛出异常）后恢复 desktop.ini 的隐藏和系统属性"""
+        desktop_ini = tmp_path / "desktop.ini"
+        desktop_ini.write_bytes("[.ShellClassInfo]\r\nInfoTip=旧\r\n".encode("gbk"))
+        hidden_system = FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+        attributes = MemoryAttributeBackend({str(desktop_ini): hidden_system})
+        handler = FolderCommentHandler(attributes=attributes, encoding_policy=policy)
+
+        for operation in (
+            lambda: handler.set_comment(str(tmp_path), "新备注"),
+            lambda: handler.delete_comment(str(tmp_path)),
+        ):
+            with contextlib.suppress(NonUtf16DesktopIni):
+                assert operation() is False
+            assert attributes.get(str(desktop_ini)) == hidden_system
+
+
+@pytest.mark.unit
+class TestBatch:
+    """批量接口测试"""
+
+    @pytest.fixture
+    def handler(self, tmp_path):
+        return FolderCommentHandler(
+            attributes=MemoryAttributeBackend(),
+            locks=FolderLocks(lock_dir=str(tmp_path / "locks")),
+            max_workers=4,
+        )
+
+    def test_set_get_delete(self, handler, tmp_path, capsys):
+        """测试批量设置、读取、删除，结果按输入顺序且不输出"""
+        folders = []
+        for i in range(10):
+            (tmp_path / f"f{i}").mkdir()
+            folders.append(str(tmp_path / f"f{i}"))
+
+        results = handler.set_comments({f: f"备注{i}" for i, f in enumerate(folders)})
+        assert [r.folder_path for r in results] == folders
+        assert all(r.status is WriteStatus.UPDATED for r in results)
+        assert all(r.bytes_written > 0 for r in results)
+
+        again = handler.set_comments([(folders[0], "备注0")])
+        assert again[0].status is WriteStatus.UNCHANGED
+
+        read = handler.get_comments(folders)
+        assert [r.comment for r in read] == [f"备注{i}" for i in range(10)]
+
+        deleted = handler.delete_comments([*folders, folders[0]])
+        assert all(r.ok for r in deleted)
+        assert handler.get_comments(folders[:1])[0].comment is None
+        assert capsys.readouterr().out == ""
+
+    def test_errors(self, handler, tmp_path):
+        """测试错误类型"""
+        (tmp_path / "file.txt").write_text("x")
+        (tmp_path / "gbk").mkdir()
+        (tmp_path / "gbk" / "desktop.ini").write_bytes(
+            "[.ShellClassInfo]\r\nInfoTip=旧\r\n".encode("gbk")
+        )
+        handler.encoding_policy = EncodingPolicy.FAIL
+
+        results = handler.set_comments(
+            [(str(tmp_path / "file.txt"), "备注"), (str(tmp_path / "gbk"), "备注")]
+        )
+
+        assert [r.error for r in results] == [ErrorKind.NOT_A_FOLDER, ErrorKind.ENCODING]
+        assert not any(r.ok for r in results)
+
+    def test_non_utf16_never_prompts(self, handler, tmp_path, capsys):
+        """测试默认编码策略下批量操作不询问，UTF-8 desktop.ini 记录为编码错误"""
+        content = "[.ShellClassInfo]\r\nInfoTip=旧备注\r\n".encode()
+        folders = []
+        for i in range(4):
+            (tmp_path / f"f{i}").mkdir()
+            (tmp_path / f"f{i}" / "desktop.ini").write_bytes(content)
+            folders.append(str(tmp_path / f"f{i}"))
+
+        with patch("builtins.input", side_effect=AssertionError("prompted")) as mock_input:
+            written = handler.set_comments(dict.fromkeys(folders, "新备注"))
+            deleted = handler.delete_comments(folders)
+            mock_input.assert_not_called()
+
+        assert [r.error for r in written + deleted] == [ErrorKind.ENCODING] * 8
+        assert all((tmp_path / f"f{i}" / "desktop.ini").read_bytes() == content for i in range(4))
+        assert len(handler.encoding_report.failed) == 8
+        assert capsys.readouterr().out == ""
+
+        handler.encoding_policy = EncodingPolicy.SKIP
+        assert handler.set_comments([(folders[0], "新备注")])[0].error is ErrorKind.ENCODING
+
+    def test_cancel_and_deadline(self, handler, tmp_path):
+        """测试取消和超时时未执行的项按输入顺序记录为 CANCELLED / TIMEOUT"""
+        folders = [str(tmp_path / f"f{i}") for i in range(3)]
+        for folder in folders:
+            os.mkdir(folder)
+
+        token = CancellationToken()
+        token.cancel()
+        results = handler.set_comments([(f, "备注") for f in folders], token=token)
+        assert [r.folder_path for r in results] == folders
+        assert all(r.error is ErrorKind.CANCELLED and r.comment == "备注" for r in results)
+        assert handler.get_comments(folders)[0].comment is None
+
+        results = handler.get_comments(folders, token=Deadline(0))
+        assert all(r.error is ErrorKind.TIMEOUT for r in results)
+
+    def test_adaptive_concurrency(self, handler, tmp_path):
+        """测试共享的自适应并发控制器记录批量操作，显式线程数时不使用"""
+        folders = [str(tmp_path / f"f{i}") for i in range(10)]
+        for folder in folders:
+            os.mkdir(folder)
+        handler.concurrency = AdaptiveConcurrency(max_limit=4)
+
+        handler.set_comments(dict.fromkeys(folders, "备注"))
+        handler.get_comments([*folders, str(tmp_path / "missing")])
+        metrics = handler.concurrency.metrics()
+        assert metrics.completed == 21
+        # 路径不存在是确定性的失败，不表示存储压力
+        assert metrics.errors == 0
+
+        handler.get_comments(folders, max_workers=2)
+        assert handler.concurrency.metrics().completed == 21
+
+    def test_progress(self, handler, tmp_path):
+        """测试进度回调，结束时总会回调一次"""
+        folders = [str(tmp_path / f"f{i}") for i in range(5)]
+        for folder in folders:
+            os.mkdir(folder)
+        updates = []
+        handler.get_comments(folders, progress=updates.append)
+        assert updates[0].total == 5
+        assert updates[-1].finished
+        assert updates[-1].done == 5
+
+    def test_write_failure(self, handler, tmp_path):
+        """测试写入失败记录为 WRITE"""
+        with patch.object(DesktopIniHandler, "write_info_tip", return_value=False):
+            (result,) = handler.set_comments({str(tmp_path): "备注"})
+        assert result.status is WriteStatus.FAILED
+        assert result.error is ErrorKind.WRITE
+
+    def test_long_comment_truncated(self, handler, tmp_path):
+        """测试批量接口静默截断过长备注"""
+        (result,) = handler.set_comments({str(tmp_path): "a" * (MAX_COMMENT_LENGTH + 5)})
+        assert result.ok
+        assert handler.get_comment(str(tmp_path)) == "a" * MAX_COMMENT_LENGTH
+
+
+@pytest.mark.unit
+class TestReporter:
+    """处理器消息报告测试"""
+
+    def test_default_is_silent(self, tmp_path, capsys):
+        """测试库的默认报告器不输出任何内容"""
+        handler = FolderCommentHandler(attributes=MemoryAttributeBackend())
+        assert handler.set_comment(str(tmp_path), "备注") is True
+        assert handler.delete_comment(str(tmp_path)) is True
+        assert capsys.readouterr().out == ""
+
+    def test_buffered_reporter(self, tmp_path):
+        """测试消息模板和参数被收集，渲染时才翻译"""
+        reporter = BufferedReporter()
+        handler = FolderCommentHandler(attributes=MemoryAttributeBackend(), reporter=reporter)
+
+        handler.set_comment(str(tmp_path), "备注")
+
+        first = reporter.messages[0]
+        assert first.template == "Remark [{remark}] has been set for folder [{folder_path}]"
+        assert first.params == {"remark": "备注", "folder_path": str(tmp_path)}
+        assert "设置备注 [备注]" in reporter.render()[0]
@@ -0,0 +1,84 @@
+"""desktop.ini 文档模型单元测试"""
+
+import pytest
+
+from remark.storage.ini_document import DesktopIniDocument, LineKind
+
+
+@pytest.mark.unit
+class TestDesktopIniDocument:
+    """文档模型测试"""
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "",
+            "[.ShellClassInfo]\r\nInfoTip=备注\r\n",
+            "[.ShellClassInfo]\nInfoTip=备注",
+            "; comment\r\n\r\n[.ShellClassInfo]\r\nIconResource=a.dll,0\n[ViewState]\rMode=\r\n",
+            "garbage line\r\n[.ShellClassInfo]\r\n",
+        ],
+    )
+    def test_round_trip(self, content):
+        """测试解析后原样序列化"""
+        assert DesktopIniDocument.parse(content).serialize() == content
+
+    def test_parse_line_kinds(self):
+        """测试行类型识别"""
+        doc = DesktopIniDocument.parse("; c\r\n\r\n[Sec]\r\nKey = Value\r\nstray\r\n")
+        kinds = [line.kind for line in doc.iter_lines()]
+        assert kinds == [
+            LineKind.COMMENT,
+            LineKind.BLANK,
+            LineKind.SECTION,
+            LineKind.PROPERTY,
+            LineKind.OTHER,
+        ]
+
+    def test_get_case_insensitive(self):
+        """测试段落名和键名不区分大小写"""
+        doc = DesktopIniDocument.parse("[.shellclassinfo]\r\ninfotip = 备注\r\n")
+        assert doc.get(".ShellClassInfo", "InfoTip") == "备注"
+        assert doc.get(".ShellClassInfo", "IconResource") is None
+        assert doc.get("Other", "InfoTip", "default") == "default"
+
+    def test_set_updates_first_and_drops_duplicates(self):
+        """测试更新已有键时删除重复行"""
+        doc = DesktopIniDocument.parse("[.ShellClassInfo]\nInfoTip=a\nInfoTip=b\nLogo=x\n")
+        doc.set(".ShellClassInfo", "InfoTip", "c")
+
+        assert doc.serialize() == "[.ShellClassInfo]\nInfoTip=c\nLogo=x\n"
+        assert doc.get_all(".ShellClassInfo", "InfoTip") == ["c"]
+
+    def test_set_inserts_after_header(self):
+        """测试新增键插入到段落头之后，并沿用文件的行尾符"""
+        doc = DesktopIniDocument.parse("[.ShellClassInfo]\nIconResource=a.dll,0\n")
+        doc.set(".ShellClassInfo", "InfoTip", "备注")
+
+        assert doc.serialize() == "[.ShellClassInfo]\nInfoTip=备注\nIconResource=a.dll,0\n"
+
+    def test_set_creates_section(self):
+        """测试段落不存在时在末尾新建，不丢失已有内容"""
+        doc = DesktopIniDocument.parse("[ViewState]\r\nMode=")
+        doc.set(".ShellClassInfo", "InfoTip", "备注")
+
+        assert doc.serialize() == "[ViewState]\r\nMode=\r\n[.ShellClassInfo]\r\nInfoTip=备注\r\n"
+
+    def test_remove(self):
+        """测试删除键"""
+        doc = DesktopIniDocument.parse("[.ShellClassInfo]\r\nInfoTip=a\r\ninfotip=b\r\n")
+
+        assert doc.remove(".ShellClassInfo", "InfoTip") is True
+        assert doc.remove(".ShellClassInfo", "InfoTip") is False
+        assert doc.serialize() == "[.ShellClassInfo]\r\n"
+
+    def test_is_empty(self):
+        """测试空文档判断"""
+        doc = DesktopIniDocument.parse("[.ShellClassInfo]\r\n\r\n")
+        assert doc.is_empty(ignored_sections=[".ShellClassInfo"]) is True
+        assert doc.is_empty() is False
+
+    def test_line_endings(self):
+        """测试收集行尾符"""
+        doc = DesktopIniDocument.parse("[a]\r\nb=1\nc=2")
+        assert doc.line_endings() == {"\r\n", "\n"}
@@ -0,0 +1,35 @@
+"""inotify 绑定单元测试"""
+
+import pytest
+
+from remark.utils.inotify import (
+    IN_CREATE,
+    IN_DELETE,
+    IN_ISDIR,
+    Inotify,
+    inotify_available,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+class TestInotify:
+    """inotify 测试"""
+
+    def test_events(self, tmp_path):
+        """测试读取新建和删除事件"""
+        with Inotify() as inotify:
+            wd = inotify.add_watch(str(tmp_path), IN_CREATE | IN_DELETE)
+            assert inotify.read(timeout=0) == []
+
+            (tmp_path / "folder").mkdir()
+            (tmp_path / "folder").rmdir()
+            events = inotify.read(timeout=1.0)
+        assert [(e.wd, e.name) for e in events] == [(wd, "folder"), (wd, "folder")]
+        assert events[0].mask == IN_CREATE | IN_ISDIR
+        assert events[1].mask == IN_DELETE | IN_ISDIR
+
+    def test_missing_path(self, tmp_path):
+        """测试监视不存在的路径时抛出 OSError"""
+        with Inotify() as inotify, pytest.raises(OSError):
+            inotify.add_watch(str(tmp_path / "missing"), IN_CREATE)
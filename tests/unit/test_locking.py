@@ -0,0 +1,272 @@
+"""文件夹锁与争用重试单元测试"""
+
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from remark.core.folder_handler import FolderCommentHandler
+from remark.storage.atomic import atomic_write
+from remark.storage.attributes import MemoryAttributeBackend
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.storage.locking import (
+    ERROR_SHARING_VIOLATION,
+    FolderLocks,
+    LockStats,
+    LockTimeout,
+    RetryPolicy,
+    _try_lock_file,
+    default_lock_dir,
+    is_sharing_violation,
+)
+from remark.utils.reporter import ConsoleReporter
+
+
+def sharing_violation():
+    """构造 Windows 共享冲突异常"""
+    error = PermissionError(13, "The process cannot access the file")
+    error.winerror = ERROR_SHARING_VIOLATION
+    return error
+
+
+@pytest.mark.unit
+class TestRetryPolicy:
+    """重试策略测试"""
+
+    def test_is_sharing_violation(self):
+        """测试共享冲突识别"""
+        assert is_sharing_violation(sharing_violation()) is True
+        assert is_sharing_violation(PermissionError(13, "denied")) is False
+        assert is_sharing_violation(ValueError()) is False
+
+    def test_retry_until_success(self):
+        """测试共享冲突后重试成功"""
+        stats = LockStats()
+        func = MagicMock(side_effect=[sharing_violation(), sharing_violation(), "ok"])
+        policy = RetryPolicy(attempts=5, initial_delay=0.01, backoff=2.0, stats=stats)
+
+        with patch("remark.storage.locking.time.sleep") as mock_sleep:
+            assert policy.run(func) == "ok"
+
+        assert func.call_count == 3
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.01, 0.02]
+        assert stats.retries == 2
+        assert stats.retry_failures == 0
+
+    def test_retry_exhausted(self):
+        """测试重试次数耗尽后抛出原异常"""
+        stats = LockStats()
+        func = MagicMock(side_effect=sharing_violation())
+        policy = RetryPolicy(attempts=3, initial_delay=0.5, max_delay=0.6, stats=stats)
+
+        with (
+            patch("remark.storage.locking.time.sleep") as mock_sleep,
+            pytest.raises(PermissionError),
+        ):
+            policy.run(func)
+
+        assert func.call_count == 3
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 0.6]
+        assert stats.retry_failures == 1
+
+    def test_other_errors_not_retried(self):
+        """测试其他错误不重试"""
+        func = MagicMock(side_effect=FileNotFoundError())
+        with pytest.raises(FileNotFoundError):
+            RetryPolicy().run(func)
+        func.assert_called_once()
+
+    def test_atomic_write_retries_replace(self, tmp_path):
+        """测试原子写入在替换遇到共享冲突时重试"""
+        target = tmp_path / "desktop.ini"
+        real_replace = os.replace
+        calls = []
+
+        def flaky_replace(src, dst):
+            calls.append(src)
+            if len(calls) == 1:
+                raise sharing_violation()
+            real_replace(src, dst)
+
+        with (
+            patch("os.replace", side_effect=flaky_replace),
+            patch("remark.storage.locking.time.sleep"),
+        ):
+            atomic_write(str(target), b"data", retry=RetryPolicy(initial_delay=0))
+
+        assert target.read_bytes() == b"data"
+        assert len(calls) == 2
+
+
+@pytest.mark.unit
+class TestFolderLocks:
+    """文件夹锁测试"""
+
+    def test_mutual_exclusion(self, tmp_path):
+        """测试同一文件夹的持有者互斥"""
+        locks = FolderLocks(lock_dir=str(tmp_path / "locks"))
+        active = []
+        overlaps = []
+
+        def worker():
+            for _ in range(20):
+                with locks.hold(str(tmp_path)):
+                    active.append(1)
+                    if len(active) > 1:
+                        overlaps.append(1)
+                    time.sleep(0.0005)
+                    active.pop()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert overlaps == []
+        stats = locks.stats.snapshot()
+        assert stats.acquisitions == 80
+        assert stats.contentions > 0
+
+    def test_cross_process_lock_file(self, tmp_path):
+        """测试持有锁时锁文件已被锁定，释放后可再次锁定"""
+        locks = FolderLocks(lock_dir=str(tmp_path / "locks"))
+        folder = str(tmp_path)
+
+        with locks.hold(folder):
+            fd = os.open(locks.lock_path(folder), os.O_RDWR)
+            try:
+                assert _try_lock_file(fd) is False
+            finally:
+                os.close(fd)
+
+        fd = os.open(locks.lock_path(folder), os.O_RDWR)
+        try:
+            assert _try_lock_file(fd) is True
+        finally:
+            os.close(fd)
+
+    def test_timeout(self, tmp_path):
+        """测试等待超时"""
+        holder = FolderLocks(lock_dir=str(tmp_path / "locks"))
+        waiter = FolderLocks(lock_dir=str(tmp_path / "locks"), timeout=0.05)
+        with holder.hold(str(tmp_path)), pytest.raises(LockTimeout), waiter.hold(str(tmp_path)):
+            pass
+        assert waiter.stats.snapshot().timeouts == 1
+
+    def test_different_folders_independent(self, tmp_path):
+        """测试不同文件夹互不阻塞"""
+        locks = FolderLocks(lock_dir=str(tmp_path / "locks"), timeout=0.05)
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        with locks.hold(str(tmp_path / "a")), locks.hold(str(tmp_path / "b")):
+            pass
+        assert locks.stats.snapshot().contentions == 0
+
+    def test_striped_lock_files(self, tmp_path):
+        """测试锁文件数不超过条带数，同一条带的不同文件夹在进程内互不阻塞"""
+        lock_dir = tmp_path / "locks"
+        locks = FolderLocks(lock_dir=str(lock_dir), timeout=0.05, stripes=4)
+        for i in range(50):
+            with locks.hold(str(tmp_path / f"folder{i}")):
+                pass
+        assert len(os.listdir(lock_dir)) <= 4
+
+        single = FolderLocks(lock_dir=str(lock_dir), timeout=0.05, stripes=1)
+        lock_path = single.lock_path(str(tmp_path / "a"))
+        assert single.lock_path(str(tmp_path / "b")) == lock_path
+        with single.hold(str(tmp_path / "a")), single.hold(str(tmp_path / "b")):
+            fd = os.open(lock_path, os.O_RDWR)
+            try:
+                assert _try_lock_file(fd) is False
+            finally:
+                os.close(fd)
+        fd = os.open(lock_path, os.O_RDWR)
+        try:
+            assert _try_lock_file(fd) is True
+        finally:
+            os.close(fd)
+
+    def test_default_lock_dir(self, monkeypatch, tmp_path):
+        """测试默认锁目录：环境变量优先，Windows 上使用所有账户共用的 ProgramData"""
+        monkeypatch.setenv("REMARK_LOCK_DIR", str(tmp_path))
+        assert default_lock_dir() == str(tmp_path)
+
+        monkeypatch.delenv("REMARK_LOCK_DIR")
+        monkeypatch.setenv("PROGRAMDATA", str(tmp_path / "ProgramData"))
+        with patch("remark.storage.locking.sys.platform", "win32"):
+            assert default_lock_dir().startswith(str(tmp_path / "ProgramData"))
+        with patch("remark.storage.locking.sys.platform", "linux"):
+            assert default_lock_dir().startswith(tempfile.gettempdir())
+
+    def test_read_only_lock_file(self, tmp_path):
+        """测试其他账户创建、只能读取的锁文件仍可加锁"""
+        locks = FolderLocks(lock_dir=str(tmp_path / "locks"))
+        folder = str(tmp_path)
+        real_open = os.open
+
+        def open_without_write(path, flags, *args):
+            if flags & os.O_RDWR:
+                raise PermissionError(13, "Access is denied", path)
+            return real_open(path, flags, *args)
+
+        with locks.hold(folder):
+            pass
+        with patch("remark.storage.locking.os.open", open_without_write), locks.hold(folder):
+            fd = real_open(locks.lock_path(folder), os.O_RDONLY)
+            try:
+                assert _try_lock_file(fd) is False
+            finally:
+                os.close(fd)
+
+
+@pytest.mark.unit
+class TestHandlerLocking:
+    """处理器并发写入测试"""
+
+    def test_parallel_set_comment(self, tmp_path):
+        """测试多线程同时设置同一文件夹的备注，文件始终完整"""
+        handler = FolderCommentHandler(
+            attributes=MemoryAttributeBackend(),
+            locks=FolderLocks(lock_dir=str(tmp_path / "locks")),
+        )
+        folder = tmp_path / "folder"
+        folder.mkdir()
+        remarks = [f"备注{i}" for i in range(8)]
+
+        with patch("builtins.print"):
+            threads = [
+                threading.Thread(target=handler.set_comment, args=(str(folder), remark))
+                for remark in remarks
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert DesktopIniHandler.read_info_tip(str(folder)) in remarks
+        assert handler.lock_stats.acquisitions == len(remarks)
+
+    def test_lock_timeout_fails(self, tmp_path, capsys):
+        """测试等待锁超时时返回失败"""
+        locks = FolderLocks(lock_dir=str(tmp_path / "locks"), timeout=0.01)
+        handler = FolderCommentHandler(
+            attributes=MemoryAttributeBackend(), locks=locks, reporter=ConsoleReporter()
+        )
+
+        with locks.hold(str(tmp_path)):
+            assert handler.set_comment(str(tmp_path), "备注") is False
+            assert handler.delete_comment(str(tmp_path)) is False
+
+        assert "等待文件夹锁超时" in capsys.readouterr().out
+
+    def test_retry_stats_shared(self, tmp_path):
+        """测试处理器的重试次数计入锁统计"""
+        handler = FolderCommentHandler(
+            locks=FolderLocks(lock_dir=str(tmp_path / "locks")),
+            retry=RetryPolicy(initial_delay=0),
+        )
+        assert handler.retry.stats is handler.locks.stats
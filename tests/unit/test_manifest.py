@@ -0,0 +1,139 @@
+"""备注清单单元测试"""
+
+import os
+
+import pytest
+
+from remark.core.folder_handler import FolderCommentHandler
+from remark.core.manifest import (
+    ManifestEntry,
+    ManifestError,
+    PlanAction,
+    apply_plan,
+    load_manifest,
+    parse_manifest,
+    plan_reconcile,
+)
+from remark.storage.attributes import MemoryAttributeBackend
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.storage.locking import FolderLocks
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return FolderCommentHandler(
+        attributes=MemoryAttributeBackend(),
+        locks=FolderLocks(lock_dir=str(tmp_path / "locks")),
+    )
+
+
+@pytest.mark.unit
+class TestParseManifest:
+    """清单解析测试"""
+
+    def test_toml(self, tmp_path):
+        """测试 TOML 清单和 root"""
+        text = 'root = "projects"\nabsent = ["old"]\n\n[remarks]\n"alpha" = "Alpha 项目"\n'
+        entries = parse_manifest(text, "toml", str(tmp_path))
+        base = tmp_path / "projects"
+        assert entries == [
+            ManifestEntry(str(base / "alpha"), "Alpha 项目"),
+            ManifestEntry(str(base / "old"), None),
+        ]
+
+    def test_json_shorthand(self, tmp_path):
+        """测试 JSON 简写形式，null 表示应当没有备注"""
+        entries = parse_manifest('{"a": "备注", "b": null}', "json", str(tmp_path))
+        assert [(os.path.basename(e.path), e.remark) for e in entries] == [
+            ("a", "备注"),
+            ("b", None),
+        ]
+
+    def test_csv(self, tmp_path):
+        """测试 CSV 清单：表头、引号中的逗号、空备注"""
+        text = 'path,remark\na,"一,二"\nb,\n\n'
+        entries = parse_manifest(text, "csv", str(tmp_path))
+        assert [(os.path.basename(e.path), e.remark) for e in entries] == [
+            ("a", "一,二"),
+            ("b", None),
+        ]
+
+    @pytest.mark.parametrize(
+        "text,fmt",
+        [
+            ('{"a": "x", "./a": "y"}', "json"),
+            ('{"remarks": {"a": 1}}', "json"),
+            ("a,b,c\n", "csv"),
+            ("[remarks", "toml"),
+            ("a", "yaml"),
+        ],
+    )
+    def test_invalid(self, tmp_path, text, fmt):
+        """测试重复路径、错误类型和语法错误"""
+        with pytest.raises(ManifestError):
+            parse_manifest(text, fmt, str(tmp_path))
+
+    def test_load_by_extension(self, tmp_path):
+        """测试按扩展名识别格式，相对路径以清单所在目录为基准"""
+        manifest = tmp_path / "remarks.json"
+        manifest.write_text('{"a": "备注"}', encoding="utf-8")
+        assert load_manifest(str(manifest)) == [ManifestEntry(str(tmp_path / "a"), "备注")]
+        with pytest.raises(ManifestError):
+            load_manifest(str(tmp_path / "remarks.txt"))
+
+
+@pytest.mark.unit
+class TestReconcile:
+    """计划与应用测试"""
+
+    def test_plan_and_apply(self, tmp_path, handler):
+        """测试计划覆盖所有操作，应用后再次计划没有差异"""
+        for name in ("new", "same", "changed", "stale", "clean"):
+            (tmp_path / name).mkdir()
+        handler.set_comment(str(tmp_path / "same"), "不变")
+        handler.set_comment(str(tmp_path / "changed"), "旧")
+        handler.set_comment(str(tmp_path / "stale"), "过期")
+        entries = [
+            ManifestEntry(str(tmp_path / "new"), "新"),
+            ManifestEntry(str(tmp_path / "same"), "不变"),
+            ManifestEntry(str(tmp_path / "changed"), "新值"),
+            ManifestEntry(str(tmp_path / "stale"), None),
+            ManifestEntry(str(tmp_path / "clean"), None),
+            ManifestEntry(str(tmp_path / "gone"), "x"),
+        ]
+
+        plan = plan_reconcile(entries, handler, max_workers=2)
+
+        assert [item.action for item in plan.items] == [
+            PlanAction.CREATE,
+            PlanAction.UNCHANGED,
+            PlanAction.UPDATE,
+            PlanAction.DELETE,
+            PlanAction.UNCHANGED,
+            PlanAction.MISSING,
+        ]
+        assert plan.items[2].current == "旧"
+
+        results = apply_plan(plan, handler)
+        assert len(results) == 3
+        assert all(result.ok for result in results)
+        assert DesktopIniHandler.read_info_tip(str(tmp_path / "changed")) == "新值"
+        assert DesktopIniHandler.read_info_tip(str(tmp_path / "stale")) is None
+        assert plan_reconcile(entries, handler).changes == []
+
+    def test_surrounding_whitespace(self, tmp_path, handler):
+        """测试期望的备注与读回的值一样去掉首尾空白，应用后不再计划更新"""
+        for name in ("padded", "blank"):
+            (tmp_path / name).mkdir()
+        entries = [
+            ManifestEntry(str(tmp_path / "padded"), "  备注 \t"),
+            ManifestEntry(str(tmp_path / "blank"), "   "),
+        ]
+
+        plan = plan_reconcile(entries, handler)
+        assert [item.action for item in plan.items] == [PlanAction.CREATE, PlanAction.UNCHANGED]
+        assert plan.items[0].desired == "备注"
+
+        apply_plan(plan, handler)
+        assert DesktopIniHandler.read_info_tip(str(tmp_path / "padded")) == "备注"
+        assert plan_reconcile(entries, handler).changes == []
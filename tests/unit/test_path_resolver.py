@@ -7,6 +7,7 @@ from pathlib import Path, PureWindowsPath
 
 import pytest
 
+from remark.utils.cancellation import CancellationToken, OperationCancelled
 from remark.utils.path_resolver import find_candidates
 
 
@@ -384,6 +385,14 @@ class TestFindCandidates:
 
         assert len(result) == 0
 
+    def test_cancelled(self):
+        """已取消的令牌使搜索立即停止"""
+        token = CancellationToken()
+        token.cancel()
+
+        with pytest.raises(OperationCancelled):
+            find_candidates(["My", "Folder"], token=token)
+
 
 @pytest.mark.unit
 class TestGetCurrentWorkingPath:
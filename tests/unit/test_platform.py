@@ -1,10 +1,11 @@
 """平台检测单元测试"""
 
+import os
 from unittest.mock import patch
 
 import pytest
 
-from remark.utils.platform import check_platform
+from remark.utils.platform import APP_DIR_NAME, check_platform, user_cache_dir
 
 
 @pytest.mark.unit
@@ -50,3 +51,20 @@ class TestPlatform:
             assert result is False
             captured = capsys.readouterr()
             assert "此工具为 Windows 系统" in captured.out
+
+    def test_user_cache_dir_windows(self, monkeypatch):
+        """测试 Windows 上使用 LOCALAPPDATA"""
+        monkeypatch.setenv("LOCALAPPDATA", os.path.join("C:", "Users", "me", "AppData", "Local"))
+        with patch("remark.utils.platform.platform.system", return_value="Windows"):
+            assert user_cache_dir() == os.path.join(
+                "C:", "Users", "me", "AppData", "Local", APP_DIR_NAME
+            )
+
+    def test_user_cache_dir_xdg(self, monkeypatch, tmp_path):
+        """测试其他系统使用 XDG_CACHE_HOME，未设置时为 ~/.cache"""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        with patch("remark.utils.platform.platform.system", return_value="Linux"):
+            assert user_cache_dir() == os.path.join(str(tmp_path), APP_DIR_NAME)
+            monkeypatch.delenv("XDG_CACHE_HOME")
+            monkeypatch.setenv("HOME", str(tmp_path))
+            assert user_cache_dir() == os.path.join(str(tmp_path), ".cache", APP_DIR_NAME)
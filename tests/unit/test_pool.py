@@ -0,0 +1,107 @@
+"""有界并发执行单元测试"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from remark.utils.cancellation import (
+    CancellationToken,
+    Deadline,
+    DeadlineExceeded,
+    OperationCancelled,
+)
+from remark.utils.pool import bounded_map
+
+
+@pytest.mark.unit
+class TestBoundedMap:
+    """有界并发执行测试"""
+
+    def test_all_results(self):
+        """测试返回全部结果"""
+        assert sorted(bounded_map(lambda x: x * 2, range(50), max_workers=4)) == [
+            x * 2 for x in range(50)
+        ]
+
+    def test_pending_bounded(self):
+        """测试在途任务数不超过上限，生产者被惰性消费"""
+        consumed = []
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def items():
+            for i in range(40):
+                consumed.append(i)
+                yield i
+
+        def work(x):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.001)
+            with lock:
+                active -= 1
+            return x
+
+        results = bounded_map(work, items(), max_workers=2, max_pending=3)
+        next(results)
+        assert len(consumed) <= 4
+        assert len(list(results)) == 39
+        assert peak <= 2
+
+    def test_exception_propagates(self):
+        """测试任务异常在产出时抛出"""
+
+        def work(x):
+            if x == 3:
+                raise ValueError("bad")
+            return x
+
+        with pytest.raises(ValueError):
+            list(bounded_map(work, range(5), max_workers=2))
+
+    def test_invalid_arguments(self):
+        """测试非法参数"""
+        with pytest.raises(ValueError):
+            list(bounded_map(lambda x: x, [1], max_workers=1, max_pending=-1))
+
+    def test_cancel(self):
+        """测试取消后不再提交新任务，已完成的结果先全部产出"""
+        token = CancellationToken()
+        started = []
+        results = []
+
+        def work(x):
+            started.append(x)
+            if x == 5:
+                token.cancel()
+            return x
+
+        with pytest.raises(OperationCancelled):
+            for result in bounded_map(work, range(1000), max_workers=1, max_pending=1, token=token):
+                results.append(result)
+
+        assert len(started) < 1000
+        assert results == started
+
+    def test_deadline_while_waiting(self):
+        """测试慢任务阻塞期间也能及时响应截止时间"""
+        release = threading.Event()
+
+        def slow(x):
+            release.wait(5)
+            return x
+
+        # 调用方提供的执行器不会在取消时等待正在执行的任务
+        executor = ThreadPoolExecutor(max_workers=4)
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            list(bounded_map(slow, range(4), executor=executor, token=Deadline(0.05)))
+        elapsed = time.monotonic() - start
+        release.set()
+        executor.shutdown()
+        assert elapsed < 2
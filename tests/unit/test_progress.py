@@ -0,0 +1,83 @@
+"""进度报告单元测试"""
+
+import pytest
+
+from remark.utils.progress import Progress, ProgressTracker
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestProgress:
+    """进度快照测试"""
+
+    def test_fraction_and_eta(self):
+        """测试完成比例和剩余时间估计"""
+        progress = Progress(done=25, total=100, elapsed=10.0)
+        assert progress.fraction == 0.25
+        assert progress.rate == 2.5
+        assert progress.eta == pytest.approx(30.0)
+
+    def test_bytes_preferred(self):
+        """测试字节总数已知时按字节计算"""
+        progress = Progress(done=1, total=4, bytes_done=90, bytes_total=100, elapsed=9.0)
+        assert progress.fraction == 0.9
+        assert progress.eta == pytest.approx(1.0)
+
+    def test_unknown_total(self):
+        """测试总量未知时无法估计"""
+        progress = Progress(done=10, elapsed=1.0)
+        assert progress.fraction is None
+        assert progress.eta is None
+        assert Progress(total=0).fraction == 1.0
+
+
+@pytest.mark.unit
+class TestProgressTracker:
+    """进度计数器测试"""
+
+    def test_rate_limited(self):
+        """测试按间隔限频，第一次和结束时总会回调"""
+        clock = FakeClock()
+        updates = []
+        tracker = ProgressTracker(updates.append, total=100, interval=1.0, clock=clock)
+
+        for _ in range(20):
+            tracker.advance()
+            clock.now += 0.25
+        assert [p.done for p in updates] == [1, 5, 9, 13, 17]
+
+        tracker.finish()
+        tracker.finish()
+        assert updates[-1].finished
+        assert updates[-1].done == 20
+        assert len(updates) == 6
+
+        tracker.advance()
+        assert len(updates) == 6
+
+    def test_bytes_and_total(self):
+        """测试字节计数和更新总量"""
+        updates = []
+        with ProgressTracker(updates.append, interval=0) as tracker:
+            tracker.advance(items=0, nbytes=10)
+            tracker.set_total(total=3, bytes_total=40)
+            tracker.advance(nbytes=10)
+
+        assert updates[-1] == Progress(1, 3, 20, 40, updates[-1].elapsed, True)
+        assert updates[-1].fraction == 0.5
+
+    def test_no_callback(self):
+        """测试没有回调时只计数"""
+        tracker = ProgressTracker(None)
+        tracker.advance(3)
+        tracker.finish()
+        assert tracker.snapshot().done == 3
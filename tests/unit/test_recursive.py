@@ -0,0 +1,155 @@
+"""递归应用备注模板单元测试"""
+
+import os
+
+import pytest
+
+from remark.core.folder_handler import ErrorKind, FolderCommentHandler, WriteStatus
+from remark.core.recursive import RecursiveRemarkApplier, RemarkTemplate
+from remark.core.stats import FolderStats, FolderStatsEngine
+from remark.storage.attributes import MemoryAttributeBackend
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.storage.locking import FolderLocks
+from remark.utils.cancellation import CancellationToken, OperationCancelled
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    tmp_path/root
+    ├── photos
+    │   └── 2024
+    └── node_modules
+        └── pkg
+    """
+    root = tmp_path / "root"
+    (root / "photos" / "2024").mkdir(parents=True)
+    (root / "node_modules" / "pkg").mkdir(parents=True)
+    return root
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return FolderCommentHandler(
+        attributes=MemoryAttributeBackend(),
+        locks=FolderLocks(lock_dir=str(tmp_path / "locks")),
+    )
+
+
+def remarks(root):
+    """相对路径 -> 备注"""
+    result = {}
+    for path, _dirs, _files in os.walk(root):
+        remark = DesktopIniHandler.read_info_tip(path)
+        if remark is not None:
+            result[os.path.relpath(path, root).replace(os.sep, "/")] = remark
+    return result
+
+
+@pytest.mark.unit
+class TestRemarkTemplate:
+    """备注模板测试"""
+
+    def test_placeholders(self):
+        """测试占位符"""
+        template = RemarkTemplate("{parent}/{name} ({depth:02d})")
+        path = os.path.join("data", "photos", "2024")
+        assert template.render(path, 2) == "photos/2024 (02)"
+        assert template.fields == {"parent", "name", "depth"}
+        assert template.literal is None
+
+    def test_stats_format_specs(self):
+        """测试统计字段的格式说明，空文件夹的 {updated} 忽略格式说明"""
+        template = RemarkTemplate("{files:,} files {updated:%Y-%m}")
+        assert template.render("空", 0, FolderStats()) == "0 files "
+
+    def test_literal(self):
+        """测试不含占位符的模板，字面花括号被还原"""
+        template = RemarkTemplate("归档 {{旧}}")
+        assert template.literal == "归档 {旧}"
+        assert template.render("任意路径", 3) == "归档 {旧}"
+
+    @pytest.mark.parametrize(
+        "template",
+        ["{owner}", "{name.upper}", "{name", "{depth:%Y}", "{name:d}", "{size:%Y}", "{path!x}"],
+    )
+    def test_invalid(self, template):
+        """测试未知占位符、语法错误和无效的格式说明"""
+        with pytest.raises(ValueError):
+            RemarkTemplate(template)
+
+
+@pytest.mark.unit
+class TestRecursiveRemarkApplier:
+    """递归应用测试"""
+
+    def test_apply_tree(self, tree, handler):
+        """测试为整棵树设置模板备注"""
+        summary = RecursiveRemarkApplier(handler, max_workers=2).run(str(tree), "{name}@{depth}")
+
+        assert remarks(tree) == {
+            ".": "root@0",
+            "photos": "photos@1",
+            "photos/2024": "2024@2",
+            "node_modules": "node_modules@1",
+            "node_modules/pkg": "pkg@2",
+        }
+        assert (summary.directories, summary.matched, summary.updated) == (5, 5, 5)
+
+    def test_cancel_keeps_partial_summary(self, tree, handler):
+        """测试取消后停止写入，summary 保留已完成的部分"""
+        token = CancellationToken()
+        applier = RecursiveRemarkApplier(handler, max_workers=1, max_pending=1)
+
+        with pytest.raises(OperationCancelled):
+            applier.run(str(tree), "{name}", on_result=lambda _result: token.cancel(), token=token)
+
+        assert applier.summary.updated == 1
+        assert len(remarks(tree)) == 1
+
+    def test_progress(self, tree, handler):
+        """测试进度回调"""
+        updates = []
+        RecursiveRemarkApplier(handler).run(str(tree), "{name}", progress=updates.append)
+        assert updates[-1].finished
+        assert updates[-1].done == 5
+        assert updates[-1].total is None
+
+    def test_depth_include_exclude(self, tree, handler):
+        """测试深度限制、排除子树和只包含匹配的文件夹"""
+        applier = RecursiveRemarkApplier(handler, exclude=["node_modules"], include=["photos*"])
+        applier.run(str(tree), "相册")
+        assert remarks(tree) == {"photos": "相册", "photos/2024": "相册"}
+
+        summary = RecursiveRemarkApplier(handler, max_depth=0).run(str(tree), "根")
+        assert summary.matched == 1
+        assert DesktopIniHandler.read_info_tip(str(tree)) == "根"
+
+    def test_rerun_unchanged(self, tree, handler):
+        """测试重复应用相同模板时不再写入"""
+        applier = RecursiveRemarkApplier(handler)
+        applier.run(str(tree), "{parent}")
+        summary = applier.run(str(tree), "{parent}")
+        assert summary.unchanged == 5
+        assert summary.updated == 0
+
+    def test_failures_counted(self, tree, handler, monkeypatch):
+        """测试失败按原因汇总"""
+        monkeypatch.setattr(DesktopIniHandler, "write_info_tip", lambda *args: False)
+        results = list(RecursiveRemarkApplier(handler).iter_apply(str(tree), "x"))
+        assert all(r.status is WriteStatus.FAILED for r in results)
+        assert RecursiveRemarkApplier(handler).run(str(tree), "x").errors == {ErrorKind.WRITE: 5}
+
+    def test_stats_template(self, tree, handler):
+        """测试统计字段：每个文件夹使用自己子树的统计"""
+        (tree / "photos" / "2024" / "a.jpg").write_bytes(b"x" * 2048)
+        (tree / "photos" / "b.jpg").write_bytes(b"x" * 10)
+        applier = RecursiveRemarkApplier(handler, stats_engine=FolderStatsEngine())
+
+        applier.run(str(tree), "{size}, {files} files")
+
+        assert remarks(tree)["photos"] == "2.0 KB, 2 files"
+        assert remarks(tree)["photos/2024"] == "2.0 KB, 1 files"
+        assert remarks(tree)["node_modules"] == "0 B, 0 files"
+        with pytest.raises(ValueError):
+            RemarkTemplate("{size}").render(str(tree))
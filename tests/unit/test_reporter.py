@@ -0,0 +1,66 @@
+"""消息报告器单元测试"""
+
+import io
+from unittest.mock import patch
+
+import pytest
+
+from remark.utils.reporter import (
+    BufferedReporter,
+    ConsoleReporter,
+    Level,
+    Message,
+    NullReporter,
+)
+
+
+@pytest.mark.unit
+class TestReporters:
+    """报告器测试"""
+
+    def test_null_reporter_skips_translation(self):
+        """测试空报告器不翻译、不格式化"""
+        with patch("remark.utils.reporter._") as mock_translate:
+            NullReporter().info("Remark deleted successfully")
+            NullReporter().error("Failed to set remark: {error}", error="x")
+        mock_translate.assert_not_called()
+
+    def test_console_reporter(self):
+        """测试控制台报告器翻译并输出"""
+        stream = io.StringIO()
+        ConsoleReporter(stream).info("Remark deleted successfully")
+        assert stream.getvalue() == "备注删除成功\n"
+
+    def test_params_not_reformatted(self):
+        """测试参数中的花括号不会被再次格式化"""
+        message = Message(Level.INFO, "{text}", {"text": "{folder_path}"})
+        assert message.render() == "{folder_path}"
+
+    def test_buffered_replay(self):
+        """测试缓冲报告器按顺序转交消息"""
+        buffered = BufferedReporter()
+        buffered.warning("Failed to set file attributes")
+        buffered.error("Failed to set remark: {error}", error="boom")
+
+        assert [m.level for m in buffered.messages] == [Level.WARNING, Level.ERROR]
+        target = BufferedReporter()
+        buffered.replay(target)
+        assert target.render() == buffered.render()
+        assert "boom" in target.render()[1]
+
+        buffered.clear()
+        assert len(buffered) == 0
+
+    def test_confirm(self):
+        """测试只有控制台报告器会询问，无效输入时重复询问"""
+        assert NullReporter().confirm("Operation cancelled.") is None
+        assert BufferedReporter().confirm("Operation cancelled.") is None
+
+        stream = io.StringIO()
+        with patch("builtins.input", side_effect=["maybe", "N"]) as mock_input:
+            assert ConsoleReporter(stream).confirm("Operation cancelled.") is False
+        assert mock_input.call_count == 2
+        assert stream.getvalue() == "请输入 Y 或 n\n"
+
+        with patch("builtins.input", return_value=""):
+            assert ConsoleReporter(stream).confirm("Operation cancelled.") is True
@@ -0,0 +1,104 @@
+"""紧凑扫描结果单元测试"""
+
+import pytest
+
+from remark.core.scan_results import FolderFlags, ScanResults, collect_remarks
+from remark.storage.desktop_ini import DesktopIniHandler
+
+
+@pytest.mark.unit
+class TestScanResults:
+    """扫描结果容器测试"""
+
+    @pytest.fixture
+    def results(self, tmp_path):
+        results = ScanResults(str(tmp_path))
+        results.add(str(tmp_path / "clients" / "acme"), "Q3 contracts", FolderFlags.HAS_INI)
+        results.add(str(tmp_path / "clients" / "beta"), "合同", FolderFlags.HAS_INI)
+        results.add(str(tmp_path / "clients-old"), "合同", FolderFlags.HAS_INI)
+        results.add(str(tmp_path / "archive"), flags=FolderFlags.HAS_INI | FolderFlags.UNREADABLE)
+        return results
+
+    def test_lookup(self, tmp_path, results):
+        """测试按路径查找备注和状态，上级文件夹自动添加"""
+        assert len(results) == 6
+        assert results.remark_count == 2
+        assert results.get(str(tmp_path / "clients" / "beta")) == "合同"
+        assert results.get(str(tmp_path / "clients")) is None
+        assert str(tmp_path / "clients") in results
+        assert results.flags(str(tmp_path / "clients")) == FolderFlags.NONE
+        assert results.flags(str(tmp_path / "clients" / "acme")) == (
+            FolderFlags.HAS_INI | FolderFlags.HAS_REMARK
+        )
+        assert results.flags(str(tmp_path / "missing")) is None
+        assert str(tmp_path / "clients" / "acme" / "x") not in results
+        assert str(tmp_path.parent) not in results
+
+    def test_iteration(self, tmp_path, results):
+        """测试按添加顺序先序遍历，按子树过滤时不包含名称相同前缀的兄弟文件夹"""
+        assert list(results.iter_remarks()) == [
+            (tmp_path / "clients" / "acme", "Q3 contracts"),
+            (tmp_path / "clients" / "beta", "合同"),
+            (tmp_path / "clients-old", "合同"),
+        ]
+        assert [path for path, _ in results.iter_remarks(str(tmp_path / "clients"))] == [
+            tmp_path / "clients" / "acme",
+            tmp_path / "clients" / "beta",
+        ]
+        assert list(results.iter_folders(FolderFlags.UNREADABLE)) == [
+            (tmp_path / "archive", FolderFlags.HAS_INI | FolderFlags.UNREADABLE)
+        ]
+        assert len(list(results.iter_folders())) == 6
+        assert list(results.iter_remarks(str(tmp_path / "missing"))) == []
+
+    def test_add_outside_root(self, tmp_path, results):
+        """测试添加根目录之外的路径抛出 ValueError"""
+        with pytest.raises(ValueError):
+            results.add(str(tmp_path.parent / "elsewhere"), "外")
+
+    def test_compact(self, tmp_path, results):
+        """测试压缩后仍可添加，相同备注继续去重"""
+        results.compact()
+        results.add(str(tmp_path / "new"), "合同")
+        assert results.remark_count == 2
+        assert results.get(str(tmp_path / "new")) == "合同"
+
+    def test_size(self, tmp_path):
+        """测试每个文件夹占用的空间低于 60 字节"""
+        results = ScanResults(str(tmp_path))
+        for i in range(1000):
+            results.add(str(tmp_path / f"dept-{i % 10}" / f"project-{i:05d}"), f"项目 {i % 50}")
+        results.compact()
+        assert results.nbytes / len(results) < 60
+
+
+@pytest.mark.unit
+class TestCollectRemarks:
+    """目录树扫描测试"""
+
+    def test_collect(self, tmp_path, monkeypatch):
+        """测试记录所有文件夹、备注和无法读取的 desktop.ini"""
+        root = tmp_path / "root"
+        for name in ("a/b", "a/c", "d"):
+            (root / name).mkdir(parents=True)
+        DesktopIniHandler.write_info_tip(str(root / "a" / "b"), "乙")
+        DesktopIniHandler.write_info_tip(str(root / "d"), "丁")
+        DesktopIniHandler.write_info_tip(str(root / "a" / "c"), "丙")
+        read_info_tip = DesktopIniHandler.read_info_tip
+
+        def failing(folder_path):
+            if folder_path == str(root / "a" / "c"):
+                raise PermissionError(folder_path)
+            return read_info_tip(folder_path)
+
+        monkeypatch.setattr(DesktopIniHandler, "read_info_tip", failing)
+        results = collect_remarks(str(root))
+        assert len(results) == 5
+        assert sorted(results.iter_remarks()) == [(root / "a" / "b", "乙"), (root / "d", "丁")]
+        assert results.flags(str(root)) == FolderFlags.NONE
+        assert results.flags(str(root / "a" / "c")) == FolderFlags.HAS_INI | FolderFlags.UNREADABLE
+        assert sorted(path for path, _ in results.iter_folders(FolderFlags.HAS_INI)) == [
+            root / "a" / "b",
+            root / "a" / "c",
+            root / "d",
+        ]
@@ -0,0 +1,106 @@
+"""备注快照单元测试"""
+
+import os
+
+import pytest
+
+from remark.core.catalog import catalog_key
+from remark.core.snapshot import (
+    RemarkSnapshot,
+    SnapshotCommentHandler,
+    SnapshotError,
+    build_snapshot,
+    write_snapshot,
+)
+from remark.storage.desktop_ini import DesktopIniHandler
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "remarks.snapshot")
+
+
+@pytest.mark.unit
+class TestRemarkSnapshot:
+    """快照读写测试"""
+
+    def test_round_trip(self, tmp_path, snapshot_path):
+        """测试跨越多个重启点的查找，相同备注只存一次"""
+        remarks = {str(tmp_path / f"folder{i:03d}"): f"备注 {i % 7}" for i in range(100)}
+        assert write_snapshot(snapshot_path, remarks.items(), root=str(tmp_path)) == 100
+
+        with RemarkSnapshot(snapshot_path) as snapshot:
+            assert len(snapshot) == 100
+            assert snapshot.remark_count == 7
+            assert snapshot.root == str(tmp_path)
+            for path, remark in remarks.items():
+                assert snapshot.get(path) == remark
+            assert snapshot.get(str(tmp_path / "folder100")) is None
+            assert snapshot.get(str(tmp_path / "a")) is None
+            assert str(tmp_path / "folder042") in snapshot
+
+    def test_prefix_listing(self, tmp_path, snapshot_path):
+        """测试按子树列出，不会匹配名称相同前缀的兄弟文件夹"""
+        clients = tmp_path / "clients"
+        remarks = [
+            (str(clients), "客户"),
+            (str(clients / "acme"), "Q3 contracts"),
+            (str(clients / "acme" / "2024"), "合同"),
+            (str(tmp_path / "clients-old"), "旧"),
+            (str(tmp_path / "archive"), "归档"),
+        ]
+        write_snapshot(snapshot_path, remarks)
+
+        with RemarkSnapshot(snapshot_path) as snapshot:
+            listed = list(snapshot.iter_remarks(str(clients)))
+            assert listed == [(catalog_key(path), remark) for path, remark in remarks[:3]]
+            assert len(list(snapshot.iter_remarks())) == 5
+            assert list(snapshot.iter_remarks(str(tmp_path / "missing"))) == []
+
+    def test_empty(self, snapshot_path):
+        """测试空快照"""
+        assert write_snapshot(snapshot_path, []) == 0
+        with RemarkSnapshot(snapshot_path) as snapshot:
+            assert len(snapshot) == 0
+            assert snapshot.get("/anything") is None
+            assert list(snapshot.iter_remarks()) == []
+
+    @pytest.mark.parametrize("content", [b"", b"not a snapshot" * 10])
+    def test_invalid_file(self, snapshot_path, content):
+        """测试不是快照的文件抛出 SnapshotError"""
+        with open(snapshot_path, "wb") as f:
+            f.write(content)
+        with pytest.raises(SnapshotError):
+            RemarkSnapshot(snapshot_path)
+
+    def test_truncated(self, tmp_path, snapshot_path):
+        """测试截断的快照抛出 SnapshotError"""
+        write_snapshot(snapshot_path, [(str(tmp_path / "a"), "甲")])
+        os.truncate(snapshot_path, os.path.getsize(snapshot_path) - 8)
+        with pytest.raises(SnapshotError):
+            RemarkSnapshot(snapshot_path)
+
+
+@pytest.mark.unit
+class TestSnapshotHandler:
+    """由目录树扫描生成快照和只读处理器测试"""
+
+    def test_build_and_read(self, tmp_path, snapshot_path):
+        """测试扫描 desktop.ini 生成快照，处理器只读"""
+        root = tmp_path / "root"
+        for name in ("a", "a/b", "c"):
+            (root / name).mkdir(parents=True)
+        DesktopIniHandler.write_info_tip(str(root / "a"), "甲")
+        DesktopIniHandler.write_info_tip(str(root / "a" / "b"), "乙")
+
+        assert build_snapshot(str(root), snapshot_path) == 2
+        handler = SnapshotCommentHandler(snapshot_path)
+        assert handler.get_comment(str(root / "a" / "b")) == "乙"
+        assert handler.get_comments([str(root / "a"), str(root / "c")]) == ["甲", None]
+        assert handler.supports(str(root / "c"))
+        assert not handler.supports(str(tmp_path))
+        with pytest.raises(PermissionError):
+            handler.set_comment(str(root / "c"), "丙")
+        with pytest.raises(PermissionError):
+            handler.delete_comment(str(root / "a"))
+        handler.snapshot.close()
@@ -0,0 +1,97 @@
+"""文件夹统计单元测试"""
+
+import os
+
+import pytest
+
+from remark.core.stats import FolderStats, FolderStatsEngine, Size, StatsCache
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    root
+    ├── a.txt (10)
+    ├── desktop.ini（不计入）
+    └── sub
+        ├── b.txt (100)
+        └── deep
+            └── c.txt (1000)
+    """
+    root = tmp_path / "root"
+    (root / "sub" / "deep").mkdir(parents=True)
+    (root / "a.txt").write_bytes(b"x" * 10)
+    (root / "desktop.ini").write_bytes(b"x" * 50)
+    (root / "sub" / "b.txt").write_bytes(b"x" * 100)
+    (root / "sub" / "deep" / "c.txt").write_bytes(b"x" * 1000)
+    os.utime(root / "sub" / "deep" / "c.txt", ns=(0, 2_000_000_000_000_000_000))
+    return root
+
+
+@pytest.mark.unit
+class TestFolderStatsEngine:
+    """统计引擎测试"""
+
+    def test_bottom_up_totals(self, tree):
+        """测试每个文件夹的统计包含所有子孙文件夹"""
+        stats = FolderStatsEngine(max_workers=2).compute(str(tree))
+
+        assert stats[str(tree)] == FolderStats(1110, 3, 2, 2_000_000_000_000_000_000)
+        assert stats[os.path.join(str(tree), "sub")].size == 1100
+        assert stats[os.path.join(str(tree), "sub", "deep")].folders == 0
+
+    def test_cache_reuses_unchanged_directories(self, tree, tmp_path):
+        """测试持久化缓存：未变化的目录不重新列举，新增文件的目录重新列举"""
+        # 缓存目录不存在时由 save 创建
+        cache_file = str(tmp_path / "cache" / "stats.json")
+        engine = FolderStatsEngine(StatsCache(cache_file))
+        engine.compute(str(tree))
+        engine.cache.save()
+        assert engine.listed == 3
+
+        engine = FolderStatsEngine(StatsCache(cache_file))
+        assert len(engine.cache) == 3
+        (tree / "sub" / "new.txt").write_bytes(b"x" * 5)
+        sub = tree / "sub"
+        os.utime(sub, ns=(0, sub.stat().st_mtime_ns + 1_000_000_000))
+        stats = engine.compute(str(tree))
+
+        assert (engine.listed, engine.reused) == (1, 2)
+        assert stats[str(tree)].size == 1115
+
+    def test_prune_removed_directories(self, tree):
+        """测试删除的目录从缓存中移除"""
+        engine = FolderStatsEngine()
+        engine.compute(str(tree))
+        (tree / "sub" / "deep" / "c.txt").unlink()
+        (tree / "sub" / "deep").rmdir()
+        engine.compute(str(tree))
+        assert len(engine.cache) == 2
+
+    def test_corrupt_cache_ignored(self, tmp_path):
+        """测试损坏的缓存文件被忽略"""
+        cache_file = tmp_path / "stats.json"
+        cache_file.write_text("{not json", encoding="utf-8")
+        assert len(StatsCache(str(cache_file))) == 0
+
+
+@pytest.mark.unit
+class TestTemplateFields:
+    """模板字段测试"""
+
+    @pytest.mark.parametrize(
+        "size,expected",
+        [(0, "0 B"), (1023, "1023 B"), (1536, "1.5 KB"), (int(12.4 * 1024**3), "12.4 GB")],
+    )
+    def test_size(self, size, expected):
+        """测试易读的大小"""
+        assert str(Size(size)) == expected
+        assert f"{Size(size):,}" == f"{size:,}"
+
+    def test_fields(self):
+        """测试模板字段格式"""
+        fields = FolderStats(1024, 3210, 5, 1_790_000_000_000_000_000).template_fields()
+        text = "{size}, {files:,} files, updated {updated:%Y}".format(**fields)
+        assert text.startswith("1.0 KB, 3,210 files, updated 20")
+        assert FolderStats().template_fields()["updated"] == ""
+        assert "updated {updated:%Y}".format(**FolderStats().template_fields()) == "updated "
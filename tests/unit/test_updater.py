@@ -7,6 +7,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from remark.utils.cancellation import CancellationToken, OperationCancelled
 from remark.utils.constants import UPDATE_CACHE_FILE, UPDATE_CHECK_INTERVAL
 from remark.utils.updater import (
     _create_opener,
@@ -514,6 +515,49 @@ class TestDownloadUpdate:
 
         captured = capsys.readouterr()
         assert "下载进度" in captured.out
+        assert "100.0%" in captured.out
+
+    def test_download_update_custom_progress(self, tmp_path, capsys):
+        """自定义进度回调接收字节数，不输出到控制台"""
+        dest = str(tmp_path / "test.exe")
+
+        mock_response = Mock()
+        mock_response.headers = {"content-length": "50"}
+        mock_response.read.side_effect = [b"x" * 25, b"x" * 25, b""]
+        mock_response.__enter__ = Mock(return_value=mock_response)
+        mock_response.__exit__ = Mock(return_value=False)
+
+        updates = []
+        with patch("urllib.request.OpenerDirector.open", return_value=mock_response):
+            download_update("http://example.com/test.exe", dest, progress=updates.append)
+
+        assert updates[-1].finished
+        assert (updates[-1].bytes_done, updates[-1].bytes_total) == (50, 50)
+        assert capsys.readouterr().out == ""
+
+    def test_download_update_cancelled(self, tmp_path):
+        """取消时停止下载并删除不完整的文件"""
+        dest = tmp_path / "test.exe"
+        token = CancellationToken()
+
+        def read(_size):
+            token.cancel()
+            return b"x" * 25
+
+        mock_response = Mock()
+        mock_response.headers = {"content-length": "100"}
+        mock_response.read.side_effect = read
+        mock_response.__enter__ = Mock(return_value=mock_response)
+        mock_response.__exit__ = Mock(return_value=False)
+
+        with (
+            patch("urllib.request.OpenerDirector.open", return_value=mock_response),
+            pytest.raises(OperationCancelled),
+        ):
+            download_update("http://example.com/test.exe", str(dest), token=token)
+
+        assert mock_response.read.call_count == 1
+        assert not dest.exists()
 
     def test_download_update_network_error(self):
         """网络错误时抛出异常"""
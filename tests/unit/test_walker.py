@@ -0,0 +1,90 @@
+"""目录遍历单元测试"""
+
+import os
+
+import pytest
+
+from remark.utils.cancellation import CancellationToken, OperationCancelled
+from remark.utils.walker import walk_directories
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    tmp_path
+    ├── a
+    │   └── a1
+    │       └── desktop.ini
+    └── b
+        └── DESKTOP.INI
+    """
+    (tmp_path / "a" / "a1").mkdir(parents=True)
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "a1" / "desktop.ini").write_bytes(b"")
+    (tmp_path / "b" / "DESKTOP.INI").write_bytes(b"")
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestWalkDirectories:
+    """目录遍历测试"""
+
+    def test_preorder(self, tree):
+        """测试先序遍历并记录深度"""
+        result = [(os.path.relpath(e.path, tree), e.depth) for e in walk_directories(str(tree))]
+        assert sorted(result) == sorted(
+            [(".", 0), ("a", 1), (os.path.join("a", "a1"), 2), ("b", 1)]
+        )
+        paths = [r[0] for r in result]
+        assert paths.index("a") < paths.index(os.path.join("a", "a1"))
+
+    def test_max_depth(self, tree):
+        """测试深度限制"""
+        depths = [e.depth for e in walk_directories(str(tree), max_depth=1)]
+        assert max(depths) == 1
+
+    def test_has_file_case_insensitive(self, tree):
+        """测试文件查找不区分大小写"""
+        found = {
+            os.path.relpath(e.path, tree)
+            for e in walk_directories(str(tree))
+            if e.has_file("desktop.ini")
+        }
+        assert found == {os.path.join("a", "a1"), "b"}
+
+    def test_include_filter(self, tree):
+        """测试过滤函数跳过子树"""
+        paths = [
+            os.path.relpath(e.path, tree)
+            for e in walk_directories(str(tree), include=lambda entry: entry.name != "a")
+        ]
+        assert sorted(paths) == [".", "b"]
+
+    def test_on_error(self, tmp_path):
+        """测试无法列举的目录通过回调报告"""
+        errors = []
+        result = list(
+            walk_directories(str(tmp_path / "missing"), on_error=lambda p, e: errors.append(p))
+        )
+        assert result == []
+        assert errors == [str(tmp_path / "missing")]
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="需要符号链接支持")
+    def test_symlink_not_followed(self, tree):
+        """测试默认不进入符号链接"""
+        try:
+            os.symlink(tree / "a", tree / "link", target_is_directory=True)
+        except OSError:
+            pytest.skip("无法创建符号链接")
+        paths = {os.path.relpath(e.path, tree) for e in walk_directories(str(tree))}
+        assert "link" not in paths
+
+    def test_cancel(self, tree):
+        """测试取消后停止遍历，之前产出的目录不受影响"""
+        token = CancellationToken()
+        seen = []
+        with pytest.raises(OperationCancelled):
+            for entry in walk_directories(str(tree), token=token):
+                seen.append(entry.path)
+                token.cancel()
+        assert seen == [str(tree)]
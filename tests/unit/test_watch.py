@@ -0,0 +1,307 @@
+"""监视模式单元测试"""
+
+import errno
+import os
+import shutil
+
+import pytest
+
+from remark.core.catalog import RemarkCatalog
+from remark.core.watch import (
+    CacheSubscriber,
+    CatalogSubscriber,
+    ChangeEvent,
+    ChangeKind,
+    Debouncer,
+    InotifyBackend,
+    PollingBackend,
+    ReporterSubscriber,
+    Watcher,
+)
+from remark.storage.attributes import MemoryAttributeBackend
+from remark.storage.cache import RemarkCache
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.utils.cancellation import Deadline
+from remark.utils.reporter import BufferedReporter
+
+CREATED, MODIFIED, DELETED = ChangeKind.CREATED, ChangeKind.MODIFIED, ChangeKind.DELETED
+RENAMED, REMOVED, RESCAN = ChangeKind.RENAMED, ChangeKind.REMOVED, ChangeKind.RESCAN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """tmp_path/root 下的 a（有 desktop.ini）、a/inner 和 b"""
+    root = tmp_path / "root"
+    (root / "a" / "inner").mkdir(parents=True)
+    (root / "b").mkdir()
+    DesktopIniHandler.write_info_tip(str(root / "a"), "甲")
+    return root
+
+
+def write_ini(folder, remark):
+    DesktopIniHandler.write_info_tip(str(folder), remark)
+
+
+def bump_mtime(path):
+    """保证修改时间变化（有些文件系统的时间戳精度较粗）"""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.mark.unit
+class TestDebouncer:
+    """去抖测试"""
+
+    def test_merge_rules(self):
+        """测试同一文件夹的连续事件合并"""
+        debouncer = Debouncer(0)
+        debouncer.add(
+            [
+                ChangeEvent(CREATED, "/a"),
+                ChangeEvent(MODIFIED, "/a"),
+                ChangeEvent(CREATED, "/b"),
+                ChangeEvent(DELETED, "/b"),
+                ChangeEvent(DELETED, "/c"),
+                ChangeEvent(CREATED, "/c"),
+            ]
+        )
+        assert debouncer.flush() == [ChangeEvent(CREATED, "/a"), ChangeEvent(MODIFIED, "/c")]
+        assert debouncer.flush() == []
+
+    def test_folder_events_are_barriers(self):
+        """测试文件夹事件前后的 desktop.ini 事件不合并，顺序保持不变"""
+        debouncer = Debouncer(0)
+        rename = ChangeEvent(RENAMED, "/new", "/old")
+        debouncer.add([ChangeEvent(MODIFIED, "/old"), rename, ChangeEvent(MODIFIED, "/old")])
+        assert debouncer.flush() == [
+            ChangeEvent(MODIFIED, "/old"),
+            rename,
+            ChangeEvent(MODIFIED, "/old"),
+        ]
+
+    def test_timing(self):
+        """测试安静 delay 秒后交出，持续有事件时最多等待 max_delay 秒"""
+        clock = FakeClock()
+        debouncer = Debouncer(1.0, max_delay=3.0, clock=clock)
+        assert debouncer.time_until_due() is None
+        for _ in range(4):
+            debouncer.add([ChangeEvent(MODIFIED, "/a")])
+            assert debouncer.flush() == []
+            clock.now += 0.8
+        # 距上次事件不到 1 秒，但距第一个事件已超过 3 秒
+        assert debouncer.time_until_due() == 0
+        assert debouncer.flush() == [ChangeEvent(MODIFIED, "/a")]
+
+        debouncer.add([ChangeEvent(DELETED, "/a")])
+        assert debouncer.flush() == []
+        assert debouncer.flush(force=True) == [ChangeEvent(DELETED, "/a")]
+
+
+@pytest.mark.unit
+class TestPollingBackend:
+    """轮询后端测试"""
+
+    @pytest.fixture
+    def backend(self, tree):
+        backend = PollingBackend(interval=0)
+        backend.add_root(str(tree))
+        return backend
+
+    def test_no_changes(self, backend):
+        """测试没有变化时不报告事件"""
+        assert backend.poll() == []
+
+    def test_ini_changes(self, tree, backend):
+        """测试 desktop.ini 新建、原地修改和删除"""
+        write_ini(tree / "b", "乙")
+        assert backend.poll() == [ChangeEvent(CREATED, str(tree / "b"))]
+
+        ini = DesktopIniHandler.get_path(str(tree / "a"))
+        with open(ini, "ab") as f:
+            f.write(b"\r\n")
+        bump_mtime(ini)
+        assert backend.poll() == [ChangeEvent(MODIFIED, str(tree / "a"))]
+
+        os.remove(ini)
+        assert backend.poll() == [ChangeEvent(DELETED, str(tree / "a"))]
+
+    def test_rename_and_move(self, tree, backend):
+        """测试按 inode 识别重命名和跨文件夹移动"""
+        os.rename(tree / "a", tree / "renamed")
+        assert backend.poll() == [ChangeEvent(RENAMED, str(tree / "renamed"), str(tree / "a"))]
+        os.rename(tree / "renamed", tree / "b" / "moved")
+        assert backend.poll() == [
+            ChangeEvent(RENAMED, str(tree / "b" / "moved"), str(tree / "renamed"))
+        ]
+        # 快照跟随移动，之后的修改按新路径报告
+        os.remove(DesktopIniHandler.get_path(str(tree / "b" / "moved")))
+        assert backend.poll() == [ChangeEvent(DELETED, str(tree / "b" / "moved"))]
+
+    def test_new_and_removed_folders(self, tree, backend):
+        """测试新文件夹中的 desktop.ini 报告为新建，删除的文件夹报告一次"""
+        (tree / "b" / "new" / "deep").mkdir(parents=True)
+        write_ini(tree / "b" / "new" / "deep", "深")
+        shutil.rmtree(tree / "a")
+        assert sorted(backend.poll(), key=lambda e: e.kind.value) == [
+            ChangeEvent(CREATED, str(tree / "b" / "new" / "deep")),
+            ChangeEvent(REMOVED, str(tree / "a")),
+        ]
+
+    def test_root_removed_and_restored(self, tree, backend):
+        """测试根被删除后报告删除，重新出现时要求重新扫描"""
+        shutil.rmtree(tree)
+        assert backend.poll() == [ChangeEvent(REMOVED, str(tree))]
+        assert backend.poll() == []
+        tree.mkdir()
+        assert backend.poll() == [ChangeEvent(RESCAN, str(tree))]
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not InotifyBackend.available(), reason="inotify not available")
+class TestInotifyBackend:
+    """inotify 后端测试"""
+
+    @pytest.fixture
+    def watcher(self, tree):
+        with Watcher([str(tree)], backend="inotify", debounce=0) as watcher:
+            yield watcher
+
+    @staticmethod
+    def collect(watcher, count):
+        """读取事件直到收到 count 个（最多约 2 秒）"""
+        events = []
+        for _ in range(40):
+            events += watcher.poll(0.05)
+            if len(events) >= count:
+                break
+        return events
+
+    def test_ini_changes(self, tree, watcher):
+        """测试原子写入新建和替换 desktop.ini，以及删除"""
+        assert watcher.backend.name == "inotify"
+        write_ini(tree / "b", "乙")
+        assert self.collect(watcher, 1) == [ChangeEvent(CREATED, str(tree / "b"))]
+        write_ini(tree / "a", "甲2")
+        assert self.collect(watcher, 1) == [ChangeEvent(MODIFIED, str(tree / "a"))]
+        os.remove(DesktopIniHandler.get_path(str(tree / "a")))
+        assert self.collect(watcher, 1) == [ChangeEvent(DELETED, str(tree / "a"))]
+
+    def test_folders(self, tree, watcher):
+        """测试重命名、新建文件夹自动加入监视、删除和移出监视范围"""
+        os.rename(tree / "a", tree / "renamed")
+        assert self.collect(watcher, 1) == [
+            ChangeEvent(RENAMED, str(tree / "renamed"), str(tree / "a"))
+        ]
+        write_ini(tree / "renamed" / "inner", "内")
+        assert self.collect(watcher, 1) == [ChangeEvent(CREATED, str(tree / "renamed" / "inner"))]
+
+        (tree / "new").mkdir()
+        self.collect(watcher, 0)
+        write_ini(tree / "new", "新")
+        assert ChangeEvent(CREATED, str(tree / "new")) in self.collect(watcher, 1)
+
+        shutil.rmtree(tree / "b")
+        assert self.collect(watcher, 1) == [ChangeEvent(REMOVED, str(tree / "b"))]
+        os.rename(tree / "renamed", tree.parent / "outside")
+        assert self.collect(watcher, 1) == [ChangeEvent(REMOVED, str(tree / "renamed"))]
+
+    def test_watch_limit_while_running(self, tree, watcher, monkeypatch):
+        """测试运行中监视数达到上限时发出 RESCAN，而不是中断监视"""
+        backend = watcher.backend
+        add_watch = backend._inotify.add_watch
+
+        def limited(path, mask):
+            if os.path.basename(path) == "deep":
+                raise OSError(errno.ENOSPC, "no space")
+            return add_watch(path, mask)
+
+        monkeypatch.setattr(backend._inotify, "add_watch", limited)
+        (tree.parent / "big" / "deep").mkdir(parents=True)
+        os.rename(tree.parent / "big", tree / "big")
+        assert self.collect(watcher, 1) == [ChangeEvent(RESCAN, str(tree))]
+
+        write_ini(tree / "b", "乙")
+        assert self.collect(watcher, 1) == [ChangeEvent(CREATED, str(tree / "b"))]
+
+
+@pytest.mark.unit
+class TestWatcher:
+    """监视器和订阅者测试"""
+
+    def test_auto_falls_back_to_polling(self, tree, monkeypatch):
+        """测试 inotify 监视数达到上限时退回轮询"""
+
+        def exhausted(self, root):
+            raise OSError(errno.ENOSPC, "no space")
+
+        monkeypatch.setattr(InotifyBackend, "add_root", exhausted)
+        with Watcher([str(tree)]) as watcher:
+            assert watcher.backend.name == "polling"
+        with pytest.raises(ValueError):
+            Watcher([str(tree)], backend="fsevents")
+
+    def test_subscribers(self, tree, tmp_path):
+        """测试备注目录、缓存和日志订阅者按批收到事件"""
+        attributes = MemoryAttributeBackend()
+        cache = RemarkCache()
+        messages = BufferedReporter()
+        with (
+            RemarkCatalog(str(tmp_path / "catalog.sqlite3"), attributes=attributes) as catalog,
+            Watcher([str(tree)], backend=PollingBackend(interval=0), debounce=0) as watcher,
+        ):
+            catalog.refresh(str(tree))
+            watcher.subscribe(CatalogSubscriber(catalog))
+            watcher.subscribe(CacheSubscriber(cache))
+            watcher.subscribe(ReporterSubscriber(messages))
+            cache.get(str(tree / "b"), DesktopIniHandler.read_info_tip)
+
+            write_ini(tree / "b", "乙")
+            assert watcher.poll() == [ChangeEvent(CREATED, str(tree / "b"))]
+            assert catalog.get(str(tree / "b")).remark == "乙"
+            assert cache.stats.invalidations == 1
+
+            os.rename(tree / "a", tree / "c")
+            watcher.poll()
+            assert catalog.get(str(tree / "a")) is None
+            assert catalog.get(str(tree / "c")).remark == "甲"
+            assert catalog.get(str(tree / "c" / "inner")) is not None
+
+        assert messages.render() == [
+            f"desktop.ini 已新建: {tree / 'b'}",
+            f"文件夹已重命名: {tree / 'a'} -> {tree / 'c'}",
+        ]
+
+    def test_failing_subscriber(self, tree):
+        """测试一个订阅者出错时报告错误，其他订阅者仍收到事件"""
+        received = []
+        reporter = BufferedReporter()
+
+        def broken(events):
+            raise RuntimeError("boom")
+
+        with Watcher(
+            [str(tree)], backend=PollingBackend(interval=0), debounce=0, reporter=reporter
+        ) as watcher:
+            watcher.subscribe(broken)
+            watcher.subscribe(received.extend)
+            write_ini(tree / "b", "乙")
+            watcher.poll()
+        assert received == [ChangeEvent(CREATED, str(tree / "b"))]
+        assert "boom" in reporter.render()[0]
+
+    def test_run_flushes_on_stop(self, tree):
+        """测试停止时立即交出尚未到时间的事件"""
+        received = []
+        with Watcher([str(tree)], backend=PollingBackend(interval=0), debounce=60) as watcher:
+            watcher.subscribe(received.extend)
+            write_ini(tree / "b", "乙")
+            watcher.run(Deadline(0.2))
+        assert received == [ChangeEvent(CREATED, str(tree / "b"))]
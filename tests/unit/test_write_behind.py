@@ -0,0 +1,172 @@
+"""写后合并队列单元测试"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from remark.core.folder_handler import CommentResult, ErrorKind, FolderCommentHandler, WriteStatus
+from remark.core.write_behind import WriteBehindQueue, WriteOperation
+from remark.storage.attributes import MemoryAttributeBackend
+from remark.storage.desktop_ini import DesktopIniHandler
+from remark.storage.locking import FolderLocks
+from remark.utils.reporter import ConsoleReporter
+
+
+def make_handler():
+    handler = MagicMock(spec=FolderCommentHandler)
+    handler.set_comment_result.side_effect = lambda path, comment: CommentResult(
+        path, WriteStatus.UPDATED, comment=comment
+    )
+    handler.delete_comment_result.side_effect = lambda path: CommentResult(
+        path, WriteStatus.UPDATED
+    )
+    return handler
+
+
+@pytest.mark.unit
+class TestWriteBehindQueue:
+    """写后合并队列测试"""
+
+    def test_last_writer_wins(self):
+        """测试同一文件夹的多次设置只写入最后一次"""
+        handler = make_handler()
+        with WriteBehindQueue(handler, max_delay=60) as queue:
+            first = queue.set_comment("/folder", "一")
+            second = queue.set_comment("/folder", "二")
+            assert len(queue) == 1
+            results = queue.flush()
+
+        handler.set_comment_result.assert_called_once_with("/folder", "二")
+        assert len(results) == 1
+        assert first.result() is second.result()
+        assert first.result().merged == 2
+        assert queue.stats.coalesced == 1
+        assert queue.stats.written == 1
+
+    def test_delete_cancels_set(self):
+        """测试删除取消尚未写入的设置"""
+        handler = make_handler()
+        with WriteBehindQueue(handler, max_delay=60) as queue:
+            future = queue.set_comment("/folder", "备注")
+            queue.delete_comment("/folder")
+            queue.flush()
+
+        handler.set_comment_result.assert_not_called()
+        handler.delete_comment_result.assert_called_once_with("/folder")
+        assert future.result().operation is WriteOperation.DELETE
+
+    def test_folders_written_separately(self):
+        """测试不同文件夹分别写入"""
+        handler = make_handler()
+        with WriteBehindQueue(handler, max_delay=60) as queue:
+            queue.set_comment("/a", "甲")
+            queue.set_comment("/b", "乙")
+            results = queue.flush()
+
+        assert [r.folder_path for r in results] == ["/a", "/b"]
+        assert handler.set_comment_result.call_count == 2
+
+    def test_flush_on_size(self):
+        """测试积压数量达到上限时自动写入"""
+        handler = make_handler()
+        with WriteBehindQueue(handler, max_pending=2, max_delay=60) as queue:
+            queue.set_comment("/a", "甲")
+            future = queue.set_comment("/b", "乙")
+            assert future.result(timeout=5).success is True
+
+    def test_flush_on_time(self):
+        """测试等待超过时限后自动写入"""
+        handler = make_handler()
+        with WriteBehindQueue(handler, max_delay=0.01) as queue:
+            future = queue.set_comment("/a", "甲")
+            assert future.result(timeout=5).status is WriteStatus.UPDATED
+
+    def test_close_flushes_remaining(self):
+        """测试关闭时写入剩余更新，之后不能再提交"""
+        handler = make_handler()
+        queue = WriteBehindQueue(handler, max_delay=60)
+        future = queue.set_comment("/a", "甲")
+        queue.close()
+
+        assert future.done()
+        with pytest.raises(RuntimeError):
+            queue.set_comment("/a", "乙")
+
+    def test_failure_reported(self):
+        """测试写入失败和异常通过结果返回"""
+        handler = make_handler()
+        handler.set_comment_result.side_effect = [
+            CommentResult("/a", WriteStatus.FAILED, error=ErrorKind.WRITE),
+            OSError("disconnected"),
+        ]
+        results = []
+        with WriteBehindQueue(handler, max_delay=60, on_result=results.append) as queue:
+            failed = queue.set_comment("/a", "甲")
+            queue.flush()
+            raised = queue.set_comment("/a", "乙")
+            queue.flush()
+
+        assert failed.result().success is False
+        assert failed.result().reason is ErrorKind.WRITE
+        assert isinstance(raised.result().error, OSError)
+        assert len(results) == 2
+        assert queue.stats.failed == 2
+
+    @pytest.mark.parametrize("kwargs", [{"max_pending": 0}, {"max_delay": -1}])
+    def test_invalid_arguments(self, kwargs):
+        """测试非法参数"""
+        with pytest.raises(ValueError):
+            WriteBehindQueue(make_handler(), **kwargs)
+
+    def test_concurrent_submitters(self, tmp_path):
+        """测试多线程提交时每个文件夹最终为最后一次写入的值"""
+        handler = FolderCommentHandler(
+            attributes=MemoryAttributeBackend(),
+            locks=FolderLocks(lock_dir=str(tmp_path / "locks")),
+        )
+        folders = []
+        for i in range(4):
+            folder = tmp_path / f"f{i}"
+            folder.mkdir()
+            folders.append(str(folder))
+
+        def submit(queue, folder):
+            for n in range(10):
+                queue.set_comment(folder, f"备注{n}")
+
+        queue = WriteBehindQueue(handler, max_delay=0.005)
+        threads = [threading.Thread(target=submit, args=(queue, f)) for f in folders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        queue.close()
+
+        for folder in folders:
+            assert DesktopIniHandler.read_info_tip(folder) == "备注9"
+        assert queue.stats.submitted == 40
+        assert queue.stats.written + queue.stats.coalesced == 40
+
+    def test_never_prompts_or_prints(self, tmp_path, capsys):
+        """测试后台写入非 UTF-16 desktop.ini 时不询问、不输出，失败原因通过结果返回"""
+        (tmp_path / "desktop.ini").write_bytes("[.ShellClassInfo]\r\nInfoTip=旧\r\n".encode("gbk"))
+        handler = FolderCommentHandler(
+            attributes=MemoryAttributeBackend(),
+            locks=FolderLocks(lock_dir=str(tmp_path / "locks")),
+            reporter=ConsoleReporter(),
+        )
+
+        with (
+            patch("builtins.input", side_effect=AssertionError("input() called")),
+            WriteBehindQueue(handler, max_delay=60) as queue,
+        ):
+            written = queue.set_comment(str(tmp_path), "新备注")
+            queue.flush()
+            deleted = queue.delete_comment(str(tmp_path))
+            queue.flush()
+
+        for future in (written, deleted):
+            assert future.result().success is False
+            assert future.result().reason is ErrorKind.ENCODING
+        assert capsys.readouterr().out == ""